@@ -2,7 +2,8 @@
 Cache management endpoints for cart service.
 """
 
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Request
+from fastapi.responses import JSONResponse
 from logging import getLogger
 
 from kugel_common.schemas.api_response import ApiResponse
@@ -12,6 +13,7 @@ from app.dependencies.terminal_cache_dependency import (
     get_terminal_cache_size,
     get_tenant_terminal_ids_in_cache,
 )
+from app.utils.master_data_snapshot import master_data_event_subscriber
 
 # Create a router instance
 router = APIRouter()
@@ -85,3 +87,20 @@ async def clear_cache(current_user: dict = Depends(get_current_user)) -> ApiResp
             "items_cleared": items_before,
         }
     )
+
+
+@router.post(
+    "/cache/master-data/events",
+    summary="Handle master data change events",
+    description="Refresh the local master data snapshot after master data changed",
+)
+async def handle_master_data_event(request: Request):
+    """
+    Handle a master data change event delivered by Dapr pub/sub.
+
+    Returns:
+        Dapr status (SUCCESS or DROP)
+    """
+    message = await request.json()
+    result = await master_data_event_subscriber.handle_message_async(message)
+    return JSONResponse(content=result, status_code=status.HTTP_200_OK)
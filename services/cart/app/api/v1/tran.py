@@ -15,8 +15,10 @@ from app.models.repositories.terminal_counter_repository import (
 )
 from app.models.repositories.tranlog_repository import TranlogRepository
 from app.models.repositories.tranlog_delivery_status_repository import TranlogDeliveryStatusRepository
-from app.models.repositories.settings_master_web_repository import SettingsMasterWebRepository
-from app.models.repositories.payment_master_web_repository import PaymentMasterWebRepository
+from app.models.repositories.item_master_repository_factory import (
+    create_payment_master_repository,
+    create_settings_master_repository,
+)
 from app.models.repositories.transaction_status_repository import TransactionStatusRepository
 from app.api.v1.schemas import (
     Cart,
@@ -123,13 +125,13 @@ async def get_tran_service_for_pubsub_notification(
     await tranlog_repo.initialize()
     tranlog_delivery_status_repo = TranlogDeliveryStatusRepository(db=db_common, terminal_info=terminal_info)
     await tranlog_delivery_status_repo.initialize()
-    settings_master_repo = SettingsMasterWebRepository(
+    settings_master_repo = create_settings_master_repository(
         tenant_id=tenant_id,
         store_code=terminal_info.store_code,
         terminal_no=terminal_info.terminal_no,
         terminal_info=terminal_info,
     )
-    payment_master_repo = PaymentMasterWebRepository(tenant_id=tenant_id, terminal_info=terminal_info)
+    payment_master_repo = create_payment_master_repository(tenant_id=tenant_id, terminal_info=terminal_info)
     transaction_status_repo = TransactionStatusRepository(db=db, terminal_info=terminal_info)
     await transaction_status_repo.initialize()
 
@@ -173,13 +175,13 @@ async def get_tran_service(
         db=db_common, terminal_info=terminal_info  # use common db
     )
     await tranlog_delivery_status_repo.initialize()
-    settings_master_repo = SettingsMasterWebRepository(
+    settings_master_repo = create_settings_master_repository(
         tenant_id=tenant_id,
         store_code=terminal_info.store_code,
         terminal_no=terminal_info.terminal_no,
         terminal_info=terminal_info,
     )
-    payment_master_repo = PaymentMasterWebRepository(tenant_id=tenant_id, terminal_info=terminal_info)
+    payment_master_repo = create_payment_master_repository(tenant_id=tenant_id, terminal_info=terminal_info)
     transaction_status_repo = TransactionStatusRepository(db=db, terminal_info=terminal_info)
     await transaction_status_repo.initialize()
 
@@ -236,6 +238,9 @@ async def get_transactions_by_query(
     page: int = Query(1),
     sort: list[tuple[str, int]] = Depends(parse_sort),
     include_cancelled: bool = Query(False),
+    paging: str = Query("offset", pattern="^(offset|cursor)$", description="offset: page numbers, cursor: keyset"),
+    cursor: str = Query(None, description="metadata.nextCursor of the previous page (implies paging=cursor)"),
+    total: str = Query("estimate", pattern="^(exact|estimate|none)$", description="Total for cursor paging"),
     tran_service: TranService = Depends(get_tran_service),
 ):
     """
@@ -256,6 +261,9 @@ async def get_transactions_by_query(
         page: Page number for pagination (default: 1)
         sort: Sort order specification
         include_cancelled: Whether to include cancelled transactions
+        paging: "offset" (default) for page numbers, "cursor" for keyset pagination
+        cursor: Cursor of the next page from the previous response (metadata.nextCursor)
+        total: Total reported with cursor paging: exact, estimate (default) or none
         tran_service: Injected transaction service
 
     Returns:
@@ -283,6 +291,9 @@ async def get_transactions_by_query(
             page=page,
             sort=sort,
             include_cancelled=include_cancelled,
+            use_cursor=paging == "cursor",
+            cursor=cursor,
+            total_mode=total,
         )
         return_tranlogs = [SchemasTransformerV1().transform_tran(tranlog=tranlog) for tranlog in paginated_result.data]
     except Exception as e:
@@ -25,13 +25,32 @@ class CartSettings(BaseSettings):
     ITEM_CACHE_TTL_SECONDS: int = Field(default=300, description="Item cache TTL in seconds (default: 5 minutes)")
     USE_ITEM_CACHE: bool = Field(default=True, description="Use item cache to avoid redundant API/gRPC calls")
 
+    # Master data snapshot settings
+    USE_MASTER_DATA_SNAPSHOT: bool = Field(
+        default=False, description="Serve item lookups from a local copy of the master data snapshot"
+    )
+    MASTER_DATA_SNAPSHOT_REFRESH_SECONDS: int = Field(
+        default=60, description="Interval in seconds after which the local master data snapshot is refreshed"
+    )
+    USE_MASTER_DATA_EVENTS: bool = Field(
+        default=False, description="Subscribe to master data change events to refresh the local snapshot early"
+    )
+    MASTER_DATA_PUBSUB_NAME: str = Field(default="pubsub-master-data", description="Dapr pub/sub component")
+    MASTER_DATA_PUBSUB_TOPIC: str = Field(default="topic-master-data", description="Dapr topic for change events")
+
     # gRPC settings
     USE_GRPC: bool = Field(default=False, description="Use gRPC for master-data communication")
     GRPC_TIMEOUT: float = Field(default=5.0, description="gRPC request timeout in seconds")
     MASTER_DATA_GRPC_URL: str = Field(
         default="master-data:50051",
-        description="Master-data gRPC server URL"
+        description="Master-data gRPC server URL (use dns:///<headless-service>:<port> to balance across replicas)"
+    )
+    GRPC_CHANNEL_POOL_SIZE: int = Field(
+        default=2, description="Number of gRPC channels (HTTP/2 connections) pooled per master-data target"
     )
+    GRPC_LB_POLICY: str = Field(default="round_robin", description="gRPC load balancing policy across replicas")
+    GRPC_KEEPALIVE_TIME_MS: int = Field(default=60000, description="Interval of gRPC keepalive pings")
+    GRPC_KEEPALIVE_TIMEOUT_MS: int = Field(default=20000, description="Timeout of gRPC keepalive pings")
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -82,12 +82,8 @@ async def __get_cart_service_async(terminal_info: TerminalInfoDocument, cart_id:
 
     from app.models.repositories.item_master_repository_factory import (
         create_item_master_repository,
-    )
-    from app.models.repositories.payment_master_web_repository import (
-        PaymentMasterWebRepository,
-    )
-    from app.models.repositories.settings_master_web_repository import (
-        SettingsMasterWebRepository,
+        create_payment_master_repository,
+        create_settings_master_repository,
     )
     from kugel_common.models.repositories.store_info_web_repository import (
         StoreInfoWebRepository,
@@ -118,8 +114,8 @@ async def __get_cart_service_async(terminal_info: TerminalInfoDocument, cart_id:
         store_code=terminal_info.store_code,
         terminal_info=terminal_info,
     )
-    payment_master_repo = PaymentMasterWebRepository(tenant_id=tenant_id, terminal_info=terminal_info)
-    settings_master_repo = SettingsMasterWebRepository(
+    payment_master_repo = create_payment_master_repository(tenant_id=tenant_id, terminal_info=terminal_info)
+    settings_master_repo = create_settings_master_repository(
         tenant_id=tenant_id,
         store_code=terminal_info.store_code,
         terminal_no=terminal_info.terminal_no,
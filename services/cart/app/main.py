@@ -24,6 +24,7 @@ from app.api.v1.cart import router as v1_cart_router
 from app.api.v1.tran import router as v1_tran_router
 from app.api.v1.tenant import router as v1_tenant_router
 from app.api.v1.cache import router as v1_cache_router
+from app.utils.master_data_snapshot import master_data_event_subscriber
 from app.cron.republish_undelivery_message import (
     start_republish_undelivered_tranlog_job,
     shutdown_republish_undelivered_tranlog_job,
@@ -76,6 +77,24 @@ async def root():
     return {"message": "Welcome to Kugel-POS Cart API. supoorted version: v1"}
 
 
+# Define Dapr pub/sub subscription endpoints  # Master data change events refresh the local master data snapshot early
+@app.get("/dapr/subscribe")
+def subscribe_topics():
+    """
+    Define Dapr pub/sub subscriptions for this service.
+
+    Returns:
+        list: List of subscription configurations with pubsubname, topic, and route
+    """
+    if not settings.USE_MASTER_DATA_EVENTS:
+        return []
+    return [
+        master_data_event_subscriber.make_subscription(
+            settings.MASTER_DATA_PUBSUB_NAME, settings.MASTER_DATA_PUBSUB_TOPIC, "/api/v1/cache/master-data/events"
+        )
+    ]
+
+
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """
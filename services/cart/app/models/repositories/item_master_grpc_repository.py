@@ -28,6 +28,7 @@ from kugel_common.models.documents.terminal_info_document import TerminalInfoDoc
 from app.models.documents.item_master_document import ItemMasterDocument
 from app.config.settings_cart import cart_settings
 from app.utils.grpc_channel_helper import get_master_data_grpc_stub
+from app.utils.master_data_snapshot import get_item_from_snapshot_async
 from logging import getLogger
 
 logger = getLogger(__name__)
@@ -135,6 +136,11 @@ class ItemMasterGrpcRepository:
                     )
                     return doc
 
+        if cart_settings.USE_MASTER_DATA_SNAPSHOT:
+            item = await get_item_from_snapshot_async(self.tenant_id, self.store_code, self.terminal_info, item_code)
+            if item is not None:
+                return item
+
         # Fetch via gRPC
         try:
             # Use module-level shared stub (eliminates 100-300ms overhead per request)
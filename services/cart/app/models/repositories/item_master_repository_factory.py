@@ -12,9 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """
-Item Master Repository Factory
+Master Data Repository Factory
 
-Provides runtime selection between HTTP and gRPC implementations.
+Provides runtime selection between HTTP and gRPC implementations of the
+repositories reading master-data (items, settings and payments).
 """
 
 from typing import Union
@@ -22,6 +23,10 @@ from kugel_common.models.documents.terminal_info_document import TerminalInfoDoc
 from app.config.settings_cart import cart_settings
 from app.models.repositories.item_master_web_repository import ItemMasterWebRepository
 from app.models.repositories.item_master_grpc_repository import ItemMasterGrpcRepository
+from app.models.repositories.settings_master_web_repository import SettingsMasterWebRepository
+from app.models.repositories.settings_master_grpc_repository import SettingsMasterGrpcRepository
+from app.models.repositories.payment_master_web_repository import PaymentMasterWebRepository
+from app.models.repositories.payment_master_grpc_repository import PaymentMasterGrpcRepository
 from app.models.documents.item_master_document import ItemMasterDocument
 import logging
 
@@ -56,3 +61,38 @@ def create_item_master_repository(
             terminal_info=terminal_info,
             item_master_documents=item_master_documents,
         )
+
+
+def create_settings_master_repository(
+    tenant_id: str,
+    store_code: str,
+    terminal_no: int,
+    terminal_info: TerminalInfoDocument,
+) -> Union[SettingsMasterWebRepository, SettingsMasterGrpcRepository]:
+    """
+    Create settings master repository based on configuration
+
+    Returns:
+        SettingsMasterWebRepository or SettingsMasterGrpcRepository depending on USE_GRPC setting
+    """
+    repository_class = SettingsMasterGrpcRepository if cart_settings.USE_GRPC else SettingsMasterWebRepository
+    return repository_class(
+        tenant_id=tenant_id,
+        store_code=store_code,
+        terminal_no=terminal_no,
+        terminal_info=terminal_info,
+    )
+
+
+def create_payment_master_repository(
+    tenant_id: str,
+    terminal_info: TerminalInfoDocument,
+) -> Union[PaymentMasterWebRepository, PaymentMasterGrpcRepository]:
+    """
+    Create payment master repository based on configuration
+
+    Returns:
+        PaymentMasterWebRepository or PaymentMasterGrpcRepository depending on USE_GRPC setting
+    """
+    repository_class = PaymentMasterGrpcRepository if cart_settings.USE_GRPC else PaymentMasterWebRepository
+    return repository_class(tenant_id=tenant_id, terminal_info=terminal_info)
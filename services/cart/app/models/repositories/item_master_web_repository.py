@@ -5,6 +5,7 @@ from kugel_common.models.documents.terminal_info_document import TerminalInfoDoc
 from app.models.documents.item_master_document import ItemMasterDocument
 from app.config.settings import settings
 from app.config.settings_cart import cart_settings
+from app.utils.master_data_snapshot import get_item_from_snapshot_async
 import time
 from typing import List, Tuple
 
@@ -20,6 +21,8 @@ class ItemMasterWebRepository:
     This class provides methods to retrieve item information from the master data service
     and caches retrieved items to avoid redundant API calls.
     Cached items expire after ITEM_CACHE_TTL_SECONDS.
+    When USE_MASTER_DATA_SNAPSHOT is enabled, items are served from the local
+    master data snapshot of the store and the API is only called on a miss.
     """
 
     def __init__(
@@ -115,6 +118,11 @@ class ItemMasterWebRepository:
                     )
                     return doc
 
+        if cart_settings.USE_MASTER_DATA_SNAPSHOT:
+            item = await get_item_from_snapshot_async(self.tenant_id, self.store_code, self.terminal_info, item_code)
+            if item is not None:
+                return item
+
         # Use pooled client for connection reuse (eliminates 50-100ms overhead per request)
         client = await get_pooled_client("master-data")
         headers = {"X-API-KEY": self.terminal_info.api_key}
@@ -0,0 +1,142 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+gRPC-based Payment Master Repository
+
+Provides payment method retrieval via the MasterDataService gRPC service.
+Maintains compatibility with HTTP-based repository interface.
+"""
+
+import grpc
+from kugel_common.grpc import item_service_pb2
+from kugel_common.exceptions import RepositoryException, NotFoundException
+from kugel_common.models.documents.terminal_info_document import TerminalInfoDocument
+from app.models.documents.payment_master_document import PaymentMasterDocument
+from app.config.settings_cart import cart_settings
+from app.utils.grpc_channel_helper import get_master_data_service_grpc_stub
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class PaymentMasterGrpcRepository:
+    """
+    gRPC-based repository for payment method master data.
+
+    All payment methods of the tenant are loaded with one call the first time a
+    payment method is not found in the cache.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        terminal_info: TerminalInfoDocument,
+        payment_master_documents: list[PaymentMasterDocument] = None,
+    ):
+        """
+        Initialize the repository with tenant and terminal information.
+
+        Args:
+            tenant_id: The tenant identifier
+            terminal_info: Terminal information document
+            payment_master_documents: Optional list of pre-loaded payment documents for caching
+        """
+        self.tenant_id = tenant_id
+        self.terminal_info = terminal_info
+        self.payment_master_documents = payment_master_documents
+        self.base_url = cart_settings.MASTER_DATA_GRPC_URL
+
+    def set_payment_master_documents(self, payment_master_documents: list):
+        """
+        Set the cached payment master documents.
+
+        Args:
+            payment_master_documents: List of payment master documents to cache
+        """
+        self.payment_master_documents = payment_master_documents
+
+    async def get_payment_by_code_async(self, payment_code: str) -> PaymentMasterDocument:
+        """
+        Get a payment method by its code from cache or via gRPC.
+
+        Args:
+            payment_code: The code of the payment method to retrieve
+
+        Returns:
+            PaymentMasterDocument: The requested payment method
+
+        Raises:
+            NotFoundException: If the payment method could not be found
+            RepositoryException: If there's an error communicating via gRPC
+        """
+        if self.payment_master_documents is None:
+            self.payment_master_documents = []
+
+        payment = next(
+            (payment for payment in self.payment_master_documents if payment.payment_code == payment_code), None
+        )
+        if payment is None:
+            self.payment_master_documents = await self.get_all_payments_async()
+            payment = next(
+                (payment for payment in self.payment_master_documents if payment.payment_code == payment_code), None
+            )
+        if payment is None:
+            message = f"payment not found for id {payment_code}"
+            raise NotFoundException(
+                message=message,
+                collection_name="payment grpc",
+                find_key=payment_code,
+                logger=logger,
+            )
+        return payment
+
+    async def get_all_payments_async(self) -> list[PaymentMasterDocument]:
+        """
+        Get all payment methods of the tenant with one gRPC call.
+
+        Returns:
+            list[PaymentMasterDocument]: All payment methods
+
+        Raises:
+            RepositoryException: If there's an error communicating via gRPC
+        """
+        try:
+            stub = await get_master_data_service_grpc_stub(self.tenant_id, self.terminal_info.store_code)
+            request = item_service_pb2.MasterDataRequest(
+                tenant_id=self.tenant_id, terminal_id=self.terminal_info.terminal_id
+            )
+            response = await stub.ListPayments(request, timeout=cart_settings.GRPC_TIMEOUT)
+        except grpc.RpcError as e:
+            message = f"gRPC error listing payments: {e.code()} - {e.details()}"
+            raise RepositoryException(
+                message=message,
+                collection_name="payment grpc",
+                logger=logger,
+                original_exception=e,
+            )
+
+        logger.info(f"PaymentMasterGrpcRepository: fetched {len(response.payments)} payments via gRPC")
+        return [
+            PaymentMasterDocument(
+                tenant_id=self.tenant_id,
+                payment_code=payment.payment_code,
+                description=payment.description,
+                limit_amount=payment.limit_amount,
+                can_refund=payment.can_refund,
+                can_deposit_over=payment.can_deposit_over,
+                can_change=payment.can_change,
+                is_active=payment.is_active,
+            )
+            for payment in response.payments
+        ]
@@ -52,7 +52,8 @@ class PaymentMasterWebRepository:
         """
         Get a payment method by its code from cache or from the web API.
 
-        First checks if the payment method exists in the cache, and if not, fetches it from the API.
+        First checks if the payment method exists in the cache, and if not, reloads the
+        whole payment list from the API.
 
         Args:
             payment_code: The code of the payment method to retrieve
@@ -71,27 +72,51 @@ class PaymentMasterWebRepository:
         payment = next(
             (payment for payment in self.payment_master_documents if payment.payment_code == payment_code), None
         )
-        if payment is not None:
-            logger.info(
-                f"paymentMasterRepository.get_payment_by_code: payment_code->{payment_code} in the list of payment_master_documents"
+        if payment is None:
+            self.payment_master_documents = await self.get_all_payments_async()
+            payment = next(
+                (payment for payment in self.payment_master_documents if payment.payment_code == payment_code), None
             )
-            return payment
+        if payment is None:
+            message = f"payment not found for id {payment_code}"
+            raise NotFoundException(
+                message=message,
+                collection_name="payment web",
+                find_key=payment_code,
+                logger=logger,
+            )
+        return payment
+
+    async def get_all_payments_async(self) -> list[PaymentMasterDocument]:
+        """
+        Get all payment methods of the tenant with one conditional GET request.
+
+        The list is revalidated with its ETag, so while it is unchanged master-data
+        answers 304 Not Modified and the previously received list is reused.
+
+        Returns:
+            list[PaymentMasterDocument]: All payment methods
 
+        Raises:
+            RepositoryException: If there's an error communicating with the API
+        """
         # Use pooled client for connection reuse (eliminates 50-100ms overhead per request)
         client = await get_pooled_client("master-data")
         headers = {"X-API-KEY": self.terminal_info.api_key}
-        params = {"terminal_id": self.terminal_info.terminal_id}
-        endpoint = f"/tenants/{self.tenant_id}/payments/{payment_code}"
+        params = {"terminal_id": self.terminal_info.terminal_id, "limit": 0}
+        endpoint = f"/tenants/{self.tenant_id}/payments"
 
         try:
-            response_data = await client.get(endpoint, params=params, headers=headers)
+            response_data = await client.get_conditional(endpoint, params=params, headers=headers)
         except Exception as e:
-            if hasattr(e, "status_code") and e.status_code == 404:
-                message = f"payment not found for id {payment_code}: {e.status_code}"
-                raise NotFoundException(message, payment_code, logger)
-            else:
-                message = f"Request error for id {payment_code}: {e}"
-                raise RepositoryException(message, logger)
-
-        logger.debug(f"response: {response_data}")
-        return PaymentMasterDocument(**response_data.get("data"))
+            message = f"Request error listing payments: {e}"
+            raise RepositoryException(
+                message=message,
+                collection_name="payment web",
+                logger=logger,
+                original_exception=e,
+            )
+
+        payments = response_data.get("data") or []
+        logger.debug(f"PaymentMasterWebRepository: fetched {len(payments)} payments")
+        return [PaymentMasterDocument(**payment) for payment in payments]
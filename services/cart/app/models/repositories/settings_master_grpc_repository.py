@@ -0,0 +1,151 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+gRPC-based Settings Master Repository
+
+Provides settings value resolution via the MasterDataService gRPC service.
+Maintains compatibility with HTTP-based repository interface.
+"""
+
+import grpc
+from kugel_common.grpc import item_service_pb2
+from kugel_common.exceptions import RepositoryException
+from kugel_common.models.documents.terminal_info_document import TerminalInfoDocument
+from app.models.documents.settings_master_document import SettingsMasterDocument
+from app.config.settings_cart import cart_settings
+from app.utils.grpc_channel_helper import get_master_data_service_grpc_stub
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class SettingsMasterGrpcRepository:
+    """
+    gRPC-based repository for settings master data.
+
+    Values are resolved by master-data for the store and terminal of the repository,
+    so the returned documents carry the resolved value as their default value.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        store_code: str = None,
+        terminal_no: int = None,
+        terminal_info: TerminalInfoDocument = None,
+        settings_master_documents: list[SettingsMasterDocument] = None,
+    ):
+        """
+        Initialize the repository with tenant, store, and terminal information.
+
+        Args:
+            tenant_id: The tenant identifier
+            store_code: Optional store code filter
+            terminal_no: Optional terminal number filter
+            terminal_info: Terminal information document
+            settings_master_documents: Optional list of pre-loaded settings documents for caching
+        """
+        self.tenant_id = tenant_id
+        self.store_code = store_code
+        self.terminal_no = terminal_no
+        self.terminal_info = terminal_info
+        self.settings_master_documents = settings_master_documents
+        self.base_url = cart_settings.MASTER_DATA_GRPC_URL
+
+    def set_settings_master_documents(self, settings_master_documents: list):
+        """
+        Set the cached settings master documents.
+
+        Args:
+            settings_master_documents: List of settings master documents to cache
+        """
+        self.settings_master_documents = settings_master_documents
+
+    async def get_all_settings_async(self) -> list[SettingsMasterDocument]:
+        """
+        Resolve all settings of the tenant for the store and terminal.
+
+        Returns:
+            list[SettingsMasterDocument]: A list of all settings with their resolved values
+
+        Raises:
+            RepositoryException: If there's an error communicating via gRPC
+        """
+        self.settings_master_documents = await self.resolve_settings_async([])
+        return self.settings_master_documents
+
+    async def get_settings_value_by_name_async(self, name: str) -> SettingsMasterDocument:
+        """
+        Get a specific setting by its name from cache or via gRPC.
+
+        Args:
+            name: The name of the setting to retrieve
+
+        Returns:
+            SettingsMasterDocument: The requested setting document, or None if not found
+
+        Raises:
+            RepositoryException: If there's an error communicating via gRPC
+        """
+        if self.settings_master_documents is None:
+            self.settings_master_documents = []
+
+        # first check name exist in the list of settings_master_documents
+        setting_doc = next((setting for setting in self.settings_master_documents if setting.name == name), None)
+        if setting_doc is not None:
+            return setting_doc
+
+        setting_docs = await self.resolve_settings_async([name])
+        if not setting_docs:
+            return None
+        self.settings_master_documents.extend(setting_docs)
+        return setting_docs[0]
+
+    async def resolve_settings_async(self, names: list[str]) -> list[SettingsMasterDocument]:
+        """
+        Resolve several settings with one gRPC call.
+
+        Args:
+            names: Names of the settings to resolve, empty for all settings of the tenant
+
+        Returns:
+            list[SettingsMasterDocument]: The settings that exist, with the resolved value as default value
+
+        Raises:
+            RepositoryException: If there's an error communicating via gRPC
+        """
+        try:
+            stub = await get_master_data_service_grpc_stub(self.tenant_id, self.store_code)
+            request = item_service_pb2.SettingsResolveRequest(
+                tenant_id=self.tenant_id,
+                store_code=self.store_code or "",
+                terminal_no=self.terminal_no or 0,
+                names=names,
+                terminal_id=self.terminal_info.terminal_id if self.terminal_info else "",
+            )
+            response = await stub.ResolveSettings(request, timeout=cart_settings.GRPC_TIMEOUT)
+        except grpc.RpcError as e:
+            message = f"gRPC error resolving settings {names}: {e.code()} - {e.details()}"
+            raise RepositoryException(
+                message=message,
+                collection_name="settings grpc",
+                logger=logger,
+                original_exception=e,
+            )
+
+        return [
+            SettingsMasterDocument(tenant_id=self.tenant_id, name=value.name, default_value=value.value, values=[])
+            for value in response.values
+            if value.found
+        ]
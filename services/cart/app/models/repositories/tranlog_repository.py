@@ -3,6 +3,7 @@ from logging import getLogger
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.models.repositories.keyset_pagination import TotalMode
 from kugel_common.exceptions import CannotCreateException
 from kugel_common.models.documents.terminal_info_document import TerminalInfoDocument
 from kugel_common.schemas.pagination import PaginatedResult
@@ -101,6 +102,9 @@ class TranlogRepository(AbstractRepository[BaseTransaction]):
         page: int = 1,
         sort: list[tuple[str, int]] = None,
         include_cancelled: bool = False,
+        use_cursor: bool = False,
+        cursor: str = None,
+        total_mode: str = TotalMode.ESTIMATE,
     ) -> PaginatedResult[BaseTransaction]:
         """
         Retrieve a paginated list of transaction logs matching the specified criteria.
@@ -116,6 +120,9 @@ class TranlogRepository(AbstractRepository[BaseTransaction]):
             page: Page number to retrieve
             sort: List of field name and direction tuples for sorting
             include_cancelled: Whether to include cancelled transactions
+            use_cursor: Use cursor (keyset) pagination instead of page numbers
+            cursor: Cursor of the next page returned in the previous page's metadata
+            total_mode: Total reported with cursor pagination: exact, estimate or none
 
         Returns:
             PaginatedResult[BaseTransaction]: Paginated list of matching transaction logs
@@ -134,6 +141,10 @@ class TranlogRepository(AbstractRepository[BaseTransaction]):
         logger.debug(
             f"TranlogRepository.get_tranlog_list_by_query_async: query->{query} limit->{limit} page->{page} sort->{sort}"
         )
+        if use_cursor or cursor:
+            return await self.get_keyset_paginated_list_async(
+                filter=query, limit=limit, sort=sort, cursor=cursor, total_mode=total_mode
+            )
         return await self.get_paginated_list_async(filter=query, limit=limit, page=page, sort=sort)
 
     def __get_shard_key(self, tranlog: BaseTransaction) -> str:
@@ -14,6 +14,7 @@ from kugel_common.models.documents.base_tranlog import BaseTransaction
 from kugel_common.receipt.abstract_receipt_data import AbstractReceiptData
 from kugel_common.utils.misc import get_app_time_str, get_app_time
 from kugel_common.enums import TransactionType
+from kugel_common.models.repositories.keyset_pagination import TotalMode
 from kugel_common.utils.slack_notifier import send_warning_notification
 
 from app.models.repositories.tranlog_repository import TranlogRepository
@@ -317,6 +318,9 @@ class TranService:
         page: int = 1,
         sort: list[tuple[str, int]] = None,
         include_cancelled: bool = False,
+        use_cursor: bool = False,
+        cursor: str = None,
+        total_mode: str = TotalMode.ESTIMATE,
     ):
         """
         Retrieve transaction logs matching specified criteria.
@@ -335,6 +339,9 @@ class TranService:
             page: Page number to retrieve
             sort: List of field name and direction tuples for sorting
             include_cancelled: Whether to include cancelled transactions
+            use_cursor: Use cursor (keyset) pagination instead of page numbers
+            cursor: Cursor of the next page returned in the previous page's metadata
+            total_mode: Total reported with cursor pagination: exact, estimate or none
 
         Returns:
             PaginatedResult: Paginated list of matching transaction logs with void/return status
@@ -351,6 +358,9 @@ class TranService:
             page=page,
             sort=sort,
             include_cancelled=include_cancelled,
+            use_cursor=use_cursor,
+            cursor=cursor,
+            total_mode=total_mode,
         )
 
         # Merge void/return status from history
@@ -15,32 +15,137 @@
 gRPC Channel Helper for Master-Data Service
 
 Provides module-level gRPC channel pooling to eliminate channel creation overhead.
-Channels are shared across all requests for the same tenant/store combination.
+Channels are pooled per target (MASTER_DATA_GRPC_URL), not per tenant/store, so a
+deployment with many stores keeps a fixed number of HTTP/2 connections to
+master-data. Each target gets GRPC_CHANNEL_POOL_SIZE channels with their own
+connections; calls are spread over them in turn and each channel balances its
+calls across master-data replicas with GRPC_LB_POLICY (round_robin needs a target
+resolving to all replicas, e.g. dns:///master-data-headless:50051).
 
 Performance Impact:
 - Eliminates 100-300ms gRPC channel creation overhead per request
-- Expected channel creation reduction: 98-99%
+- Number of connections no longer grows with the number of tenants/stores
 
 Usage:
     from app.utils.grpc_channel_helper import get_master_data_grpc_stub
 
     stub = await get_master_data_grpc_stub(tenant_id, store_code)
     response = await stub.GetItemDetail(request)
+
+    master_data_stub = await get_master_data_service_grpc_stub(tenant_id, store_code)
+    response = await master_data_stub.ResolveSettings(request)
 """
 
-from typing import Dict, Tuple, Optional
+from typing import Any, Dict, List
 import grpc
 from kugel_common.grpc import item_service_pb2_grpc
-from kugel_common.utils.grpc_client_helper import GrpcClientHelper
 from app.config.settings_cart import cart_settings
 from logging import getLogger
 
 logger = getLogger(__name__)
 
-# Module-level channel and stub cache (shared across all requests)
-# Key: (tenant_id, store_code)
-_channels: Dict[Tuple[str, str], grpc.aio.Channel] = {}
-_stubs: Dict[Tuple[str, str], item_service_pb2_grpc.ItemServiceStub] = {}
+
+class _CallCounter:
+    """
+    Counter of the calls (streams) of a pooled channel.
+
+    Active calls are the HTTP/2 streams currently open on the channel.
+    """
+
+    def __init__(self):
+        self.active_calls = 0
+        self.total_calls = 0
+
+    def _on_done(self, call) -> None:
+        self.active_calls -= 1
+
+    async def intercept(self, continuation, client_call_details, request):
+        """Start the call and count it until it is done"""
+        self.total_calls += 1
+        self.active_calls += 1
+        try:
+            call = await continuation(client_call_details, request)
+        except BaseException:
+            self.active_calls -= 1
+            raise
+        call.add_done_callback(self._on_done)
+        return call
+
+
+class _UnaryUnaryCallCounter(grpc.aio.UnaryUnaryClientInterceptor):
+    """Client interceptor counting the unary calls of a channel"""
+
+    def __init__(self, counter: _CallCounter):
+        self.counter = counter
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        return await self.counter.intercept(continuation, client_call_details, request)
+
+
+class _UnaryStreamCallCounter(grpc.aio.UnaryStreamClientInterceptor):
+    """Client interceptor counting the server streaming calls of a channel"""
+
+    def __init__(self, counter: _CallCounter):
+        self.counter = counter
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        return await self.counter.intercept(continuation, client_call_details, request)
+
+
+# Module-level channel and stub pools (shared across all requests)
+# Key: target, one entry per pooled channel
+_channels: Dict[str, List[grpc.aio.Channel]] = {}
+_call_counters: Dict[str, List[_CallCounter]] = {}
+_stubs: Dict[str, List[item_service_pb2_grpc.ItemServiceStub]] = {}
+_master_data_stubs: Dict[str, List[item_service_pb2_grpc.MasterDataServiceStub]] = {}
+# index of the pooled channel used by the next call
+_next_channel: Dict[str, int] = {}
+
+
+def _get_channel_options() -> list[tuple[str, Any]]:
+    """Get the options of the pooled channels"""
+    return [
+        ('grpc.max_send_message_length', 10 * 1024 * 1024),  # 10 MB
+        ('grpc.max_receive_message_length', 10 * 1024 * 1024),  # 10 MB
+        ('grpc.keepalive_time_ms', cart_settings.GRPC_KEEPALIVE_TIME_MS),
+        ('grpc.keepalive_timeout_ms', cart_settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+        ('grpc.lb_policy_name', cart_settings.GRPC_LB_POLICY),
+        # give each pooled channel its own connections instead of sharing the global subchannel pool
+        ('grpc.use_local_subchannel_pool', 1),
+    ]
+
+
+def _get_pool_index(target: str) -> int:
+    """
+    Get the index of the pooled channel for the next call, creating the pool on first use.
+
+    Args:
+        target: The master-data gRPC target
+
+    Returns:
+        Index of the channel in the pool of the target
+    """
+    if target not in _channels:
+        pool_size = max(1, cart_settings.GRPC_CHANNEL_POOL_SIZE)
+        _call_counters[target] = [_CallCounter() for _ in range(pool_size)]
+        _channels[target] = [
+            grpc.aio.insecure_channel(
+                target,
+                options=_get_channel_options(),
+                interceptors=[_UnaryUnaryCallCounter(counter), _UnaryStreamCallCounter(counter)],
+            )
+            for counter in _call_counters[target]
+        ]
+        _stubs[target] = [item_service_pb2_grpc.ItemServiceStub(channel) for channel in _channels[target]]
+        _master_data_stubs[target] = [
+            item_service_pb2_grpc.MasterDataServiceStub(channel) for channel in _channels[target]
+        ]
+        _next_channel[target] = 0
+        logger.info(f"Created gRPC channel pool for master-data service (target={target}, size={pool_size})")
+
+    index = _next_channel[target]
+    _next_channel[target] = (index + 1) % len(_channels[target])
+    return index
 
 
 async def get_master_data_grpc_stub(
@@ -48,48 +153,46 @@ async def get_master_data_grpc_stub(
     store_code: str
 ) -> item_service_pb2_grpc.ItemServiceStub:
     """
-    Get or create a shared gRPC stub for master-data service.
+    Get a shared gRPC stub for master-data service.
 
-    Stubs are cached per (tenant_id, store_code) combination and reused across all requests.
-    This eliminates the 100-300ms channel creation overhead per request.
+    Stubs are pooled per target and shared by all tenants and stores; every call
+    returns the stub of the next channel of the pool.
 
     Args:
-        tenant_id: The tenant identifier
-        store_code: The store code
+        tenant_id: The tenant identifier (not part of the pool key)
+        store_code: The store code (not part of the pool key)
 
     Returns:
         ItemServiceStub: A gRPC stub for ItemService, shared across all requests
-                         for the same tenant/store combination
 
     Performance:
-        - First call for a tenant/store: Creates channel (~100-300ms)
-        - Subsequent calls: Returns cached stub (~1-5ms)
-        - Expected improvement: 98-99% reduction in channel creation overhead
+        - First call: Creates the channel pool (~100-300ms on first connect)
+        - Subsequent calls: Returns a pooled stub (~1-5ms)
     """
-    cache_key = (tenant_id, store_code)
+    target = cart_settings.MASTER_DATA_GRPC_URL
+    index = _get_pool_index(target)
+    return _stubs[target][index]
 
-    if cache_key not in _channels or cache_key not in _stubs:
-        # Create gRPC helper with configuration
-        grpc_helper = GrpcClientHelper(
-            target=cart_settings.MASTER_DATA_GRPC_URL,
-            options=[
-                ('grpc.max_send_message_length', 10 * 1024 * 1024),  # 10 MB
-                ('grpc.max_receive_message_length', 10 * 1024 * 1024),  # 10 MB
-            ]
-        )
 
-        # Create channel via helper
-        _channels[cache_key] = await grpc_helper.get_channel()
+async def get_master_data_service_grpc_stub(
+    tenant_id: str,
+    store_code: str
+) -> item_service_pb2_grpc.MasterDataServiceStub:
+    """
+    Get a shared gRPC stub for the MasterDataService of master-data.
 
-        # Create stub (reused for all requests)
-        _stubs[cache_key] = item_service_pb2_grpc.ItemServiceStub(_channels[cache_key])
+    The stub uses the same channel pool as the ItemService stubs.
 
-        logger.info(
-            f"Created new gRPC channel for master-data service "
-            f"(tenant={tenant_id}, store={store_code})"
-        )
+    Args:
+        tenant_id: The tenant identifier (not part of the pool key)
+        store_code: The store code (not part of the pool key)
 
-    return _stubs[cache_key]
+    Returns:
+        MasterDataServiceStub: A gRPC stub for settings, payments, taxes and categories
+    """
+    target = cart_settings.MASTER_DATA_GRPC_URL
+    index = _get_pool_index(target)
+    return _master_data_stubs[target][index]
 
 
 async def close_master_data_grpc_channels() -> None:
@@ -106,40 +209,58 @@ async def close_master_data_grpc_channels() -> None:
     closed_count = 0
     error_count = 0
 
-    for cache_key, channel in list(_channels.items()):
-        try:
-            await channel.close()
-            logger.info(
-                f"Closed gRPC channel for master-data service "
-                f"(tenant={cache_key[0]}, store={cache_key[1]})"
-            )
-            closed_count += 1
-        except Exception as e:
-            logger.warning(
-                f"Error closing gRPC channel for (tenant={cache_key[0]}, store={cache_key[1]}): {e}",
-                exc_info=True
-            )
-            error_count += 1
+    for target, channels in list(_channels.items()):
+        for index, channel in enumerate(channels):
+            try:
+                await channel.close()
+                logger.info(f"Closed gRPC channel for master-data service (target={target}, index={index})")
+                closed_count += 1
+            except Exception as e:
+                logger.warning(
+                    f"Error closing gRPC channel for (target={target}, index={index}): {e}",
+                    exc_info=True
+                )
+                error_count += 1
 
     # Clear the caches
     _channels.clear()
+    _call_counters.clear()
     _stubs.clear()
+    _master_data_stubs.clear()
+    _next_channel.clear()
 
     logger.info(
         f"gRPC channel cleanup complete: {closed_count} closed, {error_count} errors"
     )
 
 
-def get_channel_cache_stats() -> Dict[str, int]:
+def get_channel_cache_stats() -> Dict[str, Any]:
     """
-    Get statistics about the channel cache.
+    Get statistics about the channel pool.
 
     Returns:
-        Dict with 'total_channels' and 'total_stubs' counts
+        Dict with 'total_channels', 'total_stubs', 'total_master_data_stubs' and
+        'total_active_calls' counts, and 'channels' with the connectivity state
+        and call (stream) counts of every pooled channel
 
     Note: This is primarily for testing and monitoring purposes.
     """
+    channels = []
+    for target, pool in _channels.items():
+        for index, (channel, counter) in enumerate(zip(pool, _call_counters.get(target, []))):
+            channels.append(
+                {
+                    'target': target,
+                    'index': index,
+                    'state': channel.get_state(try_to_connect=False).name,
+                    'active_calls': counter.active_calls,
+                    'total_calls': counter.total_calls,
+                }
+            )
     return {
-        'total_channels': len(_channels),
-        'total_stubs': len(_stubs),
+        'total_channels': sum(len(pool) for pool in _channels.values()),
+        'total_stubs': sum(len(pool) for pool in _stubs.values()),
+        'total_master_data_stubs': sum(len(pool) for pool in _master_data_stubs.values()),
+        'total_active_calls': sum(channel['active_calls'] for channel in channels),
+        'channels': channels,
     }
@@ -0,0 +1,282 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Local copy of the master data snapshot served by the master-data service
+
+Cart workers download the versioned master data snapshots once and keep them
+as in-memory indexes, so item lookups during cart operations do not need a
+request per item. Items, categories, payments, settings and taxes are shared by
+all stores of a tenant and are kept once per tenant; only the store prices are
+kept per store. Each copy is refreshed after MASTER_DATA_SNAPSHOT_REFRESH_SECONDS
+with a conditional request (If-None-Match) that downloads only the documents
+changed since the version held locally.
+
+Usage:
+    from app.utils.master_data_snapshot import master_data_snapshot_manager
+
+    item = await get_item_from_snapshot_async(tenant_id, store_code, terminal_info, item_code)
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+from logging import getLogger
+
+from kugel_common.models.documents.terminal_info_document import TerminalInfoDocument
+from kugel_common.utils.http_client_helper import get_pooled_client
+from kugel_common.utils.master_data_events import MasterDataChangeEvent, MasterDataEventSubscriber
+from app.config.settings_cart import cart_settings
+from app.models.documents.item_master_document import ItemMasterDocument
+
+logger = getLogger(__name__)
+
+# section name -> field identifying a document within the section, for the sections shared by the tenant
+TENANT_SECTION_KEYS = {
+    "items": "item_code",
+    "categories": "category_code",
+    "payments": "payment_code",
+    "settings": "name",
+    "taxes": "tax_code",
+}
+
+# section name -> field identifying a document within the section, for the sections of a store
+STORE_SECTION_KEYS = {
+    "store_prices": "item_code",
+}
+
+
+class MasterDataSnapshot:
+    """In-memory indexes of the master data snapshot of a tenant, or of the store prices of a store."""
+
+    def __init__(self, tenant_id: str, store_code: Optional[str] = None):
+        """
+        Initialize an empty snapshot.
+
+        Args:
+            tenant_id: The tenant identifier
+            store_code: The store code for a store snapshot, None for the tenant snapshot
+        """
+        self.tenant_id = tenant_id
+        self.store_code = store_code
+        self.section_keys = STORE_SECTION_KEYS if store_code is not None else TENANT_SECTION_KEYS
+        self.version: Optional[int] = None
+        self.etag: Optional[str] = None
+        self.refreshed_at = 0.0
+        self.indexes: Dict[str, Dict[str, dict]] = {name: {} for name in self.section_keys}
+
+    @property
+    def name(self) -> str:
+        return self.tenant_id if self.store_code is None else f"{self.tenant_id}/{self.store_code}"
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.version is not None
+
+    def apply(self, data: dict) -> None:
+        """
+        Apply a full snapshot or a delta downloaded from the master-data service.
+
+        Args:
+            data: The "data" of the snapshot response
+        """
+        sections = data.get("sections", {})
+        keys = data.get("keys") if not data.get("full", True) else None
+        for name, key_field in self.section_keys.items():
+            documents = sections.get(name, [])
+            if keys is None or name not in keys:
+                # full snapshot of the section (taxes are always sent in full)
+                index = {}
+            else:
+                # delta: keep only documents that still exist, then apply the changes
+                existing = set(keys[name])
+                index = {key: doc for key, doc in self.indexes[name].items() if key in existing}
+            for document in documents:
+                key = document.get(key_field)
+                if document.get("is_deleted"):
+                    index.pop(key, None)
+                else:
+                    index[key] = document
+            self.indexes[name] = index
+        self.version = data.get("version")
+        self.etag = data.get("etag")
+        self.refreshed_at = time.monotonic()
+
+    def get(self, section: str, key: str) -> Optional[dict]:
+        """
+        Get a document of a section by its key.
+
+        Args:
+            section: Section name (items, categories, payments, settings, taxes ...)
+            key: Key of the document
+
+        Returns:
+            The document, or None if it is not in the snapshot
+        """
+        return self.indexes[section].get(key)
+
+    def get_item(
+        self, item_code: str, store_snapshot: Optional["MasterDataSnapshot"] = None
+    ) -> Optional[ItemMasterDocument]:
+        """
+        Get an item of the tenant snapshot merged with the price of the store, like the item details API.
+
+        Args:
+            item_code: The code of the item
+            store_snapshot: Snapshot holding the store prices, None for the item without a store price
+
+        Returns:
+            ItemMasterDocument, or None if the item is not in the snapshot
+        """
+        item = self.indexes["items"].get(item_code)
+        if item is None:
+            return None
+        item_doc = ItemMasterDocument(**item)
+        store_item = store_snapshot.get("store_prices", item_code) if store_snapshot is not None else None
+        if store_item is not None:
+            item_doc.store_code = store_item.get("store_code")
+            item_doc.store_price = store_item.get("store_price")
+        return item_doc
+
+
+class MasterDataSnapshotManager:
+    """Keeps the master data snapshots of the tenants and stores served by this worker up to date."""
+
+    def __init__(self):
+        # (tenant_id, None) for tenant snapshots, (tenant_id, store_code) for store snapshots
+        self._snapshots: Dict[Tuple[str, Optional[str]], MasterDataSnapshot] = {}
+        self._locks: Dict[Tuple[str, Optional[str]], asyncio.Lock] = {}
+
+    async def get_snapshot_async(
+        self, tenant_id: str, store_code: Optional[str], terminal_info: TerminalInfoDocument
+    ) -> MasterDataSnapshot:
+        """
+        Get the snapshot of a tenant or a store, downloading or refreshing it when it is stale.
+
+        Only one refresh per snapshot runs at a time; concurrent callers wait for it
+        and then use the refreshed snapshot.
+
+        Args:
+            tenant_id: The tenant identifier
+            store_code: The store code for the store prices, None for the sections shared by the tenant
+            terminal_info: Terminal information used for authentication
+
+        Returns:
+            MasterDataSnapshot of the tenant or the store
+        """
+        key = (tenant_id, store_code)
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and not self.__is_stale(snapshot):
+            return snapshot
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            snapshot = self._snapshots.setdefault(key, MasterDataSnapshot(tenant_id, store_code))
+            if self.__is_stale(snapshot):
+                await self.__refresh_async(snapshot, terminal_info)
+        return snapshot
+
+    def __is_stale(self, snapshot: MasterDataSnapshot) -> bool:
+        return (
+            not snapshot.is_loaded
+            or time.monotonic() - snapshot.refreshed_at >= cart_settings.MASTER_DATA_SNAPSHOT_REFRESH_SECONDS
+        )
+
+    async def __refresh_async(self, snapshot: MasterDataSnapshot, terminal_info: TerminalInfoDocument) -> None:
+        client = await get_pooled_client("master-data")
+        headers = {"X-API-KEY": terminal_info.api_key}
+        params: Dict[str, Any] = {"terminal_id": terminal_info.terminal_id}
+        if snapshot.is_loaded:
+            headers["If-None-Match"] = snapshot.etag
+            params["since"] = snapshot.version
+        if snapshot.store_code is None:
+            endpoint = f"/tenants/{snapshot.tenant_id}/master-snapshot"
+        else:
+            endpoint = f"/tenants/{snapshot.tenant_id}/stores/{snapshot.store_code}/master-snapshot"
+            params["scope"] = "store"
+
+        response_data, status_code = await client.request("GET", endpoint, params=params, headers=headers)
+        if status_code == 304:
+            logger.debug(f"Master data snapshot of {snapshot.name} is up to date")
+            snapshot.refreshed_at = time.monotonic()
+            return
+        snapshot.apply(response_data.get("data"))
+        logger.info(
+            f"Master data snapshot of {snapshot.name} refreshed: version->{snapshot.version}, "
+            f"documents->{sum(len(index) for index in snapshot.indexes.values())}"
+        )
+
+    def invalidate(self, tenant_id: str, store_code: Optional[str] = None) -> None:
+        """
+        Mark the snapshots of a tenant as stale, so the next lookup refreshes them.
+
+        The refresh is still a conditional delta download, so invalidating on every
+        change event is cheap.
+
+        Args:
+            tenant_id: The tenant whose master data changed
+            store_code: If provided, only the store prices of this store are invalidated
+        """
+        for (snapshot_tenant_id, snapshot_store_code), snapshot in self._snapshots.items():
+            if snapshot_tenant_id == tenant_id and store_code in (None, snapshot_store_code):
+                snapshot.refreshed_at = 0.0
+
+    def clear(self, tenant_id: Optional[str] = None) -> None:
+        """
+        Drop the local snapshots.
+
+        Args:
+            tenant_id: If provided, drop only the snapshots of this tenant
+        """
+        for key in [key for key in self._snapshots if tenant_id is None or key[0] == tenant_id]:
+            del self._snapshots[key]
+
+
+# Module-level manager shared by all requests of the worker
+master_data_snapshot_manager = MasterDataSnapshotManager()
+
+
+async def _on_master_data_changed(event: MasterDataChangeEvent) -> None:
+    master_data_snapshot_manager.invalidate(event.tenant_id, event.store_code)
+
+
+# Subscriber of the master data change events published by master-data
+master_data_event_subscriber = MasterDataEventSubscriber()
+master_data_event_subscriber.register_all(_on_master_data_changed)
+
+
+async def get_item_from_snapshot_async(
+    tenant_id: str, store_code: str, terminal_info: TerminalInfoDocument, item_code: str
+) -> Optional[ItemMasterDocument]:
+    """
+    Look up an item in the local snapshot of the tenant, with the price of the store.
+
+    The snapshot is only an optimization, so errors while downloading it are
+    logged and reported as a miss; callers then fall back to the master-data API.
+
+    Args:
+        tenant_id: The tenant identifier
+        store_code: The store code
+        terminal_info: Terminal information used for authentication
+        item_code: The code of the item
+
+    Returns:
+        ItemMasterDocument, or None if the item is not in the snapshot or the snapshot is unavailable
+    """
+    try:
+        tenant_snapshot = await master_data_snapshot_manager.get_snapshot_async(tenant_id, None, terminal_info)
+        store_snapshot = await master_data_snapshot_manager.get_snapshot_async(tenant_id, store_code, terminal_info)
+    except Exception as e:
+        logger.warning(f"Master data snapshot of {tenant_id}/{store_code} is not available: {e}")
+        return None
+    return tenant_snapshot.get_item(item_code, store_snapshot)
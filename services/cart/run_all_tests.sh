@@ -39,6 +39,9 @@ test_files=(
     "tests/test_tran_service_status.py"
     "tests/test_tran_service_unit_simple.py"
     "tests/test_transaction_status_repository.py"
+    "tests/utils/test_master_data_snapshot.py"
+    "tests/repositories/test_master_data_grpc_repositories.py"
+    "tests/repositories/test_payment_master_web_repository.py"
 )
 
 TOTAL_TESTS=${#test_files[@]}
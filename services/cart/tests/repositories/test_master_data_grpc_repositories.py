@@ -0,0 +1,120 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the settings and payment gRPC repositories
+
+Tests verify that the repositories resolve settings and list payments through the
+MasterDataService stub and keep the results in their cache.
+"""
+
+import grpc
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from kugel_common.exceptions import NotFoundException, RepositoryException
+from kugel_common.grpc import item_service_pb2
+from kugel_common.models.documents.terminal_info_document import TerminalInfoDocument
+from app.models.repositories.settings_master_grpc_repository import SettingsMasterGrpcRepository
+from app.models.repositories.payment_master_grpc_repository import PaymentMasterGrpcRepository
+
+
+@pytest.fixture
+def terminal_info():
+    """Create a test terminal info document"""
+    return TerminalInfoDocument(terminal_id="TEST001", store_code="STORE01", terminal_name="Test Terminal")
+
+
+class _RpcError(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "unavailable"
+
+
+@pytest.mark.asyncio
+async def test_settings_resolve_and_cache(terminal_info):
+    """Resolved settings are returned as documents and served from cache afterwards"""
+    repository = SettingsMasterGrpcRepository(
+        tenant_id="test_tenant", store_code="STORE01", terminal_no=1, terminal_info=terminal_info
+    )
+    response = item_service_pb2.SettingsResolveResponse(
+        values=[
+            item_service_pb2.ResolvedSetting(name="RECEIPT_WIDTH", value="40", found=True),
+            item_service_pb2.ResolvedSetting(name="UNKNOWN", value="", found=False),
+        ]
+    )
+    with patch(
+        "app.models.repositories.settings_master_grpc_repository.get_master_data_service_grpc_stub",
+        new_callable=AsyncMock,
+    ) as mock_get_stub:
+        mock_stub = MagicMock()
+        mock_stub.ResolveSettings = AsyncMock(return_value=response)
+        mock_get_stub.return_value = mock_stub
+
+        settings = await repository.resolve_settings_async(["RECEIPT_WIDTH", "UNKNOWN"])
+        assert [(s.name, s.default_value) for s in settings] == [("RECEIPT_WIDTH", "40")]
+
+        request = mock_stub.ResolveSettings.call_args.args[0]
+        assert request.store_code == "STORE01"
+        assert request.terminal_no == 1
+        assert list(request.names) == ["RECEIPT_WIDTH", "UNKNOWN"]
+
+        repository.set_settings_master_documents(settings)
+        setting = await repository.get_settings_value_by_name_async("RECEIPT_WIDTH")
+        assert setting.default_value == "40"
+        assert mock_stub.ResolveSettings.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_settings_grpc_error_raises_repository_exception(terminal_info):
+    """gRPC errors are surfaced as RepositoryException"""
+    repository = SettingsMasterGrpcRepository(tenant_id="test_tenant", terminal_info=terminal_info)
+    with patch(
+        "app.models.repositories.settings_master_grpc_repository.get_master_data_service_grpc_stub",
+        new_callable=AsyncMock,
+    ) as mock_get_stub:
+        mock_stub = MagicMock()
+        mock_stub.ResolveSettings = AsyncMock(side_effect=_RpcError())
+        mock_get_stub.return_value = mock_stub
+
+        with pytest.raises(RepositoryException):
+            await repository.get_settings_value_by_name_async("RECEIPT_WIDTH")
+
+
+@pytest.mark.asyncio
+async def test_payment_loaded_once_on_cache_miss(terminal_info):
+    """All payments are loaded with one call and the cache serves later lookups"""
+    repository = PaymentMasterGrpcRepository(tenant_id="test_tenant", terminal_info=terminal_info)
+    response = item_service_pb2.PaymentListResponse(
+        payments=[
+            item_service_pb2.Payment(payment_code="01", description="Cash", can_change=True, is_active=True),
+            item_service_pb2.Payment(payment_code="11", description="Card", is_active=True),
+        ]
+    )
+    with patch(
+        "app.models.repositories.payment_master_grpc_repository.get_master_data_service_grpc_stub",
+        new_callable=AsyncMock,
+    ) as mock_get_stub:
+        mock_stub = MagicMock()
+        mock_stub.ListPayments = AsyncMock(return_value=response)
+        mock_get_stub.return_value = mock_stub
+
+        cash = await repository.get_payment_by_code_async("01")
+        card = await repository.get_payment_by_code_async("11")
+        assert cash.description == "Cash" and cash.can_change
+        assert card.description == "Card"
+        assert mock_stub.ListPayments.call_count == 1
+
+        with pytest.raises(NotFoundException):
+            await repository.get_payment_by_code_async("99")
@@ -0,0 +1,99 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the payment web repository
+
+Tests verify that the repository loads the whole payment list with one request,
+revalidates it with If-None-Match and reuses the cached list on 304 Not Modified.
+"""
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from kugel_common.exceptions import NotFoundException, RepositoryException
+from kugel_common.models.documents.terminal_info_document import TerminalInfoDocument
+from kugel_common.utils.http_client_helper import HttpClientHelper, clear_conditional_cache
+from app.models.repositories import payment_master_web_repository
+from app.models.repositories.payment_master_web_repository import PaymentMasterWebRepository
+
+ETAG = '"payments-v1"'
+
+
+@pytest.fixture
+def terminal_info():
+    """Create a test terminal info document"""
+    return TerminalInfoDocument(
+        terminal_id="T0001-STORE01-1", store_code="STORE01", terminal_name="Test Terminal", api_key="key"
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    clear_conditional_cache()
+    yield
+    clear_conditional_cache()
+
+
+def _make_client(requests: list, status_code: int = 200) -> HttpClientHelper:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304, headers={"ETag": ETAG})
+        if status_code != 200:
+            return httpx.Response(status_code, json={"success": False})
+        payments = [
+            {"paymentCode": "01", "description": "Cash", "canChange": True},
+            {"paymentCode": "11", "description": "Card"},
+        ]
+        return httpx.Response(200, json={"success": True, "data": payments}, headers={"ETag": ETAG})
+
+    client = HttpClientHelper(base_url="http://master-data/api/v1", max_retries=1, retry_delay=0)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_loads_list_once_and_revalidates_with_etag(terminal_info):
+    requests = []
+    client = _make_client(requests)
+    with patch.object(payment_master_web_repository, "get_pooled_client", AsyncMock(return_value=client)):
+        repository = PaymentMasterWebRepository(tenant_id="T0001", terminal_info=terminal_info)
+        cash = await repository.get_payment_by_code_async("01")
+        card = await repository.get_payment_by_code_async("11")
+        assert cash.can_change is True
+        assert card.description == "Card"
+        assert len(requests) == 1
+        assert requests[0].url.path == "/api/v1/tenants/T0001/payments"
+        assert requests[0].url.params["limit"] == "0"
+        assert requests[0].headers["x-api-key"] == "key"
+
+        # a new repository revalidates the list and reuses it on 304
+        repository = PaymentMasterWebRepository(tenant_id="T0001", terminal_info=terminal_info)
+        assert (await repository.get_payment_by_code_async("11")).description == "Card"
+        assert len(requests) == 2
+        assert requests[1].headers["if-none-match"] == ETAG
+
+        with pytest.raises(NotFoundException):
+            await repository.get_payment_by_code_async("99")
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_request_error_raises_repository_exception(terminal_info):
+    client = _make_client([], status_code=500)
+    with patch.object(payment_master_web_repository, "get_pooled_client", AsyncMock(return_value=client)):
+        repository = PaymentMasterWebRepository(tenant_id="T0001", terminal_info=terminal_info)
+        with pytest.raises(RepositoryException):
+            await repository.get_payment_by_code_async("01")
+    await client.close()
@@ -14,13 +14,15 @@
 """
 Unit tests for gRPC Channel Helper
 
-Tests verify that gRPC channels are properly created, reused, and closed
-at the module level (shared across all requests).
+Tests verify that gRPC channels are pooled per target (shared across all tenants,
+stores and requests), used in turn, and properly closed.
 """
 
+import grpc
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import app.utils.grpc_channel_helper as channel_helper
+from app.config.settings_cart import cart_settings
 
 
 @pytest.fixture(autouse=True)
@@ -29,143 +31,124 @@ def clear_channel_cache():
     # Clear before test
     channel_helper._channels.clear()
     channel_helper._stubs.clear()
+    channel_helper._master_data_stubs.clear()
+    channel_helper._call_counters.clear()
+    channel_helper._next_channel.clear()
 
     yield
 
     # Clear after test
     channel_helper._channels.clear()
     channel_helper._stubs.clear()
+    channel_helper._master_data_stubs.clear()
+    channel_helper._call_counters.clear()
+    channel_helper._next_channel.clear()
+
+
+@pytest.fixture
+def pool_size():
+    """Use a pool of two channels"""
+    with patch.object(cart_settings, "GRPC_CHANNEL_POOL_SIZE", 2):
+        yield 2
+
+
+def _mock_channel():
+    channel = MagicMock()
+    channel.close = AsyncMock()
+    channel.get_state.return_value = grpc.ChannelConnectivity.READY
+    return channel
 
 
 @pytest.mark.asyncio
-async def test_get_stub_creates_channel_on_first_call():
-    """Test that get_master_data_grpc_stub creates channel on first call"""
-    with patch('app.utils.grpc_channel_helper.GrpcClientHelper') as mock_helper_class:
-        mock_helper = MagicMock()
-        mock_channel = MagicMock()
-        mock_helper.get_channel = AsyncMock(return_value=mock_channel)
-        mock_helper_class.return_value = mock_helper
-
-        # First call should create channel
+async def test_get_stub_creates_pool_on_first_call(pool_size):
+    """Test that get_master_data_grpc_stub creates the channel pool of the target on first call"""
+    with patch("app.utils.grpc_channel_helper.grpc.aio.insecure_channel") as mock_insecure_channel:
+        mock_insecure_channel.side_effect = lambda *args, **kwargs: _mock_channel()
+
         stub = await channel_helper.get_master_data_grpc_stub("test_tenant", "STORE01")
 
         assert stub is not None
-        assert ("test_tenant", "STORE01") in channel_helper._channels
-        assert ("test_tenant", "STORE01") in channel_helper._stubs
-        mock_helper.get_channel.assert_called_once()
+        target = cart_settings.MASTER_DATA_GRPC_URL
+        assert len(channel_helper._channels[target]) == pool_size
+        assert mock_insecure_channel.call_count == pool_size
+
+        options = dict(mock_insecure_channel.call_args.kwargs["options"])
+        assert options["grpc.lb_policy_name"] == cart_settings.GRPC_LB_POLICY
+        assert options["grpc.keepalive_time_ms"] == cart_settings.GRPC_KEEPALIVE_TIME_MS
+        assert options["grpc.use_local_subchannel_pool"] == 1
 
 
 @pytest.mark.asyncio
-async def test_get_stub_reuses_existing_channel():
+async def test_get_stub_shares_pool_across_tenants_and_stores(pool_size):
     """
-    Test that get_master_data_grpc_stub reuses existing channel (CORE FUNCTIONALITY)
+    Test that all tenants and stores share the pool of the target (CORE FUNCTIONALITY)
 
-    This is the critical test that verifies channel pooling is working correctly.
-    The second call should NOT create a new channel, but reuse the existing one.
+    The number of channels must not grow with the number of tenant/store combinations.
     """
-    with patch('app.utils.grpc_channel_helper.GrpcClientHelper') as mock_helper_class:
-        mock_helper = MagicMock()
-        mock_channel = MagicMock()
-        mock_helper.get_channel = AsyncMock(return_value=mock_channel)
-        mock_helper_class.return_value = mock_helper
-
-        # First call creates channel
-        stub1 = await channel_helper.get_master_data_grpc_stub("test_tenant", "STORE01")
+    with patch("app.utils.grpc_channel_helper.grpc.aio.insecure_channel") as mock_insecure_channel:
+        mock_insecure_channel.side_effect = lambda *args, **kwargs: _mock_channel()
 
-        # Second call should reuse channel
-        stub2 = await channel_helper.get_master_data_grpc_stub("test_tenant", "STORE01")
+        stubs = [
+            await channel_helper.get_master_data_grpc_stub(f"tenant{i}", f"STORE{i:02d}") for i in range(10)
+        ]
 
-        # Verify same stub instance is returned
-        assert stub1 is stub2
-
-        # Verify get_channel was called only once (channel reused)
-        mock_helper.get_channel.assert_called_once()
+        assert mock_insecure_channel.call_count == pool_size
+        assert channel_helper.get_channel_cache_stats()["total_channels"] == pool_size
+        # stubs of the pool are used in turn
+        assert stubs[0] is stubs[2]
+        assert stubs[0] is not stubs[1]
 
 
 @pytest.mark.asyncio
-async def test_get_stub_creates_separate_channels_for_different_tenants():
-    """Test that different tenant/store combinations get separate channels"""
-    with patch('app.utils.grpc_channel_helper.GrpcClientHelper') as mock_helper_class:
-        mock_helper = MagicMock()
-        mock_channel1 = MagicMock()
-        mock_channel2 = MagicMock()
-        mock_helper.get_channel = AsyncMock(side_effect=[mock_channel1, mock_channel2])
-        mock_helper_class.return_value = mock_helper
-
-        # Create stubs for different tenant/store combinations
-        stub1 = await channel_helper.get_master_data_grpc_stub("tenant1", "STORE01")
-        stub2 = await channel_helper.get_master_data_grpc_stub("tenant2", "STORE02")
+async def test_master_data_service_stub_uses_same_pool(pool_size):
+    """Test that MasterDataService stubs use the channels of the ItemService pool"""
+    with patch("app.utils.grpc_channel_helper.grpc.aio.insecure_channel") as mock_insecure_channel:
+        mock_insecure_channel.side_effect = lambda *args, **kwargs: _mock_channel()
 
-        # Verify different stubs
-        assert stub1 is not stub2
+        await channel_helper.get_master_data_grpc_stub("tenant1", "STORE01")
+        stub = await channel_helper.get_master_data_service_grpc_stub("tenant2", "STORE02")
 
-        # Verify two channels were created
-        assert len(channel_helper._channels) == 2
-        assert len(channel_helper._stubs) == 2
-        assert mock_helper.get_channel.call_count == 2
+        assert stub is not None
+        assert mock_insecure_channel.call_count == pool_size
 
 
 @pytest.mark.asyncio
-async def test_close_all_channels():
+async def test_close_all_channels(pool_size):
     """Test that close_master_data_grpc_channels properly closes all channels"""
-    with patch('app.utils.grpc_channel_helper.GrpcClientHelper') as mock_helper_class:
-        mock_helper = MagicMock()
-        mock_channel1 = MagicMock()
-        mock_channel1.close = AsyncMock()
-        mock_channel2 = MagicMock()
-        mock_channel2.close = AsyncMock()
-        mock_helper.get_channel = AsyncMock(side_effect=[mock_channel1, mock_channel2])
-        mock_helper_class.return_value = mock_helper
-
-        # Create two channels
-        await channel_helper.get_master_data_grpc_stub("tenant1", "STORE01")
-        await channel_helper.get_master_data_grpc_stub("tenant2", "STORE02")
+    with patch("app.utils.grpc_channel_helper.grpc.aio.insecure_channel") as mock_insecure_channel:
+        channels = [_mock_channel() for _ in range(pool_size)]
+        mock_insecure_channel.side_effect = channels
 
-        # Close all channels
+        await channel_helper.get_master_data_grpc_stub("tenant1", "STORE01")
         await channel_helper.close_master_data_grpc_channels()
 
-        # Verify both channels were closed
-        mock_channel1.close.assert_called_once()
-        mock_channel2.close.assert_called_once()
-
-        # Verify caches were cleared
+        for channel in channels:
+            channel.close.assert_called_once()
         assert len(channel_helper._channels) == 0
         assert len(channel_helper._stubs) == 0
 
 
 @pytest.mark.asyncio
-async def test_get_stub_after_close_creates_new_channel():
-    """Test that get_master_data_grpc_stub creates new channel after close"""
-    with patch('app.utils.grpc_channel_helper.GrpcClientHelper') as mock_helper_class:
-        mock_helper = MagicMock()
-        mock_channel1 = MagicMock()
-        mock_channel1.close = AsyncMock()
-        mock_channel2 = MagicMock()
-        mock_helper.get_channel = AsyncMock(side_effect=[mock_channel1, mock_channel2])
-        mock_helper_class.return_value = mock_helper
-
-        # Create and close
+async def test_get_stub_after_close_creates_new_pool(pool_size):
+    """Test that get_master_data_grpc_stub creates a new pool after close"""
+    with patch("app.utils.grpc_channel_helper.grpc.aio.insecure_channel") as mock_insecure_channel:
+        mock_insecure_channel.side_effect = lambda *args, **kwargs: _mock_channel()
+
         await channel_helper.get_master_data_grpc_stub("test_tenant", "STORE01")
         await channel_helper.close_master_data_grpc_channels()
-
-        # Create again - should create new channel
         await channel_helper.get_master_data_grpc_stub("test_tenant", "STORE01")
 
-        # Verify get_channel was called twice
-        assert mock_helper.get_channel.call_count == 2
+        assert mock_insecure_channel.call_count == pool_size * 2
 
 
 @pytest.mark.asyncio
-async def test_close_handles_errors_gracefully():
+async def test_close_handles_errors_gracefully(pool_size):
     """Test that close_master_data_grpc_channels handles errors gracefully"""
-    with patch('app.utils.grpc_channel_helper.GrpcClientHelper') as mock_helper_class:
-        mock_helper = MagicMock()
-        mock_channel = MagicMock()
-        mock_channel.close = AsyncMock(side_effect=Exception("Close failed"))
-        mock_helper.get_channel = AsyncMock(return_value=mock_channel)
-        mock_helper_class.return_value = mock_helper
-
-        # Create channel
+    with patch("app.utils.grpc_channel_helper.grpc.aio.insecure_channel") as mock_insecure_channel:
+        channel = _mock_channel()
+        channel.close = AsyncMock(side_effect=Exception("Close failed"))
+        mock_insecure_channel.return_value = channel
+
         await channel_helper.get_master_data_grpc_stub("test_tenant", "STORE01")
 
         # Close should not raise exception even if channel.close() fails
@@ -179,7 +162,6 @@ async def test_close_handles_errors_gracefully():
 @pytest.mark.asyncio
 async def test_close_without_channels_is_safe():
     """Test that calling close without creating channels is safe"""
-    # Close without creating channels should not raise exception
     await channel_helper.close_master_data_grpc_channels()
 
     assert len(channel_helper._channels) == 0
@@ -187,45 +169,61 @@ async def test_close_without_channels_is_safe():
 
 
 @pytest.mark.asyncio
-async def test_multiple_close_calls_are_safe():
+async def test_multiple_close_calls_are_safe(pool_size):
     """Test that calling close multiple times is safe"""
-    with patch('app.utils.grpc_channel_helper.GrpcClientHelper') as mock_helper_class:
-        mock_helper = MagicMock()
-        mock_channel = MagicMock()
-        mock_channel.close = AsyncMock()
-        mock_helper.get_channel = AsyncMock(return_value=mock_channel)
-        mock_helper_class.return_value = mock_helper
-
-        # Create channel
+    with patch("app.utils.grpc_channel_helper.grpc.aio.insecure_channel") as mock_insecure_channel:
+        channels = [_mock_channel() for _ in range(pool_size)]
+        mock_insecure_channel.side_effect = channels
+
         await channel_helper.get_master_data_grpc_stub("test_tenant", "STORE01")
 
-        # Close multiple times
         await channel_helper.close_master_data_grpc_channels()
         await channel_helper.close_master_data_grpc_channels()
         await channel_helper.close_master_data_grpc_channels()
 
         # channel.close() should only be called once (first close, cache was cleared)
-        assert mock_channel.close.call_count == 1
+        for channel in channels:
+            assert channel.close.call_count == 1
 
 
-def test_get_channel_cache_stats():
-    """Test that get_channel_cache_stats returns correct statistics"""
-    # Clear cache first
-    channel_helper._channels.clear()
-    channel_helper._stubs.clear()
+@pytest.mark.asyncio
+async def test_call_counter_tracks_active_calls():
+    """Test that the call counter counts calls until they are done"""
+    counter = channel_helper._CallCounter()
+    call = MagicMock()
+    continuation = AsyncMock(return_value=call)
+
+    result = await counter.intercept(continuation, MagicMock(), MagicMock())
 
+    assert result is call
+    assert counter.active_calls == 1
+    assert counter.total_calls == 1
+    done_callback = call.add_done_callback.call_args.args[0]
+    done_callback(call)
+    assert counter.active_calls == 0
+
+
+def test_get_channel_cache_stats(pool_size):
+    """Test that get_channel_cache_stats returns correct statistics"""
     # Empty cache
     stats = channel_helper.get_channel_cache_stats()
-    assert stats['total_channels'] == 0
-    assert stats['total_stubs'] == 0
+    assert stats["total_channels"] == 0
+    assert stats["total_stubs"] == 0
+    assert stats["channels"] == []
 
     # Add mock entries
-    channel_helper._channels[("tenant1", "store1")] = MagicMock()
-    channel_helper._stubs[("tenant1", "store1")] = MagicMock()
-    channel_helper._channels[("tenant2", "store2")] = MagicMock()
-    channel_helper._stubs[("tenant2", "store2")] = MagicMock()
+    counter = channel_helper._CallCounter()
+    counter.active_calls = 3
+    counter.total_calls = 10
+    channel_helper._channels["target1"] = [_mock_channel()]
+    channel_helper._call_counters["target1"] = [counter]
+    channel_helper._stubs["target1"] = [MagicMock()]
 
     # Check stats
     stats = channel_helper.get_channel_cache_stats()
-    assert stats['total_channels'] == 2
-    assert stats['total_stubs'] == 2
+    assert stats["total_channels"] == 1
+    assert stats["total_stubs"] == 1
+    assert stats["total_active_calls"] == 3
+    assert stats["channels"] == [
+        {"target": "target1", "index": 0, "state": "READY", "active_calls": 3, "total_calls": 10}
+    ]
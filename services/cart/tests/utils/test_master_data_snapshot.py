@@ -0,0 +1,196 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Unit tests for the local master data snapshot
+
+Tests verify that full snapshots and deltas are applied to the in-memory
+indexes, that items of the tenant snapshot are merged with the store prices of
+the store snapshot, and that the manager keeps one tenant snapshot for all
+stores, refreshes with If-None-Match and handles 304 Not Modified. Master data
+change events mark the affected snapshots stale.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from kugel_common.models.documents.terminal_info_document import TerminalInfoDocument
+from app.utils.master_data_snapshot import MasterDataSnapshot, MasterDataSnapshotManager
+from app.utils import master_data_snapshot
+
+
+def _full_snapshot() -> dict:
+    return {
+        "version": 1000,
+        "etag": '"1000-abc"',
+        "full": True,
+        "sections": {
+            "items": [
+                {"item_code": "ITEM001", "description": "Apple", "unit_price": 100.0, "tax_code": "01"},
+                {"item_code": "ITEM002", "description": "Orange", "unit_price": 200.0, "tax_code": "01"},
+            ],
+            "categories": [{"category_code": "001", "description": "Fruit"}],
+            "payments": [{"payment_code": "01", "description": "Cash"}],
+            "settings": [],
+            "taxes": [{"tax_code": "01", "rate": 10.0}],
+        },
+    }
+
+
+def _store_snapshot(store_code: str = "STORE01", store_price: float = 90.0) -> dict:
+    return {
+        "version": 1000,
+        "etag": '"1000-def"',
+        "full": True,
+        "sections": {"store_prices": [{"item_code": "ITEM001", "store_code": store_code, "store_price": store_price}]},
+    }
+
+
+def _loaded(store_code=None, data=None) -> MasterDataSnapshot:
+    snapshot = MasterDataSnapshot("T0001", store_code)
+    snapshot.apply(data or (_full_snapshot() if store_code is None else _store_snapshot(store_code)))
+    return snapshot
+
+
+def _terminal_info() -> TerminalInfoDocument:
+    return TerminalInfoDocument(tenant_id="T0001", store_code="STORE01", terminal_no=1, terminal_id="T0001-STORE01-1")
+
+
+def test_apply_full_snapshot_and_get_item():
+    snapshot = _loaded()
+    store_snapshot = _loaded("STORE01")
+
+    assert snapshot.version == 1000
+    assert "store_prices" not in snapshot.indexes
+    assert set(store_snapshot.indexes) == {"store_prices"}
+    item = snapshot.get_item("ITEM001", store_snapshot)
+    assert item.description == "Apple"
+    assert item.store_price == 90.0
+    assert snapshot.get_item("ITEM001").store_price == 0.0
+    assert snapshot.get_item("ITEM002", store_snapshot).unit_price == 200.0
+    assert snapshot.get_item("ITEM999") is None
+    assert snapshot.get("payments", "01")["description"] == "Cash"
+
+
+def test_apply_delta_updates_and_drops_deleted_documents():
+    snapshot = _loaded()
+    store_snapshot = _loaded("STORE01")
+
+    snapshot.apply(
+        {
+            "version": 2000,
+            "etag": '"2000-def"',
+            "full": False,
+            "sections": {
+                "items": [
+                    {"item_code": "ITEM002", "description": "Orange", "unit_price": 250.0},
+                    {"item_code": "ITEM003", "description": "Lemon", "unit_price": 50.0, "is_deleted": True},
+                ],
+                "categories": [],
+                "payments": [],
+                "settings": [],
+                "taxes": [{"tax_code": "01", "rate": 10.0}],
+            },
+            # ITEM001 still exists, payment 01 was deleted
+            "keys": {
+                "items": ["ITEM001", "ITEM002"],
+                "categories": ["001"],
+                "payments": [],
+                "settings": [],
+            },
+        }
+    )
+
+    assert snapshot.version == 2000
+    assert snapshot.get_item("ITEM001", store_snapshot).store_price == 90.0
+    assert snapshot.get_item("ITEM002").unit_price == 250.0
+    assert snapshot.get_item("ITEM003") is None
+    assert snapshot.get("payments", "01") is None
+    assert snapshot.get("taxes", "01") is not None
+
+
+@pytest.mark.asyncio
+async def test_manager_refreshes_with_if_none_match():
+    manager = MasterDataSnapshotManager()
+    client = MagicMock()
+    client.request = AsyncMock(side_effect=[({"data": _full_snapshot()}, 200), ({}, 304)])
+
+    with patch("app.utils.master_data_snapshot.get_pooled_client", AsyncMock(return_value=client)), patch(
+        "app.utils.master_data_snapshot.cart_settings"
+    ) as mock_settings:
+        mock_settings.MASTER_DATA_SNAPSHOT_REFRESH_SECONDS = 0
+        snapshot = await manager.get_snapshot_async("T0001", None, _terminal_info())
+        assert snapshot.get_item("ITEM001") is not None
+        first_call = client.request.call_args_list[0]
+        assert first_call.args[1] == "/tenants/T0001/master-snapshot"
+        assert "If-None-Match" not in first_call.kwargs["headers"]
+
+        # stale again (refresh interval 0): conditional request answered with 304 keeps the copy
+        snapshot = await manager.get_snapshot_async("T0001", None, _terminal_info())
+        second_call = client.request.call_args_list[1]
+        assert second_call.kwargs["headers"]["If-None-Match"] == '"1000-abc"'
+        assert second_call.kwargs["params"]["since"] == 1000
+        assert snapshot.get_item("ITEM001").description == "Apple"
+
+
+@pytest.mark.asyncio
+async def test_stores_share_the_tenant_snapshot():
+    manager = MasterDataSnapshotManager()
+    client = MagicMock()
+    client.request = AsyncMock(
+        side_effect=[
+            ({"data": _full_snapshot()}, 200),
+            ({"data": _store_snapshot("STORE01", 90.0)}, 200),
+            ({"data": _store_snapshot("STORE02", 80.0)}, 200),
+        ]
+    )
+
+    with patch("app.utils.master_data_snapshot.get_pooled_client", AsyncMock(return_value=client)), patch.object(
+        master_data_snapshot, "master_data_snapshot_manager", manager
+    ):
+        get_item = master_data_snapshot.get_item_from_snapshot_async
+        first = await get_item("T0001", "STORE01", _terminal_info(), "ITEM001")
+        second = await get_item("T0001", "STORE02", _terminal_info(), "ITEM001")
+
+    assert (first.store_price, second.store_price) == (90.0, 80.0)
+    endpoints = [call.args[1] for call in client.request.call_args_list]
+    assert endpoints == [
+        "/tenants/T0001/master-snapshot",
+        "/tenants/T0001/stores/STORE01/master-snapshot",
+        "/tenants/T0001/stores/STORE02/master-snapshot",
+    ]
+    assert client.request.call_args_list[1].kwargs["params"]["scope"] == "store"
+
+
+@pytest.mark.asyncio
+async def test_master_data_event_marks_snapshot_stale():
+    manager = MasterDataSnapshotManager()
+    tenant_snapshot = _loaded()
+    other_store = _loaded("STORE02")
+    for snapshot in [tenant_snapshot, _loaded("STORE01"), other_store]:
+        manager._snapshots[(snapshot.tenant_id, snapshot.store_code)] = snapshot
+
+    event = {
+        "tenant_id": "T0001",
+        "entity": "price",
+        "operation": "updated",
+        "keys": ["ITEM001"],
+        "store_code": "STORE01",
+    }
+    with patch.object(master_data_snapshot, "master_data_snapshot_manager", manager):
+        result = await master_data_snapshot.master_data_event_subscriber.handle_message_async({"data": event})
+
+    assert result == {"status": "SUCCESS"}
+    assert manager._snapshots[("T0001", "STORE01")].refreshed_at == 0.0
+    assert other_store.refreshed_at > 0.0
+    assert tenant_snapshot.refreshed_at > 0.0
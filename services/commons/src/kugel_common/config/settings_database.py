@@ -56,6 +56,8 @@ class DBCollectionCommonSettings(BaseSettings):
     Attributes:
         DB_COLLECTION_NAME_REQUEST_LOG: Collection name for API request logs
         DB_COLLECTION_NAME_TERMINAL_INFO: Collection name for terminal information
+        DB_COLLECTION_NAME_LEASE: Collection name for leases held by one replica at a time
     """
     DB_COLLECTION_NAME_REQUEST_LOG: str = "log_request"
-    DB_COLLECTION_NAME_TERMINAL_INFO: str = "info_terminal"
\ No newline at end of file
+    DB_COLLECTION_NAME_TERMINAL_INFO: str = "info_terminal"
+    DB_COLLECTION_NAME_LEASE: str = "info_lease"
\ No newline at end of file
@@ -34,6 +34,7 @@ class WebServiceSettings(BaseSettings):
         BASE_URL_REPORT: URL for the Report microservice
         BASE_URL_JOURNAL: URL for the Journal microservice
         BASE_URL_STOCK: URL for the Stock microservice
+        HTTP_CONDITIONAL_CACHE_MAX_ENTRIES: Maximum number of responses kept for conditional GET requests
     """
     BASE_URL_DAPR: str = "http://localhost:3500/v1.0"
     BASE_URL_MASTER_DATA: str = "http://localhost:8002/api/v1"
@@ -41,4 +42,5 @@ class WebServiceSettings(BaseSettings):
     BASE_URL_CART: str = "http://localhost:8003/api/v1"
     BASE_URL_REPORT: str = "http://localhost:8004/api/v1"
     BASE_URL_JOURNAL: str = "http://localhost:8005/api/v1"
-    BASE_URL_STOCK: str = "http://localhost:8006/api/v1"
\ No newline at end of file
+    BASE_URL_STOCK: str = "http://localhost:8006/api/v1"
+    HTTP_CONDITIONAL_CACHE_MAX_ENTRIES: int = 256
\ No newline at end of file
@@ -24,17 +24,47 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12item_service.proto\x12\x0citem_service\"b\n\x11ItemDetailRequest\x12\x11\n\ttenant_id\x18\x01 \x01(\t\x12\x12\n\nstore_code\x18\x02 \x01(\t\x12\x11\n\titem_code\x18\x03 \x01(\t\x12\x13\n\x0bterminal_id\x18\x04 \x01(\t\"\xd0\x01\n\x12ItemDetailResponse\x12\x11\n\titem_code\x18\x01 \x01(\t\x12\x11\n\titem_name\x18\x02 \x01(\t\x12\r\n\x05price\x18\x03 \x01(\x05\x12\x10\n\x08tax_rate\x18\x04 \x01(\x05\x12\x15\n\rcategory_code\x18\x05 \x01(\t\x12\x0f\n\x07\x62\x61rcode\x18\x06 \x01(\t\x12\x11\n\tis_active\x18\x07 \x01(\x08\x12\x12\n\ncreated_at\x18\x08 \x01(\t\x12\x12\n\nupdated_at\x18\t \x01(\t\x12\x10\n\x08tax_code\x18\n \x01(\t2a\n\x0bItemService\x12R\n\rGetItemDetail\x12\x1f.item_service.ItemDetailRequest\x1a .item_service.ItemDetailResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12item_service.proto\x12\x0citem_service\"b\n\x11ItemDetailRequest\x12\x11\n\ttenant_id\x18\x01 \x01(\t\x12\x12\n\nstore_code\x18\x02 \x01(\t\x12\x11\n\titem_code\x18\x03 \x01(\t\x12\x13\n\x0bterminal_id\x18\x04 \x01(\t\"\xd0\x01\n\x12ItemDetailResponse\x12\x11\n\titem_code\x18\x01 \x01(\t\x12\x11\n\titem_name\x18\x02 \x01(\t\x12\r\n\x05price\x18\x03 \x01(\x05\x12\x10\n\x08tax_rate\x18\x04 \x01(\x05\x12\x15\n\rcategory_code\x18\x05 \x01(\t\x12\x0f\n\x07\x62\x61rcode\x18\x06 \x01(\t\x12\x11\n\tis_active\x18\x07 \x01(\x08\x12\x12\n\ncreated_at\x18\x08 \x01(\t\x12\x12\n\nupdated_at\x18\t \x01(\t\x12\x10\n\x08tax_code\x18\n \x01(\t\"h\n\x16\x42\x61tchItemDetailRequest\x12\x11\n\ttenant_id\x18\x01 \x01(\t\x12\x12\n\nstore_code\x18\x02 \x01(\t\x12\x12\n\nitem_codes\x18\x03 \x03(\t\x12\x13\n\x0bterminal_id\x18\x04 \x01(\t\"h\n\x17\x42\x61tchItemDetailResponse\x12/\n\x05items\x18\x01 \x03(\x0b\x32 .item_service.ItemDetailResponse\x12\x1c\n\x14not_found_item_codes\x18\x02 \x03(\t\";\n\x11MasterDataRequest\x12\x11\n\ttenant_id\x18\x01 \x01(\t\x12\x13\n\x0bterminal_id\x18\x02 \x01(\t\"x\n\x16SettingsResolveRequest\x12\x11\n\ttenant_id\x18\x01 \x01(\t\x12\x12\n\nstore_code\x18\x02 \x01(\t\x12\x13\n\x0bterminal_no\x18\x03 \x01(\x05\x12\r\n\x05names\x18\x04 \x03(\t\x12\x13\n\x0bterminal_id\x18\x05 \x01(\t\"=\n\x0fResolvedSetting\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\x12\r\n\x05\x66ound\x18\x03 \x01(\x08\"H\n\x17SettingsResolveResponse\x12-\n\x06values\x18\x01 \x03(\x0b\x32\x1d.item_service.ResolvedSetting\"\x9f\x01\n\x07Payment\x12\x14\n\x0cpayment_code\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x14\n\x0climit_amount\x18\x03 \x01(\x01\x12\x12\n\ncan_refund\x18\x04 \x01(\x08\x12\x18\n\x10\x63\x61n_deposit_over\x18\x05 \x01(\x08\x12\x12\n\ncan_change\x18\x06 \x01(\x08\x12\x11\n\tis_active\x18\x07 \x01(\x08\">\n\x13PaymentListResponse\x12\'\n\x08payments\x18\x01 \x03(\x0b\x32\x15.item_service.Payment\"t\n\x03Tax\x12\x10\n\x08tax_code\x18\x01 \x01(\t\x12\x10\n\x08tax_type\x18\x02 \x01(\t\x12\x10\n\x08tax_name\x18\x03 \x01(\t\x12\x0c\n\x04rate\x18\x04 \x01(\x01\x12\x13\n\x0bround_digit\x18\x05 \x01(\x05\x12\x14\n\x0cround_method\x18\x06 \x01(\t\"3\n\x0fTaxListResponse\x12 \n\x05taxes\x18\x01 \x03(\x0b\x32\x11.item_service.Tax\"c\n\x08\x43\x61tegory\x12\x15\n\rcategory_code\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x19\n\x11\x64\x65scription_short\x18\x03 \x01(\t\x12\x10\n\x08tax_code\x18\x04 \x01(\t\"\xa7\x01\n\x13\x43\x61tegoryMapResponse\x12\x45\n\ncategories\x18\x01 \x03(\x0b\x32\x31.item_service.CategoryMapResponse.CategoriesEntry\x1aI\n\x0f\x43\x61tegoriesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12%\n\x05value\x18\x02 \x01(\x0b\x32\x16.item_service.Category:\x02\x38\x01\x32\xa4\x02\n\x0bItemService\x12R\n\rGetItemDetail\x12\x1f.item_service.ItemDetailRequest\x1a .item_service.ItemDetailResponse\x12\x62\n\x13\x42\x61tchGetItemDetails\x12$.item_service.BatchItemDetailRequest\x1a%.item_service.BatchItemDetailResponse\x12]\n\x11StreamItemDetails\x12$.item_service.BatchItemDetailRequest\x1a .item_service.ItemDetailResponse0\x01\x32\xb9\x03\n\x11MasterDataService\x12^\n\x0fResolveSettings\x12$.item_service.SettingsResolveRequest\x1a%.item_service.SettingsResolveResponse\x12R\n\x0cListPayments\x12\x1f.item_service.MasterDataRequest\x1a!.item_service.PaymentListResponse\x12K\n\tListTaxes\x12\x1f.item_service.MasterDataRequest\x1a\x1d.item_service.TaxListResponse\x12T\n\x0eGetCategoryMap\x12\x1f.item_service.MasterDataRequest\x1a!.item_service.CategoryMapResponse\x12M\n\x10StreamCategories\x12\x1f.item_service.MasterDataRequest\x1a\x16.item_service.Category0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'item_service_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_CATEGORYMAPRESPONSE_CATEGORIESENTRY']._loaded_options = None
+  _globals['_CATEGORYMAPRESPONSE_CATEGORIESENTRY']._serialized_options = b'8\001'
   _globals['_ITEMDETAILREQUEST']._serialized_start=36
   _globals['_ITEMDETAILREQUEST']._serialized_end=134
   _globals['_ITEMDETAILRESPONSE']._serialized_start=137
   _globals['_ITEMDETAILRESPONSE']._serialized_end=345
-  _globals['_ITEMSERVICE']._serialized_start=347
-  _globals['_ITEMSERVICE']._serialized_end=444
+  _globals['_BATCHITEMDETAILREQUEST']._serialized_start=347
+  _globals['_BATCHITEMDETAILREQUEST']._serialized_end=451
+  _globals['_BATCHITEMDETAILRESPONSE']._serialized_start=453
+  _globals['_BATCHITEMDETAILRESPONSE']._serialized_end=557
+  _globals['_MASTERDATAREQUEST']._serialized_start=559
+  _globals['_MASTERDATAREQUEST']._serialized_end=618
+  _globals['_SETTINGSRESOLVEREQUEST']._serialized_start=620
+  _globals['_SETTINGSRESOLVEREQUEST']._serialized_end=740
+  _globals['_RESOLVEDSETTING']._serialized_start=742
+  _globals['_RESOLVEDSETTING']._serialized_end=803
+  _globals['_SETTINGSRESOLVERESPONSE']._serialized_start=805
+  _globals['_SETTINGSRESOLVERESPONSE']._serialized_end=877
+  _globals['_PAYMENT']._serialized_start=880
+  _globals['_PAYMENT']._serialized_end=1039
+  _globals['_PAYMENTLISTRESPONSE']._serialized_start=1041
+  _globals['_PAYMENTLISTRESPONSE']._serialized_end=1103
+  _globals['_TAX']._serialized_start=1105
+  _globals['_TAX']._serialized_end=1221
+  _globals['_TAXLISTRESPONSE']._serialized_start=1223
+  _globals['_TAXLISTRESPONSE']._serialized_end=1274
+  _globals['_CATEGORY']._serialized_start=1276
+  _globals['_CATEGORY']._serialized_end=1375
+  _globals['_CATEGORYMAPRESPONSE']._serialized_start=1378
+  _globals['_CATEGORYMAPRESPONSE']._serialized_end=1545
+  _globals['_CATEGORYMAPRESPONSE_CATEGORIESENTRY']._serialized_start=1472
+  _globals['_CATEGORYMAPRESPONSE_CATEGORIESENTRY']._serialized_end=1545
+  _globals['_ITEMSERVICE']._serialized_start=1548
+  _globals['_ITEMSERVICE']._serialized_end=1840
+  _globals['_MASTERDATASERVICE']._serialized_start=1843
+  _globals['_MASTERDATASERVICE']._serialized_end=2284
 # @@protoc_insertion_point(module_scope)
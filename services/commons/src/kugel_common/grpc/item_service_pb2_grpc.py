@@ -39,6 +39,16 @@ class ItemServiceStub(object):
                 request_serializer=item__service__pb2.ItemDetailRequest.SerializeToString,
                 response_deserializer=item__service__pb2.ItemDetailResponse.FromString,
                 _registered_method=True)
+        self.BatchGetItemDetails = channel.unary_unary(
+                '/item_service.ItemService/BatchGetItemDetails',
+                request_serializer=item__service__pb2.BatchItemDetailRequest.SerializeToString,
+                response_deserializer=item__service__pb2.BatchItemDetailResponse.FromString,
+                _registered_method=True)
+        self.StreamItemDetails = channel.unary_stream(
+                '/item_service.ItemService/StreamItemDetails',
+                request_serializer=item__service__pb2.BatchItemDetailRequest.SerializeToString,
+                response_deserializer=item__service__pb2.ItemDetailResponse.FromString,
+                _registered_method=True)
 
 
 class ItemServiceServicer(object):
@@ -50,6 +60,20 @@ class ItemServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BatchGetItemDetails(self, request, context):
+        """Several items of a store with one call; codes not found are listed in not_found_item_codes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamItemDetails(self, request, context):
+        """Same items as BatchGetItemDetails, one message per item (for long code lists)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ItemServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +82,16 @@ def add_ItemServiceServicer_to_server(servicer, server):
                     request_deserializer=item__service__pb2.ItemDetailRequest.FromString,
                     response_serializer=item__service__pb2.ItemDetailResponse.SerializeToString,
             ),
+            'BatchGetItemDetails': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetItemDetails,
+                    request_deserializer=item__service__pb2.BatchItemDetailRequest.FromString,
+                    response_serializer=item__service__pb2.BatchItemDetailResponse.SerializeToString,
+            ),
+            'StreamItemDetails': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamItemDetails,
+                    request_deserializer=item__service__pb2.BatchItemDetailRequest.FromString,
+                    response_serializer=item__service__pb2.ItemDetailResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'item_service.ItemService', rpc_method_handlers)
@@ -95,3 +129,305 @@ class ItemService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def BatchGetItemDetails(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/item_service.ItemService/BatchGetItemDetails',
+            item__service__pb2.BatchItemDetailRequest.SerializeToString,
+            item__service__pb2.BatchItemDetailResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamItemDetails(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/item_service.ItemService/StreamItemDetails',
+            item__service__pb2.BatchItemDetailRequest.SerializeToString,
+            item__service__pb2.ItemDetailResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+
+class MasterDataServiceStub(object):
+    """Read-only access to the master data used on every transaction
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.ResolveSettings = channel.unary_unary(
+                '/item_service.MasterDataService/ResolveSettings',
+                request_serializer=item__service__pb2.SettingsResolveRequest.SerializeToString,
+                response_deserializer=item__service__pb2.SettingsResolveResponse.FromString,
+                _registered_method=True)
+        self.ListPayments = channel.unary_unary(
+                '/item_service.MasterDataService/ListPayments',
+                request_serializer=item__service__pb2.MasterDataRequest.SerializeToString,
+                response_deserializer=item__service__pb2.PaymentListResponse.FromString,
+                _registered_method=True)
+        self.ListTaxes = channel.unary_unary(
+                '/item_service.MasterDataService/ListTaxes',
+                request_serializer=item__service__pb2.MasterDataRequest.SerializeToString,
+                response_deserializer=item__service__pb2.TaxListResponse.FromString,
+                _registered_method=True)
+        self.GetCategoryMap = channel.unary_unary(
+                '/item_service.MasterDataService/GetCategoryMap',
+                request_serializer=item__service__pb2.MasterDataRequest.SerializeToString,
+                response_deserializer=item__service__pb2.CategoryMapResponse.FromString,
+                _registered_method=True)
+        self.StreamCategories = channel.unary_stream(
+                '/item_service.MasterDataService/StreamCategories',
+                request_serializer=item__service__pb2.MasterDataRequest.SerializeToString,
+                response_deserializer=item__service__pb2.Category.FromString,
+                _registered_method=True)
+
+
+class MasterDataServiceServicer(object):
+    """Read-only access to the master data used on every transaction
+    """
+
+    def ResolveSettings(self, request, context):
+        """Resolve settings values for a terminal (store+terminal, store, global, default)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListPayments(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListTaxes(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetCategoryMap(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamCategories(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_MasterDataServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'ResolveSettings': grpc.unary_unary_rpc_method_handler(
+                    servicer.ResolveSettings,
+                    request_deserializer=item__service__pb2.SettingsResolveRequest.FromString,
+                    response_serializer=item__service__pb2.SettingsResolveResponse.SerializeToString,
+            ),
+            'ListPayments': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListPayments,
+                    request_deserializer=item__service__pb2.MasterDataRequest.FromString,
+                    response_serializer=item__service__pb2.PaymentListResponse.SerializeToString,
+            ),
+            'ListTaxes': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListTaxes,
+                    request_deserializer=item__service__pb2.MasterDataRequest.FromString,
+                    response_serializer=item__service__pb2.TaxListResponse.SerializeToString,
+            ),
+            'GetCategoryMap': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetCategoryMap,
+                    request_deserializer=item__service__pb2.MasterDataRequest.FromString,
+                    response_serializer=item__service__pb2.CategoryMapResponse.SerializeToString,
+            ),
+            'StreamCategories': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamCategories,
+                    request_deserializer=item__service__pb2.MasterDataRequest.FromString,
+                    response_serializer=item__service__pb2.Category.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'item_service.MasterDataService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('item_service.MasterDataService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class MasterDataService(object):
+    """Read-only access to the master data used on every transaction
+    """
+
+    @staticmethod
+    def ResolveSettings(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/item_service.MasterDataService/ResolveSettings',
+            item__service__pb2.SettingsResolveRequest.SerializeToString,
+            item__service__pb2.SettingsResolveResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListPayments(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/item_service.MasterDataService/ListPayments',
+            item__service__pb2.MasterDataRequest.SerializeToString,
+            item__service__pb2.PaymentListResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListTaxes(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/item_service.MasterDataService/ListTaxes',
+            item__service__pb2.MasterDataRequest.SerializeToString,
+            item__service__pb2.TaxListResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetCategoryMap(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/item_service.MasterDataService/GetCategoryMap',
+            item__service__pb2.MasterDataRequest.SerializeToString,
+            item__service__pb2.CategoryMapResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamCategories(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/item_service.MasterDataService/StreamCategories',
+            item__service__pb2.MasterDataRequest.SerializeToString,
+            item__service__pb2.Category.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -28,9 +28,19 @@ from kugel_common.models.documents.abstract_document import AbstractDocument
 from kugel_common.utils.misc import get_app_time
 from kugel_common.exceptions import RepositoryException, CannotDeleteException, DuplicateKeyException
 from kugel_common.schemas.pagination import PaginatedResult, Metadata
+from kugel_common.models.repositories.keyset_pagination import (
+    TotalMode,
+    normalize_keyset_sort,
+    encode_cursor,
+    decode_cursor,
+    build_keyset_filter,
+)
 
 logger = getLogger(__name__)
 
+# Upper bound of the count used for estimated totals of filtered keyset pages
+KEYSET_ESTIMATE_COUNT_LIMIT = 10000
+
 Tdocument = TypeVar("Tdocument", bound=AbstractDocument)
 
 class AbstractRepository(ABC, Generic[Tdocument]):
@@ -358,6 +368,95 @@ class AbstractRepository(ABC, Generic[Tdocument]):
             message = f"Failed to get document from app.database: filter->{filter} sort->{sort} page->{page} limit->{limit} e.message->{e}"
             raise RepositoryException(message, self.collection_name, logger, e) from e
 
+    async def get_keyset_paginated_list_async(
+        self,
+        filter: dict,
+        limit: int,
+        sort: list[tuple[str, int]] = None,
+        cursor: str = None,
+        total_mode: str = TotalMode.ESTIMATE,
+    ) -> PaginatedResult[Tdocument]:
+        """
+        Retrieve a page of documents using keyset (cursor) pagination
+
+        Unlike get_paginated_list_async the page is located with a range condition
+        on the sort keys and _id taken from the cursor, so every page costs the
+        same regardless of its depth. The sort keys (followed by _id) should be
+        covered by an index for this to hold.
+
+        Args:
+            filter: Dictionary specifying the filter criteria
+            limit: Maximum number of documents per page (must be positive)
+            sort: List of tuples specifying the sort order (field, direction)
+            cursor: metadata.next_cursor of the previous page, None for the first page
+            total_mode: "exact", "estimate" or "none" (see TotalMode)
+
+        Returns:
+            PaginatedResult[Tdocument]: Page of documents; metadata.next_cursor is None on the last page
+
+        Raises:
+            InvalidRequestDataException: If the cursor is invalid
+            RepositoryException: If any database error occurs
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        sort = normalize_keyset_sort(sort)
+        page = 1
+        query = filter
+        if cursor:
+            values, previous_page = decode_cursor(cursor, sort)
+            page = previous_page + 1
+            query = {"$and": [filter, build_keyset_filter(sort, values)]}
+
+        try:
+            cursor_db = self.dbcollection.find(query, session=self.session).sort(sort).limit(limit + 1)
+            result_set = await cursor_db.to_list(limit + 1)
+
+            next_cursor = None
+            if len(result_set) > limit:
+                result_set = result_set[:limit]
+                next_cursor = encode_cursor(result_set[-1], sort, page)
+
+            total, total_is_estimate = await self.__count_for_keyset_async(filter, total_mode)
+
+            sort_str = ", ".join([f"{key}:{value}" for key, value in sort])
+            return PaginatedResult(
+                metadata=Metadata(
+                    total=total,
+                    page=page,
+                    limit=limit,
+                    sort=sort_str,
+                    filter=filter,
+                    next_cursor=next_cursor,
+                    total_is_estimate=total_is_estimate,
+                ),
+                data=[self.__create_document(**result) for result in result_set],
+            )
+
+        except Exception as e:
+            message = f"Failed to get document from app.database: filter->{filter} sort->{sort} cursor->{cursor} limit->{limit} e.message->{e}"
+            raise RepositoryException(message, self.collection_name, logger, e) from e
+
+    async def __count_for_keyset_async(self, filter: dict, total_mode: str) -> tuple[int, bool]:
+        """
+        Count documents for a keyset page according to the total mode
+
+        Returns:
+            tuple: (total or None, whether the total is an estimate or None)
+        """
+        if total_mode == TotalMode.NONE:
+            return None, None
+        if total_mode == TotalMode.EXACT:
+            return await self.dbcollection.count_documents(filter, session=self.session), False
+        if not filter:
+            return await self.dbcollection.estimated_document_count(), True
+        count = await self.dbcollection.count_documents(
+            filter, limit=KEYSET_ESTIMATE_COUNT_LIMIT, session=self.session
+        )
+        # below the limit the count is exact
+        return count, count >= KEYSET_ESTIMATE_COUNT_LIMIT
+
     async def get_one_async(self, filter: dict) -> Tdocument:
         """
         Retrieve a single document matching a filter
@@ -0,0 +1,150 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Keyset (cursor) pagination helpers
+
+Offset pagination (skip) reads and discards every document before the requested
+page, so deep pages get slower as the collection grows. Keyset pagination instead
+remembers the sort key values and _id of the last document of a page in an opaque
+cursor token and starts the next page with a range condition on those values,
+which an index on the sort keys can serve directly.
+"""
+import base64
+import json
+from typing import Any, Optional
+
+from bson import json_util
+
+from kugel_common.exceptions import InvalidRequestDataException
+
+
+class TotalMode:
+    """How the total number of documents is reported for a keyset page"""
+
+    EXACT = "exact"  # count_documents on the filter (cost grows with the match count)
+    ESTIMATE = "estimate"  # collection metadata for unfiltered queries, otherwise a count capped at a limit
+    NONE = "none"  # no total
+
+
+def normalize_keyset_sort(sort: Optional[list[tuple[str, int]]]) -> list[tuple[str, int]]:
+    """
+    Make a sort specification usable for keyset pagination
+
+    _id is appended as a tie-breaker (in the direction of the last key) so that
+    the order is total and no document is skipped or repeated between pages.
+
+    Args:
+        sort: Sort specification, None for newest first
+
+    Returns:
+        Sort specification ending with _id
+    """
+    sort = list(sort) if sort else [("created_at", -1)]
+    if sort[-1][0] != "_id":
+        sort = [(key, direction) for key, direction in sort if key != "_id"]
+        sort.append(("_id", sort[-1][1]))
+    return sort
+
+
+def _get_value(document: dict, key: str) -> Any:
+    """Get a (possibly dotted) field value from a raw document"""
+    value = document
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def encode_cursor(document: dict, sort: list[tuple[str, int]], page: int) -> str:
+    """
+    Encode the position after a document as an opaque cursor token
+
+    Args:
+        document: Raw document (as returned by MongoDB) of the last row of the page
+        sort: Normalized sort specification
+        page: Page number of the page the document belongs to
+
+    Returns:
+        URL-safe cursor token
+    """
+    payload = {
+        "s": [[key, direction] for key, direction in sort],
+        "v": [_get_value(document, key) for key, _ in sort],
+        "p": page,
+    }
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: list[tuple[str, int]]) -> tuple[list[Any], int]:
+    """
+    Decode a cursor token created by encode_cursor
+
+    Args:
+        cursor: Cursor token
+        sort: Normalized sort specification of the current request
+
+    Returns:
+        Sort key values of the last document of the previous page, and that page number
+
+    Raises:
+        InvalidRequestDataException: If the token is malformed or was created for another sort
+    """
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        token_sort = [(key, direction) for key, direction in payload["s"]]
+        values = payload["v"]
+        page = int(payload["p"])
+    except (ValueError, KeyError, TypeError, json.JSONDecodeError) as e:
+        raise InvalidRequestDataException(f"Invalid cursor: {cursor}", original_exception=e) from e
+
+    if token_sort != sort or len(values) != len(sort):
+        raise InvalidRequestDataException(f"Cursor does not match the requested sort: {sort}")
+    return values, page
+
+
+def build_keyset_filter(sort: list[tuple[str, int]], values: list[Any]) -> dict:
+    """
+    Build the range condition selecting the documents after the cursor position
+
+    For sort keys k1..kn the condition is
+    (k1 > v1) or (k1 = v1 and k2 > v2) or ... ("<" for descending keys).
+    Missing or null values sort first in MongoDB, which is taken into account.
+
+    Args:
+        sort: Normalized sort specification
+        values: Sort key values of the last document of the previous page
+
+    Returns:
+        MongoDB filter
+    """
+    branches = []
+    for i, (key, direction) in enumerate(sort):
+        condition = {sort[j][0]: values[j] for j in range(i)}
+        value = values[i]
+        if value is None:
+            if direction < 0:
+                # nothing sorts below null
+                continue
+            condition[key] = {"$ne": None}
+        elif direction > 0:
+            condition[key] = {"$gt": value}
+        else:
+            # also matches missing / null values, which come last in descending order
+            condition[key] = {"$not": {"$gte": value}}
+        branches.append(condition)
+
+    if not branches:
+        return {"_id": {"$exists": False}}
+    return branches[0] if len(branches) == 1 else {"$or": branches}
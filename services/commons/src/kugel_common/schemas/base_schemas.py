@@ -33,10 +33,13 @@ class Metadata(BaseSchemmaModel):
     
     Represents metadata for paginated API responses.
     Includes total count, current page, items per page, sort criteria,
-    and filter conditions.
+    and filter conditions. Cursor (keyset) paginated responses also carry
+    the cursor of the next page; their total may be estimated or omitted.
     """
-    total: int
+    total: Optional[int]
     page: int
     limit: int
     sort: Optional[str]
     filter: Optional[dict]
+    next_cursor: Optional[str] = None
+    total_is_estimate: Optional[bool] = None
@@ -8,6 +8,7 @@ import logging
 import time
 import asyncio
 import httpx
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Union, Tuple, Awaitable, AsyncIterator
 from contextlib import asynccontextmanager
 
@@ -15,6 +16,10 @@ from kugel_common.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Responses kept for conditional GET requests: (url, params) -> (etag, parsed JSON)
+# Shared by all clients because service clients are often created per call (get_service_client)
+_conditional_cache: "OrderedDict[Tuple[str, Tuple], Tuple[str, Any]]" = OrderedDict()
+
 class HttpClientError(Exception):
     """Exception class for HTTP client errors"""
     def __init__(self, message: str, status_code: Optional[int] = None, response: Optional[Any] = None):
@@ -196,6 +201,47 @@ class HttpClientHelper:
         data, _ = await self.request('GET', endpoint, params=params, **kwargs)
         return data
 
+    async def get_conditional(self, endpoint: str, params: Optional[Dict] = None, **kwargs) -> dict:
+        """
+        Execute a GET request revalidating a previously received response
+
+        The ETag of the last response for the same URL and query parameters is sent
+        as If-None-Match. When the server answers 304 Not Modified the cached data is
+        returned without transferring or parsing the body again. Only responses that
+        carry an ETag are cached. The returned data is shared, callers must not modify it.
+
+        Args:
+            endpoint: API endpoint
+            params: URL query parameters
+            **kwargs: Additional parameters to pass to the httpx library
+
+        Returns:
+            JSON response data
+        """
+        url = self._build_url(endpoint)
+        cache_key = (url, tuple(sorted((str(key), str(value)) for key, value in (params or {}).items())))
+        cached = _conditional_cache.get(cache_key)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        response = await self._make_request('GET', endpoint, params=params, headers=headers, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            logger.debug(f"Not modified, using cached response: {url}")
+            _conditional_cache.move_to_end(cache_key)
+            return cached[1]
+
+        data = response.json()
+        etag = response.headers.get("etag")
+        if etag:
+            _conditional_cache[cache_key] = (etag, data)
+            _conditional_cache.move_to_end(cache_key)
+            while len(_conditional_cache) > settings.HTTP_CONDITIONAL_CACHE_MAX_ENTRIES:
+                _conditional_cache.popitem(last=False)
+        else:
+            _conditional_cache.pop(cache_key, None)
+        return data
+
     async def post(self, endpoint: str, params:Optional[Dict] = None, data: Optional[Union[Dict, Any]] = None, json: Optional[Dict] = None, **kwargs) -> dict:
         """
         Execute a POST request
@@ -326,6 +372,11 @@ async def close_all_clients():
             del _client_pool[key]
 
 
+def clear_conditional_cache():
+    """Discard all responses kept for conditional GET requests"""
+    _conditional_cache.clear()
+
+
 @asynccontextmanager
 async def get_service_client(service_name: str, **kwargs) -> AsyncIterator[HttpClientHelper]:
     """
@@ -0,0 +1,248 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Master data change events
+
+Master-data publishes an event through Dapr pub/sub whenever items, store prices,
+taxes, payments, settings, categories or item books change. Services keeping
+local copies of master data subscribe to the topic and invalidate or patch
+their caches, so cache TTLs can be long without serving stale data.
+
+Publishing:
+    publisher = MasterDataEventPublisher("pubsub-master-data", "topic-master-data")
+    await publisher.publish_async(
+        MasterDataChangeEvent(
+            tenant_id=tenant_id, entity=MasterDataEntity.ITEM, operation=MasterDataOperation.UPDATED, keys=[code]
+        )
+    )
+
+Subscribing:
+    subscriber = MasterDataEventSubscriber()
+    subscriber.register(MasterDataEntity.ITEM, on_item_changed)   # async def on_item_changed(event): ...
+
+    @app.get("/dapr/subscribe")
+    def subscribe_topics():
+        return [subscriber.make_subscription("pubsub-master-data", "topic-master-data", "/api/v1/master-data-events")]
+
+    @router.post("/master-data-events")
+    async def handle_master_data_event(request: Request):
+        return await subscriber.handle_message_async(await request.json())
+"""
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+from kugel_common.utils.dapr_client_helper import DaprClientHelper
+
+import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MASTER_DATA_PUBSUB_NAME = "pubsub-master-data"
+DEFAULT_MASTER_DATA_PUBSUB_TOPIC = "topic-master-data"
+
+
+class MasterDataEntity(str, Enum):
+    """Kinds of master data that publish change events"""
+    ITEM = "item"
+    PRICE = "price"  # store-specific item price
+    TAX = "tax"
+    PAYMENT = "payment"
+    SETTINGS = "settings"
+    CATEGORY = "category"
+    ITEM_BOOK = "item_book"
+
+
+class MasterDataOperation(str, Enum):
+    """Kinds of changes"""
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class MasterDataChangeEvent(BaseModel):
+    """
+    Change of master data documents
+
+    Attributes:
+        event_id: Unique identifier of the event
+        tenant_id: Tenant whose master data changed
+        entity: Kind of the changed master data
+        operation: Kind of the change
+        keys: Keys (item_code, payment_code, name ...) of the changed documents;
+            empty when the keys are unknown, meaning all documents of the entity may have changed
+        store_code: Store of store-specific data (prices), None for tenant-wide data
+        data: Changed document when available, for subscribers that patch instead of invalidate
+        changed_at: Time of the change
+    """
+    event_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    tenant_id: str
+    entity: MasterDataEntity
+    operation: MasterDataOperation
+    keys: List[str] = []
+    store_code: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+    changed_at: datetime = Field(default_factory=datetime.now)
+
+
+MasterDataEventHandler = Callable[[MasterDataChangeEvent], Awaitable[None]]
+
+
+class MasterDataEventPublisher:
+    """
+    Publishes master data change events to Dapr pub/sub
+
+    Publishing never raises: caches of subscribers fall back to their TTL when
+    an event is lost, so a failed publish is only logged.
+    """
+
+    def __init__(
+        self,
+        pubsub_name: str = DEFAULT_MASTER_DATA_PUBSUB_NAME,
+        topic_name: str = DEFAULT_MASTER_DATA_PUBSUB_TOPIC,
+        dapr_client: Optional[DaprClientHelper] = None,
+    ):
+        """
+        Initialize the publisher
+
+        Args:
+            pubsub_name: Name of the Dapr pub/sub component
+            topic_name: Topic the events are published to
+            dapr_client: Dapr client to use, a new one is created if omitted
+        """
+        self.pubsub_name = pubsub_name
+        self.topic_name = topic_name
+        self._dapr_client = dapr_client or DaprClientHelper(circuit_breaker_threshold=3, circuit_breaker_timeout=60)
+
+    async def publish_async(self, event: MasterDataChangeEvent) -> bool:
+        """
+        Publish a change event
+
+        Args:
+            event: Event to publish
+
+        Returns:
+            bool: True if the event was published
+        """
+        success = await self._dapr_client.publish_event(
+            pubsub_name=self.pubsub_name,
+            topic_name=self.topic_name,
+            event_data=event.model_dump(mode="json"),
+        )
+        if not success:
+            logger.warning(
+                f"Failed to publish master data event {event.entity.value}/{event.operation.value} "
+                f"for tenant {event.tenant_id}, keys: {event.keys}"
+            )
+        return success
+
+    async def close(self) -> None:
+        """Close the Dapr client"""
+        await self._dapr_client.close()
+
+
+class MasterDataEventSubscriber:
+    """
+    Dispatches received master data change events to the handlers registered per entity
+
+    Handlers typically invalidate the affected cache entries, or patch them with
+    event.data when it is present.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[MasterDataEntity, List[MasterDataEventHandler]] = {}
+
+    def register(self, entities, handler: MasterDataEventHandler) -> None:
+        """
+        Register a handler
+
+        Args:
+            entities: Entity or list of entities the handler is called for
+            handler: Async callable receiving the MasterDataChangeEvent
+        """
+        if isinstance(entities, MasterDataEntity):
+            entities = [entities]
+        for entity in entities:
+            self._handlers.setdefault(MasterDataEntity(entity), []).append(handler)
+
+    def register_all(self, handler: MasterDataEventHandler) -> None:
+        """
+        Register a handler called for every entity
+
+        Args:
+            handler: Async callable receiving the MasterDataChangeEvent
+        """
+        self.register(list(MasterDataEntity), handler)
+
+    @staticmethod
+    def make_subscription(
+        pubsub_name: str = DEFAULT_MASTER_DATA_PUBSUB_NAME,
+        topic_name: str = DEFAULT_MASTER_DATA_PUBSUB_TOPIC,
+        route: str = "/api/v1/master-data-events",
+    ) -> Dict[str, str]:
+        """
+        Make the subscription entry returned from /dapr/subscribe
+
+        Args:
+            pubsub_name: Name of the Dapr pub/sub component
+            topic_name: Topic the events are published to
+            route: Route Dapr delivers the events to
+
+        Returns:
+            Subscription configuration with pubsubname, topic and route
+        """
+        return {"pubsubname": pubsub_name, "topic": topic_name, "route": route}
+
+    async def dispatch_async(self, event: MasterDataChangeEvent) -> None:
+        """
+        Call the handlers registered for the entity of the event
+
+        Args:
+            event: Received event
+        """
+        for handler in self._handlers.get(event.entity, []):
+            await handler(event)
+
+    async def handle_message_async(self, message: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Handle a message delivered by Dapr
+
+        Cache invalidation is local to the receiving process, so failed messages
+        are dropped instead of retried; the TTL of the cache bounds the staleness.
+
+        Args:
+            message: CloudEvent delivered by Dapr, the event is in "data"
+
+        Returns:
+            Dapr response body ({"status": "SUCCESS"} or {"status": "DROP"})
+        """
+        try:
+            event = MasterDataChangeEvent(**message.get("data", message))
+        except (ValidationError, TypeError) as e:
+            logger.warning(f"Dropping invalid master data event: {e}")
+            return {"status": "DROP"}
+
+        try:
+            await self.dispatch_async(event)
+        except Exception as e:
+            logger.error(f"Error handling master data event {event.event_id}: {e}")
+            return {"status": "DROP"}
+
+        logger.debug(
+            f"Handled master data event {event.entity.value}/{event.operation.value} "
+            f"for tenant {event.tenant_id}, keys: {event.keys}"
+        )
+        return {"status": "SUCCESS"}
@@ -0,0 +1,110 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+MongoDB lease
+
+A lease lets one replica of a service do work that must not run on several
+replicas at once, such as a migration or a change stream watcher. The lease is
+a document keyed by its name; the holder renews it before it expires, and
+another replica can take it over once the holder stops renewing. The holder
+can keep progress in the lease document (e.g. a resume token) for the next one.
+
+Usage:
+    lease = MongoLease(db, "search_tokens_backfill", ttl_seconds=60)
+    if await lease.acquire_async():
+        try:
+            ...  # call lease.renew_async() more often than ttl_seconds
+        finally:
+            await lease.release_async()
+"""
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from typing import Any, Optional
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from kugel_common.config.settings import settings
+
+logger = getLogger(__name__)
+
+
+class MongoLease:
+    """
+    Time-limited lock stored in a MongoDB collection
+
+    Attributes:
+        name: Name of the lease, unique within the database
+        ttl_seconds: Time after which a lease that was not renewed can be taken over
+        owner_id: Identifier of this holder (a random id per instance by default)
+    """
+
+    def __init__(
+        self, db: AsyncIOMotorDatabase, name: str, ttl_seconds: int, owner_id: Optional[str] = None
+    ):
+        self.collection = db[settings.DB_COLLECTION_NAME_LEASE]
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.owner_id = owner_id or uuid4().hex
+
+    async def acquire_async(self, fields: Optional[dict[str, Any]] = None) -> bool:
+        """
+        Acquire the lease, or extend it if this instance already holds it
+
+        Args:
+            fields: Additional fields stored in the lease document
+
+        Returns:
+            True if this instance holds the lease, False if another holder does
+        """
+        now = datetime.now(timezone.utc)
+        update = {**(fields or {}), "owner_id": self.owner_id, "expires_at": now + timedelta(seconds=self.ttl_seconds)}
+        try:
+            lease = await self.collection.find_one_and_update(
+                {"_id": self.name, "$or": [{"owner_id": self.owner_id}, {"expires_at": {"$lt": now}}]},
+                {"$set": update},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # the lease exists and is held by another instance
+            return False
+        return lease is not None and lease.get("owner_id") == self.owner_id
+
+    async def renew_async(self, fields: Optional[dict[str, Any]] = None) -> bool:
+        """
+        Extend the lease held by this instance
+
+        Args:
+            fields: Additional fields stored in the lease document
+
+        Returns:
+            True if the lease is still held, False if it expired and was taken over
+        """
+        held = await self.acquire_async(fields)
+        if not held:
+            logger.warning(f"Lease {self.name} was taken over by another holder")
+        return held
+
+    async def get_async(self) -> Optional[dict[str, Any]]:
+        """Get the lease document, including the fields stored by its holders"""
+        return await self.collection.find_one({"_id": self.name})
+
+    async def release_async(self) -> None:
+        """Release the lease if this instance holds it; the stored fields are kept for the next holder"""
+        await self.collection.update_one(
+            {"_id": self.name, "owner_id": self.owner_id}, {"$set": {"expires_at": datetime.now(timezone.utc)}}
+        )
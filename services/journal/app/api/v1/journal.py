@@ -128,9 +128,15 @@ async def get_journals(
     receipt_no_from: int = Query(None),
     receipt_no_to: int = Query(None),
     keywords: list[str] = Query(None, description="Search keywords"),
+    keyword_match: str = Query(
+        "any", pattern="^(any|all)$", description="any: journals containing any keyword, all: every keyword"
+    ),
     limit: int = Query(100),
     page: int = Query(1),
     sort: list[tuple[str, int]] = Depends(parse_sort),
+    paging: str = Query("offset", pattern="^(offset|cursor)$", description="offset: page numbers, cursor: keyset"),
+    cursor: str = Query(None, description="metadata.nextCursor of the previous page (implies paging=cursor)"),
+    total: str = Query("estimate", pattern="^(exact|estimate|none)$", description="Total for cursor paging"),
     journal_service: JournalService = Depends(get_journal_service),
 ):
     """
@@ -156,16 +162,20 @@ async def get_journals(
         receipt_no_from: Optional start of receipt number range
         receipt_no_to: Optional end of receipt number range
         keywords: Optional list of keywords to search for in journal text
+        keyword_match: "any" (default) or "all"; keyword results are ranked by the number of matched keywords
         limit: Maximum number of results to return (default: 100)
         page: Page number for pagination (default: 1)
         sort: Sorting criteria (default: terminal_no, business_date, receipt_no)
+        paging: "offset" (default) for page numbers, "cursor" for keyset pagination
+        cursor: Cursor of the next page from the previous response (metadata.nextCursor)
+        total: Total reported with cursor paging: exact, estimate (default) or none
         journal_service: The injected journal service
 
     Returns:
         ApiResponse[list[JournalSchema]]: Standard API response with matching journal entries
     """
     logger.info(
-        f"get_journals: tenant_id->{tenant_id}, store_code->{store_code}, terminals->{terminals}, transaction_types->{transaction_types}, business_date_from->{business_date_from}, business_date_to->{business_date_to}, generate_date_time_from->{generate_date_time_from}, generate_date_time_to->{generate_date_time_to}, receipt_no_from->{receipt_no_from}, receipt_no_to->{receipt_no_to}, keywords->{keywords}, limit->{limit}, page->{page}, sort->{sort}"
+        f"get_journals: tenant_id->{tenant_id}, store_code->{store_code}, terminals->{terminals}, transaction_types->{transaction_types}, business_date_from->{business_date_from}, business_date_to->{business_date_to}, generate_date_time_from->{generate_date_time_from}, generate_date_time_to->{generate_date_time_to}, receipt_no_from->{receipt_no_from}, receipt_no_to->{receipt_no_to}, keywords->{keywords}, keyword_match->{keyword_match}, limit->{limit}, page->{page}, sort->{sort}, paging->{paging}, cursor->{cursor}"
     )
     verify_tenant_id(tenant_id, tenant_id_with_security, logger)
     paginated_result = await journal_service.get_journals_paginated_async(
@@ -179,9 +189,13 @@ async def get_journals(
         receipt_no_from=receipt_no_from,
         receipt_no_to=receipt_no_to,
         keywords=keywords,
+        keyword_match=keyword_match,
         limit=limit,
         page=page,
         sort=sort,
+        use_cursor=paging == "cursor",
+        cursor=cursor,
+        total_mode=total,
     )
     return_journals = [SchemasTransformerV1().transform_journal_response(journal) for journal in paginated_result.data]
 
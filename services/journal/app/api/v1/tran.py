@@ -448,3 +448,61 @@ async def receive_transactions(
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
     return response
+
+
+@router.post(
+    "/tenants/{tenant_id}/transactions/bulk",
+    response_model=ApiResponse[list[TranResponse]],
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_400_BAD_REQUEST: StatusCodes.get(status.HTTP_400_BAD_REQUEST),
+        status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
+        status.HTTP_403_FORBIDDEN: StatusCodes.get(status.HTTP_403_FORBIDDEN),
+        status.HTTP_422_UNPROCESSABLE_ENTITY: StatusCodes.get(status.HTTP_422_UNPROCESSABLE_ENTITY),
+        status.HTTP_500_INTERNAL_SERVER_ERROR: StatusCodes.get(status.HTTP_500_INTERNAL_SERVER_ERROR),
+    },
+)
+async def receive_transactions_bulk(
+    tran_data_list: list[dict],
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    tran_service: LogService = Depends(get_log_service),
+):
+    """
+    Direct API endpoint for receiving many transactions in one call.
+
+    The transactions and their journal entries are stored with idempotent
+    bulk writes in batches (see LogService.receive_tranlogs_async), without
+    a multi-document transaction. Sending the same transactions again does
+    not create duplicates, so the call can be retried as a whole.
+
+    Args:
+        tran_data_list: List of transaction data in JSON format
+        tenant_id: The tenant identifier from the path
+        tenant_id_with_security: The tenant ID extracted from security credentials
+        tran_service: The LogService instance from the dependency
+
+    Returns:
+        ApiResponse[list[TranResponse]]: A standard API response with the received transactions
+    """
+    logger.info(f"Received bulk transaction request. tenant_id: {tenant_id}, count: {len(tran_data_list)}")
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+    tran_data_objs = [BaseTransaction(**tran_data) for tran_data in tran_data_list]
+    for tran_data_obj in tran_data_objs:
+        if tran_data_obj.tenant_id != tenant_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid tenant_id in transaction: {tran_data_obj.tenant_id}",
+            )
+    await tran_service.receive_tranlogs_async(tran_data_objs)
+    transformer = SchemasTransformerV1()
+    tran_res_list = [transformer.transform_tran_response(tran_data_obj) for tran_data_obj in tran_data_objs]
+
+    response = ApiResponse(
+        success=True,
+        code=status.HTTP_201_CREATED,
+        message=f"Transactions received successfully. tenant_id: {tenant_id}, count: {len(tran_res_list)}",
+        data=[tran_res.model_dump() for tran_res in tran_res_list],
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+    return response
@@ -26,6 +26,13 @@ class Settings(
     DEBUG: str = "false"
     DEBUG_PORT: int = 5678
 
+    # Tranlog ingestion: "transaction" writes the tranlog and its journal in a multi-document
+    # transaction, "bulk" writes them with idempotent ordered bulk upserts without a session
+    JOURNAL_INGESTION_MODE: str = "transaction"
+    TRANLOG_BULK_BATCH_SIZE: int = 500
+    TRANLOG_BULK_WRITE_MAX_RETRIES: int = 3
+    TRANLOG_BULK_WRITE_RETRY_INTERVAL: float = 0.2  # seconds, doubled on every retry
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_ignore_empty=True,  # Ignore empty values from .env file
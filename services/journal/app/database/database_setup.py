@@ -1,4 +1,5 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import asyncio
 from typing import Optional
 from logging import getLogger
 from kugel_common.database import database as db_helper
@@ -95,6 +96,8 @@ async def create_journal_collection(tenant_id: str):
             "keys": {"tenant_id": 1, "store_code": 1, "terminal_no": 1, "business_date": 1, "receipt_no": 1},
             "unique": False,
         },
+        # multikey index for keyword search (see JournalRepository.ensure_search_tokens_async)
+        {"keys": {"tenant_id": 1, "store_code": 1, "search_tokens": 1}, "unique": False},
     ]
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
@@ -123,6 +126,42 @@ async def create_collections(tenant_id: str):
     # add more collections here
 
 
+# upgrade the collections of a tenant created before later changes
+async def upgrade_collections(tenant_id: str) -> bool:
+    """Returns False while an upgrade step is left to another replica."""
+    from app.models.repositories.journal_repository import JournalRepository
+
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    # search tokens of journals stored before keyword search was indexed
+    search_ready = await JournalRepository(db, tenant_id).ensure_search_tokens_async()
+
+    # add more upgrade steps here
+    return search_ready
+
+
+# upgrade the collections of all existing tenants
+async def upgrade_all_tenants():
+    from app.models.repositories.journal_repository import SEARCH_BACKFILL_LEASE_SECONDS
+
+    client = await db_helper.get_client_async()
+    prefix = f"{settings.DB_NAME_PREFIX}_"
+    pending = [db_name[len(prefix) :] for db_name in await client.list_database_names() if db_name.startswith(prefix)]
+    while pending:
+        waiting = []
+        for tenant_id in pending:
+            try:
+                if not await upgrade_collections(tenant_id):
+                    waiting.append(tenant_id)
+            except Exception as e:
+                # one broken tenant must not stop the upgrade of the others
+                logger.error(f"Failed to upgrade collections for tenant_id:{tenant_id}: {e}")
+        pending = waiting
+        if pending:
+            # check again once the lease of a replica that stopped would have expired
+            await asyncio.sleep(SEARCH_BACKFILL_LEASE_SECONDS)
+    logger.info("Upgrading collections of existing tenants completed")
+
+
 # setup database
 async def execute(tenant_id: str):
     logger.info(f"Setting up database for tenant_id:{tenant_id} execution started...")
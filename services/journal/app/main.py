@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from logging import getLogger, config
+import asyncio
 import platform
 import os
 
@@ -24,6 +25,7 @@ from app.api.v1.tenant import router as v1_tenant_router
 from app.api.v1.journal import router as v1_journal_router
 from app.api.v1.tran import router as v1_tran_router
 from app.config.settings import settings
+from app.database import database_setup
 
 # Create a FastAPI instance with API documentation URLs enabled
 app = FastAPI(docs_url="/docs", redoc_url="/redoc")
@@ -128,6 +130,10 @@ async def health_check():
     return HealthCheckResponse(status=overall_status, service="journal", version="1.0.0", checks=checks)
 
 
+# Background task backfilling search tokens and other upgrades for existing tenants
+upgrade_task: asyncio.Task = None
+
+
 # Application startup event handler
 async def startup_event():
     """
@@ -153,6 +159,11 @@ async def startup_event():
         logger.error(f"Error connecting to the database: {e}")
         raise e
 
+    # Upgrade the collections of existing tenants in the background
+    # Keyword searches match journal_text until the search tokens are backfilled
+    global upgrade_task
+    upgrade_task = asyncio.create_task(database_setup.upgrade_all_tenants())
+
 
 # Application shutdown event handler
 async def close_event():
@@ -165,6 +176,10 @@ async def close_event():
     """
     logger.info("closing the application")
 
+    # Stop the collection upgrade if it is still running
+    if upgrade_task is not None and not upgrade_task.done():
+        upgrade_task.cancel()
+
     # Close the database connection
     logger.info("close database connection for all tenants...")
     await db_helper.close_client_async()
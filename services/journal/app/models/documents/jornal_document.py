@@ -30,3 +30,4 @@ class JournalDocument(AbstractDocument):
     generate_date_time: str  # Date and time when the journal was generated
     journal_text: str  # Formatted text for journal
     receipt_text: str  # Formatted text for receipt printing
+    search_tokens: list[str] = []  # Tokens of journal_text for keyword search (see app.utils.journal_tokenizer)
@@ -1,17 +1,38 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import re
 from typing import Type
 from datetime import datetime
 from logging import getLogger
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
-from kugel_common.exceptions import CannotCreateException, DocumentNotFoundException
+from kugel_common.exceptions import CannotCreateException, DocumentNotFoundException, InvalidRequestDataException
+from kugel_common.models.repositories.keyset_pagination import TotalMode
 from kugel_common.schemas.pagination import PaginatedResult
+from kugel_common.schemas.base_schemas import Metadata
+from kugel_common.utils.misc import get_app_time
+from kugel_common.utils.mongo_lease import MongoLease
 from app.models.documents.jornal_document import JournalDocument
+from app.utils.journal_tokenizer import tokenize_text, tokenize_keyword
 from app.config.settings import settings
+from app.utils.bulk_write_helper import ordered_bulk_write_with_retry_async
 
 logger = getLogger(__name__)
 
+# Keys of the multikey index used for keyword search (same as database_setup)
+SEARCH_INDEX_KEYS = ["tenant_id", "store_code", "search_tokens"]
+
+# Number of legacy journals tokenized per bulk write when backfilling search tokens
+SEARCH_BACKFILL_BATCH_SIZE = 500
+
+# Lease held by the replica backfilling search tokens; renewed after every batch
+SEARCH_BACKFILL_LEASE_NAME = "journal_search_tokens_backfill"
+SEARCH_BACKFILL_LEASE_SECONDS = 300
+
+# Databases whose journals are known to have search tokens (checked once per process)
+_search_ready_databases: set[str] = set()
+
 
 class JournalRepository(AbstractRepository[JournalDocument]):
     """
@@ -82,6 +103,59 @@ class JournalRepository(AbstractRepository[JournalDocument]):
             )
             raise CannotCreateException(message, logger, e) from e
 
+    async def upsert_journals_async(self, journal_docs: list[JournalDocument]) -> int:
+        """
+        Store journal entries without a session using an ordered bulk write.
+
+        Each journal is inserted only if no journal with the same key as in
+        create_journal_async exists. Journals of transactions get a deterministic
+        _id derived from the transaction, so the write is idempotent and can be retried.
+
+        Args:
+            journal_docs: Journal documents to store
+
+        Returns:
+            Number of journal entries newly inserted
+
+        Raises:
+            CannotCreateException: If the journal entries cannot be stored
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        now = get_app_time()
+        operations = []
+        for journal_doc in journal_docs:
+            journal_doc.shard_key = self.__get_shard_key(journal_doc)
+            journal_doc.created_at = now
+            filter = {
+                "tenant_id": journal_doc.tenant_id,
+                "store_code": journal_doc.store_code,
+                "terminal_no": journal_doc.terminal_no,
+                "transaction_type": journal_doc.transaction_type,
+                "generate_date_time": journal_doc.generate_date_time,
+            }
+            document = journal_doc.model_dump()
+            if journal_doc.transaction_no is not None:
+                document["_id"] = (
+                    f"{journal_doc.tenant_id}-{journal_doc.store_code}-"
+                    f"{journal_doc.terminal_no}-{journal_doc.transaction_no}"
+                )
+            operations.append(UpdateOne(filter, {"$setOnInsert": document}, upsert=True))
+
+        try:
+            inserted = await ordered_bulk_write_with_retry_async(
+                self.dbcollection,
+                operations,
+                max_retries=settings.TRANLOG_BULK_WRITE_MAX_RETRIES,
+                retry_interval=settings.TRANLOG_BULK_WRITE_RETRY_INTERVAL,
+            )
+            logger.debug(f"JournalRepository.upsert_journals_async: count->{len(journal_docs)} inserted->{inserted}")
+            return inserted
+        except Exception as e:
+            message = f"Failed to store journals: tenant_id->{self.tenant_id} count->{len(journal_docs)}"
+            raise CannotCreateException(message, logger, e) from e
+
     async def get_journals_async(
         self,
         store_code: str,
@@ -94,6 +168,7 @@ class JournalRepository(AbstractRepository[JournalDocument]):
         receipt_no_from: int = None,
         receipt_no_to: int = None,
         keywords: list[str] = None,
+        keyword_match: str = "any",
         limit: int = 100,
         page: int = 1,
         sort: list[tuple[str, int]] = None,
@@ -104,7 +179,9 @@ class JournalRepository(AbstractRepository[JournalDocument]):
         This method provides a flexible search interface for journal entries,
         allowing filtering by terminal, transaction type, date ranges,
         receipt numbers, and even text content within the journal.
-        Results can be paginated and sorted as needed.
+        Results can be paginated and sorted as needed. Keywords are matched
+        against the indexed search tokens, and keyword results are ranked by
+        the number of matched keywords before the requested sort.
 
         Args:
             store_code: Identifier for the store
@@ -117,6 +194,7 @@ class JournalRepository(AbstractRepository[JournalDocument]):
             receipt_no_from: Optional start receipt number for range
             receipt_no_to: Optional end receipt number for range
             keywords: Optional list of keywords to search for in journal text
+            keyword_match: "any" to match journals containing any keyword, "all" to require every keyword
             limit: Maximum number of results per page (default: 100)
             page: Page number (default: 1)
             sort: List of field name and direction tuples for sorting
@@ -127,30 +205,28 @@ class JournalRepository(AbstractRepository[JournalDocument]):
         Raises:
             DocumentNotFoundException: If journals cannot be retrieved or no matches found
         """
-        query = {"tenant_id": self.tenant_id, "store_code": store_code}
-
-        if terminals:
-            query["terminal_no"] = {"$in": terminals}
-        if transaction_types:
-            query["transaction_type"] = {"$in": transaction_types}
-        if business_date_from and business_date_to:
-            query["business_date"] = {
-                "$gte": business_date_from,
-                "$lte": business_date_to,
-            }
-        if generate_date_time_from and generate_date_time_to:
-            query["generate_date_time"] = {
-                "$gte": generate_date_time_from,
-                "$lte": generate_date_time_to,
-            }
-        if receipt_no_from and receipt_no_to:
-            query["receipt_no"] = {"$gte": receipt_no_from, "$lte": receipt_no_to}
-        if keywords:
-            query["journal_text"] = {"$regex": "|".join(keywords)}
+        query = self.__build_query(
+            store_code,
+            terminals,
+            transaction_types,
+            business_date_from,
+            business_date_to,
+            generate_date_time_from,
+            generate_date_time_to,
+            receipt_no_from,
+            receipt_no_to,
+        )
 
         try:
+            search_ready = bool(keywords) and await self.is_search_ready_async()
+            keyword_tokens = self.__add_keyword_filter(query, keywords, keyword_match, search_ready)
             logger.debug(f"JournalRepository.get_journals_async: query->{query}, limit->{limit}, sort->{sort}")
-            journals = await self.get_list_async_with_sort_and_paging(filter=query, limit=limit, page=page, sort=sort)
+            if keyword_tokens:
+                journals = await self.__find_ranked_async(query, keyword_tokens, limit, page, sort)
+            else:
+                journals = await self.get_list_async_with_sort_and_paging(
+                    filter=query, limit=limit, page=page, sort=sort
+                )
             logger.debug(f"JournalRepository.get_journals_async: journals->{journals}")
             return journals
         except Exception as e:
@@ -185,9 +261,13 @@ class JournalRepository(AbstractRepository[JournalDocument]):
         receipt_no_from: int = None,
         receipt_no_to: int = None,
         keywords: list[str] = None,
+        keyword_match: str = "any",
         limit: int = 100,
         page: int = 1,
         sort: list[tuple[str, int]] = None,
+        use_cursor: bool = False,
+        cursor: str = None,
+        total_mode: str = TotalMode.ESTIMATE,
     ) -> PaginatedResult[JournalDocument]:
         """
         Retrieve journal entries with pagination metadata.
@@ -196,6 +276,10 @@ class JournalRepository(AbstractRepository[JournalDocument]):
         but returns results with pagination metadata including total count,
         current page, and other pagination information.
 
+        With cursor pagination (use_cursor or a cursor) pages are located by the
+        sort keys instead of skip, so deep pages cost the same as the first one.
+        Keyword matches are then returned in sort order rather than ranked.
+
         Args:
             store_code: Identifier for the store
             terminals: Optional list of terminal numbers to filter by
@@ -207,16 +291,152 @@ class JournalRepository(AbstractRepository[JournalDocument]):
             receipt_no_from: Optional start receipt number for range
             receipt_no_to: Optional end receipt number for range
             keywords: Optional list of keywords to search for in journal text
+            keyword_match: "any" to match journals containing any keyword, "all" to require every keyword
             limit: Maximum number of results per page (default: 100)
             page: Page number (default: 1)
             sort: List of field name and direction tuples for sorting
+            use_cursor: Use cursor pagination (page is ignored)
+            cursor: Cursor of the next page returned in the previous page's metadata
+            total_mode: Total reported with cursor pagination: exact, estimate or none
 
         Returns:
             PaginatedResult containing journal documents and metadata
 
         Raises:
+            InvalidRequestDataException: If the cursor is invalid
             DocumentNotFoundException: If journals cannot be retrieved
         """
+        query = self.__build_query(
+            store_code,
+            terminals,
+            transaction_types,
+            business_date_from,
+            business_date_to,
+            generate_date_time_from,
+            generate_date_time_to,
+            receipt_no_from,
+            receipt_no_to,
+        )
+
+        try:
+            search_ready = bool(keywords) and await self.is_search_ready_async()
+            keyword_tokens = self.__add_keyword_filter(query, keywords, keyword_match, search_ready)
+            logger.debug(
+                f"JournalRepository.get_journals_paginated_async: query->{query}, limit->{limit}, sort->{sort}"
+            )
+
+            if use_cursor or cursor:
+                return await self.get_keyset_paginated_list_async(
+                    filter=query, limit=limit, sort=sort, cursor=cursor, total_mode=total_mode
+                )
+            if not keyword_tokens:
+                return await self.get_paginated_list_async(filter=query, limit=limit, page=page, sort=sort)
+
+            total_count = await self.dbcollection.count_documents(query)
+            journals = await self.__find_ranked_async(query, keyword_tokens, limit, page, sort)
+            sort_str = ", ".join([f"{key}:{value}" for key, value in sort or [("created_at", -1)]])
+            return PaginatedResult(
+                metadata=Metadata(total=total_count, page=page, limit=limit, sort=sort_str, filter=query),
+                data=journals,
+            )
+        except InvalidRequestDataException:
+            raise
+        except Exception as e:
+            message = (
+                "Failed to get journals with pagination: "
+                f"tenant_id->{self.tenant_id} "
+                f"store_code->{store_code} "
+                f"terminals->{terminals} "
+                f"transaction_types->{transaction_types}"
+            )
+            raise DocumentNotFoundException(message, logger, e) from e
+
+    async def is_search_ready_async(self) -> bool:
+        """
+        Check whether journals can be searched by their search tokens.
+
+        The search index is only created after every journal has search tokens,
+        so its existence marks the end of the backfill. A positive result is
+        remembered per database and process.
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+        if self.db.name in _search_ready_databases:
+            return True
+
+        if self.__search_index_name() not in await self.dbcollection.index_information():
+            return False
+        _search_ready_databases.add(self.db.name)
+        return True
+
+    async def ensure_search_tokens_async(self) -> bool:
+        """
+        Ensure that journals can be searched by keyword.
+
+        Journals stored before search tokens existed are tokenized first, then the
+        search index is created. Called at startup for existing tenants; only the
+        replica holding the backfill lease does the work, the others return False
+        and keep searching journal_text until the index exists.
+
+        Returns:
+            True if the journals are ready for keyword search
+        """
+        if await self.is_search_ready_async():
+            return True
+
+        lease = MongoLease(self.db, SEARCH_BACKFILL_LEASE_NAME, SEARCH_BACKFILL_LEASE_SECONDS)
+        if not await lease.acquire_async():
+            logger.info(f"Search tokens of {self.db.name} are being backfilled by another replica")
+            return False
+        try:
+            await self.__backfill_search_tokens_async(lease)
+            await self.dbcollection.create_index(
+                [(key, 1) for key in SEARCH_INDEX_KEYS], name=self.__search_index_name()
+            )
+        finally:
+            await lease.release_async()
+        _search_ready_databases.add(self.db.name)
+        return True
+
+    def __search_index_name(self) -> str:
+        return f"{self.collection_name}_index_" + "_".join(SEARCH_INDEX_KEYS)
+
+    async def __backfill_search_tokens_async(self, lease: MongoLease) -> None:
+        """
+        Store search tokens for journals created before keyword search was indexed.
+        """
+        cursor = self.dbcollection.find({"search_tokens": {"$exists": False}}, {"journal_text": 1})
+        operations = []
+        count = 0
+        async for doc in cursor:
+            operations.append(
+                UpdateOne({"_id": doc["_id"]}, {"$set": {"search_tokens": tokenize_text(doc.get("journal_text"))}})
+            )
+            if len(operations) >= SEARCH_BACKFILL_BATCH_SIZE:
+                await self.dbcollection.bulk_write(operations, ordered=False)
+                count += len(operations)
+                operations = []
+                await lease.renew_async()
+        if operations:
+            await self.dbcollection.bulk_write(operations, ordered=False)
+            count += len(operations)
+        logger.info(f"Search tokens backfilled for {count} journals in {self.db.name}")
+
+    def __build_query(
+        self,
+        store_code: str,
+        terminals: list[int],
+        transaction_types: list[int],
+        business_date_from: str,
+        business_date_to: str,
+        generate_date_time_from: str,
+        generate_date_time_to: str,
+        receipt_no_from: int,
+        receipt_no_to: int,
+    ) -> dict:
+        """
+        Build the journal filter from the search criteria (keywords excluded).
+        """
         query = {"tenant_id": self.tenant_id, "store_code": store_code}
 
         if terminals:
@@ -235,23 +455,79 @@ class JournalRepository(AbstractRepository[JournalDocument]):
             }
         if receipt_no_from and receipt_no_to:
             query["receipt_no"] = {"$gte": receipt_no_from, "$lte": receipt_no_to}
-        if keywords:
-            query["journal_text"] = {"$regex": "|".join(keywords)}
+        return query
 
-        try:
-            logger.debug(
-                f"JournalRepository.get_journals_paginated_async: query->{query}, limit->{limit}, sort->{sort}"
-            )
-            return await self.get_paginated_list_async(filter=query, limit=limit, page=page, sort=sort)
-        except Exception as e:
-            message = (
-                "Failed to get journals with pagination: "
-                f"tenant_id->{self.tenant_id} "
-                f"store_code->{store_code} "
-                f"terminals->{terminals} "
-                f"transaction_types->{transaction_types}"
-            )
-            raise DocumentNotFoundException(message, logger, e) from e
+    def __add_keyword_filter(
+        self, query: dict, keywords: list[str], keyword_match: str, search_ready: bool
+    ) -> list[list[str]]:
+        """
+        Add the keyword condition on search_tokens to the query.
+
+        A journal matches a keyword when it contains all of the keyword's tokens.
+        With keyword_match "all" every keyword must match, otherwise any keyword.
+        Until the search tokens of existing journals are backfilled, keywords are
+        matched as substrings of journal_text instead and results are not ranked.
+
+        Args:
+            query: Query to extend
+            keywords: Search keywords
+            keyword_match: "any" or "all"
+            search_ready: Whether all journals have search tokens
+
+        Returns:
+            Tokens of each searchable keyword (empty if no keywords were given or tokens are not ready)
+        """
+        if not keywords:
+            return []
+
+        if not search_ready:
+            patterns = [{"journal_text": {"$regex": re.escape(keyword)}} for keyword in keywords]
+            if keyword_match == "all":
+                query["$and"] = patterns
+            else:
+                query["$or"] = patterns
+            return []
+
+        keyword_tokens = [tokens for tokens in (tokenize_keyword(keyword) for keyword in keywords) if tokens]
+        if not keyword_tokens:
+            # keywords without searchable characters cannot match anything
+            query["search_tokens"] = {"$in": []}
+            return []
+
+        if keyword_match == "all":
+            query["search_tokens"] = {"$all": sorted({token for tokens in keyword_tokens for token in tokens})}
+        elif len(keyword_tokens) == 1:
+            query["search_tokens"] = {"$all": keyword_tokens[0]}
+        else:
+            query["$or"] = [{"search_tokens": {"$all": tokens}} for tokens in keyword_tokens]
+        return keyword_tokens
+
+    async def __find_ranked_async(
+        self, query: dict, keyword_tokens: list[list[str]], limit: int, page: int, sort: list[tuple[str, int]]
+    ) -> list[JournalDocument]:
+        """
+        Find journals ranked by the number of matched keywords, then by the requested sort.
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        score = {
+            "$add": [
+                {"$cond": [{"$setIsSubset": [tokens, {"$ifNull": ["$search_tokens", []]}]}, 1, 0]}
+                for tokens in keyword_tokens
+            ]
+        }
+        sort_stage = {"_keyword_score": -1}
+        for key, direction in sort or [("created_at", -1)]:
+            sort_stage.setdefault(key, direction)
+
+        pipeline = [{"$match": query}, {"$addFields": {"_keyword_score": score}}, {"$sort": sort_stage}]
+        if limit:
+            pipeline += [{"$skip": (page - 1) * limit}, {"$limit": limit}]
+        pipeline.append({"$project": {"_keyword_score": 0, "search_tokens": 0}})
+
+        documents = await self.dbcollection.aggregate(pipeline, session=self.session).to_list(None)
+        return [JournalDocument(**doc) for doc in documents]
 
     def __get_shard_key(self, journal_doc: JournalDocument) -> str:
         """
@@ -2,14 +2,17 @@
 from typing import Type
 from logging import getLogger
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
 from kugel_common.schemas.pagination import PaginatedResult
 from kugel_common.exceptions import CannotCreateException, DuplicateKeyException
 from kugel_common.models.documents.base_tranlog import BaseTransaction
+from kugel_common.utils.misc import get_app_time
 
 from app.config.settings import settings
 from app.exceptions import DocumentNotFoundException
+from app.utils.bulk_write_helper import ordered_bulk_write_with_retry_async
 
 logger = getLogger(__name__)
 
@@ -82,6 +85,67 @@ class TranlogRepository(AbstractRepository[BaseTransaction]):
             )
             raise CannotCreateException(message, logger, e) from e
 
+    @staticmethod
+    def make_tranlog_id(tenant_id: str, store_code: str, terminal_no: int, transaction_no: int) -> str:
+        """
+        Make the deterministic _id of a transaction log.
+
+        The same transaction always gets the same _id, so writing it again
+        (e.g. on redelivery of the pub/sub message) cannot create a duplicate.
+
+        Returns:
+            The _id for the transaction log
+        """
+        return f"{tenant_id}-{store_code}-{terminal_no}-{transaction_no}"
+
+    async def upsert_tranlogs_async(self, tranlogs: list[BaseTransaction]) -> int:
+        """
+        Store transaction logs without a session using an ordered bulk write.
+
+        Each transaction log is inserted with a deterministic _id only if no log
+        with the same tenant, store, terminal and transaction number exists, so
+        the write is idempotent and can be retried.
+
+        Args:
+            tranlogs: Transaction log documents to store
+
+        Returns:
+            Number of transaction logs newly inserted
+
+        Raises:
+            CannotCreateException: If the transaction logs cannot be stored
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        now = get_app_time()
+        operations = []
+        for tranlog in tranlogs:
+            tranlog.shard_key = self.__get_shard_key(tranlog)
+            tranlog.created_at = now
+            filter = {
+                "tenant_id": tranlog.tenant_id,
+                "store_code": tranlog.store_code,
+                "terminal_no": tranlog.terminal_no,
+                "transaction_no": tranlog.transaction_no,
+            }
+            document = tranlog.model_dump()
+            document["_id"] = self.make_tranlog_id(**filter)
+            operations.append(UpdateOne(filter, {"$setOnInsert": document}, upsert=True))
+
+        try:
+            inserted = await ordered_bulk_write_with_retry_async(
+                self.dbcollection,
+                operations,
+                max_retries=settings.TRANLOG_BULK_WRITE_MAX_RETRIES,
+                retry_interval=settings.TRANLOG_BULK_WRITE_RETRY_INTERVAL,
+            )
+            logger.debug(f"TranlogRepository.upsert_tranlogs_async: count->{len(tranlogs)} inserted->{inserted}")
+            return inserted
+        except Exception as e:
+            message = f"Failed to store tranlogs: tenant_id->{self.tenant_id} count->{len(tranlogs)}"
+            raise CannotCreateException(message, logger, e) from e
+
     async def get_tranlog_list_by_query_async(
         self,
         store_code: str,
@@ -1,8 +1,12 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from logging import getLogger
 
+from kugel_common.exceptions import InvalidRequestDataException
+from kugel_common.models.repositories.keyset_pagination import TotalMode
+
 from app.models.documents.jornal_document import JournalDocument
 from app.models.repositories.journal_repository import JournalRepository
+from app.utils.journal_tokenizer import tokenize_text
 from app.exceptions import (
     JournalCreationException,
     JournalQueryException,
@@ -36,7 +40,8 @@ class JournalService:
         Create a new journal entry from dictionary data.
 
         This method validates and converts the input dictionary to a JournalDocument
-        object and stores it in the database using the repository.
+        object, computes its keyword search tokens and stores it in the database
+        using the repository.
 
         Args:
             journal: Dictionary containing journal data
@@ -50,6 +55,7 @@ class JournalService:
         """
         try:
             journal_obj = JournalDocument(**journal)
+            journal_obj.search_tokens = tokenize_text(journal_obj.journal_text)
             await self.journal_repository.create_journal_async(journal_obj)
             return journal_obj
         except ValueError as e:
@@ -59,6 +65,38 @@ class JournalService:
             message = f"ジャーナルの作成に失敗しました: {journal}"
             raise JournalCreationException(message, logger, e) from e
 
+    async def receive_journals_async(self, journals: list[dict]) -> list[JournalDocument]:
+        """
+        Create several journal entries with a single idempotent bulk write.
+
+        Unlike receive_journal_async no session is used; journals that already
+        exist are left unchanged, so the call can safely be repeated.
+
+        Args:
+            journals: List of dictionaries containing journal data
+
+        Returns:
+            List of JournalDocument instances
+
+        Raises:
+            JournalValidationException: If any journal data fails validation
+            JournalCreationException: If there is an error during journal creation
+        """
+        try:
+            journal_objs = [JournalDocument(**journal) for journal in journals]
+        except ValueError as e:
+            message = f"ジャーナルのバリデーションに失敗しました: count->{len(journals)}"
+            raise JournalValidationException(message, logger, e) from e
+
+        try:
+            for journal_obj in journal_objs:
+                journal_obj.search_tokens = tokenize_text(journal_obj.journal_text)
+            await self.journal_repository.upsert_journals_async(journal_objs)
+            return journal_objs
+        except Exception as e:
+            message = f"ジャーナルの作成に失敗しました: count->{len(journals)}"
+            raise JournalCreationException(message, logger, e) from e
+
     async def get_journals_async(
         self,
         store_code: str,
@@ -71,6 +109,7 @@ class JournalService:
         receipt_no_from: int = None,
         receipt_no_to: int = None,
         keywords: list[str] = None,
+        keyword_match: str = "any",
         limit: int = 100,
         page: int = 1,
         sort: list[tuple[str, int]] = None,
@@ -93,6 +132,7 @@ class JournalService:
             receipt_no_from: Optional start receipt number for range
             receipt_no_to: Optional end receipt number for range
             keywords: Optional list of keywords to search for in journal text
+            keyword_match: "any" to match journals containing any keyword, "all" to require every keyword
             limit: Maximum number of results per page (default: 100)
             page: Page number (default: 1)
             sort: List of field name and direction tuples for sorting
@@ -116,6 +156,7 @@ class JournalService:
                 receipt_no_from=receipt_no_from,
                 receipt_no_to=receipt_no_to,
                 keywords=keywords,
+                keyword_match=keyword_match,
                 limit=limit,
                 page=page,
                 sort=sort,
@@ -155,9 +196,13 @@ class JournalService:
         receipt_no_from: int = None,
         receipt_no_to: int = None,
         keywords: list[str] = None,
+        keyword_match: str = "any",
         limit: int = 100,
         page: int = 1,
         sort: list[tuple[str, int]] = None,
+        use_cursor: bool = False,
+        cursor: str = None,
+        total_mode: str = TotalMode.ESTIMATE,
     ):
         """
         Retrieve journal entries with pagination metadata.
@@ -177,9 +222,13 @@ class JournalService:
             receipt_no_from: Optional start receipt number for range
             receipt_no_to: Optional end receipt number for range
             keywords: Optional list of keywords to search for in journal text
+            keyword_match: "any" to match journals containing any keyword, "all" to require every keyword
             limit: Maximum number of results per page (default: 100)
             page: Page number (default: 1)
             sort: List of field name and direction tuples for sorting
+            use_cursor: Use cursor (keyset) pagination instead of page numbers
+            cursor: Cursor of the next page returned in the previous page's metadata
+            total_mode: Total reported with cursor pagination: exact, estimate or none
 
         Returns:
             PaginatedResult containing journal documents and metadata
@@ -199,10 +248,16 @@ class JournalService:
                 receipt_no_from=receipt_no_from,
                 receipt_no_to=receipt_no_to,
                 keywords=keywords,
+                keyword_match=keyword_match,
                 limit=limit,
                 page=page,
                 sort=sort,
+                use_cursor=use_cursor,
+                cursor=cursor,
+                total_mode=total_mode,
             )
+        except InvalidRequestDataException:
+            raise
         except Exception as e:
             message = (
                 "ジャーナルの検索に失敗しました: "
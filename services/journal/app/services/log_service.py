@@ -13,6 +13,7 @@ from app.models.repositories.cash_in_out_log_repository import CashInOutLogRepos
 from app.models.repositories.open_close_log_repository import OpenCloseLogRepository
 from app.services.journal_service import JournalService
 from app.models.documents.jornal_document import JournalDocument
+from app.config.settings import settings
 
 logger = getLogger(__name__)
 
@@ -53,7 +54,8 @@ class LogService:
 
         This method creates a corresponding journal entry for the transaction
         and stores both the transaction log and journal entry in a single
-        atomic transaction.
+        atomic transaction. With JOURNAL_INGESTION_MODE "bulk" both are written
+        by receive_tranlogs_async instead.
 
         Args:
             tran: The transaction log to process and store
@@ -65,13 +67,84 @@ class LogService:
             Exception: If there is an error during the transaction process
         """
 
+        if settings.JOURNAL_INGESTION_MODE == "bulk":
+            await self.receive_tranlogs_async([tran])
+            return tran
+
+        journal_doc = self.__make_tranlog_journal(tran)
+
+        async with await self.tran_repository.start_transaction() as session:
+            try:
+                self.journal_service.journal_repository.set_session(session)
+                return_tran = await self.tran_repository.create_tranlog_async(tran)
+                await self.journal_service.receive_journal_async(journal_doc.model_dump())
+                await self.tran_repository.commit_transaction()
+                return return_tran
+            except Exception as e:
+                await self.tran_repository.abort_transaction()
+                message = f"Failed to create transaction log & journal: {e}"
+                logger.error(message)
+                await send_fatal_error_notification(
+                    message=message, error=e, service="journal", context=tran.model_dump()
+                )
+                raise e
+
+    async def receive_tranlogs_async(self, trans: list[BaseTransaction]) -> list[BaseTransaction]:
+        """
+        Store transaction logs and their journal entries without a transaction.
+
+        The logs are processed in batches of TRANLOG_BULK_BATCH_SIZE. For each
+        batch the transaction logs and then the journal entries are written with
+        an ordered bulk write of idempotent upserts (deterministic _id), with
+        retries for transient errors. If the journal write fails after the
+        transaction logs were written, delivering the same logs again completes
+        the batch without creating duplicates.
+
+        Args:
+            trans: The transaction logs to process and store
+
+        Returns:
+            The stored transaction logs
+
+        Raises:
+            Exception: If there is an error while storing a batch
+        """
+        batch_size = max(1, settings.TRANLOG_BULK_BATCH_SIZE)
+        for start in range(0, len(trans), batch_size):
+            batch = trans[start : start + batch_size]
+            journals = [self.__make_tranlog_journal(tran).model_dump() for tran in batch]
+            try:
+                await self.tran_repository.upsert_tranlogs_async(batch)
+                await self.journal_service.receive_journals_async(journals)
+            except Exception as e:
+                message = f"Failed to create transaction logs & journals: {e}"
+                logger.error(message)
+                await send_fatal_error_notification(
+                    message=message,
+                    error=e,
+                    service="journal",
+                    context={"transactions": [self.__transaction_key(tran) for tran in batch]},
+                )
+                raise e
+        return trans
+
+    def __make_tranlog_journal(self, tran: BaseTransaction) -> JournalDocument:
+        """
+        Create the journal entry for a transaction log.
+
+        Args:
+            tran: The transaction log
+
+        Returns:
+            The journal document for the transaction
+        """
         # transaction type for cancellation transactions
         tran_type = tran.transaction_type
         if tran.transaction_type == TransactionType.NormalSales.value:
             if tran.sales.is_cancelled:
                 tran_type = TransactionType.NormalSalesCancel.value
 
-        journal_doc = JournalDocument(
+        return JournalDocument(
             tenant_id=tran.tenant_id,
             store_code=tran.store_code,
             terminal_no=tran.terminal_no,
@@ -90,21 +163,10 @@ class LogService:
             receipt_text=tran.receipt_text,
         )
 
-        async with await self.tran_repository.start_transaction() as session:
-            try:
-                self.journal_service.journal_repository.set_session(session)
-                return_tran = await self.tran_repository.create_tranlog_async(tran)
-                await self.journal_service.receive_journal_async(journal_doc.model_dump())
-                await self.tran_repository.commit_transaction()
-                return return_tran
-            except Exception as e:
-                await self.tran_repository.abort_transaction()
-                message = f"Failed to create transaction log & journal: {e}"
-                logger.error(message)
-                await send_fatal_error_notification(
-                    message=message, error=e, service="journal", context=tran.model_dump()
-                )
-                raise e
+    @staticmethod
+    def __transaction_key(tran: BaseTransaction) -> str:
+        """Identify a transaction log in notifications without its texts"""
+        return f"{tran.store_code}-{tran.terminal_no}-{tran.transaction_no}"
 
     async def receive_cashlog_async(self, cashlog: CashInOutLog) -> CashInOutLog:
         """
@@ -0,0 +1,68 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Ordered bulk writes with retries for session-less ingestion.
+
+Operations handed to ordered_bulk_write_with_retry_async must be idempotent
+(upserts keyed by a deterministic _id or a natural key), so that a batch can be
+sent again after a transient error, or resumed after a document that already
+exists, without a multi-document transaction.
+"""
+import asyncio
+from logging import getLogger
+
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError
+
+logger = getLogger(__name__)
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+def _is_transient(error: PyMongoError) -> bool:
+    """Whether sending the same operations again may succeed"""
+    return isinstance(error, ConnectionFailure) or error.has_error_label("RetryableWriteError")
+
+
+async def ordered_bulk_write_with_retry_async(
+    collection, operations: list, max_retries: int, retry_interval: float
+) -> int:
+    """
+    Execute idempotent operations with an ordered bulk_write
+
+    A duplicate key error means the document was already written by an earlier
+    delivery (or a concurrent one); the operations after it are sent again.
+    Transient errors are retried with exponential backoff.
+
+    Args:
+        collection: Motor collection to write to
+        operations: Idempotent write operations (e.g. UpdateOne with upsert=True)
+        max_retries: Maximum number of retries for transient errors
+        retry_interval: Wait before the first retry in seconds, doubled on every retry
+
+    Returns:
+        Number of documents inserted by the operations
+
+    Raises:
+        PyMongoError: If a non-retryable error occurs or the retries are exhausted
+    """
+    remaining = list(operations)
+    upserted = 0
+    attempt = 0
+    while remaining:
+        try:
+            result = await collection.bulk_write(remaining, ordered=True)
+            return upserted + result.upserted_count
+        except BulkWriteError as e:
+            upserted += e.details.get("nUpserted", 0)
+            write_errors = e.details.get("writeErrors", [])
+            if not write_errors or write_errors[0].get("code") != DUPLICATE_KEY_ERROR_CODE:
+                raise
+            # ordered writes stop at the first error, continue after the existing document
+            remaining = remaining[write_errors[0]["index"] + 1 :]
+        except PyMongoError as e:
+            if not _is_transient(e) or attempt >= max_retries:
+                raise
+            attempt += 1
+            wait = retry_interval * 2 ** (attempt - 1)
+            logger.warning(f"Transient error in bulk write (attempt {attempt}/{max_retries}), retry in {wait}s: {e}")
+            await asyncio.sleep(wait)
+    return upserted
@@ -0,0 +1,73 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Tokenizer for journal keyword search.
+
+Journal and receipt texts mix Japanese and alphanumeric text, which the MongoDB
+text index cannot split into words. The tokens produced here are stored in
+JournalDocument.search_tokens and searched through a multikey index:
+
+- alphanumeric words (after NFKC normalization and lower-casing) are kept whole
+- runs of Japanese characters are split into unigrams and bigrams, so that any
+  keyword can be matched by the bigrams (or the single character) it contains
+"""
+import re
+import unicodedata
+
+# alphanumeric words
+_WORD_PATTERN = r"[0-9a-z]+"
+# hiragana, katakana (including the prolonged sound mark) and CJK ideographs
+_CJK_PATTERN = r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+"
+
+_TOKEN_RE = re.compile(f"({_WORD_PATTERN})|({_CJK_PATTERN})")
+
+
+def _normalize(text: str) -> str:
+    """Normalize full-width / half-width variants and case"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def _cjk_ngrams(run: str, include_unigrams: bool) -> list[str]:
+    """Split a run of Japanese characters into bigrams (and unigrams)"""
+    if len(run) == 1:
+        return [run]
+    bigrams = [run[i : i + 2] for i in range(len(run) - 1)]
+    return list(run) + bigrams if include_unigrams else bigrams
+
+
+def _tokenize(text: str, include_unigrams: bool) -> list[str]:
+    tokens = []
+    for word, cjk_run in _TOKEN_RE.findall(_normalize(text or "")):
+        if word:
+            tokens.append(word)
+        else:
+            tokens.extend(_cjk_ngrams(cjk_run, include_unigrams))
+    return tokens
+
+
+def tokenize_text(text: str) -> list[str]:
+    """
+    Build the search tokens stored with a journal
+
+    Args:
+        text: Journal text
+
+    Returns:
+        Unique tokens in sorted order
+    """
+    return sorted(set(_tokenize(text, include_unigrams=True)))
+
+
+def tokenize_keyword(keyword: str) -> list[str]:
+    """
+    Build the tokens a journal must contain to match a keyword
+
+    Japanese keywords of two or more characters are matched by their bigrams only,
+    which keeps the query selective.
+
+    Args:
+        keyword: Search keyword
+
+    Returns:
+        Unique tokens in sorted order (empty if the keyword has no searchable characters)
+    """
+    return sorted(set(_tokenize(keyword, include_unigrams=False)))
@@ -24,6 +24,9 @@ test_files=(
     "tests/test_journal.py"
     "tests/test_log_service.py"
     "tests/test_transaction_type_conversion.py"
+    "tests/test_journal_search.py"
+    "tests/test_keyset_pagination.py"
+    "tests/test_bulk_ingestion.py"
 )
 
 TOTAL_TESTS=${#test_files[@]}
@@ -0,0 +1,99 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
+
+from kugel_common.models.documents.base_tranlog import BaseTransaction
+from kugel_common.models.documents.user_info_document import UserInfoDocument
+from kugel_common.enums import TransactionType
+
+from app.services.log_service import LogService
+from app.services.journal_service import JournalService
+from app.models.repositories.journal_repository import JournalRepository
+from app.models.repositories.tranlog_repository import TranlogRepository
+from app.utils.bulk_write_helper import ordered_bulk_write_with_retry_async
+
+
+def _transaction(transaction_no: int) -> BaseTransaction:
+    return BaseTransaction(
+        tenant_id="T0001",
+        store_code="S001",
+        terminal_no=1,
+        transaction_no=transaction_no,
+        transaction_type=TransactionType.NormalSales.value,
+        business_date="20240101",
+        open_counter=1,
+        business_counter=100,
+        generate_date_time=f"2024-01-01T10:00:{transaction_no:02d}",
+        receipt_no=transaction_no,
+        user=UserInfoDocument(id="user123", name="Test User"),
+        sales=BaseTransaction.SalesInfo(total_amount_with_tax=1100.0, total_quantity=5, is_cancelled=False),
+        staff=BaseTransaction.Staff(id="staff123", name="Test Staff"),
+        journal_text="Journal text",
+        receipt_text="Receipt text",
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_write_resumes_after_existing_document():
+    collection = MagicMock()
+    duplicate = BulkWriteError({"writeErrors": [{"index": 1, "code": 11000}], "nUpserted": 1})
+    collection.bulk_write = AsyncMock(side_effect=[duplicate, MagicMock(upserted_count=1)])
+
+    inserted = await ordered_bulk_write_with_retry_async(collection, ["a", "b", "c"], max_retries=0, retry_interval=0)
+
+    assert inserted == 2
+    assert collection.bulk_write.call_args_list[1][0][0] == ["c"]
+    assert collection.bulk_write.call_args_list[1][1] == {"ordered": True}
+
+
+@pytest.mark.asyncio
+async def test_bulk_write_retries_transient_errors():
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock(side_effect=[AutoReconnect("primary stepped down"), MagicMock(upserted_count=2)])
+
+    assert await ordered_bulk_write_with_retry_async(collection, ["a", "b"], max_retries=1, retry_interval=0) == 2
+
+    collection.bulk_write = AsyncMock(side_effect=OperationFailure("bad value", code=2))
+    with pytest.raises(OperationFailure):
+        await ordered_bulk_write_with_retry_async(collection, ["a"], max_retries=3, retry_interval=0)
+    assert collection.bulk_write.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_receive_tranlogs_in_batches_without_session():
+    tran_repo = TranlogRepository(MagicMock(), "T0001")
+    tran_repo.dbcollection = MagicMock()
+    tran_repo.dbcollection.bulk_write = AsyncMock(return_value=MagicMock(upserted_count=2))
+    tran_repo.start_transaction = AsyncMock()
+    journal_repo = JournalRepository(MagicMock(), "T0001")
+    journal_repo.dbcollection = MagicMock()
+    journal_repo.dbcollection.bulk_write = AsyncMock(return_value=MagicMock(upserted_count=2))
+
+    log_service = LogService(
+        tran_repository=tran_repo,
+        cash_in_out_log_repository=AsyncMock(),
+        open_close_log_repository=AsyncMock(),
+        journal_service=JournalService(journal_repo),
+    )
+    trans = [_transaction(i) for i in range(1, 6)]
+
+    with patch("app.services.log_service.settings") as mock_settings:
+        mock_settings.TRANLOG_BULK_BATCH_SIZE = 2
+        result = await log_service.receive_tranlogs_async(trans)
+
+    assert result == trans
+    tran_repo.start_transaction.assert_not_called()
+    assert tran_repo.dbcollection.bulk_write.call_count == 3
+    assert journal_repo.dbcollection.bulk_write.call_count == 3
+
+    operation = tran_repo.dbcollection.bulk_write.call_args_list[0][0][0][0]
+    assert operation._filter == {"tenant_id": "T0001", "store_code": "S001", "terminal_no": 1, "transaction_no": 1}
+    assert operation._doc["$setOnInsert"]["_id"] == "T0001-S001-1-1"
+    assert operation._upsert is True
+
+    journal_operation = journal_repo.dbcollection.bulk_write.call_args_list[0][0][0][0]
+    journal = journal_operation._doc["$setOnInsert"]
+    assert journal["_id"] == "T0001-S001-1-1"
+    assert journal["search_tokens"] == ["journal", "text"]
@@ -0,0 +1,96 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.repositories.journal_repository import JournalRepository
+from app.services.journal_service import JournalService
+from app.utils.journal_tokenizer import tokenize_keyword, tokenize_text
+
+
+def test_tokenize_text_words_and_cjk_ngrams():
+    tokens = tokenize_text("ｺｰﾗ 東京 ＡＢＣ-123")
+    # half-width katakana and full-width letters are normalized
+    assert {"コ", "コー", "ーラ", "東", "京", "東京", "abc", "123"} <= set(tokens)
+    assert tokens == sorted(set(tokens))
+
+
+def test_tokenize_keyword():
+    assert tokenize_keyword("東京都") == ["京都", "東京"]
+    assert tokenize_keyword("合") == ["合"]
+    assert tokenize_keyword("Cola") == ["cola"]
+    assert tokenize_keyword("¥") == []
+
+
+class TestJournalKeywordSearch:
+    """Keyword search builds an indexed token query and ranks results."""
+
+    @pytest.fixture
+    def repository(self):
+        repository = JournalRepository(MagicMock(), "T0001")
+        repository.dbcollection = MagicMock()
+        repository.dbcollection.count_documents = AsyncMock(return_value=0)
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[])
+        repository.dbcollection.aggregate = MagicMock(return_value=cursor)
+        repository.is_search_ready_async = AsyncMock(return_value=True)
+        return repository
+
+    @pytest.mark.asyncio
+    async def test_any_keyword(self, repository):
+        await repository.get_journals_paginated_async(store_code="S001", keywords=["コーラ", "cola"])
+
+        query = repository.dbcollection.count_documents.call_args[0][0]
+        assert "journal_text" not in query
+        assert query["$or"] == [
+            {"search_tokens": {"$all": ["コー", "ーラ"]}},
+            {"search_tokens": {"$all": ["cola"]}},
+        ]
+
+        pipeline = repository.dbcollection.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": query}
+        assert list(pipeline[2]["$sort"].keys())[0] == "_keyword_score"
+
+    @pytest.mark.asyncio
+    async def test_all_keywords(self, repository):
+        await repository.get_journals_paginated_async(
+            store_code="S001", keywords=["cola", "東京"], keyword_match="all"
+        )
+
+        query = repository.dbcollection.count_documents.call_args[0][0]
+        assert query["search_tokens"] == {"$all": ["cola", "東京"]}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_journal_text_until_backfilled(self, repository):
+        repository.is_search_ready_async = AsyncMock(return_value=False)
+        repository.get_paginated_list_async = AsyncMock()
+
+        await repository.get_journals_paginated_async(
+            store_code="S001", keywords=["cola", "1+1"], keyword_match="all"
+        )
+
+        query = repository.get_paginated_list_async.call_args.kwargs["filter"]
+        assert "search_tokens" not in query
+        assert query["$and"] == [{"journal_text": {"$regex": "cola"}}, {"journal_text": {"$regex": r"1\+1"}}]
+        repository.dbcollection.aggregate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_receive_journal_sets_search_tokens(self):
+        journal_repository = AsyncMock(spec=JournalRepository)
+        service = JournalService(journal_repository)
+        journal = {
+            "tenant_id": "T0001",
+            "store_code": "S001",
+            "terminal_no": 1,
+            "transaction_type": 101,
+            "business_date": "20240101",
+            "open_counter": 1,
+            "business_counter": 1,
+            "generate_date_time": "20240101T100000",
+            "journal_text": "コーラ 150",
+            "receipt_text": "",
+        }
+
+        result = await service.receive_journal_async(journal)
+
+        assert result.search_tokens == tokenize_text("コーラ 150")
+        journal_repository.create_journal_async.assert_called_once_with(result)
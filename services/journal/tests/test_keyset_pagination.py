@@ -0,0 +1,112 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from bson import ObjectId
+
+from kugel_common.exceptions import InvalidRequestDataException
+from kugel_common.models.repositories.keyset_pagination import (
+    build_keyset_filter,
+    decode_cursor,
+    encode_cursor,
+    normalize_keyset_sort,
+)
+from app.models.repositories.journal_repository import JournalRepository
+
+SORT = [("terminal_no", 1), ("business_date", 1), ("receipt_no", 1)]
+
+
+def _journal(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "tenant_id": "T0001",
+        "store_code": "S001",
+        "terminal_no": 1,
+        "transaction_type": 101,
+        "business_date": "20250101",
+        "open_counter": 1,
+        "business_counter": 1,
+        "receipt_no": i,
+        "generate_date_time": "2025-01-01T10:00:00",
+        "journal_text": "",
+        "receipt_text": "",
+    }
+
+
+def test_cursor_round_trip():
+    sort = normalize_keyset_sort(SORT)
+    assert sort[-1] == ("_id", 1)
+
+    document = _journal(5)
+    cursor = encode_cursor(document, sort, page=3)
+    values, page = decode_cursor(cursor, sort)
+    assert values == [1, "20250101", 5, document["_id"]]
+    assert page == 3
+
+    with pytest.raises(InvalidRequestDataException):
+        decode_cursor(cursor, normalize_keyset_sort([("receipt_no", -1)]))
+    with pytest.raises(InvalidRequestDataException):
+        decode_cursor("not-a-cursor", sort)
+
+
+def test_keyset_filter():
+    assert build_keyset_filter([("receipt_no", 1), ("_id", 1)], [5, "id"]) == {
+        "$or": [{"receipt_no": {"$gt": 5}}, {"receipt_no": 5, "_id": {"$gt": "id"}}]
+    }
+    # a null descending key has nothing after it except the tie-breaker branch
+    assert build_keyset_filter([("business_date", -1), ("_id", -1)], [None, "id"]) == {
+        "business_date": None,
+        "_id": {"$not": {"$gte": "id"}},
+    }
+
+
+class TestJournalCursorPaging:
+    """Journals can be paged with an opaque cursor instead of skip."""
+
+    @pytest.fixture
+    def repository(self):
+        repository = JournalRepository(MagicMock(), "T0001")
+        repository.dbcollection = MagicMock()
+        repository.dbcollection.count_documents = AsyncMock(return_value=3)
+        repository.dbcollection.estimated_document_count = AsyncMock(return_value=3)
+        repository.documents = [_journal(i) for i in range(3)]
+
+        def find(query, session=None):
+            db_cursor = MagicMock()
+            db_cursor.sort.return_value = db_cursor
+            db_cursor.limit.return_value = db_cursor
+            db_cursor.to_list = AsyncMock(side_effect=lambda n: [dict(d) for d in repository.documents[:n]])
+            return db_cursor
+
+        repository.dbcollection.find = MagicMock(side_effect=find)
+        return repository
+
+    @pytest.mark.asyncio
+    async def test_first_and_next_page(self, repository):
+        result = await repository.get_journals_paginated_async(store_code="S001", limit=2, sort=SORT, use_cursor=True)
+
+        assert len(result.data) == 2
+        assert result.metadata.page == 1
+        assert result.metadata.next_cursor is not None
+        assert result.metadata.total == 3 and result.metadata.total_is_estimate is False
+        # no skip, one extra document is read to detect the next page
+        query = repository.dbcollection.find.call_args[0][0]
+        assert "$and" not in query
+
+        repository.documents = repository.documents[2:]
+        result = await repository.get_journals_paginated_async(
+            store_code="S001", limit=2, sort=SORT, cursor=result.metadata.next_cursor, total_mode="none"
+        )
+        assert len(result.data) == 1
+        assert result.metadata.page == 2
+        assert result.metadata.next_cursor is None
+        assert result.metadata.total is None
+
+        query = repository.dbcollection.find.call_args[0][0]
+        assert query["$and"][0]["store_code"] == "S001"
+        assert query["$and"][1]["$or"][0] == {"terminal_no": {"$gt": 1}}
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_is_not_wrapped(self, repository):
+        with pytest.raises(InvalidRequestDataException):
+            await repository.get_journals_paginated_async(store_code="S001", sort=SORT, cursor="broken")
@@ -0,0 +1,82 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Conditional responses (ETag / If-None-Match) for master-data list endpoints.
+
+Clients polling whole masters (categories, payments) send the ETag of the copy
+they hold and get 304 Not Modified while it is unchanged, so neither side
+transfers or parses the list again. The ETag is a hash of the encoded body and
+therefore a strong validator.
+"""
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+
+def encode_response(response: BaseModel, response_model: type[BaseModel]) -> bytes:
+    """
+    Encode a response the way FastAPI encodes it for the route's response_model.
+
+    Args:
+        response: Response object returned by the endpoint
+        response_model: Response model declared on the route
+
+    Returns:
+        JSON body
+    """
+    content: Any = response_model.model_validate(response.model_dump()).model_dump(mode="json", by_alias=True)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Make a strong ETag of a response body.
+
+    Args:
+        body: Encoded response body
+
+    Returns:
+        Quoted ETag
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check whether the If-None-Match header of a request matches an ETag.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client already holds the current representation
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison, so a W/ prefix added by a proxy still matches
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def make_conditional_response(request: Request, response: BaseModel, response_model: type[BaseModel]) -> Response:
+    """
+    Make a response carrying an ETag, or 304 Not Modified if the client's copy is current.
+
+    Args:
+        request: Incoming request
+        response: Response object returned by the endpoint
+        response_model: Response model declared on the route
+
+    Returns:
+        Response with the encoded body and ETag, or an empty 304 response
+    """
+    body = encode_response(response, response_model)
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
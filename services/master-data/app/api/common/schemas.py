@@ -380,6 +380,44 @@ class BaseSettingsMasterValueResponse(BaseSchemaModel):
     value: str
 
 
+class BaseSettingsMasterResolveRequest(BaseSchemaModel):
+    """
+    Base Settings Resolve Request Schema
+
+    Defines fields for resolving several setting values for one terminal.
+    Includes the setting names, store code and terminal number.
+    """
+
+    names: list[str]
+    store_code: str
+    terminal_no: int
+
+
+class BaseSettingsMasterResolvedValue(BaseSchemaModel):
+    """
+    Base Settings Resolved Value Schema
+
+    Defines fields for a resolved setting value.
+    Includes the setting name and its value (None if the setting does not exist).
+    """
+
+    name: str
+    value: Optional[str] = None
+
+
+class BaseSettingsMasterResolveResponse(BaseSchemaModel):
+    """
+    Base Settings Resolve Response Schema
+
+    Defines fields for responses to bulk setting value resolution requests.
+    Includes store code, terminal number and the resolved values in request order.
+    """
+
+    store_code: str
+    terminal_no: int
+    values: list[BaseSettingsMasterResolvedValue]
+
+
 class BaseSettingsMasterDeleteResponse(BaseSchemaModel):
     """
     Base Settings Master Delete Response Schema
@@ -622,3 +660,41 @@ class BaseTaxMasterResponse(BaseSchemaModel):
     round_method: Optional[str] = None
     entry_datetime: Optional[str] = None
     last_update_datetime: Optional[str] = None
+
+
+# Item Import
+class BaseItemImportRowError(BaseSchemaModel):
+    """
+    Base Item Import Row Error Schema
+
+    Defines fields for a row that could not be imported.
+    Includes row number, item code and error message.
+    """
+
+    row: int
+    item_code: Optional[str] = None
+    message: str
+
+
+class BaseItemImportResponse(BaseSchemaModel):
+    """
+    Base Item Import Response Schema
+
+    Defines fields for returning the result or progress of a bulk item import.
+    Includes job ID, target, store code, format, status, row counts,
+    row errors, and start and finish datetimes.
+    """
+
+    job_id: str
+    target: str
+    store_code: Optional[str] = None
+    data_format: str
+    status: str
+    total_rows: int
+    upserted_count: int
+    modified_count: int
+    error_count: int
+    errors: list[BaseItemImportRowError]
+    message: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -16,6 +16,8 @@ from app.api.common.schemas import (
     BaseItemBookTab,
     BaseItemBookButton,
     BaseTaxMasterResponse,
+    BaseItemImportRowError,
+    BaseItemImportResponse,
 )
 from app.models.documents.item_common_master_document import ItemCommonMasterDocument
 from app.models.documents.item_store_master_document import ItemStoreMasterDocument
@@ -30,6 +32,7 @@ from app.models.documents.item_book_master_document import (
     ItemBookButton,
 )
 from app.models.documents.tax_master_document import TaxMasterDocument
+from app.models.documents.item_import_job_document import ItemImportJobDocument
 
 logger = getLogger(__name__)
 
@@ -202,3 +205,23 @@ class SchemasTransformer:
 
         logger.debug(f"return_tax: {return_tax}")
         return return_tax
+
+    def transform_item_import(self, job_doc: ItemImportJobDocument) -> BaseItemImportResponse:
+        return BaseItemImportResponse(
+            job_id=job_doc.job_id,
+            target=job_doc.target,
+            store_code=job_doc.store_code,
+            data_format=job_doc.data_format,
+            status=job_doc.status,
+            total_rows=job_doc.total_rows,
+            upserted_count=job_doc.upserted_count,
+            modified_count=job_doc.modified_count,
+            error_count=job_doc.error_count,
+            errors=[
+                BaseItemImportRowError(row=error.row, item_code=error.item_code, message=error.message)
+                for error in job_doc.errors
+            ],
+            message=job_doc.message,
+            started_at=job_doc.started_at.strftime("%Y-%m-%d %H:%M:%S") if job_doc.started_at else None,
+            finished_at=job_doc.finished_at.strftime("%Y-%m-%d %H:%M:%S") if job_doc.finished_at else None,
+        )
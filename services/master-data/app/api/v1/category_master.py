@@ -1,5 +1,5 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from fastapi import APIRouter, status, HTTPException, Depends, Path, Query
+from fastapi import APIRouter, status, HTTPException, Depends, Path, Query, Request
 from logging import getLogger
 from typing import List
 import inspect
@@ -22,6 +22,7 @@ from app.api.v1.schemas import (
     CategoryMasterResponse,
     CategoryMasterDeleteResponse,
 )
+from app.api.common.conditional_response import make_conditional_response
 from app.api.v1.schemas_transformer import SchemasTransformerV1
 from app.dependencies.get_master_services import get_category_master_service_async
 from app.dependencies.common import parse_sort
@@ -106,6 +107,7 @@ async def create_category(
     response_model=ApiResponse[List[CategoryMasterResponse]],
     status_code=status.HTTP_200_OK,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The list identified by If-None-Match is up to date"},
         status.HTTP_400_BAD_REQUEST: StatusCodes.get(status.HTTP_400_BAD_REQUEST),
         status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
         status.HTTP_422_UNPROCESSABLE_ENTITY: StatusCodes.get(status.HTTP_422_UNPROCESSABLE_ENTITY),
@@ -113,6 +115,7 @@ async def create_category(
     },
 )
 async def get_categories(
+    request: Request,
     tenant_id: str = Path(...),
     limit: int = Query(100),
     page: int = Query(1),
@@ -130,6 +133,7 @@ async def get_categories(
     the one in the security credentials.
 
     Args:
+        request: The incoming request, its If-None-Match header is compared with the ETag
         tenant_id: The tenant identifier from the path
         limit: Maximum number of categories to return (default: 100)
         page: Page number for pagination (default: 1)
@@ -161,7 +165,7 @@ async def get_categories(
         metadata=paginated_result.metadata.model_dump(),
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
-    return response
+    return make_conditional_response(request, response, ApiResponse[List[CategoryMasterResponse]])
 
 
 @router.get(
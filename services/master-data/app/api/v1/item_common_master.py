@@ -185,13 +185,18 @@ async def get_item_master_all_async(
     limit: int = Query(100),
     page: int = Query(1),
     sort: list[tuple[str, int]] = Depends(parse_sort),
+    paging: str = Query("offset", pattern="^(offset|cursor)$", description="offset: page numbers, cursor: keyset"),
+    cursor: str = Query(None, description="metadata.nextCursor of the previous page (implies paging=cursor)"),
+    total: str = Query("estimate", pattern="^(exact|estimate|none)$", description="Total for cursor paging"),
     tenant_id_in_token: str = Depends(get_tenant_id_with_security_by_query_optional),
 ):
     """
     Retrieve all item master records for a tenant.
 
     This endpoint returns a paginated list of all active items for the specified tenant.
-    The results can be sorted and paginated as needed.
+    The results can be sorted and paginated as needed. With paging=cursor the next page
+    is requested with metadata.nextCursor instead of a page number, which keeps deep
+    pages as fast as the first one.
 
     Authentication is required via token or API key. The tenant ID in the path must match
     the one in the security credentials.
@@ -201,6 +206,9 @@ async def get_item_master_all_async(
         limit: Maximum number of items to return (default: 100)
         page: Page number for pagination (default: 1)
         sort: Sorting criteria (default: item_code ascending)
+        paging: "offset" (default) for page numbers, "cursor" for keyset pagination
+        cursor: Cursor of the next page from the previous response (metadata.nextCursor)
+        total: Total reported with cursor paging: exact, estimate (default) or none
         tenant_id_in_token: The tenant ID from security credentials
 
     Returns:
@@ -213,14 +221,20 @@ async def get_item_master_all_async(
     verify_tenant_id(tenant_id, tenant_id_in_token, logger)
     master_service = await get_item_master_service_async(tenant_id)
     try:
-        item_docs, total_count = await master_service.get_item_all_paginated_async(limit, page, sort)
+        if paging == "cursor" or cursor:
+            paginated_result = await master_service.get_item_all_keyset_async(
+                limit, sort, cursor=cursor, total_mode=total
+            )
+            item_docs, total_count = paginated_result.data, paginated_result.metadata.total
+            metadata = paginated_result.metadata
+        else:
+            item_docs, total_count = await master_service.get_item_all_paginated_async(limit, page, sort)
+            metadata = PaginationMetadata(page=page, limit=limit, total_count=total_count)
         transformer = SchemasTransformerV1()
         item_all = [transformer.transform_item(item_doc) for item_doc in item_docs]
     except Exception as e:
         raise e
 
-    metadata = PaginationMetadata(page=page, limit=limit, total_count=total_count)
-
     response = ApiResponse(
         success=True,
         code=status.HTTP_200_OK,
@@ -0,0 +1,223 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from fastapi import APIRouter, status, Depends, Query, Path, Request, Response
+from logging import getLogger
+import inspect
+
+from kugel_common.status_codes import StatusCodes
+from kugel_common.security import get_tenant_id_with_security_by_query_optional, verify_tenant_id
+from kugel_common.schemas.api_response import ApiResponse
+from kugel_common.exceptions import InvalidRequestDataException
+
+from app.api.v1.schemas import ItemImportResponse
+from app.api.v1.schemas_transformer import SchemasTransformerV1
+from app.dependencies.get_master_services import get_item_import_service_async
+from app.services.item_import_service import (
+    ItemImportService,
+    IMPORT_TARGET_ITEM_COMMON,
+    IMPORT_TARGET_ITEM_STORE,
+    resolve_import_format,
+)
+
+# Create a router instance for item import endpoints
+router = APIRouter()
+
+# Get a logger instance for this module
+logger = getLogger(__name__)
+
+IMPORT_MODE_SYNC = "sync"
+IMPORT_MODE_ASYNC = "async"
+
+IMPORT_RESPONSES = {
+    status.HTTP_400_BAD_REQUEST: StatusCodes.get(status.HTTP_400_BAD_REQUEST),
+    status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
+    status.HTTP_422_UNPROCESSABLE_ENTITY: StatusCodes.get(status.HTTP_422_UNPROCESSABLE_ENTITY),
+    status.HTTP_500_INTERNAL_SERVER_ERROR: StatusCodes.get(status.HTTP_500_INTERNAL_SERVER_ERROR),
+}
+
+
+async def _import_async(
+    request: Request, import_service: ItemImportService, target: str, data_format: str, mode: str, operation: str
+) -> ApiResponse:
+    """
+    Run an import synchronously or queue it as a job and build the response.
+    """
+    if mode not in (IMPORT_MODE_SYNC, IMPORT_MODE_ASYNC):
+        raise InvalidRequestDataException(f"Unsupported import mode: {mode}", logger)
+    data_format = resolve_import_format(data_format, request.headers.get("content-type"))
+
+    if mode == IMPORT_MODE_ASYNC:
+        job_doc = await import_service.start_import_job_async(request.stream(), data_format, target)
+        code = status.HTTP_202_ACCEPTED
+        message = f"Item import job accepted. job_id: {job_doc.job_id}"
+    elif target == IMPORT_TARGET_ITEM_STORE:
+        job_doc = await import_service.import_item_stores_async(request.stream(), data_format)
+        code = status.HTTP_200_OK
+        message = f"Items imported. rows: {job_doc.total_rows}, errors: {job_doc.error_count}"
+    else:
+        job_doc = await import_service.import_items_async(request.stream(), data_format)
+        code = status.HTTP_200_OK
+        message = f"Items imported. rows: {job_doc.total_rows}, errors: {job_doc.error_count}"
+
+    transformer = SchemasTransformerV1()
+    return ApiResponse(
+        success=True,
+        code=code,
+        message=message,
+        data=transformer.transform_item_import(job_doc).model_dump(),
+        operation=operation,
+    )
+
+
+@router.post(
+    "/tenants/{tenant_id}/items/bulk",
+    response_model=ApiResponse[ItemImportResponse],
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"description": "Import job accepted"}, **IMPORT_RESPONSES},
+)
+async def import_items_async(
+    request: Request,
+    response: Response,
+    tenant_id: str = Path(...),
+    data_format: str = Query(None, alias="format", description="ndjson or csv, default from the Content-Type"),
+    mode: str = Query(IMPORT_MODE_SYNC, description="sync: wait for the result, async: run as a job"),
+    tenant_id_in_token: str = Depends(get_tenant_id_with_security_by_query_optional),
+):
+    """
+    Import common items in bulk from an NDJSON or CSV upload.
+
+    The request body is one item per line. NDJSON rows are JSON objects with the
+    fields of the item create request; CSV files start with a header row and
+    separate list values (item details, image URLs) with "|". Rows are
+    validated and written in chunks; existing items are updated, new items are
+    created. Rows that cannot be imported are reported with their row number
+    and do not stop the import.
+
+    With mode=async the upload is stored and imported in the background; the
+    response contains the job, whose progress can be retrieved from the
+    bulk-jobs endpoint.
+
+    Args:
+        request: The request whose body is the upload
+        response: The response, whose status is 202 for mode=async
+        tenant_id: The tenant identifier from the path
+        data_format: The format of the upload (ndjson or csv)
+        mode: sync or async
+        tenant_id_in_token: The tenant ID from security credentials
+
+    Returns:
+        ApiResponse[ItemImportResponse]: The import result, or the queued job for mode=async
+
+    Raises:
+        InvalidRequestDataException: If the format or mode is not supported
+    """
+    logger.info(f"Bulk item import request received for tenant_id: {tenant_id}, format: {data_format}, mode: {mode}")
+    verify_tenant_id(tenant_id, tenant_id_in_token, logger)
+    import_service = await get_item_import_service_async(tenant_id)
+    api_response = await _import_async(
+        request,
+        import_service,
+        IMPORT_TARGET_ITEM_COMMON,
+        data_format,
+        mode,
+        f"{inspect.currentframe().f_code.co_name}",
+    )
+    response.status_code = api_response.code
+    return api_response
+
+
+@router.post(
+    "/tenants/{tenant_id}/stores/{store_code}/items/bulk",
+    response_model=ApiResponse[ItemImportResponse],
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"description": "Import job accepted"}, **IMPORT_RESPONSES},
+)
+async def import_item_stores_async(
+    request: Request,
+    response: Response,
+    tenant_id: str = Path(...),
+    store_code: str = Path(...),
+    data_format: str = Query(None, alias="format", description="ndjson or csv, default from the Content-Type"),
+    mode: str = Query(IMPORT_MODE_SYNC, description="sync: wait for the result, async: run as a job"),
+    tenant_id_in_token: str = Depends(get_tenant_id_with_security_by_query_optional),
+):
+    """
+    Import store-specific items (store prices) in bulk from an NDJSON or CSV upload.
+
+    Each row contains item_code and store_price. The items must exist in the
+    common item master; rows for unknown items are reported as errors.
+
+    Args:
+        request: The request whose body is the upload
+        response: The response, whose status is 202 for mode=async
+        tenant_id: The tenant identifier from the path
+        store_code: The store code to import the items for
+        data_format: The format of the upload (ndjson or csv)
+        mode: sync or async
+        tenant_id_in_token: The tenant ID from security credentials
+
+    Returns:
+        ApiResponse[ItemImportResponse]: The import result, or the queued job for mode=async
+
+    Raises:
+        InvalidRequestDataException: If the format or mode is not supported
+    """
+    logger.info(
+        f"Bulk item store import request received for tenant_id: {tenant_id}, store_code: {store_code}, "
+        f"format: {data_format}, mode: {mode}"
+    )
+    verify_tenant_id(tenant_id, tenant_id_in_token, logger)
+    import_service = await get_item_import_service_async(tenant_id, store_code)
+    api_response = await _import_async(
+        request,
+        import_service,
+        IMPORT_TARGET_ITEM_STORE,
+        data_format,
+        mode,
+        f"{inspect.currentframe().f_code.co_name}",
+    )
+    response.status_code = api_response.code
+    return api_response
+
+
+@router.get(
+    "/tenants/{tenant_id}/items/bulk-jobs/{job_id}",
+    response_model=ApiResponse[ItemImportResponse],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
+        status.HTTP_404_NOT_FOUND: StatusCodes.get(status.HTTP_404_NOT_FOUND),
+        status.HTTP_500_INTERNAL_SERVER_ERROR: StatusCodes.get(status.HTTP_500_INTERNAL_SERVER_ERROR),
+    },
+)
+async def get_item_import_job_async(
+    tenant_id: str = Path(...),
+    job_id: str = Path(...),
+    tenant_id_in_token: str = Depends(get_tenant_id_with_security_by_query_optional),
+):
+    """
+    Retrieve the progress or result of a bulk item import job.
+
+    Args:
+        tenant_id: The tenant identifier from the path
+        job_id: The identifier of the job returned by the bulk endpoint
+        tenant_id_in_token: The tenant ID from security credentials
+
+    Returns:
+        ApiResponse[ItemImportResponse]: The job with its status, counts and row errors
+
+    Raises:
+        DocumentNotFoundException: If the job does not exist
+    """
+    logger.info(f"Item import job request received for tenant_id: {tenant_id}, job_id: {job_id}")
+    verify_tenant_id(tenant_id, tenant_id_in_token, logger)
+    import_service = await get_item_import_service_async(tenant_id)
+    job_doc = await import_service.get_import_job_async(job_id)
+
+    transformer = SchemasTransformerV1()
+    return ApiResponse(
+        success=True,
+        code=status.HTTP_200_OK,
+        message=f"Item import job found. job_id: {job_id}, status: {job_doc.status}",
+        data=transformer.transform_item_import(job_doc).model_dump(),
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
@@ -0,0 +1,32 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from logging import getLogger
+
+from app.utils.master_data_events import master_data_event_subscriber
+
+# Create a router instance for master data event endpoints
+router = APIRouter()
+
+# Get a logger instance for this module
+logger = getLogger(__name__)
+
+
+@router.post(
+    "/master-data-events",
+    summary="Handle master data change events",
+    description="Invalidate the in-process caches of this replica for master data changed through any replica",
+)
+async def handle_master_data_event(request: Request):
+    """
+    Handle a master data change event delivered by Dapr pub/sub.
+
+    Args:
+        request: The CloudEvent delivered by Dapr
+
+    Returns:
+        JSONResponse: Dapr status (SUCCESS or DROP)
+    """
+    message = await request.json()
+    result = await master_data_event_subscriber.handle_message_async(message)
+    return JSONResponse(content=result, status_code=status.HTTP_200_OK)
@@ -0,0 +1,155 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from fastapi import APIRouter, status, Depends, Path, Query, Request, Response
+from logging import getLogger
+from typing import Literal, Optional
+import inspect
+
+from kugel_common.status_codes import StatusCodes
+from kugel_common.security import get_tenant_id_with_security_by_query_optional, verify_tenant_id
+
+from app.dependencies.get_master_services import get_master_snapshot_service_async
+from app.models.repositories.master_snapshot_repository import SnapshotScope
+from app.services.master_snapshot_service import MasterSnapshotService, encoding_etag
+
+# Create a router instance for master data snapshot endpoints
+router = APIRouter()
+
+# Get a logger instance for this module
+logger = getLogger(__name__)
+
+
+async def _make_snapshot_response_async(
+    request: Request, service: MasterSnapshotService, since: Optional[int], message: str, operation: str
+) -> Response:
+    """
+    Build the snapshot response, or 304 Not Modified when If-None-Match holds its ETag.
+
+    The gzip and identity bodies carry different ETags. If-None-Match matches
+    either of them, since both encode the same snapshot version.
+    """
+    _, etag = await service.get_version_async()
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {"ETag": encoding_etag(etag, compress), "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = [tag.strip() for tag in if_none_match.split(",")]
+        if etag in client_etags or encoding_etag(etag, True) in client_etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    envelope = {"success": True, "code": status.HTTP_200_OK, "message": message, "operation": operation}
+    body, etag = await service.get_encoded_snapshot_async(since=since, compress=compress, envelope=envelope)
+    headers["ETag"] = encoding_etag(etag, compress)
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/tenants/{tenant_id}/stores/{store_code}/master-snapshot",
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The snapshot identified by If-None-Match is up to date"},
+        status.HTTP_400_BAD_REQUEST: StatusCodes.get(status.HTTP_400_BAD_REQUEST),
+        status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
+        status.HTTP_422_UNPROCESSABLE_ENTITY: StatusCodes.get(status.HTTP_422_UNPROCESSABLE_ENTITY),
+        status.HTTP_500_INTERNAL_SERVER_ERROR: StatusCodes.get(status.HTTP_500_INTERNAL_SERVER_ERROR),
+    },
+)
+async def get_master_snapshot(
+    request: Request,
+    tenant_id: str = Path(...),
+    store_code: str = Path(...),
+    since: int = Query(None, ge=0, description="Version held by the client, only changes since then are returned"),
+    scope: Literal["all", "store"] = Query(
+        SnapshotScope.ALL, description="'all' for every section, 'store' for the store prices only"
+    ),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    tenant_id_in_token: str = Depends(get_tenant_id_with_security_by_query_optional),
+):
+    """
+    Download the master data of a store as a versioned snapshot.
+
+    The snapshot contains the items, store prices, categories, taxes, payments and
+    settings that terminals and cart workers need to serve item lookups locally.
+    The response carries an ETag; clients send it back in If-None-Match and get
+    304 Not Modified while nothing has changed. Clients holding an older copy can
+    pass its version in 'since' to receive only the documents changed since then,
+    together with the keys of all documents so that deleted ones can be dropped.
+    The body is gzip-compressed when the client accepts it. Clients serving several
+    stores use scope 'store' here and download the tenant sections once from
+    /tenants/{tenant_id}/master-snapshot.
+
+    Authentication is required via token or API key. The tenant ID in the path must match
+    the one in the security credentials.
+
+    Args:
+        request: The incoming request, used for the conditional and encoding headers
+        tenant_id: The tenant identifier from the path
+        store_code: The store whose store prices are included
+        since: Version (epoch milliseconds) of the copy held by the client
+        scope: Sections contained in the snapshot
+        terminal_id: The terminal ID when using API key authentication
+        tenant_id_in_token: The tenant ID from security credentials
+
+    Returns:
+        Response: Standard API response with the snapshot in data, or 304 Not Modified
+    """
+    logger.info(
+        f"get_master_snapshot: tenant_id->{tenant_id}, store_code->{store_code}, since->{since}, scope->{scope}"
+    )
+    verify_tenant_id(tenant_id, tenant_id_in_token, logger)
+    service = await get_master_snapshot_service_async(tenant_id, store_code, scope)
+    return await _make_snapshot_response_async(
+        request,
+        service,
+        since,
+        message=f"Master snapshot for store {store_code} retrieved successfully",
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+
+
+@router.get(
+    "/tenants/{tenant_id}/master-snapshot",
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The snapshot identified by If-None-Match is up to date"},
+        status.HTTP_400_BAD_REQUEST: StatusCodes.get(status.HTTP_400_BAD_REQUEST),
+        status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
+        status.HTTP_422_UNPROCESSABLE_ENTITY: StatusCodes.get(status.HTTP_422_UNPROCESSABLE_ENTITY),
+        status.HTTP_500_INTERNAL_SERVER_ERROR: StatusCodes.get(status.HTTP_500_INTERNAL_SERVER_ERROR),
+    },
+)
+async def get_tenant_master_snapshot(
+    request: Request,
+    tenant_id: str = Path(...),
+    since: int = Query(None, ge=0, description="Version held by the client, only changes since then are returned"),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    tenant_id_in_token: str = Depends(get_tenant_id_with_security_by_query_optional),
+):
+    """
+    Download the master data shared by all stores of a tenant as a versioned snapshot.
+
+    The snapshot contains the items, categories, taxes, payments and settings; store
+    prices are downloaded per store with scope 'store'. ETags, 'since' and gzip
+    work as for the store snapshot.
+
+    Args:
+        request: The incoming request, used for the conditional and encoding headers
+        tenant_id: The tenant identifier from the path
+        since: Version (epoch milliseconds) of the copy held by the client
+        terminal_id: The terminal ID when using API key authentication
+        tenant_id_in_token: The tenant ID from security credentials
+
+    Returns:
+        Response: Standard API response with the snapshot in data, or 304 Not Modified
+    """
+    logger.info(f"get_tenant_master_snapshot: tenant_id->{tenant_id}, since->{since}")
+    verify_tenant_id(tenant_id, tenant_id_in_token, logger)
+    service = await get_master_snapshot_service_async(tenant_id, None, SnapshotScope.TENANT)
+    return await _make_snapshot_response_async(
+        request,
+        service,
+        since,
+        message=f"Master snapshot for tenant {tenant_id} retrieved successfully",
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
@@ -1,5 +1,5 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from fastapi import APIRouter, status, HTTPException, Depends, Path, Query
+from fastapi import APIRouter, status, HTTPException, Depends, Path, Query, Request
 from logging import getLogger
 import inspect
 
@@ -20,6 +20,7 @@ from app.api.v1.schemas import (
     PaymentResponse,
     PaymentDeleteResponse,
 )
+from app.api.common.conditional_response import make_conditional_response
 from app.api.v1.schemas_transformer import SchemasTransformerV1
 from app.dependencies.get_master_services import get_payment_master_service_async
 from app.dependencies.common import parse_sort
@@ -107,6 +108,7 @@ async def create_payment(
     response_model=ApiResponse[list[PaymentResponse]],
     status_code=status.HTTP_200_OK,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The list identified by If-None-Match is up to date"},
         status.HTTP_400_BAD_REQUEST: StatusCodes.get(status.HTTP_400_BAD_REQUEST),
         status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
         status.HTTP_404_NOT_FOUND: StatusCodes.get(status.HTTP_404_NOT_FOUND),
@@ -115,6 +117,7 @@ async def create_payment(
     },
 )
 async def get_all_payments(
+    request: Request,
     tenant_id: str = Path(...),
     limit: int = Query(100),
     page: int = Query(1),
@@ -132,6 +135,7 @@ async def get_all_payments(
     the one in the security credentials.
 
     Args:
+        request: The incoming request, its If-None-Match header is compared with the ETag
         tenant_id: The tenant identifier from the path
         limit: Maximum number of payment methods to return (default: 100)
         page: Page number for pagination (default: 1)
@@ -165,7 +169,7 @@ async def get_all_payments(
         metadata=metadata.model_dump(),
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
-    return response
+    return make_conditional_response(request, response, ApiResponse[list[PaymentResponse]])
 
 
 @router.get(
@@ -33,6 +33,9 @@ from app.api.common.schemas import (
     BaseSettingsMasterUpdateRequest,
     BaseSettingsMasterResponse,
     BaseSettingsMasterValueResponse,
+    BaseSettingsMasterResolveRequest,
+    BaseSettingsMasterResolvedValue,
+    BaseSettingsMasterResolveResponse,
     BaseSettingsMasterDeleteResponse,
     BaseTenantCreateRequest,
     BaseTenantCreateResponse,
@@ -51,6 +54,8 @@ from app.api.common.schemas import (
     BaseItemBookTabDeleteResponse,
     BaseItemBookButtonDeleteResponse,
     BaseTaxMasterResponse,
+    BaseItemImportRowError,
+    BaseItemImportResponse,
 )
 
 # Staff related schema definitions
@@ -312,6 +317,38 @@ class SettingsMasterValueResponse(BaseSettingsMasterValueResponse):
     pass
 
 
+class SettingsMasterResolveRequest(BaseSettingsMasterResolveRequest):
+    """
+    Settings Resolve Request Schema
+
+    Used to resolve several setting values for one store/terminal at once.
+    Contains the setting names, store code and terminal number.
+    """
+
+    pass
+
+
+class SettingsMasterResolvedValue(BaseSettingsMasterResolvedValue):
+    """
+    Settings Resolved Value Schema
+
+    Contains a setting name and its resolved value.
+    """
+
+    pass
+
+
+class SettingsMasterResolveResponse(BaseSettingsMasterResolveResponse):
+    """
+    Settings Resolve Response Schema
+
+    Defines the response format for resolving several setting values at once.
+    Contains store code, terminal number and the resolved values.
+    """
+
+    values: list[SettingsMasterResolvedValue]
+
+
 class SettingsMasterDeleteResponse(BaseSettingsMasterDeleteResponse):
     """
     Settings Master Delete Response Schema
@@ -520,3 +557,28 @@ class TaxMasterResponse(BaseTaxMasterResponse):
     """
 
     pass
+
+
+# Item import related schema definitions
+
+
+class ItemImportRowError(BaseItemImportRowError):
+    """
+    Item Import Row Error Schema
+
+    Describes a row of a bulk item import that was not imported.
+    Contains row number, item code and error message.
+    """
+
+    pass
+
+
+class ItemImportResponse(BaseItemImportResponse):
+    """
+    Item Import Response Schema
+
+    Defines the response format for the result or progress of a bulk item import.
+    Contains job ID, status, row counts and row errors.
+    """
+
+    pass
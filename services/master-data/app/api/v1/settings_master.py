@@ -20,6 +20,9 @@ from app.api.v1.schemas import (
     SettingsMasterResponse,
     SettingsMasterDeleteResponse,
     SettingsMasterValueResponse,
+    SettingsMasterResolveRequest,
+    SettingsMasterResolvedValue,
+    SettingsMasterResolveResponse,
 )
 from app.api.v1.schemas_transformer import SchemasTransformerV1
 from app.dependencies.get_master_services import get_settings_master_service_async
@@ -299,6 +302,73 @@ async def get_settings_value_by_name_async(
     return response
 
 
+@router.post(
+    "/tenants/{tenant_id}/settings/values/resolve",
+    response_model=ApiResponse[SettingsMasterResolveResponse],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: StatusCodes.get(status.HTTP_400_BAD_REQUEST),
+        status.HTTP_401_UNAUTHORIZED: StatusCodes.get(status.HTTP_401_UNAUTHORIZED),
+        status.HTTP_422_UNPROCESSABLE_ENTITY: StatusCodes.get(status.HTTP_422_UNPROCESSABLE_ENTITY),
+        status.HTTP_500_INTERNAL_SERVER_ERROR: StatusCodes.get(status.HTTP_500_INTERNAL_SERVER_ERROR),
+    },
+)
+async def resolve_settings_values_async(
+    resolve_request: SettingsMasterResolveRequest,
+    tenant_id: str = Path(...),
+    tenant_id_in_token=Depends(get_tenant_id_with_security_by_query_optional),
+):
+    """
+    Resolve the effective values of several settings for a specific store and terminal.
+
+    Each name is resolved like the single value endpoint (store and terminal, store,
+    global, default value), so a terminal can load all the settings it needs with one
+    request. An empty list of names resolves all settings of the tenant. Settings that
+    do not exist are returned with a null value instead of failing the whole request.
+
+    Authentication is required via token or API key. The tenant ID in the path must match
+    the one in the security credentials.
+
+    Args:
+        resolve_request: The names to resolve, the store code and the terminal number
+        tenant_id: The tenant identifier from the path
+        tenant_id_in_token: The tenant ID from security credentials
+
+    Returns:
+        ApiResponse[SettingsMasterResolveResponse]: Standard API response with the resolved values
+
+    Raises:
+        RepositoryException: If there's an error during database operations
+    """
+    logger.info(
+        f"Resolve settings values request received for {len(resolve_request.names)} names. tenant_id: {tenant_id}. "
+        f"store_code: {resolve_request.store_code}. terminal_no: {resolve_request.terminal_no}"
+    )
+    verify_tenant_id(tenant_id, tenant_id_in_token, logger)
+    master_service = await get_settings_master_service_async(tenant_id)
+    try:
+        values = await master_service.resolve_settings_values_async(
+            resolve_request.names, resolve_request.store_code, resolve_request.terminal_no
+        )
+    except Exception as e:
+        logger.error(f"Error resolving settings values: {e}")
+        raise e
+
+    return_values = SettingsMasterResolveResponse(
+        store_code=resolve_request.store_code,
+        terminal_no=resolve_request.terminal_no,
+        values=[SettingsMasterResolvedValue(name=name, value=value) for name, value in values.items()],
+    )
+    response = ApiResponse(
+        success=True,
+        code=status.HTTP_200_OK,
+        message=f"Settings values resolved. count: {len(return_values.values)}",
+        data=return_values.model_dump(),
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+    return response
+
+
 @router.put(
     "/tenants/{tenant_id}/settings/{name}",
     response_model=ApiResponse[SettingsMasterResponse],
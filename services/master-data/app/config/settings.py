@@ -1,7 +1,7 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Any
+from typing import Any, Optional
 
 from kugel_common.config.settings_auth import AuthSettings
 from kugel_common.config.settings_database import DBSettings, DBCollectionCommonSettings
@@ -37,6 +37,31 @@ class Settings(
     # gRPC settings
     USE_GRPC: bool = Field(default=False, description="Enable gRPC server")
     GRPC_PORT: int = Field(default=50051, description="gRPC server port")
+    GRPC_MAX_CONCURRENT_RPCS: Optional[int] = Field(
+        default=None, description="Maximum number of RPCs served at once, further RPCs are rejected (None: no limit)"
+    )
+    GRPC_MAX_CONCURRENT_STREAMS: int = Field(default=1000, description="Maximum concurrent streams per connection")
+    GRPC_MAX_MESSAGE_LENGTH: int = Field(default=10 * 1024 * 1024, description="Maximum message size in bytes")
+    GRPC_KEEPALIVE_TIME_MS: int = Field(default=60000, description="Interval of server keepalive pings")
+    GRPC_KEEPALIVE_TIMEOUT_MS: int = Field(default=20000, description="Timeout of server keepalive pings")
+    GRPC_MIN_PING_INTERVAL_MS: int = Field(
+        default=30000, description="Minimum interval of client keepalive pings accepted by the server"
+    )
+    GRPC_COMPRESSION: str = Field(default="none", description="Default response compression: none or gzip")
+    GRPC_LOG_SAMPLE_RATE: float = Field(
+        default=0.01, description="Fraction of successful item RPCs logged at INFO level (0 to 1)"
+    )
+
+    # Master data change events (Dapr pub/sub)
+    MASTER_DATA_EVENTS_ENABLED: bool = Field(default=False, description="Publish master data change events")
+    MASTER_DATA_EVENT_SOURCE: str = Field(
+        default="repository", description="Source of the change events: repository or change_stream"
+    )
+    MASTER_DATA_PUBSUB_NAME: str = Field(default="pubsub-master-data", description="Dapr pub/sub component")
+    MASTER_DATA_PUBSUB_TOPIC: str = Field(default="topic-master-data", description="Dapr topic for change events")
+    MASTER_DATA_CHANGE_STREAM_LEASE_SECONDS: int = Field(
+        default=30, description="Lease of the replica watching the change stream; another takes over once it expires"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -4,3 +4,28 @@ from pydantic_settings import BaseSettings
 
 class RepositorySettings(BaseSettings):
     CACHE_EXPIRE_MINUTES: int = 1
+    # Cache of the enriched (description / price) buttons of item book details.
+    # Items changed on other replicas are only seen after the TTL unless master data events are enabled.
+    ITEM_BOOK_DETAIL_CACHE_TTL_SECONDS: int = 3
+    ITEM_BOOK_DETAIL_CACHE_TTL_SECONDS_WITH_EVENTS: int = 300
+    ITEM_BOOK_DETAIL_CACHE_MAX_ENTRIES: int = 1000
+    # Cache of item details (common item joined with the store price) read by GetItemDetail.
+    # Prices changed on other replicas are only seen after the TTL unless master data events are enabled.
+    ITEM_DETAIL_CACHE_TTL_SECONDS: int = 3
+    ITEM_DETAIL_CACHE_TTL_SECONDS_WITH_EVENTS: int = 60
+    ITEM_DETAIL_CACHE_MAX_ENTRIES: int = 10000
+    # Settings resolution index: how long the per-tenant index is reused without an invalidation.
+    # Changes made on other replicas are only seen after the TTL unless master data events are enabled.
+    SETTINGS_RESOLUTION_INDEX_TTL_SECONDS: int = 5
+    SETTINGS_RESOLUTION_INDEX_TTL_SECONDS_WITH_EVENTS: int = 300
+    # Master data snapshot: how long the computed version is reused and how many encoded bodies are kept
+    MASTER_SNAPSHOT_VERSION_CACHE_SECONDS: int = 5
+    MASTER_SNAPSHOT_BODY_CACHE_MAX_ENTRIES: int = 50
+    # Deltas also resend the documents changed this long before the client's version, so that writes
+    # committed late with an older timestamp reach the client
+    MASTER_SNAPSHOT_DELTA_OVERLAP_SECONDS: int = 60
+    # Bulk item import: rows validated and written per bulk_write, and row errors kept per import
+    ITEM_IMPORT_CHUNK_SIZE: int = 1000
+    ITEM_IMPORT_MAX_ERRORS: int = 1000
+    # Import jobs without progress for this long are reported as failed (the replica running them stopped)
+    ITEM_IMPORT_JOB_STALE_SECONDS: int = 600
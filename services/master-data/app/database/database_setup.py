@@ -22,6 +22,9 @@ async def create_master_item_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_ITEM_COMMON_MASTER
     index_keys_list = [
         {"keys": {"tenant_id": 1, "item_code": 1}, "unique": True},
+        # latest documents for the master snapshot version
+        {"keys": {"tenant_id": 1, "updated_at": -1}},
+        {"keys": {"tenant_id": 1, "created_at": -1}},
     ]
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
@@ -33,6 +36,9 @@ async def create_master_item_store_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_ITEM_STORE_MASTER
     index_keys_list = [
         {"keys": {"tenant_id": 1, "store_code": 1, "item_code": 1}, "unique": True},
+        # latest documents for the master snapshot version
+        {"keys": {"tenant_id": 1, "store_code": 1, "updated_at": -1}},
+        {"keys": {"tenant_id": 1, "store_code": 1, "created_at": -1}},
     ]
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
@@ -55,6 +61,9 @@ async def create_master_category_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_CATEGORY_MASTER
     index_keys_list = [
         {"keys": {"tenant_id": 1, "category_code": 1}, "unique": True},
+        # latest documents for the master snapshot version
+        {"keys": {"tenant_id": 1, "updated_at": -1}},
+        {"keys": {"tenant_id": 1, "created_at": -1}},
     ]
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
@@ -66,6 +75,9 @@ async def create_master_payment_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_PAYMENT_MASTER
     index_keys_list = [
         {"keys": {"tenant_id": 1, "payment_code": 1}, "unique": True},
+        # latest documents for the master snapshot version
+        {"keys": {"tenant_id": 1, "updated_at": -1}},
+        {"keys": {"tenant_id": 1, "created_at": -1}},
     ]
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
@@ -77,6 +89,9 @@ async def create_master_settings_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_SETTINGS_MASTER
     index_keys_list = [
         {"keys": {"tenant_id": 1, "name": 1}, "unique": True},
+        # latest documents for the master snapshot version
+        {"keys": {"tenant_id": 1, "updated_at": -1}},
+        {"keys": {"tenant_id": 1, "created_at": -1}},
     ]
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
@@ -94,6 +109,17 @@ async def create_master_staff_collection(tenant_id: str):
     )
 
 
+# create item import job collection
+async def create_item_import_job_collection(tenant_id: str):
+    name = settings.DB_COLLECTION_NAME_ITEM_IMPORT_JOB
+    index_keys_list = [
+        {"keys": {"tenant_id": 1, "job_id": 1}, "unique": True},
+    ]
+    await create_some_collection(
+        tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
+    )
+
+
 # create request log collection
 async def create_request_log_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_REQUEST_LOG
@@ -114,11 +140,39 @@ async def create_collections(tenant_id: str):
     await create_master_payment_collection(tenant_id)
     await create_master_settings_collection(tenant_id)
     await create_master_staff_collection(tenant_id)
+    await create_item_import_job_collection(tenant_id)
     await create_request_log_collection(tenant_id)
 
     # add more collections here
 
 
+# upgrade the collections of a tenant created before later changes
+async def upgrade_collections(tenant_id: str):
+    from app.models.repositories.master_snapshot_repository import MasterSnapshotRepository
+
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    # timestamp indexes giving the master snapshot version
+    await MasterSnapshotRepository.ensure_indexes_async(db)
+
+    # add more upgrade steps here
+
+
+# upgrade the collections of all existing tenants
+async def upgrade_all_tenants():
+    client = await db_helper.get_client_async()
+    prefix = f"{settings.DB_NAME_PREFIX}_"
+    for db_name in await client.list_database_names():
+        if not db_name.startswith(prefix):
+            continue
+        tenant_id = db_name[len(prefix) :]
+        try:
+            await upgrade_collections(tenant_id)
+        except Exception as e:
+            # one broken tenant must not stop the upgrade of the others
+            logger.error(f"Failed to upgrade collections for tenant_id:{tenant_id}: {e}")
+    logger.info("Upgrading collections of existing tenants completed")
+
+
 # setup database
 async def execute(tenant_id: str):
     logger.info(f"Setting up database for tenant_id:{tenant_id} execution started...")
@@ -6,6 +6,7 @@ This module provides dependency injection functions that create service instance
 with their required repositories for each master data domain.
 """
 from logging import getLogger
+from typing import Optional
 
 from kugel_common.database import database as db_helper
 
@@ -13,7 +14,9 @@ from app.config.settings import settings
 from app.services.category_master_service import CategoryMasterService
 from app.services.item_book_master_service import ItemBookMasterService
 from app.services.item_common_master_service import ItemCommonMasterService
+from app.services.item_import_service import ItemImportService
 from app.services.item_store_master_service import ItemStoreMasterService
+from app.services.master_snapshot_service import MasterSnapshotService
 from app.services.payment_master_service import PaymentMasterService
 from app.services.settings_master_service import SettingsMasterService
 from app.services.staff_master_service import StaffMasterService
@@ -22,7 +25,9 @@ from app.services.tax_master_service import TaxMasterService
 from app.models.repositories.category_master_repository import CategoryMasterRepository
 from app.models.repositories.item_book_master_repository import ItemBookMasterRepository
 from app.models.repositories.item_common_master_repository import ItemCommonMasterRepository
+from app.models.repositories.item_import_job_repository import ItemImportJobRepository
 from app.models.repositories.item_store_master_repository import ItemStoreMasterRepository
+from app.models.repositories.master_snapshot_repository import MasterSnapshotRepository, SnapshotScope
 from app.models.repositories.payment_master_repository import PaymentMasterRepository
 from app.models.repositories.settings_master_repository import SettingsMasterRepository
 from app.models.repositories.staff_master_repository import StaffMasterRepository
@@ -95,6 +100,26 @@ async def get_item_master_service_async(tenant_id: str) -> ItemCommonMasterServi
     return ItemCommonMasterService(item_common_master_repo=ItemCommonMasterRepository(db, tenant_id))
 
 
+async def get_item_import_service_async(tenant_id: str, store_code: str = None) -> ItemImportService:
+    """
+    Dependency function to create and inject an ItemImportService instance.
+
+    Args:
+        tenant_id: The tenant identifier used to select the appropriate database
+        store_code: The store code for importing store-specific items, None for common items
+
+    Returns:
+        ItemImportService: Configured service instance for the specified tenant
+    """
+    logger.debug(f"get_item_import_service_async: tenant_id->{tenant_id}, store_code->{store_code}")
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    return ItemImportService(
+        item_common_master_repo=ItemCommonMasterRepository(db, tenant_id),
+        item_import_job_repo=ItemImportJobRepository(db, tenant_id),
+        item_store_master_repo=ItemStoreMasterRepository(db, tenant_id, store_code) if store_code else None,
+    )
+
+
 async def get_item_store_master_service_async(tenant_id: str, store_code: str) -> ItemStoreMasterService:
     """
     Dependency function to create and inject an ItemStoreMasterService instance.
@@ -117,6 +142,31 @@ async def get_item_store_master_service_async(tenant_id: str, store_code: str) -
     )
 
 
+async def get_master_snapshot_service_async(
+    tenant_id: str, store_code: Optional[str], scope: str = SnapshotScope.ALL
+) -> MasterSnapshotService:
+    """
+    Dependency function to create and inject a MasterSnapshotService instance.
+
+    Args:
+        tenant_id: The tenant identifier used to select the appropriate database
+        store_code: The store whose store-specific data is included in the snapshot, None for the tenant scope
+        scope: Sections contained in the snapshot (see SnapshotScope)
+
+    Returns:
+        MasterSnapshotService: Configured service instance for the specified tenant and store
+    """
+    logger.debug(
+        f"get_master_snapshot_service_async: tenant_id->{tenant_id}, store_code->{store_code}, scope->{scope}"
+    )
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    return MasterSnapshotService(
+        snapshot_repo=MasterSnapshotRepository(db, tenant_id, store_code),
+        tax_master_repo=TaxMasterRepository(db, tenant_id),
+        scope=scope,
+    )
+
+
 async def get_payment_master_service_async(tenant_id: str) -> PaymentMasterService:
     """
     Dependency function to create and inject a PaymentMasterService instance.
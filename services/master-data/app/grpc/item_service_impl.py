@@ -14,17 +14,53 @@
 """
 ItemService gRPC implementation
 
-Implements the GetItemDetail RPC method for retrieving item master data.
+Implements the RPC methods for retrieving item master data:
+- GetItemDetail: one item
+- BatchGetItemDetails: several items with one call
+- StreamItemDetails: several items, one message per item
+
+These methods are called for every scanned item, so only a sample of the
+successful calls (GRPC_LOG_SAMPLE_RATE) is logged at INFO level; latency and
+error counts of all calls are recorded by MetricsInterceptor.
 """
 
+import random
 import grpc
 from kugel_common.grpc import item_service_pb2, item_service_pb2_grpc
 from kugel_common.exceptions import DocumentNotFoundException
+from app.config.settings import settings
 from app.dependencies.get_master_services import get_item_store_master_service_async
+from app.utils.item_detail_cache import item_detail_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of items read from the database per query while streaming
+STREAM_BATCH_SIZE = 200
+
+
+def _is_log_sampled() -> bool:
+    """Decide whether a successful call is logged at INFO level"""
+    return logger.isEnabledFor(logging.INFO) and random.random() < settings.GRPC_LOG_SAMPLE_RATE
+
+
+def to_item_detail_response(item) -> item_service_pb2.ItemDetailResponse:
+    """Convert an item store detail document to an ItemDetailResponse"""
+    # Use store_price if available, otherwise fall back to unit_price
+    price = item.store_price if item.store_price is not None else item.unit_price
+    return item_service_pb2.ItemDetailResponse(
+        item_code=item.item_code,
+        item_name=item.description or "",
+        price=int(price) if price else 0,
+        tax_rate=int(item.tax_code) if item.tax_code else 0,
+        category_code=item.category_code or "",
+        barcode=item.item_code,  # Using item_code as barcode for now
+        is_active=not item.is_deleted if hasattr(item, 'is_deleted') else True,
+        created_at=item.created_at.isoformat() if item.created_at else "",
+        updated_at=item.updated_at.isoformat() if item.updated_at else "",
+        tax_code=item.tax_code or "",  # Tax code as string
+    )
+
 
 class ItemServiceImpl(item_service_pb2_grpc.ItemServiceServicer):
     """gRPC service implementation for item master data"""
@@ -32,43 +68,34 @@ class ItemServiceImpl(item_service_pb2_grpc.ItemServiceServicer):
     async def GetItemDetail(self, request, context):
         """Get item detail by item code"""
         try:
-            logger.info(
-                f"gRPC GetItemDetail request: tenant_id={request.tenant_id}, "
-                f"store_code={request.store_code}, item_code={request.item_code}"
-            )
-
-            # Get item store master service for the tenant and store
-            master_service = await get_item_store_master_service_async(
-                request.tenant_id, request.store_code
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"gRPC GetItemDetail request: tenant_id={request.tenant_id}, "
+                    f"store_code={request.store_code}, item_code={request.item_code}"
+                )
 
-            # Get combined common + store-specific item data
-            try:
-                item = await master_service.get_item_store_detail_by_code_async(request.item_code)
-            except DocumentNotFoundException:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details(f"Item {request.item_code} not found")
-                logger.warning(f"Item not found: {request.item_code}")
-                return item_service_pb2.ItemDetailResponse()
+            # Serve cached details without building the service and repositories
+            item = item_detail_cache.get(request.tenant_id, request.store_code, request.item_code)
+            if item is None:
+                # Get item store master service for the tenant and store
+                master_service = await get_item_store_master_service_async(
+                    request.tenant_id, request.store_code
+                )
 
-            # Use store_price if available, otherwise fall back to unit_price
-            price = item.store_price if item.store_price is not None else item.unit_price
+                # Get combined common + store-specific item data
+                try:
+                    item = await master_service.get_item_store_detail_by_code_async(request.item_code)
+                except DocumentNotFoundException:
+                    context.set_code(grpc.StatusCode.NOT_FOUND)
+                    context.set_details(f"Item {request.item_code} not found")
+                    logger.warning(f"Item not found: {request.item_code}")
+                    return item_service_pb2.ItemDetailResponse()
 
             # Build response
-            response = item_service_pb2.ItemDetailResponse(
-                item_code=item.item_code,
-                item_name=item.description or "",
-                price=int(price) if price else 0,
-                tax_rate=int(item.tax_code) if item.tax_code else 0,
-                category_code=item.category_code or "",
-                barcode=item.item_code,  # Using item_code as barcode for now
-                is_active=not item.is_deleted if hasattr(item, 'is_deleted') else True,
-                created_at=item.created_at.isoformat() if item.created_at else "",
-                updated_at=item.updated_at.isoformat() if item.updated_at else "",
-                tax_code=item.tax_code or "",  # Tax code as string
-            )
+            response = to_item_detail_response(item)
 
-            logger.info(f"gRPC GetItemDetail success: item_code={item.item_code}, price={price}")
+            if _is_log_sampled():
+                logger.info(f"gRPC GetItemDetail success (sampled): item_code={item.item_code}, price={response.price}")
             return response
 
         except Exception as e:
@@ -76,3 +103,47 @@ class ItemServiceImpl(item_service_pb2_grpc.ItemServiceServicer):
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return item_service_pb2.ItemDetailResponse()
+
+    async def BatchGetItemDetails(self, request, context):
+        """Get several items by item code with one call"""
+        try:
+            if _is_log_sampled():
+                logger.info(
+                    f"gRPC BatchGetItemDetails request (sampled): tenant_id={request.tenant_id}, "
+                    f"store_code={request.store_code}, items={len(request.item_codes)}"
+                )
+            master_service = await get_item_store_master_service_async(request.tenant_id, request.store_code)
+            items = await master_service.get_item_store_details_by_codes_async(list(request.item_codes))
+
+            found_codes = {item.item_code for item in items}
+            return item_service_pb2.BatchItemDetailResponse(
+                items=[to_item_detail_response(item) for item in items],
+                not_found_item_codes=[code for code in dict.fromkeys(request.item_codes) if code not in found_codes],
+            )
+
+        except Exception as e:
+            logger.error(f"gRPC BatchGetItemDetails error: {e}", exc_info=True)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return item_service_pb2.BatchItemDetailResponse()
+
+    async def StreamItemDetails(self, request, context):
+        """Stream several items by item code, reading them in batches of STREAM_BATCH_SIZE"""
+        if _is_log_sampled():
+            logger.info(
+                f"gRPC StreamItemDetails request (sampled): tenant_id={request.tenant_id}, "
+                f"store_code={request.store_code}, items={len(request.item_codes)}"
+            )
+        try:
+            master_service = await get_item_store_master_service_async(request.tenant_id, request.store_code)
+            item_codes = list(dict.fromkeys(request.item_codes))
+            for start in range(0, len(item_codes), STREAM_BATCH_SIZE):
+                items = await master_service.get_item_store_details_by_codes_async(
+                    item_codes[start : start + STREAM_BATCH_SIZE]
+                )
+                for item in items:
+                    yield to_item_detail_response(item)
+
+        except Exception as e:
+            logger.error(f"gRPC StreamItemDetails error: {e}", exc_info=True)
+            await context.abort(grpc.StatusCode.INTERNAL, str(e))
@@ -0,0 +1,147 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+MasterDataService gRPC implementation
+
+Implements the RPC methods for the master data read on every transaction:
+settings resolution, payment list, tax list and category map.
+"""
+
+import grpc
+from kugel_common.grpc import item_service_pb2, item_service_pb2_grpc
+from app.dependencies.get_master_services import (
+    get_category_master_service_async,
+    get_payment_master_service_async,
+    get_settings_master_service_async,
+    get_tax_master_service_async,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def to_category_message(category) -> item_service_pb2.Category:
+    """Convert a category master document to a Category message"""
+    return item_service_pb2.Category(
+        category_code=category.category_code or "",
+        description=category.description or "",
+        description_short=category.description_short or "",
+        tax_code=category.tax_code or "",
+    )
+
+
+class MasterDataServiceImpl(item_service_pb2_grpc.MasterDataServiceServicer):
+    """gRPC service implementation for settings, payment, tax and category master data"""
+
+    async def ResolveSettings(self, request, context):
+        """Resolve settings values for a store and terminal"""
+        try:
+            logger.debug(
+                f"gRPC ResolveSettings request: tenant_id={request.tenant_id}, store_code={request.store_code}, "
+                f"terminal_no={request.terminal_no}, names={len(request.names)}"
+            )
+            master_service = await get_settings_master_service_async(request.tenant_id)
+            values = await master_service.resolve_settings_values_async(
+                list(request.names), request.store_code, request.terminal_no
+            )
+            return item_service_pb2.SettingsResolveResponse(
+                values=[
+                    item_service_pb2.ResolvedSetting(name=name, value=value or "", found=value is not None)
+                    for name, value in values.items()
+                ]
+            )
+
+        except Exception as e:
+            logger.error(f"gRPC ResolveSettings error: {e}", exc_info=True)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return item_service_pb2.SettingsResolveResponse()
+
+    async def ListPayments(self, request, context):
+        """List all payment methods of the tenant"""
+        try:
+            master_service = await get_payment_master_service_async(request.tenant_id)
+            payments = await master_service.get_all_payments(limit=0, page=1, sort=[("payment_code", 1)])
+            return item_service_pb2.PaymentListResponse(
+                payments=[
+                    item_service_pb2.Payment(
+                        payment_code=payment.payment_code or "",
+                        description=payment.description or "",
+                        limit_amount=payment.limit_amount or 0.0,
+                        can_refund=bool(payment.can_refund),
+                        can_deposit_over=bool(payment.can_deposit_over),
+                        can_change=bool(payment.can_change),
+                        is_active=bool(payment.is_active),
+                    )
+                    for payment in payments
+                ]
+            )
+
+        except Exception as e:
+            logger.error(f"gRPC ListPayments error: {e}", exc_info=True)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return item_service_pb2.PaymentListResponse()
+
+    async def ListTaxes(self, request, context):
+        """List all taxes of the tenant"""
+        try:
+            master_service = await get_tax_master_service_async(request.tenant_id)
+            taxes = await master_service.get_all_taxes_async()
+            return item_service_pb2.TaxListResponse(
+                taxes=[
+                    item_service_pb2.Tax(
+                        tax_code=tax.tax_code or "",
+                        tax_type=tax.tax_type or "",
+                        tax_name=tax.tax_name or "",
+                        rate=tax.rate or 0.0,
+                        round_digit=tax.round_digit or 0,
+                        round_method=tax.round_method or "",
+                    )
+                    for tax in taxes
+                ]
+            )
+
+        except Exception as e:
+            logger.error(f"gRPC ListTaxes error: {e}", exc_info=True)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return item_service_pb2.TaxListResponse()
+
+    async def GetCategoryMap(self, request, context):
+        """Get all categories of the tenant keyed by category code"""
+        try:
+            master_service = await get_category_master_service_async(request.tenant_id)
+            categories = await master_service.get_categories_async(limit=0, page=1, sort=[("category_code", 1)])
+            return item_service_pb2.CategoryMapResponse(
+                categories={category.category_code: to_category_message(category) for category in categories}
+            )
+
+        except Exception as e:
+            logger.error(f"gRPC GetCategoryMap error: {e}", exc_info=True)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return item_service_pb2.CategoryMapResponse()
+
+    async def StreamCategories(self, request, context):
+        """Stream all categories of the tenant, one message per category"""
+        try:
+            master_service = await get_category_master_service_async(request.tenant_id)
+            categories = await master_service.get_categories_async(limit=0, page=1, sort=[("category_code", 1)])
+            for category in categories:
+                yield to_category_message(category)
+
+        except Exception as e:
+            logger.error(f"gRPC StreamCategories error: {e}", exc_info=True)
+            await context.abort(grpc.StatusCode.INTERNAL, str(e))
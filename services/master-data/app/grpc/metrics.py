@@ -0,0 +1,212 @@
+# Copyright 2025 masa@kugel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Server-side metrics of the gRPC services
+
+MetricsInterceptor records per RPC method the number of calls, the calls in
+flight, the status codes of finished calls and a latency histogram. The
+counters live in process memory (one set per replica) and are read with
+grpc_server_metrics.snapshot().
+
+Servicers report errors with context.set_code() instead of raising, so the
+status of a call is taken from the context when the handler returns.
+"""
+
+import asyncio
+import bisect
+import time
+from typing import Any, Dict, List
+
+import grpc
+from grpc import aio
+
+# Upper bounds of the latency histogram buckets in milliseconds (the last bucket is unbounded)
+LATENCY_BUCKETS_MS: List[float] = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+
+class MethodMetrics:
+    """
+    Counters of one RPC method
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.status_codes: Dict[str, int] = {}
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def start(self) -> None:
+        """Record the start of a call"""
+        self.calls += 1
+        self.in_flight += 1
+
+    def finish(self, status_code: grpc.StatusCode, latency_ms: float) -> None:
+        """
+        Record the end of a call
+
+        Args:
+            status_code: Status code of the call
+            latency_ms: Duration of the call in milliseconds
+        """
+        self.in_flight -= 1
+        self.status_codes[status_code.name] = self.status_codes.get(status_code.name, 0) + 1
+        self.total_latency_ms += latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def latency_percentile_ms(self, percentile: float) -> float:
+        """
+        Estimate a latency percentile from the histogram
+
+        Args:
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            Upper bound of the bucket containing the percentile (max latency for the last bucket)
+        """
+        finished = sum(self.latency_buckets)
+        if finished == 0:
+            return 0.0
+        rank = finished * percentile / 100
+        cumulative = 0
+        for index, count in enumerate(self.latency_buckets):
+            cumulative += count
+            if cumulative >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_latency_ms
+        return self.max_latency_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the counters as a dictionary"""
+        finished = sum(self.latency_buckets)
+        errors = sum(count for name, count in self.status_codes.items() if name != grpc.StatusCode.OK.name)
+        return {
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "errors": errors,
+            "status_codes": dict(self.status_codes),
+            "avg_latency_ms": round(self.total_latency_ms / finished, 3) if finished else 0.0,
+            "p50_latency_ms": self.latency_percentile_ms(50),
+            "p99_latency_ms": self.latency_percentile_ms(99),
+            "max_latency_ms": round(self.max_latency_ms, 3),
+        }
+
+
+class GrpcServerMetrics:
+    """
+    Metrics of all RPC methods served by this process
+    """
+
+    def __init__(self):
+        self._methods: Dict[str, MethodMetrics] = {}
+
+    def get(self, method: str) -> MethodMetrics:
+        """Get the counters of a method, creating them on first use"""
+        metrics = self._methods.get(method)
+        if metrics is None:
+            metrics = self._methods[method] = MethodMetrics()
+        return metrics
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the metrics of all methods
+
+        Returns:
+            Dictionary with the total calls in flight and the counters keyed by method name
+        """
+        return {
+            "in_flight": sum(metrics.in_flight for metrics in self._methods.values()),
+            "methods": {method: metrics.snapshot() for method, metrics in self._methods.items()},
+        }
+
+    def clear(self) -> None:
+        """Reset all counters"""
+        self._methods.clear()
+
+
+grpc_server_metrics = GrpcServerMetrics()
+
+
+def _get_status_code(context: aio.ServicerContext, error: BaseException = None) -> grpc.StatusCode:
+    """Get the status code of a finished call from its context and the error raised by the handler"""
+    code = context.code()
+    if isinstance(code, grpc.StatusCode) and (error is None or code != grpc.StatusCode.OK):
+        return code
+    if error is None:
+        return grpc.StatusCode.OK
+    if isinstance(error, asyncio.CancelledError):
+        return grpc.StatusCode.CANCELLED
+    return grpc.StatusCode.UNKNOWN
+
+
+class MetricsInterceptor(aio.ServerInterceptor):
+    """
+    Server interceptor recording latency, status codes and calls in flight of every RPC
+    """
+
+    def __init__(self, metrics: GrpcServerMetrics = grpc_server_metrics):
+        self.metrics = metrics
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method_metrics = self.metrics.get(handler_call_details.method)
+
+        if handler.unary_unary is not None:
+            behavior = handler.unary_unary
+
+            async def unary_unary(request, context):
+                method_metrics.start()
+                start = time.perf_counter()
+                error = None
+                try:
+                    return await behavior(request, context)
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    method_metrics.finish(_get_status_code(context, error), (time.perf_counter() - start) * 1000)
+
+            return grpc.unary_unary_rpc_method_handler(
+                unary_unary,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        if handler.unary_stream is not None:
+            behavior = handler.unary_stream
+
+            async def unary_stream(request, context):
+                method_metrics.start()
+                start = time.perf_counter()
+                error = None
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    method_metrics.finish(_get_status_code(context, error), (time.perf_counter() - start) * 1000)
+
+            return grpc.unary_stream_rpc_method_handler(
+                unary_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        # client streaming methods are not used by the master-data services
+        return handler
@@ -15,16 +15,46 @@
 gRPC server lifecycle management
 
 Handles server startup, shutdown, and graceful termination.
+The server options (concurrency limits, message sizes, keepalive policy and
+compression) are taken from the GRPC_* settings.
 """
 
 import grpc
 from grpc import aio
 from kugel_common.grpc import item_service_pb2_grpc
+from app.config.settings import settings
 from app.grpc.item_service_impl import ItemServiceImpl
+from app.grpc.master_data_service_impl import MasterDataServiceImpl
+from app.grpc.metrics import MetricsInterceptor
 import logging
 
 logger = logging.getLogger(__name__)
 
+_COMPRESSIONS = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+}
+
+
+def get_server_options() -> list[tuple[str, int]]:
+    """
+    Get the options of the gRPC server
+
+    Returns:
+        List of gRPC channel arguments
+    """
+    return [
+        ("grpc.max_concurrent_streams", settings.GRPC_MAX_CONCURRENT_STREAMS),
+        ("grpc.max_send_message_length", settings.GRPC_MAX_MESSAGE_LENGTH),
+        ("grpc.max_receive_message_length", settings.GRPC_MAX_MESSAGE_LENGTH),
+        ("grpc.keepalive_time_ms", settings.GRPC_KEEPALIVE_TIME_MS),
+        ("grpc.keepalive_timeout_ms", settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+        ("grpc.keepalive_permit_without_calls", 1),
+        # accept the keepalive pings of pooled client channels instead of closing the connection
+        ("grpc.http2.min_recv_ping_interval_without_data_ms", settings.GRPC_MIN_PING_INTERVAL_MS),
+        ("grpc.http2.max_ping_strikes", 0),
+    ]
+
 
 async def start_grpc_server(port: int):
     """
@@ -36,19 +66,36 @@ async def start_grpc_server(port: int):
     Returns:
         grpc.aio.Server: The started gRPC server instance
     """
-    server = aio.server()
+    compression = _COMPRESSIONS.get(settings.GRPC_COMPRESSION.lower())
+    if compression is None:
+        raise ValueError(f"Invalid GRPC_COMPRESSION: {settings.GRPC_COMPRESSION}")
+
+    server = aio.server(
+        interceptors=[MetricsInterceptor()],
+        options=get_server_options(),
+        maximum_concurrent_rpcs=settings.GRPC_MAX_CONCURRENT_RPCS,
+        compression=compression,
+    )
 
     # Register service implementation
     item_service_pb2_grpc.add_ItemServiceServicer_to_server(
         ItemServiceImpl(),
         server
     )
+    item_service_pb2_grpc.add_MasterDataServiceServicer_to_server(
+        MasterDataServiceImpl(),
+        server
+    )
 
     # Bind to port
     server.add_insecure_port(f'[::]:{port}')
 
     await server.start()
-    logger.info(f"gRPC server started on port {port}")
+    logger.info(
+        f"gRPC server started on port {port} "
+        f"(max_concurrent_rpcs={settings.GRPC_MAX_CONCURRENT_RPCS}, "
+        f"max_concurrent_streams={settings.GRPC_MAX_CONCURRENT_STREAMS}, compression={settings.GRPC_COMPRESSION})"
+    )
 
     return server
 
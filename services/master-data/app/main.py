@@ -28,6 +28,7 @@ from fastapi.exceptions import RequestValidationError
 from logging import getLogger, config
 import platform
 import os
+import asyncio
 
 # Load logging configuration from the specified file
 logging_conf_path = os.path.join(os.path.dirname(__file__), "logging.conf")
@@ -42,23 +43,42 @@ from kugel_common.schemas.health import HealthCheckResponse, HealthStatus, Compo
 from kugel_common.utils.health_check import HealthChecker
 from kugel_common.exceptions import register_exception_handlers
 from kugel_common.middleware.log_requests import log_requests
+from kugel_common.utils.mongo_lease import MongoLease
 
 # Import routers for different types of master data
 from app.api.v1.staff_master import router as v1_staff_master_router
 from app.api.v1.item_common_master import router as v1_item_common_master_router
 from app.api.v1.item_store_master import router as v1_item_store_master_router
+from app.api.v1.item_import import router as v1_item_import_router
 from app.api.v1.item_book_master import router as v1_item_book_master_router
 from app.api.v1.payment_master import router as v1_payment_master_router
 from app.api.v1.settings_master import router as v1_settings_master_router
 from app.api.v1.category_master import router as v1_category_master_router
 from app.api.v1.tenant import router as v1_tenant_router
 from app.api.v1.tax_master import router as v1_tax_master_router
+from app.api.v1.master_snapshot import router as v1_master_snapshot_router
+from app.api.v1.master_data_events import router as v1_master_data_events_router
 from app.config.settings import settings
+from app.database import database_setup
 from app.grpc.server import start_grpc_server, stop_grpc_server
+from app.grpc.metrics import grpc_server_metrics
+from app.utils.master_data_events import (
+    EVENT_SOURCE_CHANGE_STREAM,
+    close_master_data_event_publisher_async,
+    get_master_data_event_publisher,
+    master_data_event_subscriber,
+)
+from app.utils.master_data_change_stream import MasterDataChangeStreamWatcher
 
 # gRPC server instance (global variable)
 grpc_server = None
 
+# Change stream watcher publishing master data change events (global variable)
+change_stream_watcher = None
+
+# Background upgrade of the collections of existing tenants (global variable)
+upgrade_task: asyncio.Task = None
+
 # Create a FastAPI instance with API documentation URLs enabled
 app = FastAPI(
     title="KugelPOS Master-Data Service",
@@ -90,6 +110,10 @@ app.include_router(
     v1_item_store_master_router, prefix="/api/v1", tags=["Item Store Master"]
 )  # Store-specific item data (prices, inventory)
 
+app.include_router(
+    v1_item_import_router, prefix="/api/v1", tags=["Item Import"]
+)  # Bulk import of common and store-specific items (NDJSON / CSV)
+
 app.include_router(
     v1_item_book_master_router, prefix="/api/v1", tags=["Item Book Master"]
 )  # Book-specific item data (ISBN, author, publisher)
@@ -110,6 +134,14 @@ app.include_router(v1_tenant_router, prefix="/api/v1", tags=["Tenant"])  # Tenan
 
 app.include_router(v1_tax_master_router, prefix="/api/v1", tags=["Tax Master"])  # Tax configuration (rates, rules)
 
+app.include_router(
+    v1_master_snapshot_router, prefix="/api/v1", tags=["Master Snapshot"]
+)  # Versioned master data download for terminals and cart
+
+app.include_router(
+    v1_master_data_events_router, prefix="/api/v1", tags=["Master Data Events"]
+)  # Cache invalidation by master data change events
+
 # Add middleware to log all HTTP requests with service name "master-data"
 app.middleware("http")(log_requests("master-data"))
 
@@ -133,6 +165,24 @@ async def root():
     return {"message": "Welcome to Kugel-POS Master-data Service API. supoorted version: v1"}
 
 
+# Define Dapr pub/sub subscription endpoints  # Every replica invalidates its caches on master data changes
+@app.get("/dapr/subscribe")
+def subscribe_topics():
+    """
+    Define Dapr pub/sub subscriptions for this service.
+
+    Returns:
+        list: List of subscription configurations with pubsubname, topic, and route
+    """
+    if not settings.MASTER_DATA_EVENTS_ENABLED:
+        return []
+    return [
+        master_data_event_subscriber.make_subscription(
+            settings.MASTER_DATA_PUBSUB_NAME, settings.MASTER_DATA_PUBSUB_TOPIC, "/api/v1/master-data-events"
+        )
+    ]
+
+
 @app.get("/health", response_model=HealthCheckResponse, tags=["Health"])
 async def health_check():
     """
@@ -147,7 +197,7 @@ async def health_check():
     db_client = await db_helper.get_client_async()
     mongodb_health = await health_checker.check_mongodb(db_client)
 
-    # Master-data service does not use any Dapr components
+    # Master-data service uses Dapr only for optional master data change events
     # Only check MongoDB
 
     # Build health check response
@@ -160,6 +210,17 @@ async def health_check():
     return HealthCheckResponse(status=overall_status, service="master-data", version="1.0.0", checks=checks)
 
 
+@app.get("/grpc/metrics", tags=["Health"])
+async def grpc_metrics():
+    """
+    Metrics of the gRPC server of this replica.
+
+    Returns:
+        dict: Calls in flight and, per RPC method, call counts, status codes and latencies
+    """
+    return {"enabled": settings.USE_GRPC, **grpc_server_metrics.snapshot()}
+
+
 # Application startup event handler
 async def startup_event():
     """
@@ -192,12 +253,25 @@ async def startup_event():
         logger.error(f"Error connecting to the database: {e}")
         raise e
 
+    # Create the indexes added after existing tenants were set up, in the background
+    global upgrade_task
+    upgrade_task = asyncio.create_task(database_setup.upgrade_all_tenants())
+
     # Start gRPC server if enabled
     if settings.USE_GRPC:
         global grpc_server
         grpc_server = await start_grpc_server(settings.GRPC_PORT)
         logger.info(f"gRPC server enabled on port {settings.GRPC_PORT}")
 
+    # Publish master data change events from a change stream if configured
+    if settings.MASTER_DATA_EVENTS_ENABLED and settings.MASTER_DATA_EVENT_SOURCE == EVENT_SOURCE_CHANGE_STREAM:
+        global change_stream_watcher
+        # the lease lives outside of the tenant databases
+        lease_db = await db_helper.get_db_async(settings.DB_NAME_PREFIX)
+        lease = MongoLease(lease_db, "master_data_change_stream", settings.MASTER_DATA_CHANGE_STREAM_LEASE_SECONDS)
+        change_stream_watcher = MasterDataChangeStreamWatcher(db_client, get_master_data_event_publisher(), lease)
+        change_stream_watcher.start()
+
     # add startup tasks here
 
 
@@ -215,10 +289,18 @@ async def close_event():
     """
     logger.info("closing the application")
 
+    if upgrade_task is not None and not upgrade_task.done():
+        upgrade_task.cancel()
+
     # Stop gRPC server if running
     if grpc_server:
         await stop_grpc_server(grpc_server)
 
+    # Stop publishing master data change events
+    if change_stream_watcher:
+        await change_stream_watcher.stop()
+    await close_master_data_event_publisher_async()
+
     logger.info("Closing the database connection")
     await db_helper.close_client_async()
 
@@ -0,0 +1,41 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.documents.abstract_document import AbstractDocument
+
+
+class ItemImportRowError(BaseModel):
+    """
+    Error of a row of a bulk item import.
+    """
+
+    row: int  # 1-based row number in the uploaded file (excluding the CSV header)
+    item_code: Optional[str] = None  # Item code of the row, if it could be read
+    message: str  # Reason why the row was not imported
+
+
+class ItemImportJobDocument(AbstractDocument):
+    """
+    Document class representing a bulk item import and its result.
+
+    Imports run synchronously return the result directly; imports run as jobs
+    store their progress in this document so that any replica can report it.
+    """
+
+    tenant_id: Optional[str] = None  # Unique identifier for the tenant (multi-tenancy support)
+    job_id: Optional[str] = None  # Unique identifier of the import job
+    target: Optional[str] = None  # Imported master: item_common or item_store
+    store_code: Optional[str] = None  # Store of an item_store import
+    data_format: Optional[str] = None  # Format of the uploaded file: ndjson or csv
+    status: Optional[str] = None  # queued, running, completed or failed
+    total_rows: int = 0  # Number of rows read
+    upserted_count: int = 0  # Number of items newly created
+    modified_count: int = 0  # Number of existing items changed
+    error_count: int = 0  # Number of rows not imported
+    errors: list[ItemImportRowError] = []  # Row errors, up to ITEM_IMPORT_MAX_ERRORS
+    message: Optional[str] = None  # Reason of a failed job
+    started_at: Optional[datetime] = None  # Time the import started
+    finished_at: Optional[datetime] = None  # Time the import finished
@@ -3,6 +3,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.models.documents.category_master_document import CategoryMasterDocument
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
 from app.config.settings import settings
+from app.utils.master_data_events import emit_master_data_change, MasterDataEntity, MasterDataOperation
 from kugel_common.schemas.pagination import PaginatedResult
 
 from logging import getLogger
@@ -46,6 +47,9 @@ class CategoryMasterRepository(AbstractRepository[CategoryMasterDocument]):
         document.shard_key = self.__get_shard_key(document)
         success = await self.create_async(document)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.CATEGORY, MasterDataOperation.CREATED, [document.category_code]
+            )
             return document
         else:
             raise Exception("Failed to create category")
@@ -118,6 +122,9 @@ class CategoryMasterRepository(AbstractRepository[CategoryMasterDocument]):
         """
         success = await self.update_one_async(self.__make_query_filter(category_code), update_data)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.CATEGORY, MasterDataOperation.UPDATED, [category_code]
+            )
             return await self.get_category_by_code_async(category_code)
         else:
             raise Exception(f"Failed to update category with code {category_code}")
@@ -137,6 +144,9 @@ class CategoryMasterRepository(AbstractRepository[CategoryMasterDocument]):
         """
         success = await self.replace_one_async(self.__make_query_filter(category_code), new_document)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.CATEGORY, MasterDataOperation.UPDATED, [category_code]
+            )
             return new_document
         else:
             raise Exception(f"Failed to replace category with code {category_code}")
@@ -151,7 +161,9 @@ class CategoryMasterRepository(AbstractRepository[CategoryMasterDocument]):
         Returns:
             None
         """
-        return await self.delete_async(self.__make_query_filter(category_code))
+        result = await self.delete_async(self.__make_query_filter(category_code))
+        emit_master_data_change(self.tenant_id, MasterDataEntity.CATEGORY, MasterDataOperation.DELETED, [category_code])
+        return result
 
     def __make_query_filter(self, category_code: str) -> dict:
         """
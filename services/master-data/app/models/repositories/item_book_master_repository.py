@@ -3,6 +3,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.models.documents.item_book_master_document import ItemBookMasterDocument
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
 from app.config.settings import settings
+from app.utils.item_detail_cache import item_book_detail_cache
+from app.utils.master_data_events import emit_master_data_change, MasterDataEntity, MasterDataOperation
 
 from logging import getLogger
 
@@ -45,6 +47,9 @@ class ItemBookMasterRepository(AbstractRepository[ItemBookMasterDocument]):
         document.shard_key = self.__get_shard_key(document)
         success = await self.create_async(document)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.ITEM_BOOK, MasterDataOperation.CREATED, [document.item_book_id]
+            )
             return document
         else:
             raise Exception("Failed to create item book")
@@ -94,7 +99,11 @@ class ItemBookMasterRepository(AbstractRepository[ItemBookMasterDocument]):
             The updated item book document
         """
         success = await self.update_one_async(self.__make_query_filter(item_book_id), update_data)
+        item_book_detail_cache.invalidate_item_book(self.tenant_id, item_book_id)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.ITEM_BOOK, MasterDataOperation.UPDATED, [item_book_id]
+            )
             return await self.get_item_book_async(item_book_id)
         else:
             raise Exception(f"Failed to update item book with id {item_book_id}")
@@ -113,7 +122,11 @@ class ItemBookMasterRepository(AbstractRepository[ItemBookMasterDocument]):
             The replaced item book document
         """
         success = await self.replace_one_async(self.__make_query_filter(item_book_id), new_document)
+        item_book_detail_cache.invalidate_item_book(self.tenant_id, item_book_id)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.ITEM_BOOK, MasterDataOperation.UPDATED, [item_book_id]
+            )
             return new_document
         else:
             raise Exception(f"Failed to replace item book with id {item_book_id}")
@@ -128,7 +141,10 @@ class ItemBookMasterRepository(AbstractRepository[ItemBookMasterDocument]):
         Returns:
             None
         """
-        return await self.delete_async(self.__make_query_filter(item_book_id))
+        item_book_detail_cache.invalidate_item_book(self.tenant_id, item_book_id)
+        result = await self.delete_async(self.__make_query_filter(item_book_id))
+        emit_master_data_change(self.tenant_id, MasterDataEntity.ITEM_BOOK, MasterDataOperation.DELETED, [item_book_id])
+        return result
 
     async def get_item_book_count_by_filter_async(self, query_filter: dict) -> int:
         """
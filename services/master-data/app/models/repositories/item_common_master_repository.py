@@ -1,11 +1,20 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from logging import getLogger
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 
+from kugel_common.exceptions import RepositoryException
 from kugel_common.utils.misc import get_app_time
 from app.config.settings import settings
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.models.repositories.keyset_pagination import TotalMode
+from kugel_common.schemas.pagination import PaginatedResult
 from app.models.documents.item_common_master_document import ItemCommonMasterDocument
+from app.models.documents.item_store_master_document import ItemStoreMasterDocument
+from app.utils.bulk_upsert_helper import BulkUpsertResult, unordered_bulk_upsert_async
+from app.utils.item_detail_cache import invalidate_item_caches
+from app.utils.master_data_events import emit_master_data_change, MasterDataEntity, MasterDataOperation
 
 logger = getLogger(__name__)
 
@@ -66,6 +75,10 @@ class ItemCommonMasterRepository(AbstractRepository[ItemCommonMasterDocument]):
         item_doc.shard_key = self.__get_shard_key(item_doc)
         success = await self.create_async(item_doc)
         if success:
+            invalidate_item_caches(self.tenant_id, [item_doc.item_code])
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.ITEM, MasterDataOperation.CREATED, [item_doc.item_code]
+            )
             return item_doc
         else:
             raise Exception("Failed to create item")
@@ -119,6 +132,94 @@ class ItemCommonMasterRepository(AbstractRepository[ItemCommonMasterDocument]):
 
         return item_doc
 
+    async def get_items_by_codes_async(self, item_codes: list[str]) -> list[ItemCommonMasterDocument]:
+        """
+        Retrieve several active (not logically deleted) items with one query.
+
+        Args:
+            item_codes: Codes of the items to retrieve
+
+        Returns:
+            List of the matching item documents; missing items are absent
+        """
+        if not item_codes:
+            return []
+        filter = {"tenant_id": self.tenant_id, "item_code": {"$in": list(item_codes)}, "is_deleted": False}
+        return await self.get_list_async(filter)
+
+    async def get_item_with_store_async(
+        self, item_code: str, store_code: str
+    ) -> tuple[Optional[ItemCommonMasterDocument], Optional[ItemStoreMasterDocument]]:
+        """
+        Retrieve an active item and its store-specific record with one aggregation.
+
+        The store-specific record is joined with $lookup so that the item detail
+        needs a single round trip instead of one query per collection.
+
+        Args:
+            item_code: Unique identifier for the item
+            store_code: Store whose store-specific record is joined
+
+        Returns:
+            Tuple of the item document (None if not found) and the store-specific
+            item document (None if the store has no record for the item)
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+        pipeline = [
+            {"$match": {"tenant_id": self.tenant_id, "item_code": item_code, "is_deleted": False}},
+            {"$limit": 1},
+            {
+                "$lookup": {
+                    "from": settings.DB_COLLECTION_NAME_ITEM_STORE_MASTER,
+                    "let": {"item_code": "$item_code"},
+                    "pipeline": [
+                        {
+                            "$match": {
+                                "tenant_id": self.tenant_id,
+                                "store_code": store_code,
+                                "$expr": {"$eq": ["$item_code", "$$item_code"]},
+                            }
+                        },
+                        {"$limit": 1},
+                    ],
+                    "as": "item_store",
+                }
+            },
+        ]
+        try:
+            documents = await self.dbcollection.aggregate(pipeline).to_list(1)
+        except Exception as e:
+            message = f"Failed to get item with store: item_code->{item_code}, store_code->{store_code}"
+            raise RepositoryException(message, self.collection_name, logger, e) from e
+        if not documents:
+            return None, None
+        item_stores = documents[0].pop("item_store", [])
+        item_store = ItemStoreMasterDocument(**item_stores[0]) if item_stores else None
+        return ItemCommonMasterDocument(**documents[0]), item_store
+
+    async def get_item_details_by_codes_async(self, item_codes: list[str]) -> dict[str, dict]:
+        """
+        Retrieve the description and unit price of several items with one query.
+
+        Only active (not logically deleted) items are returned and only the
+        fields needed to display them are read.
+
+        Args:
+            item_codes: Codes of the items to retrieve
+
+        Returns:
+            Dictionary mapping item code to {"description", "unit_price"}; missing items are absent
+        """
+        if not item_codes:
+            return {}
+        if self.dbcollection is None:
+            await self.initialize()
+        filter = {"tenant_id": self.tenant_id, "item_code": {"$in": list(item_codes)}, "is_deleted": False}
+        projection = {"_id": 0, "item_code": 1, "description": 1, "unit_price": 1}
+        documents = await self.dbcollection.find(filter, projection).to_list(None)
+        return {document["item_code"]: document for document in documents}
+
     async def get_item_by_filter_async(
         self, query_filter: dict, limit: int, page: int, sort: list[tuple[str, int]]
     ) -> list[ItemCommonMasterDocument]:
@@ -143,6 +244,38 @@ class ItemCommonMasterRepository(AbstractRepository[ItemCommonMasterDocument]):
         logger.debug(f"query_filter->{query_filter} limit->{limit} page->{page} sort->{sort}")
         return await self.get_list_async_with_sort_and_paging(query_filter, limit, page, sort)
 
+    async def get_item_by_filter_keyset_async(
+        self,
+        query_filter: dict,
+        limit: int,
+        sort: list[tuple[str, int]],
+        cursor: str = None,
+        total_mode: str = TotalMode.ESTIMATE,
+    ) -> PaginatedResult[ItemCommonMasterDocument]:
+        """
+        Retrieve items matching the specified filter with cursor (keyset) pagination.
+
+        This method automatically adds tenant filtering to ensure data isolation.
+
+        Args:
+            query_filter: MongoDB query filter to select items
+            limit: Maximum number of items to return per page
+            sort: List of tuples containing field name and sort direction
+            cursor: Cursor of the next page returned in the previous page's metadata
+            total_mode: Total reported in the metadata: exact, estimate or none
+
+        Returns:
+            PaginatedResult with the item documents and the cursor of the next page
+
+        Raises:
+            InvalidRequestDataException: If the cursor is invalid
+        """
+        query_filter["tenant_id"] = self.tenant_id
+        logger.debug(f"query_filter->{query_filter} limit->{limit} cursor->{cursor} sort->{sort}")
+        return await self.get_keyset_paginated_list_async(
+            filter=query_filter, limit=limit, sort=sort, cursor=cursor, total_mode=total_mode
+        )
+
     async def update_item_async(self, item_code: str, update_data: dict) -> ItemCommonMasterDocument:
         """
         Update specific fields of an item.
@@ -159,7 +292,9 @@ class ItemCommonMasterRepository(AbstractRepository[ItemCommonMasterDocument]):
         """
         filter = {"tenant_id": self.tenant_id, "item_code": item_code}
         success = await self.update_one_async(filter, update_data)
+        invalidate_item_caches(self.tenant_id, [item_code])
         if success:
+            emit_master_data_change(self.tenant_id, MasterDataEntity.ITEM, MasterDataOperation.UPDATED, [item_code])
             return await self.get_item_by_code_async(item_code)
         else:
             raise Exception(f"Failed to update item with code {item_code}")
@@ -182,7 +317,9 @@ class ItemCommonMasterRepository(AbstractRepository[ItemCommonMasterDocument]):
         """
         filter = {"tenant_id": self.tenant_id, "item_code": item_code}
         success = await self.replace_one_async(filter, new_document)
+        invalidate_item_caches(self.tenant_id, [item_code])
         if success:
+            emit_master_data_change(self.tenant_id, MasterDataEntity.ITEM, MasterDataOperation.UPDATED, [item_code])
             return new_document
         else:
             raise Exception(f"Failed to replace item with code {item_code}")
@@ -207,12 +344,54 @@ class ItemCommonMasterRepository(AbstractRepository[ItemCommonMasterDocument]):
 
         if is_logical:
             success = await self.update_one_async(filter, {"is_deleted": True})
+            invalidate_item_caches(self.tenant_id, [item_code])
             if success:
+                emit_master_data_change(self.tenant_id, MasterDataEntity.ITEM, MasterDataOperation.DELETED, [item_code])
                 return await self.get_item_by_code_async(item_code, is_logical_deleted=True)
             else:
                 raise Exception(f"Failed to logically delete item with code {item_code}")
         else:
-            return await self.delete_async(filter)
+            result = await self.delete_async(filter)
+            invalidate_item_caches(self.tenant_id, [item_code])
+            emit_master_data_change(self.tenant_id, MasterDataEntity.ITEM, MasterDataOperation.DELETED, [item_code])
+            return result
+
+    async def bulk_upsert_items_async(self, items: list[dict]) -> BulkUpsertResult:
+        """
+        Create or update several items with one unordered bulk write.
+
+        Only the given fields are set, so fields not contained in the import
+        (e.g. description_short) keep their values. Imported items are active,
+        so logically deleted items are restored.
+
+        Args:
+            items: Field values of the items, each containing item_code
+
+        Returns:
+            BulkUpsertResult whose errors are keyed by the index in items
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+        now = get_app_time()
+        shard_key = self.make_shard_key([self.tenant_id])
+        operations = [
+            UpdateOne(
+                {"tenant_id": self.tenant_id, "item_code": item["item_code"]},
+                {
+                    "$set": {**item, "is_deleted": False, "shard_key": shard_key, "updated_at": now},
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True,
+            )
+            for item in items
+        ]
+        result = await unordered_bulk_upsert_async(self.dbcollection, operations)
+
+        item_codes = [item["item_code"] for index, item in enumerate(items) if index not in result.errors]
+        invalidate_item_caches(self.tenant_id, item_codes)
+        if item_codes:
+            emit_master_data_change(self.tenant_id, MasterDataEntity.ITEM, MasterDataOperation.UPDATED, item_codes)
+        return result
 
     async def get_item_count_by_filter_async(self, query_filter: dict) -> int:
         """
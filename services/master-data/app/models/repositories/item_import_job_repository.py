@@ -0,0 +1,94 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from datetime import datetime
+from logging import getLogger
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.utils.misc import get_app_time
+from app.models.documents.item_import_job_document import ItemImportJobDocument
+from app.config.settings import settings
+
+logger = getLogger(__name__)
+
+
+class ItemImportJobRepository(AbstractRepository[ItemImportJobDocument]):
+    """
+    Repository for managing bulk item import jobs in the database.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, tenant_id: str):
+        """
+        Initialize a new ItemImportJobRepository instance.
+
+        Args:
+            db: MongoDB database instance
+            tenant_id: Identifier for the tenant whose data this repository will manage
+        """
+        super().__init__(settings.DB_COLLECTION_NAME_ITEM_IMPORT_JOB, ItemImportJobDocument, db)
+        self.tenant_id = tenant_id
+
+    async def create_job_async(self, job: ItemImportJobDocument) -> ItemImportJobDocument:
+        """
+        Create a new import job.
+
+        Args:
+            job: Job document to create
+
+        Returns:
+            The created job document
+        """
+        job.tenant_id = self.tenant_id
+        job.shard_key = self.make_shard_key([self.tenant_id])
+        success = await self.create_async(job)
+        if success:
+            return job
+        else:
+            raise Exception("Failed to create item import job")
+
+    async def get_job_async(self, job_id: str) -> ItemImportJobDocument:
+        """
+        Retrieve an import job by its identifier.
+
+        Args:
+            job_id: Identifier of the job
+
+        Returns:
+            The matching job document, or None if not found
+        """
+        return await self.get_one_async({"tenant_id": self.tenant_id, "job_id": job_id})
+
+    async def replace_job_async(self, job: ItemImportJobDocument) -> bool:
+        """
+        Store the progress or result of an import job.
+
+        Args:
+            job: Job document with the new state
+
+        Returns:
+            True if the job was stored
+        """
+        return await self.replace_one_async({"tenant_id": self.tenant_id, "job_id": job.job_id}, job)
+
+    async def fail_stale_job_async(self, job_id: str, stale_before: datetime, message: str) -> bool:
+        """
+        Mark a queued or running job as failed if it made no progress since stale_before.
+
+        Args:
+            job_id: Identifier of the job
+            stale_before: Jobs last stored before this time are stale
+            message: Reason stored in the failed job
+
+        Returns:
+            True if the job was stale and is now failed
+        """
+        filter = {
+            "tenant_id": self.tenant_id,
+            "job_id": job_id,
+            "status": {"$in": ["queued", "running"]},
+            "$or": [
+                {"updated_at": {"$lt": stale_before}},
+                {"updated_at": None, "created_at": {"$lt": stale_before}},
+            ],
+        }
+        new_values = {"status": "failed", "message": message, "finished_at": get_app_time()}
+        return await self.update_one_async(filter, new_values)
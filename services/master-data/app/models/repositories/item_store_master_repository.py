@@ -1,9 +1,14 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from logging import getLogger
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.utils.misc import get_app_time
 from app.models.documents.item_store_master_document import ItemStoreMasterDocument
+from app.utils.bulk_upsert_helper import BulkUpsertResult, unordered_bulk_upsert_async
+from app.utils.item_detail_cache import invalidate_item_caches
+from app.utils.master_data_events import emit_master_data_change, MasterDataEntity, MasterDataOperation
 from app.config.settings import settings
 
 logger = getLogger(__name__)
@@ -47,7 +52,9 @@ class ItemStoreMasterRepository(AbstractRepository[ItemStoreMasterDocument]):
         item_store_doc.store_code = self.store_code
         item_store_doc.shard_key = self.__get_shard_key(item_store_doc)
         success = await self.create_async(item_store_doc)
+        invalidate_item_caches(self.tenant_id, [item_store_doc.item_code], self.store_code)
         if success:
+            self.__emit_price_change(MasterDataOperation.CREATED, item_store_doc.item_code)
             return item_store_doc
         else:
             raise Exception("Failed to create item store")
@@ -65,6 +72,40 @@ class ItemStoreMasterRepository(AbstractRepository[ItemStoreMasterDocument]):
         filter = {"tenant_id": self.tenant_id, "store_code": self.store_code, "item_code": item_code}
         return await self.get_one_async(filter)
 
+    async def get_store_prices_by_codes_async(self, item_codes: list[str]) -> dict[str, float]:
+        """
+        Retrieve the store prices of several items with one query.
+
+        Args:
+            item_codes: Codes of the items to retrieve
+
+        Returns:
+            Dictionary mapping item code to store price; items without a store price are absent
+        """
+        if not item_codes:
+            return {}
+        if self.dbcollection is None:
+            await self.initialize()
+        filter = {"tenant_id": self.tenant_id, "store_code": self.store_code, "item_code": {"$in": list(item_codes)}}
+        projection = {"_id": 0, "item_code": 1, "store_price": 1}
+        documents = await self.dbcollection.find(filter, projection).to_list(None)
+        return {document["item_code"]: document.get("store_price") for document in documents}
+
+    async def get_item_stores_by_codes_async(self, item_codes: list[str]) -> dict[str, ItemStoreMasterDocument]:
+        """
+        Retrieve the store-specific records of several items with one query.
+
+        Args:
+            item_codes: Codes of the items to retrieve
+
+        Returns:
+            Dictionary mapping item code to store-specific item document; items without one are absent
+        """
+        if not item_codes:
+            return {}
+        filter = {"tenant_id": self.tenant_id, "store_code": self.store_code, "item_code": {"$in": list(item_codes)}}
+        return {item_store.item_code: item_store for item_store in await self.get_list_async(filter)}
+
     async def get_item_store_by_filter_async(
         self, query_filter: dict, limit: int, page: int, sort: list[tuple[str, int]]
     ) -> list[ItemStoreMasterDocument]:
@@ -100,7 +141,9 @@ class ItemStoreMasterRepository(AbstractRepository[ItemStoreMasterDocument]):
         """
         filter = {"tenant_id": self.tenant_id, "store_code": self.store_code, "item_code": item_code}
         success = await self.update_one_async(filter, update_data)
+        invalidate_item_caches(self.tenant_id, [item_code], self.store_code)
         if success:
+            self.__emit_price_change(MasterDataOperation.UPDATED, item_code)
             return await self.get_item_store_by_code(item_code)
         else:
             raise Exception(f"Failed to update item store with code {item_code}")
@@ -120,7 +163,9 @@ class ItemStoreMasterRepository(AbstractRepository[ItemStoreMasterDocument]):
         """
         filter = {"tenant_id": self.tenant_id, "store_code": self.store_code, "item_code": item_code}
         success = await self.replace_one_async(filter, new_document)
+        invalidate_item_caches(self.tenant_id, [item_code], self.store_code)
         if success:
+            self.__emit_price_change(MasterDataOperation.UPDATED, item_code)
             return new_document
         else:
             raise Exception(f"Failed to replace item store with code {item_code}")
@@ -137,6 +182,40 @@ class ItemStoreMasterRepository(AbstractRepository[ItemStoreMasterDocument]):
         """
         filter = {"tenant_id": self.tenant_id, "store_code": self.store_code, "item_code": item_code}
         await self.delete_async(filter)
+        invalidate_item_caches(self.tenant_id, [item_code], self.store_code)
+        self.__emit_price_change(MasterDataOperation.DELETED, item_code)
+
+    async def bulk_upsert_item_stores_async(self, items: list[dict]) -> BulkUpsertResult:
+        """
+        Create or update several store-specific items with one unordered bulk write.
+
+        Args:
+            items: Field values of the store-specific items, each containing item_code
+
+        Returns:
+            BulkUpsertResult whose errors are keyed by the index in items
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+        now = get_app_time()
+        shard_key = self.make_shard_key([self.tenant_id, self.store_code])
+        operations = [
+            UpdateOne(
+                {"tenant_id": self.tenant_id, "store_code": self.store_code, "item_code": item["item_code"]},
+                {"$set": {**item, "shard_key": shard_key, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+                upsert=True,
+            )
+            for item in items
+        ]
+        result = await unordered_bulk_upsert_async(self.dbcollection, operations)
+
+        item_codes = [item["item_code"] for index, item in enumerate(items) if index not in result.errors]
+        invalidate_item_caches(self.tenant_id, item_codes, self.store_code)
+        if item_codes:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.PRICE, MasterDataOperation.UPDATED, item_codes, self.store_code
+            )
+        return result
 
     async def get_item_count_by_filter_async(self, query_filter: dict) -> int:
         """
@@ -154,6 +233,16 @@ class ItemStoreMasterRepository(AbstractRepository[ItemStoreMasterDocument]):
             await self.initialize()
         return await self.dbcollection.count_documents(query_filter)
 
+    def __emit_price_change(self, operation: MasterDataOperation, item_code: str) -> None:
+        """
+        Publish a change event of the store price of an item.
+
+        Args:
+            operation: Kind of the change
+            item_code: Code of the changed item
+        """
+        emit_master_data_change(self.tenant_id, MasterDataEntity.PRICE, operation, [item_code], self.store_code)
+
     def __get_shard_key(self, item_store_doc: ItemStoreMasterDocument) -> str:
         """
         Generate a shard key for the store-specific item document.
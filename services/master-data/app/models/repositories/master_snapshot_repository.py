@@ -0,0 +1,190 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.config.settings import settings
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SnapshotSection:
+    """A kind of master data contained in the snapshot"""
+
+    name: str  # section name in the snapshot
+    collection_name: str  # MongoDB collection
+    key_field: str  # field identifying a document within the section
+    store_scoped: bool = False  # whether the documents belong to a store
+
+
+class SnapshotScope:
+    """Which sections a snapshot contains"""
+
+    ALL = "all"  # every section, for terminals keeping one copy per store
+    TENANT = "tenant"  # sections shared by all stores of the tenant (and taxes)
+    STORE = "store"  # sections belonging to one store
+
+
+SNAPSHOT_SECTIONS = [
+    SnapshotSection("items", settings.DB_COLLECTION_NAME_ITEM_COMMON_MASTER, "item_code"),
+    SnapshotSection("store_prices", settings.DB_COLLECTION_NAME_ITEM_STORE_MASTER, "item_code", store_scoped=True),
+    SnapshotSection("categories", settings.DB_COLLECTION_NAME_CATEGORY_MASTER, "category_code"),
+    SnapshotSection("payments", settings.DB_COLLECTION_NAME_PAYMENT_MASTER, "payment_code"),
+    SnapshotSection("settings", settings.DB_COLLECTION_NAME_SETTINGS_MASTER, "name"),
+]
+
+
+def sections_for_scope(scope: str) -> list[SnapshotSection]:
+    """Get the sections contained in a snapshot of the given scope"""
+    if scope == SnapshotScope.TENANT:
+        return [section for section in SNAPSHOT_SECTIONS if not section.store_scoped]
+    if scope == SnapshotScope.STORE:
+        return [section for section in SNAPSHOT_SECTIONS if section.store_scoped]
+    return list(SNAPSHOT_SECTIONS)
+
+
+# timestamps giving the version of a section, each backed by an index per section
+TIMESTAMP_FIELDS = ["updated_at", "created_at"]
+
+
+def section_index_keys(section: SnapshotSection, timestamp_field: str) -> list[tuple[str, int]]:
+    """Get the keys of the index serving the latest documents of a section by the given timestamp"""
+    keys = [("tenant_id", 1)]
+    if section.store_scoped:
+        keys.append(("store_code", 1))
+    keys.append((timestamp_field, -1))
+    return keys
+
+
+# internal fields that are not part of the snapshot
+_EXCLUDED_FIELDS = {"_id": 0, "shard_key": 0, "cached_on": 0}
+
+
+def to_version(value: Optional[datetime]) -> int:
+    """Convert a stored (naive UTC) timestamp to a version in epoch milliseconds"""
+    if value is None:
+        return 0
+    return int(value.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def from_version(version: int) -> datetime:
+    """Convert a version in epoch milliseconds to a timestamp comparable with stored values"""
+    return datetime.fromtimestamp(version / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+class MasterSnapshotRepository:
+    """
+    Repository reading the master data of a tenant / store for snapshots.
+
+    The snapshot spans several master collections, so this repository reads the
+    raw documents of each section instead of extending AbstractRepository.
+    The version of a section is the latest created_at / updated_at of its
+    documents, which also allows reading only the documents changed since a
+    version.
+    """
+
+    @staticmethod
+    async def ensure_indexes_async(db: AsyncIOMotorDatabase) -> None:
+        """
+        Ensure the timestamp indexes of the snapshot sections exist (collections created before the indexes existed).
+
+        Args:
+            db: MongoDB database instance of the tenant
+        """
+        for section in SNAPSHOT_SECTIONS:
+            for timestamp_field in TIMESTAMP_FIELDS:
+                keys = section_index_keys(section, timestamp_field)
+                # same name as the index created by database_setup so that both paths are idempotent
+                name = f"{section.collection_name}_index_" + "_".join(key for key, _ in keys)
+                await db[section.collection_name].create_index(keys, name=name)
+
+    def __init__(self, db: AsyncIOMotorDatabase, tenant_id: str, store_code: Optional[str]):
+        """
+        Initialize the repository.
+
+        Args:
+            db: MongoDB database instance of the tenant
+            tenant_id: Identifier for the tenant
+            store_code: Store whose store-specific data is included, None for tenant snapshots
+        """
+        self.db = db
+        self.tenant_id = tenant_id
+        self.store_code = store_code
+
+    def __make_filter(self, section: SnapshotSection) -> dict:
+        filter = {"tenant_id": self.tenant_id}
+        if section.store_scoped:
+            filter["store_code"] = self.store_code
+        return filter
+
+    async def get_section_states_async(self, sections: list[SnapshotSection]) -> dict[str, tuple[int, int]]:
+        """
+        Get the version and the number of documents of the given sections.
+
+        The document count changes when documents are deleted, which the
+        timestamps alone cannot show.
+
+        Args:
+            sections: Sections to read
+
+        Returns:
+            Dictionary mapping section name to (version, document count)
+        """
+        states = {}
+        for section in sections:
+            collection = self.db[section.collection_name]
+            filter = self.__make_filter(section)
+            # the latest document by each timestamp is read from its index instead of scanning the section
+            latest = 0
+            for timestamp_field in TIMESTAMP_FIELDS:
+                document = await collection.find_one(
+                    filter, {"_id": 0, timestamp_field: 1}, sort=section_index_keys(section, timestamp_field)
+                )
+                if document is not None:
+                    latest = max(latest, to_version(document.get(timestamp_field)))
+            states[section.name] = (latest, await collection.count_documents(filter))
+        return states
+
+    async def get_documents_async(self, section: SnapshotSection, since: Optional[int] = None) -> list[dict]:
+        """
+        Get the documents of a section.
+
+        Args:
+            section: Section to read
+            since: Version; if given only documents created or updated at or after it (less the
+                overlap window) are returned
+
+        Returns:
+            List of raw documents without internal fields
+        """
+        filter = self.__make_filter(section)
+        if since is None:
+            if section.name == "items":
+                filter["is_deleted"] = {"$ne": True}
+        else:
+            # Documents written within the overlap window before the version are sent again: a write
+            # that committed after the version was read may carry an older timestamp.
+            since_time = from_version(since) - timedelta(seconds=settings.MASTER_SNAPSHOT_DELTA_OVERLAP_SECONDS)
+            filter["$or"] = [{"updated_at": {"$gte": since_time}}, {"created_at": {"$gte": since_time}}]
+        return await self.db[section.collection_name].find(filter, _EXCLUDED_FIELDS).to_list(None)
+
+    async def get_keys_async(self, section: SnapshotSection) -> list[str]:
+        """
+        Get the keys of all documents of a section, used by clients to drop deleted documents.
+
+        Args:
+            section: Section to read
+
+        Returns:
+            List of key values
+        """
+        filter = self.__make_filter(section)
+        if section.name == "items":
+            filter["is_deleted"] = {"$ne": True}
+        projection = {"_id": 0, section.key_field: 1}
+        documents = await self.db[section.collection_name].find(filter, projection).to_list(None)
+        return [document.get(section.key_field) for document in documents]
@@ -5,6 +5,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
 from app.models.documents.payment_master_document import PaymentMasterDocument
 from app.config.settings import settings
+from app.utils.master_data_events import emit_master_data_change, MasterDataEntity, MasterDataOperation
 
 logger = getLogger(__name__)
 
@@ -46,6 +47,9 @@ class PaymentMasterRepository(AbstractRepository[PaymentMasterDocument]):
         payment_doc.shard_key = self.__get_shard_key(payment_doc)
         success = await self.create_async(payment_doc)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.PAYMENT, MasterDataOperation.CREATED, [payment_doc.payment_code]
+            )
             return payment_doc
         else:
             raise Exception("Failed to create payment")
@@ -99,6 +103,9 @@ class PaymentMasterRepository(AbstractRepository[PaymentMasterDocument]):
         filter = {"tenant_id": self.tenant_id, "payment_code": payment_code}
         success = await self.update_one_async(filter, update_data)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.PAYMENT, MasterDataOperation.UPDATED, [payment_code]
+            )
             return await self.get_payment_by_code(payment_code)
         else:
             raise Exception(f"Failed to update payment with code {payment_code}")
@@ -119,6 +126,9 @@ class PaymentMasterRepository(AbstractRepository[PaymentMasterDocument]):
         filter = {"tenant_id": self.tenant_id, "payment_code": payment_code}
         success = await self.replace_one_async(filter, new_document)
         if success:
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.PAYMENT, MasterDataOperation.UPDATED, [payment_code]
+            )
             return new_document
         else:
             raise Exception(f"Failed to replace payment with code {payment_code}")
@@ -135,6 +145,7 @@ class PaymentMasterRepository(AbstractRepository[PaymentMasterDocument]):
         """
         filter = {"tenant_id": self.tenant_id, "payment_code": payment_code}
         await self.delete_async(filter)
+        emit_master_data_change(self.tenant_id, MasterDataEntity.PAYMENT, MasterDataOperation.DELETED, [payment_code])
 
     async def get_payment_count_by_filter_async(self, query_filter: dict) -> int:
         """
@@ -6,6 +6,8 @@ from kugel_common.exceptions import RepositoryException
 from app.models.documents.settings_master_document import *
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
 from app.config.settings import settings
+from app.utils.settings_resolution_index import settings_resolution_cache
+from app.utils.master_data_events import emit_master_data_change, MasterDataEntity, MasterDataOperation
 
 logger = getLogger(__name__)
 
@@ -47,6 +49,10 @@ class SettingsMasterRepository(AbstractRepository[SettingsMasterDocument]):
         document.shard_key = self.__get_shard_key(document)
         success = await self.create_async(document)
         if success:
+            settings_resolution_cache.invalidate(self.tenant_id)
+            emit_master_data_change(
+                self.tenant_id, MasterDataEntity.SETTINGS, MasterDataOperation.CREATED, [document.name]
+            )
             return document
         else:
             raise Exception("Failed to create settings")
@@ -69,6 +75,20 @@ class SettingsMasterRepository(AbstractRepository[SettingsMasterDocument]):
         logger.debug(f"query_filter: {query_filter} limit: {limit} page: {page} sort: {sort}")
         return await self.get_list_async_with_sort_and_paging(query_filter, limit, page, sort)
 
+    async def get_settings_for_resolution_async(self) -> list[SettingsMasterDocument]:
+        """
+        Retrieve all settings of the current tenant with the fields needed to resolve values.
+
+        Returns:
+            List of settings documents containing name, default value and values
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+        query_filter = {"tenant_id": self.tenant_id}
+        projection = {"_id": 0, "name": 1, "default_value": 1, "values": 1}
+        documents = await self.dbcollection.find(query_filter, projection).to_list(None)
+        return [SettingsMasterDocument(**document) for document in documents]
+
     async def get_settings_by_name_async(self, name: str) -> SettingsMasterDocument:
         """
         Retrieve a specific setting by its name.
@@ -96,6 +116,8 @@ class SettingsMasterRepository(AbstractRepository[SettingsMasterDocument]):
         query_filter = {"tenant_id": self.tenant_id, "name": name}
         success = await self.update_one_async(query_filter, update_data)
         if success:
+            settings_resolution_cache.invalidate(self.tenant_id)
+            emit_master_data_change(self.tenant_id, MasterDataEntity.SETTINGS, MasterDataOperation.UPDATED, [name])
             return await self.get_settings_by_name_async(name)
         else:
             raise Exception(f"Failed to update settings with name {name}")
@@ -111,7 +133,10 @@ class SettingsMasterRepository(AbstractRepository[SettingsMasterDocument]):
             None
         """
         query_filter = {"tenant_id": self.tenant_id, "name": name}
-        return await self.delete_async(query_filter)
+        result = await self.delete_async(query_filter)
+        settings_resolution_cache.invalidate(self.tenant_id)
+        emit_master_data_change(self.tenant_id, MasterDataEntity.SETTINGS, MasterDataOperation.DELETED, [name])
+        return result
 
     async def get_settings_count_async(self) -> int:
         """
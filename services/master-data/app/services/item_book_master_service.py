@@ -17,6 +17,7 @@ from app.models.documents.item_book_master_document import (
 from app.models.repositories.item_book_master_repository import ItemBookMasterRepository
 from app.models.repositories.item_common_master_repository import ItemCommonMasterRepository
 from app.models.repositories.item_store_master_repository import ItemStoreMasterRepository
+from app.utils.item_detail_cache import item_book_detail_cache, ButtonDetails
 
 logger = getLogger(__name__)
 
@@ -109,6 +110,8 @@ class ItemBookMasterService:
 
         This method enriches the standard item book data with additional details like
         unit prices and descriptions from the item common and store master data.
+        The details of all buttons are read with one query per master and cached
+        per item book version (see app.utils.item_detail_cache).
 
         Args:
             item_book_id: The unique identifier of the item book
@@ -124,30 +127,65 @@ class ItemBookMasterService:
             message = f"item book with item_book_id {item_book_id} not found"
             raise DocumentNotFoundException(message, logger)
 
-        # set unit_price to buttons
-        for category in item_book.categories:
-            for tab in category.tabs:
-                for button in tab.buttons:
-
-                    # get item common price & description
-                    item_common = await self.item_common_master_repo.get_item_by_code_async(
-                        button.item_code, is_logical_deleted=False, use_cache=False
-                    )
-                    if not item_common:
-                        logger.warning(f"Item with item_code {button.item_code} not found")
-                        button.description = "not found"
-                        continue
-                    else:
-                        button.description = item_common.description
-                        button.unit_price = item_common.unit_price
-
-                    # get item store price
-                    item_store = await self.item_store_master_repo.get_item_store_by_code(button.item_code)
-                    if item_store:
-                        button.unit_price = item_store.store_price  # override price
+        buttons = [
+            button
+            for category in item_book.categories or []
+            for tab in category.tabs or []
+            for button in tab.buttons or []
+        ]
+        store_code = self.item_store_master_repo.store_code if self.item_store_master_repo else None
+        version = item_book.updated_at or item_book.created_at
+
+        tenant_id = self.item_book_master_repo.tenant_id
+        details = item_book_detail_cache.get(tenant_id, store_code, item_book_id, version)
+        if details is None:
+            generation = item_book_detail_cache.generation
+            details = await self.__get_button_details_async({button.item_code for button in buttons})
+            item_book_detail_cache.put(tenant_id, store_code, item_book_id, version, details, generation)
+
+        # set description & unit_price to buttons
+        for button in buttons:
+            detail = details.get(button.item_code)
+            if detail is None:
+                logger.warning(f"Item with item_code {button.item_code} not found")
+                button.description = "not found"
+                continue
+            button.description = detail["description"]
+            button.unit_price = detail["unit_price"]
 
         return item_book
 
+    async def __get_button_details_async(self, item_codes: set[str]) -> ButtonDetails:
+        """
+        Get the description and price of the items of an item book with two queries.
+
+        The store price, if any, overrides the unit price of the common item master.
+
+        Args:
+            item_codes: Codes of the items on the buttons
+
+        Returns:
+            Dictionary mapping item code to {"description", "unit_price"}, None for items not found
+        """
+        item_codes = sorted(code for code in item_codes if code is not None)
+        items = await self.item_common_master_repo.get_item_details_by_codes_async(item_codes)
+        store_prices = {}
+        if self.item_store_master_repo is not None:
+            store_prices = await self.item_store_master_repo.get_store_prices_by_codes_async(list(items.keys()))
+
+        details: ButtonDetails = {}
+        for item_code in item_codes:
+            item = items.get(item_code)
+            if item is None:
+                details[item_code] = None
+                continue
+            unit_price = store_prices.get(item_code)
+            details[item_code] = {
+                "description": item.get("description"),
+                "unit_price": unit_price if unit_price is not None else item.get("unit_price"),
+            }
+        return details
+
     async def get_item_book_all_async(self, limit: int, page: int, sort: list[tuple[str, int]]) -> list:
         """
         Retrieve all item books with pagination and sorting.
@@ -10,6 +10,8 @@ from kugel_common.exceptions import (
     DocumentNotFoundException,
     InvalidRequestDataException,
 )
+from kugel_common.models.repositories.keyset_pagination import TotalMode
+from kugel_common.schemas.pagination import PaginatedResult
 from app.models.documents.item_common_master_document import ItemCommonMasterDocument
 from app.models.repositories.item_common_master_repository import ItemCommonMasterRepository
 
@@ -145,6 +147,25 @@ class ItemCommonMasterService:
         total_count = await self.item_common_master_repo.get_item_count_by_filter_async({})
         return items_all_in_tenant, total_count
 
+    async def get_item_all_keyset_async(
+        self, limit: int, sort: list[tuple[str, int]], cursor: str = None, total_mode: str = TotalMode.ESTIMATE
+    ) -> PaginatedResult[ItemCommonMasterDocument]:
+        """
+        Retrieve all items with cursor (keyset) pagination.
+
+        Args:
+            limit: Maximum number of records to return
+            sort: List of tuples containing field name and sort direction
+            cursor: Cursor of the next page returned in the previous page's metadata
+            total_mode: Total reported in the metadata: exact, estimate or none
+
+        Returns:
+            PaginatedResult with the items and the cursor of the next page
+        """
+        return await self.item_common_master_repo.get_item_by_filter_keyset_async(
+            {}, limit, sort, cursor=cursor, total_mode=total_mode
+        )
+
     async def update_item_async(self, item_code: str, update_data: dict) -> ItemCommonMasterDocument:
         """
         Update an existing item with new data.
@@ -0,0 +1,429 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Bulk import of item master data from NDJSON or CSV uploads.
+
+Rows are read from the upload stream, validated and written chunk by chunk
+(ITEM_IMPORT_CHUNK_SIZE rows), so memory usage does not grow with the size of
+the file. Each chunk is written with one unordered bulk_write; rows that fail
+validation or fail to be written are reported individually and do not stop
+the other rows.
+
+Large files can be imported as jobs: the upload is spooled to a temporary
+file, the job is stored in the item import job collection and the import
+runs in the background while clients poll the job. The spool file is local
+to the replica, so a job whose replica stopped cannot be resumed; it is
+reported as failed once it made no progress for ITEM_IMPORT_JOB_STALE_SECONDS.
+"""
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import uuid
+from collections import deque
+from datetime import timedelta
+from logging import getLogger
+from typing import Any, AsyncIterator, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from kugel_common.exceptions import DocumentNotFoundException, InvalidRequestDataException
+from kugel_common.utils.misc import get_app_time
+
+from app.api.common.schemas import BaseItemCreateRequest, BaseItemStoreCreateRequest
+from app.config.settings import settings
+from app.models.documents.item_import_job_document import ItemImportJobDocument, ItemImportRowError
+from app.models.repositories.item_common_master_repository import ItemCommonMasterRepository
+from app.models.repositories.item_import_job_repository import ItemImportJobRepository
+from app.models.repositories.item_store_master_repository import ItemStoreMasterRepository
+
+logger = getLogger(__name__)
+
+IMPORT_TARGET_ITEM_COMMON = "item_common"
+IMPORT_TARGET_ITEM_STORE = "item_store"
+
+IMPORT_FORMAT_NDJSON = "ndjson"
+IMPORT_FORMAT_CSV = "csv"
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+# CSV columns holding lists, their values are separated by "|" and an empty cell is an empty list
+CSV_LIST_FIELDS = {"item_details", "image_urls", "itemDetails", "imageUrls"}
+
+SPOOL_READ_SIZE = 1024 * 1024
+
+# Background import jobs, kept referenced until they finish
+_import_tasks: set[asyncio.Task] = set()
+
+
+def resolve_import_format(data_format: Optional[str], content_type: Optional[str]) -> str:
+    """
+    Determine the format of an upload from the query parameter or the content type.
+
+    Args:
+        data_format: Format given by the client (ndjson or csv), may be None
+        content_type: Content-Type header of the request, may be None
+
+    Returns:
+        ndjson or csv
+
+    Raises:
+        InvalidRequestDataException: If the format is not supported
+    """
+    if data_format:
+        data_format = data_format.lower()
+        if data_format not in (IMPORT_FORMAT_NDJSON, IMPORT_FORMAT_CSV):
+            raise InvalidRequestDataException(f"Unsupported import format: {data_format}", logger)
+        return data_format
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return IMPORT_FORMAT_CSV
+    return IMPORT_FORMAT_NDJSON
+
+
+async def iter_lines_async(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into text lines.
+
+    Args:
+        chunks: Byte chunks, e.g. from request.stream()
+
+    Yields:
+        Lines without line terminators, decoded as UTF-8 (a leading BOM is removed)
+    """
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            text = line.rstrip(b"\r").decode("utf-8-sig" if first else "utf-8")
+            first = False
+            yield text
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8-sig" if first else "utf-8")
+
+
+class _LineFeed:
+    """Iterator handing the lines received so far to a csv.reader"""
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    """Summarise a pydantic validation error in one line"""
+    return "; ".join(f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors())
+
+
+class ItemImportService:
+    """
+    Service class for importing item master data in bulk.
+
+    Common items (item_common) and store-specific prices (item_store) can be
+    imported. Existing items are updated and missing items are created.
+    """
+
+    def __init__(
+        self,
+        item_common_master_repo: ItemCommonMasterRepository,
+        item_import_job_repo: ItemImportJobRepository,
+        item_store_master_repo: ItemStoreMasterRepository = None,
+    ):
+        """
+        Initialize the ItemImportService with repositories.
+
+        Args:
+            item_common_master_repo: Repository for common item master data operations
+            item_import_job_repo: Repository for import jobs
+            item_store_master_repo: Repository for store-specific items, required for item_store imports
+        """
+        self.item_common_master_repo = item_common_master_repo
+        self.item_import_job_repo = item_import_job_repo
+        self.item_store_master_repo = item_store_master_repo
+
+    async def import_items_async(self, chunks: AsyncIterator[bytes], data_format: str) -> ItemImportJobDocument:
+        """
+        Import common items and return the result when the import is finished.
+
+        Args:
+            chunks: Byte chunks of the upload
+            data_format: ndjson or csv
+
+        Returns:
+            ItemImportJobDocument with the counts and row errors (not stored)
+        """
+        job = self.__new_job(IMPORT_TARGET_ITEM_COMMON, data_format)
+        return await self.__run_import_async(job, chunks)
+
+    async def import_item_stores_async(self, chunks: AsyncIterator[bytes], data_format: str) -> ItemImportJobDocument:
+        """
+        Import store-specific items and return the result when the import is finished.
+
+        Args:
+            chunks: Byte chunks of the upload
+            data_format: ndjson or csv
+
+        Returns:
+            ItemImportJobDocument with the counts and row errors (not stored)
+        """
+        job = self.__new_job(IMPORT_TARGET_ITEM_STORE, data_format)
+        return await self.__run_import_async(job, chunks)
+
+    async def start_import_job_async(
+        self, chunks: AsyncIterator[bytes], data_format: str, target: str
+    ) -> ItemImportJobDocument:
+        """
+        Spool the upload to a temporary file and import it in the background.
+
+        Args:
+            chunks: Byte chunks of the upload
+            data_format: ndjson or csv
+            target: item_common or item_store
+
+        Returns:
+            The queued job, whose progress can be retrieved with get_import_job_async
+        """
+        job = self.__new_job(target, data_format)
+        # file I/O runs in worker threads so that spooling does not block the event loop
+        spool_file = await asyncio.to_thread(
+            tempfile.NamedTemporaryFile, prefix="item_import_", suffix=f".{data_format}", delete=False
+        )
+        try:
+            try:
+                async for chunk in chunks:
+                    await asyncio.to_thread(spool_file.write, chunk)
+            finally:
+                await asyncio.to_thread(spool_file.close)
+            job = await self.item_import_job_repo.create_job_async(job)
+        except Exception:
+            await asyncio.to_thread(os.remove, spool_file.name)
+            raise
+
+        task = asyncio.create_task(self.__run_import_job_async(job, spool_file.name))
+        _import_tasks.add(task)
+        task.add_done_callback(_import_tasks.discard)
+        logger.info(f"Item import job queued: tenant_id->{job.tenant_id}, job_id->{job.job_id}, target->{target}")
+        return job
+
+    async def get_import_job_async(self, job_id: str) -> ItemImportJobDocument:
+        """
+        Retrieve an import job.
+
+        Args:
+            job_id: Identifier of the job
+
+        Returns:
+            The job document
+
+        Raises:
+            DocumentNotFoundException: If the job does not exist
+        """
+        job = await self.item_import_job_repo.get_job_async(job_id)
+        if job is None:
+            message = f"item import job not found. job_id: {job_id}"
+            raise DocumentNotFoundException(message, logger)
+        if job.status in (JOB_STATUS_QUEUED, JOB_STATUS_RUNNING):
+            stale_before = get_app_time() - timedelta(seconds=settings.ITEM_IMPORT_JOB_STALE_SECONDS)
+            message = f"no progress for {settings.ITEM_IMPORT_JOB_STALE_SECONDS} seconds, the import was abandoned"
+            if await self.item_import_job_repo.fail_stale_job_async(job_id, stale_before, message):
+                logger.warning(f"Item import job abandoned: tenant_id->{job.tenant_id}, job_id->{job_id}")
+                job = await self.item_import_job_repo.get_job_async(job_id)
+        return job
+
+    def __new_job(self, target: str, data_format: str) -> ItemImportJobDocument:
+        if target == IMPORT_TARGET_ITEM_STORE and self.item_store_master_repo is None:
+            raise InvalidRequestDataException("store_code is required to import store-specific items", logger)
+        return ItemImportJobDocument(
+            tenant_id=self.item_common_master_repo.tenant_id,
+            job_id=uuid.uuid4().hex,
+            target=target,
+            store_code=self.item_store_master_repo.store_code if target == IMPORT_TARGET_ITEM_STORE else None,
+            data_format=data_format,
+            status=JOB_STATUS_QUEUED,
+        )
+
+    async def __run_import_job_async(self, job: ItemImportJobDocument, spool_path: str) -> None:
+        """Run a queued job from its spool file and store its progress"""
+
+        async def read_spool_async() -> AsyncIterator[bytes]:
+            f = await asyncio.to_thread(open, spool_path, "rb")
+            try:
+                while chunk := await asyncio.to_thread(f.read, SPOOL_READ_SIZE):
+                    yield chunk
+            finally:
+                await asyncio.to_thread(f.close)
+
+        try:
+            await self.__run_import_async(job, read_spool_async(), store_progress=True)
+        except Exception as e:
+            logger.error(f"Item import job failed: job_id->{job.job_id}, error->{e}")
+            job.status = JOB_STATUS_FAILED
+            job.message = str(e)
+            job.finished_at = get_app_time()
+            try:
+                await self.item_import_job_repo.replace_job_async(job)
+            except Exception as store_error:
+                logger.error(f"Failed to store the item import job: job_id->{job.job_id}, error->{store_error}")
+        finally:
+            await asyncio.to_thread(os.remove, spool_path)
+
+    async def __run_import_async(
+        self, job: ItemImportJobDocument, chunks: AsyncIterator[bytes], store_progress: bool = False
+    ) -> ItemImportJobDocument:
+        """Read, validate and write the rows chunk by chunk, collecting the result in job"""
+        job.status = JOB_STATUS_RUNNING
+        job.started_at = get_app_time()
+        if store_progress:
+            await self.item_import_job_repo.replace_job_async(job)
+
+        rows: list[tuple[int, Any]] = []
+        async for row in self.__iter_rows_async(chunks, job.data_format):
+            rows.append(row)
+            if len(rows) >= settings.ITEM_IMPORT_CHUNK_SIZE:
+                await self.__import_chunk_async(job, rows)
+                rows = []
+                if store_progress:
+                    await self.item_import_job_repo.replace_job_async(job)
+        if rows:
+            await self.__import_chunk_async(job, rows)
+
+        job.status = JOB_STATUS_COMPLETED
+        job.finished_at = get_app_time()
+        if store_progress:
+            await self.item_import_job_repo.replace_job_async(job)
+        logger.info(
+            f"Item import finished: tenant_id->{job.tenant_id}, target->{job.target}, rows->{job.total_rows}, "
+            f"upserted->{job.upserted_count}, modified->{job.modified_count}, errors->{job.error_count}"
+        )
+        return job
+
+    async def __iter_rows_async(self, chunks: AsyncIterator[bytes], data_format: str) -> AsyncIterator[tuple[int, Any]]:
+        """
+        Yield (row number, row) for every non-empty row; rows that cannot be
+        parsed are yielded as an error message instead of a dictionary.
+        """
+        if data_format == IMPORT_FORMAT_CSV:
+            async for row in self.__iter_csv_rows_async(chunks):
+                yield row
+            return
+
+        row_no = 0
+        async for line in iter_lines_async(chunks):
+            if not line.strip():
+                continue
+            row_no += 1
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_no, f"invalid JSON: {e.msg}"
+                continue
+            yield row_no, row if isinstance(row, dict) else "a row must be a JSON object"
+
+    async def __iter_csv_rows_async(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Any]]:
+        """
+        Yield (row number, row) for every CSV record after the header.
+
+        One csv.reader reads all lines, so quoted values may contain line breaks.
+        The reader is only advanced once the lines of a record are complete,
+        i.e. they contain an even number of quote characters.
+        """
+        row_no = 0
+        header = None
+        feed = _LineFeed()
+        reader = csv.reader(feed)
+        in_quoted_value = False
+        async for line in iter_lines_async(chunks):
+            if not in_quoted_value and not line.strip():
+                continue
+            feed.lines.append(line + "\n")
+            if line.count('"') % 2:
+                in_quoted_value = not in_quoted_value
+            if in_quoted_value:
+                continue
+
+            values = next(reader)
+            if header is None:
+                header = [value.strip() for value in values]
+                continue
+            row_no += 1
+            if len(values) != len(header):
+                yield row_no, f"expected {len(header)} columns, got {len(values)}"
+                continue
+            row = {}
+            for name, value in zip(header, values):
+                if name in CSV_LIST_FIELDS:
+                    row[name] = value.split("|") if value != "" else []
+                elif value != "":
+                    row[name] = value
+            yield row_no, row
+
+        if in_quoted_value and header is not None:
+            yield row_no + 1, "unterminated quoted value"
+
+    async def __import_chunk_async(self, job: ItemImportJobDocument, rows: list[tuple[int, Any]]) -> None:
+        """Validate and write one chunk of rows"""
+        job.total_rows += len(rows)
+        row_model: type[BaseModel] = (
+            BaseItemStoreCreateRequest if job.target == IMPORT_TARGET_ITEM_STORE else BaseItemCreateRequest
+        )
+
+        # validate, a later row for the same item replaces the earlier one, which is reported
+        # as a row error; only the fields given in the row are written, so omitted ones keep
+        # their stored values
+        valid_rows: dict[str, tuple[int, dict]] = {}
+        for row_no, row in rows:
+            if not isinstance(row, dict):
+                self.__add_error(job, row_no, None, row)
+                continue
+            try:
+                item = row_model.model_validate(row).model_dump(exclude_unset=True)
+            except ValidationError as e:
+                item_code = row.get("item_code", row.get("itemCode"))
+                item_code = str(item_code) if item_code is not None else None
+                self.__add_error(job, row_no, item_code, _format_validation_error(e))
+                continue
+            replaced = valid_rows.pop(item["item_code"], None)
+            if replaced is not None:
+                message = f"replaced by row {row_no} with the same item_code"
+                self.__add_error(job, replaced[0], item["item_code"], message)
+            valid_rows[item["item_code"]] = (row_no, item)
+
+        if job.target == IMPORT_TARGET_ITEM_STORE and valid_rows:
+            existing = await self.item_common_master_repo.get_item_details_by_codes_async(list(valid_rows.keys()))
+            for item_code in [code for code in valid_rows if code not in existing]:
+                row_no, _ = valid_rows.pop(item_code)
+                self.__add_error(job, row_no, item_code, "item not found in the common item master")
+
+        if not valid_rows:
+            return
+        entries = list(valid_rows.values())
+        items = [item for _, item in entries]
+        if job.target == IMPORT_TARGET_ITEM_STORE:
+            result = await self.item_store_master_repo.bulk_upsert_item_stores_async(items)
+        else:
+            result = await self.item_common_master_repo.bulk_upsert_items_async(items)
+
+        job.upserted_count += result.upserted_count
+        job.modified_count += result.modified_count
+        for index, message in sorted(result.errors.items()):
+            row_no, item = entries[index]
+            self.__add_error(job, row_no, item["item_code"], message)
+
+    def __add_error(self, job: ItemImportJobDocument, row_no: int, item_code: Optional[str], message: str) -> None:
+        job.error_count += 1
+        if len(job.errors) < settings.ITEM_IMPORT_MAX_ERRORS:
+            job.errors.append(ItemImportRowError(row=row_no, item_code=item_code, message=message))
@@ -1,5 +1,6 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from logging import getLogger
+from typing import Optional
 
 logger = getLogger(__name__)
 
@@ -12,6 +13,8 @@ from app.models.documents.item_store_master_document import ItemStoreMasterDocum
 from app.models.repositories.item_store_master_repository import ItemStoreMasterRepository
 from app.models.repositories.item_common_master_repository import ItemCommonMasterRepository
 from app.models.documents.item_store_detail_document import ItemStoreDetailDocument
+from app.models.documents.item_common_master_document import ItemCommonMasterDocument
+from app.utils.item_detail_cache import item_detail_cache
 
 
 class ItemStoreMasterService:
@@ -139,6 +142,8 @@ class ItemStoreMasterService:
 
         This method merges data from both common and store-specific item records
         to provide a complete view of an item with store-specific overrides applied.
+        Both records are read with one aggregation and the result is kept in the
+        item detail cache, which the item repositories invalidate on every write.
 
         Args:
             item_code: Unique identifier for the item
@@ -152,45 +157,66 @@ class ItemStoreMasterService:
 
         logger.debug(f"get_item_store_detail_by_code_async request received for item_code: {item_code}")
 
-        item_detail_doc = ItemStoreDetailDocument()
+        tenant_id = self.item_common_master_repo.tenant_id
+        store_code = self.item_store_master_repo.store_code
+        item_detail_doc = item_detail_cache.get(tenant_id, store_code, item_code)
+        if item_detail_doc is not None:
+            return item_detail_doc
 
-        item_common = await self.item_common_master_repo.get_item_by_code_async(
-            item_code=item_code, is_logical_deleted=False, use_cache=False
-        )
+        generation = item_detail_cache.generation
+        item_common, item_store = await self.item_common_master_repo.get_item_with_store_async(item_code, store_code)
         if item_common is None:
             message = f"item common with item_code {item_code} not found"
             raise DocumentNotFoundException(message, logger)
-        else:
-            logger.debug(f"item_common: {item_common}")
-            item_detail_doc.tenant_id = item_common.tenant_id
-            item_detail_doc.item_code = item_common.item_code
-            item_detail_doc.description = item_common.description
-            item_detail_doc.description_short = item_common.description_short
-            item_detail_doc.description_long = item_common.description_long
-            item_detail_doc.unit_price = item_common.unit_price
-            item_detail_doc.unit_cost = item_common.unit_cost
-            item_detail_doc.item_details = item_common.item_details
-            item_detail_doc.image_urls = item_common.image_urls
-            item_detail_doc.category_code = item_common.category_code
-            item_detail_doc.tax_code = item_common.tax_code
-            item_detail_doc.is_discount_restricted = item_common.is_discount_restricted
-            item_detail_doc.updated_at = item_common.updated_at
-            item_detail_doc.created_at = item_common.created_at
-
-        item_store = await self.item_store_master_repo.get_item_store_by_code(item_code=item_code)
+
+        logger.debug(f"item_common: {item_common}")
         if item_store is None:
             message = f"item store detail with item_code {item_code} not found"
-            # raise DocumentNotFoundException(message, logger)
             logger.info(message)
         else:
             logger.debug(f"item_store: {item_store}")
-            item_detail_doc.store_code = item_store.store_code
-            item_detail_doc.store_price = item_store.store_price
-            item_detail_doc.updated_at = item_store.updated_at
-            item_detail_doc.created_at = item_store.created_at
+        item_detail_doc = self.__make_item_detail(item_common, item_store)
 
+        item_detail_cache.put(tenant_id, store_code, item_detail_doc, generation)
         return item_detail_doc
 
+    async def get_item_store_details_by_codes_async(self, item_codes: list[str]) -> list[ItemStoreDetailDocument]:
+        """
+        Retrieve detailed item records of several items with one query per master.
+
+        Items found in the item detail cache are not read again. Store prices are
+        applied when the repository has a store code. Items that do not exist in
+        the common item master are not returned.
+
+        Args:
+            item_codes: Unique identifiers of the items
+
+        Returns:
+            List of ItemStoreDetailDocument in the order of item_codes
+        """
+        tenant_id = self.item_common_master_repo.tenant_id
+        store_code = self.item_store_master_repo.store_code
+        item_details = {}
+        for item_code in dict.fromkeys(item_codes):
+            item_detail_doc = item_detail_cache.get(tenant_id, store_code, item_code)
+            if item_detail_doc is not None:
+                item_details[item_code] = item_detail_doc
+        missing_codes = [item_code for item_code in dict.fromkeys(item_codes) if item_code not in item_details]
+
+        generation = item_detail_cache.generation
+        item_commons = await self.item_common_master_repo.get_items_by_codes_async(missing_codes)
+        item_stores = {}
+        if store_code and item_commons:
+            item_stores = await self.item_store_master_repo.get_item_stores_by_codes_async(
+                [item.item_code for item in item_commons]
+            )
+
+        for item_common in item_commons:
+            item_detail_doc = self.__make_item_detail(item_common, item_stores.get(item_common.item_code))
+            item_details[item_common.item_code] = item_detail_doc
+            item_detail_cache.put(tenant_id, store_code, item_detail_doc, generation)
+        return [item_details[item_code] for item_code in dict.fromkeys(item_codes) if item_code in item_details]
+
     async def update_item_async(self, item_code: str, update_data: dict) -> ItemStoreMasterDocument:
         """
         Update an existing store-specific item record with new data.
@@ -242,3 +268,42 @@ class ItemStoreMasterService:
 
         await self.item_store_master_repo.delete_item_store_async(item_code)
         return None
+
+    def __make_item_detail(
+        self, item_common: ItemCommonMasterDocument, item_store: Optional[ItemStoreMasterDocument] = None
+    ) -> ItemStoreDetailDocument:
+        """
+        Create an item detail document from the common item fields and the store-specific record.
+
+        The single and the batch lookups both build their item details here, so the
+        item detail cache holds the same document whichever of them filled it.
+
+        Args:
+            item_common: Common item master document
+            item_store: Store-specific item document, None if the item has none
+
+        Returns:
+            ItemStoreDetailDocument with the store price and timestamps of item_store if given
+        """
+        item_detail_doc = ItemStoreDetailDocument(
+            tenant_id=item_common.tenant_id,
+            item_code=item_common.item_code,
+            description=item_common.description,
+            description_short=item_common.description_short,
+            description_long=item_common.description_long,
+            unit_price=item_common.unit_price,
+            unit_cost=item_common.unit_cost,
+            item_details=item_common.item_details,
+            image_urls=item_common.image_urls,
+            category_code=item_common.category_code,
+            tax_code=item_common.tax_code,
+            is_discount_restricted=item_common.is_discount_restricted,
+            updated_at=item_common.updated_at,
+            created_at=item_common.created_at,
+        )
+        if item_store is not None:
+            item_detail_doc.store_code = item_store.store_code
+            item_detail_doc.store_price = item_store.store_price
+            item_detail_doc.updated_at = item_store.updated_at
+            item_detail_doc.created_at = item_store.created_at
+        return item_detail_doc
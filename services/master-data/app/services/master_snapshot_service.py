@@ -0,0 +1,199 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Service building versioned master data snapshots for terminals and cart workers.
+
+A snapshot contains everything a terminal needs for item lookups and checkout
+(items, store prices, categories, taxes, payments and settings) so that clients
+can keep a local copy instead of calling the API per item. Clients send the
+ETag of their copy to skip unchanged downloads, or the version of their copy to
+download only the documents changed since then.
+
+Clients serving several stores download the tenant scope (items, categories,
+payments, settings and taxes) once and the store scope (store prices) per store.
+"""
+import gzip
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Optional
+
+from app.config.settings import settings
+from app.models.repositories.master_snapshot_repository import (
+    MasterSnapshotRepository,
+    SnapshotScope,
+    sections_for_scope,
+)
+from app.models.repositories.tax_master_repository import TaxMasterRepository
+
+logger = getLogger(__name__)
+
+# (tenant_id, store_code, scope) -> (expires_at, version, etag)
+_state_cache: dict[tuple[str, str, str], tuple[float, int, str]] = {}
+# (tenant_id, store_code, scope, etag, since, gzip) -> encoded body
+_body_cache: OrderedDict[tuple, bytes] = OrderedDict()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encoding_etag(etag: str, compress: bool) -> str:
+    """
+    Get the ETag of the encoded representation of a snapshot.
+
+    The gzip and identity bodies are different representations, so they must
+    not share a strong ETag.
+
+    Args:
+        etag: ETag of the snapshot
+        compress: Whether the body is gzip-compressed
+
+    Returns:
+        The ETag sent with the body
+    """
+    return f'{etag[:-1]}-gzip"' if compress else etag
+
+
+def invalidate_snapshot_version(tenant_id: str) -> None:
+    """
+    Forget the memoized versions of a tenant, so the next request recomputes them.
+
+    Args:
+        tenant_id: Tenant whose master data changed
+    """
+    for key in [key for key in _state_cache if key[0] == tenant_id]:
+        del _state_cache[key]
+
+
+class MasterSnapshotService:
+    """
+    Service for downloading the master data of a store as a single versioned snapshot.
+    """
+
+    def __init__(
+        self,
+        snapshot_repo: MasterSnapshotRepository,
+        tax_master_repo: TaxMasterRepository,
+        scope: str = SnapshotScope.ALL,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            snapshot_repo: Repository reading the master data of the tenant / store
+            tax_master_repo: Repository providing the tax definitions
+            scope: Sections contained in the snapshot (see SnapshotScope)
+        """
+        self.snapshot_repo = snapshot_repo
+        self.tax_master_repo = tax_master_repo
+        self.scope = scope
+        self.sections = sections_for_scope(scope)
+
+    async def __get_taxes_async(self) -> list[dict]:
+        # taxes are tenant-wide
+        if self.scope == SnapshotScope.STORE:
+            return []
+        taxes = await self.tax_master_repo.load_all_taxes()
+        return [tax.model_dump(exclude={"shard_key", "cached_on", "etag"}) for tax in taxes]
+
+    async def get_version_async(self) -> tuple[int, str]:
+        """
+        Get the current version and ETag of the snapshot.
+
+        The result is reused for a few seconds so that many terminals polling at
+        the same time cost only one set of aggregations.
+
+        Returns:
+            Tuple of (version in epoch milliseconds, ETag)
+        """
+        key = (self.snapshot_repo.tenant_id, self.snapshot_repo.store_code, self.scope)
+        cached = _state_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1], cached[2]
+
+        states = await self.snapshot_repo.get_section_states_async(self.sections)
+        version = max((section_version for section_version, _ in states.values()), default=0)
+        # counts detect deletions, taxes come from the configuration
+        digest = hashlib.sha1(
+            json.dumps([states, await self.__get_taxes_async()], sort_keys=True, default=_json_default).encode()
+        ).hexdigest()[:12]
+        etag = f'"{version}-{digest}"'
+        _state_cache[key] = (time.monotonic() + settings.MASTER_SNAPSHOT_VERSION_CACHE_SECONDS, version, etag)
+        return version, etag
+
+    async def get_snapshot_async(self, since: Optional[int] = None) -> dict[str, Any]:
+        """
+        Build the snapshot.
+
+        Args:
+            since: Version held by the client; if given only documents changed since then
+                are returned together with the keys of all documents, so that the client
+                can drop deleted ones
+
+        Returns:
+            Snapshot data with version, etag, full flag, sections and (for deltas) keys
+        """
+        version, etag = await self.get_version_async()
+        sections = {}
+        keys = {}
+        for section in self.sections:
+            sections[section.name] = await self.snapshot_repo.get_documents_async(section, since)
+            if since is not None:
+                keys[section.name] = await self.snapshot_repo.get_keys_async(section)
+        if self.scope != SnapshotScope.STORE:
+            sections["taxes"] = await self.__get_taxes_async()
+
+        snapshot = {
+            "tenant_id": self.snapshot_repo.tenant_id,
+            "store_code": self.snapshot_repo.store_code,
+            "scope": self.scope,
+            "version": version,
+            "etag": etag,
+            "full": since is None,
+            "sections": sections,
+        }
+        if since is not None:
+            snapshot["keys"] = keys
+        return snapshot
+
+    async def get_encoded_snapshot_async(
+        self, since: Optional[int] = None, compress: bool = False, envelope: dict[str, Any] = None
+    ) -> tuple[bytes, str]:
+        """
+        Get the snapshot encoded as a JSON response body.
+
+        Encoded bodies are cached per ETag, so repeated downloads of an unchanged
+        snapshot are served without reading or serializing the master data again.
+
+        Args:
+            since: Version held by the client, None for a full snapshot
+            compress: Whether the body is gzip-compressed
+            envelope: Response fields wrapped around the snapshot, which is put in "data"
+
+        Returns:
+            Tuple of (encoded body, ETag of the snapshot, see encoding_etag for the ETag of the body)
+        """
+        _, etag = await self.get_version_async()
+        key = (self.snapshot_repo.tenant_id, self.snapshot_repo.store_code, self.scope, etag, since, compress)
+        body = _body_cache.get(key)
+        if body is not None:
+            _body_cache.move_to_end(key)
+            return body, etag
+
+        snapshot = await self.get_snapshot_async(since)
+        body = json.dumps({**(envelope or {}), "data": snapshot}, ensure_ascii=False, default=_json_default).encode()
+        if compress:
+            body = gzip.compress(body)
+        # the ETag of the snapshot may have been refreshed while it was built
+        etag = snapshot["etag"]
+        key = key[:3] + (etag,) + key[4:]
+        _body_cache[key] = body
+        while len(_body_cache) > settings.MASTER_SNAPSHOT_BODY_CACHE_MAX_ENTRIES:
+            _body_cache.popitem(last=False)
+        logger.debug(f"Built master snapshot {key}, size: {len(body)} bytes")
+        return body, etag
@@ -9,6 +9,7 @@ from kugel_common.exceptions import (
 from app.models.documents.settings_master_document import SettingsMasterDocument, SettingsValue
 from app.models.repositories.settings_master_repository import SettingsMasterRepository
 from app.utils.json_settings import ensure_json_format, process_setting_values
+from app.utils.settings_resolution_index import NOT_FOUND, SettingsResolutionIndex, settings_resolution_cache
 
 logger = getLogger(__name__)
 
@@ -89,6 +90,9 @@ class SettingsMasterService:
         3. Global setting
         4. Default value
 
+        Values are looked up in the resolution index of the tenant, which is built
+        from one query and reused until settings are changed.
+
         Args:
             name: Name of the setting to retrieve
             store_code: Store code to look up store-specific settings
@@ -100,29 +104,38 @@ class SettingsMasterService:
         Raises:
             DocumentNotFoundException: If no setting with the given name exists
         """
-
-        # get the settings document
-        setting_doc = await self.settings_master_repo.get_settings_by_name_async(name)
-        logger.debug(f"setting_doc: {setting_doc}")
-        if setting_doc is None:
+        index = await self.__get_resolution_index_async()
+        value = index.resolve(name, store_code, terminal_no)
+        if value is NOT_FOUND:
             message = f"settings with name {name} not found"
             raise DocumentNotFoundException(message, logger)
+        return value
 
-        # get the value from the settings in the order of priority
-        priority = [
-            {"store_code": store_code, "terminal_no": terminal_no},
-            {"store_code": store_code, "terminal_no": None},
-            {"store_code": None, "terminal_no": None},
-        ]
+    async def resolve_settings_values_async(
+        self,
+        names: list[str],
+        store_code: str,
+        terminal_no: int,
+    ) -> dict[str, str]:
+        """
+        Resolve the values of several settings for a terminal at once.
 
-        value_list = [value.model_dump() for value in setting_doc.values]
-        for p in priority:
-            for value_dict in value_list:
-                if all(value_dict[key] == p[key] for key in p):
-                    return value_dict["value"]
+        The same priority as get_settings_value_by_name_async is applied to each name.
 
-        # if no settings value is found, return the default value
-        return setting_doc.default_value
+        Args:
+            names: Names of the settings to resolve, empty for all settings of the tenant
+            store_code: Store code to look up store-specific settings
+            terminal_no: Terminal number to look up terminal-specific settings
+
+        Returns:
+            Dictionary mapping each name to its value, None for settings that do not exist
+        """
+        index = await self.__get_resolution_index_async()
+        values = {}
+        for name in names or index.names:
+            value = index.resolve(name, store_code, terminal_no)
+            values[name] = None if value is NOT_FOUND else value
+        return values
 
     async def get_settings_all_async(self, limit: int, page: int, sort: list[tuple[str, int]]) -> list:
         """
@@ -213,3 +226,11 @@ class SettingsMasterService:
             message = f"settings with name {name} not found"
             raise DocumentNotFoundException(message, logger)
         return await self.settings_master_repo.delete_settings_async(name)
+
+    async def __get_resolution_index_async(self) -> SettingsResolutionIndex:
+        """
+        Get the settings resolution index of the tenant, built from one query when missing.
+        """
+        return await settings_resolution_cache.get_index_async(
+            self.settings_master_repo.tenant_id, self.settings_master_repo.get_settings_for_resolution_async
+        )
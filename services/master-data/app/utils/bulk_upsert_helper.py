@@ -0,0 +1,48 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Unordered bulk upserts reporting the error of every failed operation.
+
+Bulk imports write each chunk with one unordered bulk_write, so a failing
+row does not stop the others. The errors reported by MongoDB refer to the
+index of the operation in the chunk, which callers map back to their rows.
+"""
+from dataclasses import dataclass, field
+from logging import getLogger
+
+from pymongo.errors import BulkWriteError
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class BulkUpsertResult:
+    """Result of an unordered bulk upsert"""
+
+    upserted_count: int = 0  # documents inserted
+    modified_count: int = 0  # existing documents changed
+    errors: dict[int, str] = field(default_factory=dict)  # operation index -> error message
+
+
+async def unordered_bulk_upsert_async(collection, operations: list) -> BulkUpsertResult:
+    """
+    Execute upserts with an unordered bulk write.
+
+    Args:
+        collection: Motor collection to write to
+        operations: UpdateOne / ReplaceOne operations with upsert=True
+
+    Returns:
+        BulkUpsertResult with the counts and the errors by operation index
+    """
+    if not operations:
+        return BulkUpsertResult()
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        return BulkUpsertResult(upserted_count=result.upserted_count, modified_count=result.modified_count)
+    except BulkWriteError as e:
+        details = e.details
+        errors = {error["index"]: error.get("errmsg", "write error") for error in details.get("writeErrors", [])}
+        logger.warning(f"Bulk upsert to {collection.name} failed for {len(errors)} of {len(operations)} operations")
+        return BulkUpsertResult(
+            upserted_count=details.get("nUpserted", 0), modified_count=details.get("nModified", 0), errors=errors
+        )
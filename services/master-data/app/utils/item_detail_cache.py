@@ -0,0 +1,258 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Read-through caches of data derived from items.
+
+- item_detail_cache keeps item details (common item joined with the store
+  price) per tenant, store and item. GetItemDetail is called by cart for every
+  scanned item.
+- item_book_detail_cache keeps the button details (description and price) of
+  item books per tenant, store and item book, together with the version
+  (updated_at) of the item book they were built for, so a changed item book is
+  never served stale details.
+
+The item repositories invalidate both caches with invalidate_item_caches after
+they write and the master data event subscriber does the same for changes made
+through other replicas. Without events, those changes are only seen when an
+entry expires, so the TTLs are a few seconds unless MASTER_DATA_EVENTS_ENABLED
+is set.
+
+Each cache has a generation counter bumped by every invalidation so that data
+read before a concurrent write is not stored after the write invalidated it.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from app.config.settings import settings
+from app.models.documents.item_store_detail_document import ItemStoreDetailDocument
+
+# item_code -> {"description": ..., "unit_price": ...}, None if the item does not exist
+ButtonDetails = dict[str, Optional[dict[str, Any]]]
+
+Tvalue = TypeVar("Tvalue")
+
+
+class ItemCache(ABC, Generic[Tvalue]):
+    """
+    LRU cache with TTL and generation check, keyed by (tenant_id, store_code, key)
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        """
+        Constructor
+
+        Args:
+            ttl_seconds: Time to live of an entry in seconds
+            max_entries: Maximum number of entries, the least recently used entry is evicted first
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, Tvalue]] = OrderedDict()
+
+    def _get(self, key: tuple[str, str, str]) -> Optional[Tvalue]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: tuple[str, str, str], value: Tvalue, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _remove(self, predicate: Callable[[tuple[str, str, str], Tvalue], bool]) -> None:
+        self.generation += 1
+        for key in [key for key, (_, value) in self._entries.items() if predicate(key, value)]:
+            del self._entries[key]
+
+    def invalidate_items(self, tenant_id: str, item_codes: list[str], store_code: str = None) -> None:
+        """
+        Remove the entries containing any of the items
+
+        Args:
+            tenant_id: Tenant identifier
+            item_codes: Codes of the changed items
+            store_code: Store of a store-specific change, None for all stores
+        """
+        codes = set(item_codes)
+        self._remove(
+            lambda key, value: key[0] == tenant_id
+            and (store_code is None or key[1] == store_code)
+            and self._contains_items(key, value, codes)
+        )
+
+    @abstractmethod
+    def _contains_items(self, key: tuple[str, str, str], value: Tvalue, item_codes: set[str]) -> bool:
+        """Whether the entry contains any of the items"""
+        pass
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ItemDetailCache(ItemCache[ItemStoreDetailDocument]):
+    """
+    Cache of item store details
+    """
+
+    def get(self, tenant_id: str, store_code: Optional[str], item_code: str) -> Optional[ItemStoreDetailDocument]:
+        """
+        Get the detail of an item
+
+        Args:
+            tenant_id: Tenant identifier
+            store_code: Store code whose price was applied, None for the common item only
+            item_code: Item code
+
+        Returns:
+            A copy of the cached detail, or None if not cached or expired
+        """
+        item_detail = self._get((tenant_id, store_code or "", item_code))
+        return item_detail.model_copy() if item_detail else None
+
+    def put(
+        self,
+        tenant_id: str,
+        store_code: Optional[str],
+        item_detail: ItemStoreDetailDocument,
+        generation: int,
+    ) -> None:
+        """
+        Store the detail of an item
+
+        Args:
+            tenant_id: Tenant identifier
+            store_code: Store code whose price was applied, None for the common item only
+            item_detail: Item detail to cache
+            generation: Value of generation read before the detail was loaded;
+                        the detail is not stored if an invalidation happened since
+        """
+        self._put((tenant_id, store_code or "", item_detail.item_code), item_detail.model_copy(), generation)
+
+    def _contains_items(
+        self, key: tuple[str, str, str], value: ItemStoreDetailDocument, item_codes: set[str]
+    ) -> bool:
+        return key[2] in item_codes
+
+
+class ItemBookDetailCache(ItemCache[tuple[Optional[datetime], ButtonDetails]]):
+    """
+    Cache of item book button details with version check
+    """
+
+    def get(
+        self, tenant_id: str, store_code: Optional[str], item_book_id: str, version: Optional[datetime]
+    ) -> Optional[ButtonDetails]:
+        """
+        Get the button details of an item book
+
+        Args:
+            tenant_id: Tenant identifier
+            store_code: Store code whose prices were applied
+            item_book_id: Item book identifier
+            version: Version (updated_at) of the item book currently stored
+
+        Returns:
+            Button details, or None if not cached, expired or built for another version
+        """
+        key = (tenant_id, store_code or "", item_book_id)
+        entry = self._get(key)
+        if entry is None:
+            return None
+        entry_version, details = entry
+        if entry_version != version:
+            del self._entries[key]
+            return None
+        return details
+
+    def put(
+        self,
+        tenant_id: str,
+        store_code: Optional[str],
+        item_book_id: str,
+        version: Optional[datetime],
+        details: ButtonDetails,
+        generation: int,
+    ) -> None:
+        """
+        Store the button details of an item book
+
+        Args:
+            tenant_id: Tenant identifier
+            store_code: Store code whose prices were applied
+            item_book_id: Item book identifier
+            version: Version (updated_at) of the item book the details were built for
+            details: Button details keyed by item code
+            generation: Value of generation read before the details were loaded;
+                        the details are not stored if an invalidation happened since
+        """
+        self._put((tenant_id, store_code or "", item_book_id), (version, details), generation)
+
+    def invalidate_item_book(self, tenant_id: str, item_book_id: str) -> None:
+        """
+        Remove the entries of an item book for all stores
+
+        Args:
+            tenant_id: Tenant identifier
+            item_book_id: Item book identifier
+        """
+        self._remove(lambda key, value: key[0] == tenant_id and key[2] == item_book_id)
+
+    def _contains_items(
+        self, key: tuple[str, str, str], value: tuple[Optional[datetime], ButtonDetails], item_codes: set[str]
+    ) -> bool:
+        return not item_codes.isdisjoint(value[1])
+
+
+item_detail_cache = ItemDetailCache(
+    ttl_seconds=(
+        settings.ITEM_DETAIL_CACHE_TTL_SECONDS_WITH_EVENTS
+        if settings.MASTER_DATA_EVENTS_ENABLED
+        else settings.ITEM_DETAIL_CACHE_TTL_SECONDS
+    ),
+    max_entries=settings.ITEM_DETAIL_CACHE_MAX_ENTRIES,
+)
+
+item_book_detail_cache = ItemBookDetailCache(
+    ttl_seconds=(
+        settings.ITEM_BOOK_DETAIL_CACHE_TTL_SECONDS_WITH_EVENTS
+        if settings.MASTER_DATA_EVENTS_ENABLED
+        else settings.ITEM_BOOK_DETAIL_CACHE_TTL_SECONDS
+    ),
+    max_entries=settings.ITEM_BOOK_DETAIL_CACHE_MAX_ENTRIES,
+)
+
+
+def invalidate_item_caches(tenant_id: str, item_codes: list[str], store_code: str = None) -> None:
+    """
+    Remove the cached data of changed items from all item caches
+
+    Args:
+        tenant_id: Tenant identifier
+        item_codes: Codes of the changed items
+        store_code: Store of a store-specific change, None for all stores
+    """
+    item_detail_cache.invalidate_items(tenant_id, item_codes, store_code)
+    item_book_detail_cache.invalidate_items(tenant_id, item_codes, store_code)
+
+
+def clear_item_caches() -> None:
+    """Remove all entries from all item caches"""
+    item_detail_cache.clear()
+    item_book_detail_cache.clear()
@@ -0,0 +1,205 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Change stream based source of master data change events.
+
+With MASTER_DATA_EVENT_SOURCE "change_stream" the events are produced from a
+MongoDB change stream over the master collections of all tenant databases
+instead of from the repositories, so that writes made outside of this service
+(imports, scripts, other tools) are published as well. Change streams require
+a replica set. Every replica starts a watcher, but only the one holding the
+MongoDB lease watches the stream, so each change is published once; another
+replica takes over when the leader stops renewing the lease.
+"""
+import asyncio
+from logging import getLogger
+from typing import Any, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from kugel_common.utils.master_data_events import (
+    MasterDataChangeEvent,
+    MasterDataEntity,
+    MasterDataEventPublisher,
+    MasterDataOperation,
+)
+from kugel_common.utils.mongo_lease import MongoLease
+
+from app.config.settings import settings
+
+logger = getLogger(__name__)
+
+# collection name -> (entity, key field)
+WATCHED_COLLECTIONS = {
+    settings.DB_COLLECTION_NAME_ITEM_COMMON_MASTER: (MasterDataEntity.ITEM, "item_code"),
+    settings.DB_COLLECTION_NAME_ITEM_STORE_MASTER: (MasterDataEntity.PRICE, "item_code"),
+    settings.DB_COLLECTION_NAME_TAX_MASTER: (MasterDataEntity.TAX, "tax_code"),
+    settings.DB_COLLECTION_NAME_PAYMENT_MASTER: (MasterDataEntity.PAYMENT, "payment_code"),
+    settings.DB_COLLECTION_NAME_SETTINGS_MASTER: (MasterDataEntity.SETTINGS, "name"),
+    settings.DB_COLLECTION_NAME_CATEGORY_MASTER: (MasterDataEntity.CATEGORY, "category_code"),
+    settings.DB_COLLECTION_NAME_ITEM_BOOK_MASTER: (MasterDataEntity.ITEM_BOOK, "item_book_id"),
+}
+
+_OPERATIONS = {
+    "insert": MasterDataOperation.CREATED,
+    "update": MasterDataOperation.UPDATED,
+    "replace": MasterDataOperation.UPDATED,
+    "delete": MasterDataOperation.DELETED,
+}
+
+
+def make_change_event(change: dict[str, Any]) -> Optional[MasterDataChangeEvent]:
+    """
+    Convert a change stream document to a master data change event.
+
+    Deletions carry only the _id of the document, so their keys are unknown and
+    the event asks subscribers to invalidate the whole entity of the tenant.
+
+    Args:
+        change: Change stream document
+
+    Returns:
+        MasterDataChangeEvent, or None if the change is not about master data
+    """
+    namespace = change.get("ns", {})
+    watched = WATCHED_COLLECTIONS.get(namespace.get("coll"))
+    operation = _OPERATIONS.get(change.get("operationType"))
+    prefix = f"{settings.DB_NAME_PREFIX}_"
+    database = namespace.get("db", "")
+    if watched is None or operation is None or not database.startswith(prefix):
+        return None
+
+    entity, key_field = watched
+    document = change.get("fullDocument") or {}
+    key = document.get(key_field)
+    if document.get("is_deleted"):
+        operation = MasterDataOperation.DELETED
+    return MasterDataChangeEvent(
+        tenant_id=document.get("tenant_id") or database[len(prefix):],
+        entity=entity,
+        operation=operation,
+        keys=[key] if key is not None else [],
+        store_code=document.get("store_code") if entity == MasterDataEntity.PRICE else None,
+    )
+
+
+class MasterDataChangeStreamWatcher:
+    """
+    Watches the master collections and publishes their changes while holding the leader lease.
+
+    The resume token of the last published change is kept in memory, so a
+    broken stream is reopened without losing changes while the process lives.
+    It is also stored in the lease on every renewal, so the next leader resumes
+    close to where the previous one stopped; a change published twice only
+    invalidates the caches once more.
+    """
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient,
+        publisher: MasterDataEventPublisher,
+        lease: MongoLease,
+        retry_interval: float = 5.0,
+    ):
+        """
+        Constructor
+
+        Args:
+            client: MongoDB client; the stream covers all databases of the cluster
+            publisher: Publisher of the change events
+            lease: Lease electing the replica that watches the stream
+            retry_interval: Seconds to wait before reopening a broken stream
+        """
+        self.client = client
+        self.publisher = publisher
+        self.lease = lease
+        self.retry_interval = retry_interval
+        # renew well before the lease expires
+        self.renew_interval = lease.ttl_seconds / 3
+        self.is_leader = False
+        self._resume_token = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start watching in a background task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_async())
+            logger.info("Master data change stream watcher started")
+
+    async def stop(self) -> None:
+        """Stop watching"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Master data change stream watcher stopped")
+
+    async def _run_async(self) -> None:
+        while True:
+            try:
+                if await self.lease.acquire_async():
+                    await self._lead_async()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Master data change stream leader election failed: {e}")
+            await asyncio.sleep(self.renew_interval)
+
+    async def _lead_async(self) -> None:
+        """Watch the stream until the lease is lost or the watcher is stopped"""
+        lease = await self.lease.get_async()
+        if self._resume_token is None and lease is not None:
+            self._resume_token = lease.get("resume_token")
+        self.is_leader = True
+        logger.info(f"Master data change stream leadership acquired by {self.lease.owner_id}")
+
+        watch_task = asyncio.create_task(self._watch_async())
+        try:
+            while not watch_task.done():
+                await asyncio.wait({watch_task}, timeout=self.renew_interval)
+                if not await self.lease.renew_async({"resume_token": self._resume_token}):
+                    break
+        finally:
+            self.is_leader = False
+            watch_task.cancel()
+            try:
+                await watch_task
+            except asyncio.CancelledError:
+                pass
+            # hand the lease over even when the watcher is being stopped
+            await asyncio.shield(self._release_async())
+            logger.info(f"Master data change stream leadership released by {self.lease.owner_id}")
+
+    async def _release_async(self) -> None:
+        try:
+            await self.lease.renew_async({"resume_token": self._resume_token})
+            await self.lease.release_async()
+        except Exception as e:
+            logger.warning(f"Failed to release the master data change stream lease: {e}")
+
+    async def _watch_async(self) -> None:
+        pipeline = [
+            {
+                "$match": {
+                    "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+                    "operationType": {"$in": list(_OPERATIONS)},
+                }
+            }
+        ]
+        while True:
+            try:
+                async with self.client.watch(
+                    pipeline, full_document="updateLookup", resume_after=self._resume_token
+                ) as stream:
+                    async for change in stream:
+                        event = make_change_event(change)
+                        if event is not None:
+                            await self.publisher.publish_async(event)
+                        self._resume_token = stream.resume_token
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Master data change stream failed, reopening in {self.retry_interval}s: {e}")
+                await asyncio.sleep(self.retry_interval)
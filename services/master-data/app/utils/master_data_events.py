@@ -0,0 +1,119 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Master data change events published by this service.
+
+Repositories call emit_master_data_change after every write. When
+MASTER_DATA_EVENTS_ENABLED is set and MASTER_DATA_EVENT_SOURCE is "repository",
+the event is published to Dapr pub/sub in the background so that writes are not
+slowed down by the sidecar; with "change_stream" the events are produced by
+MasterDataChangeStreamWatcher instead and emit_master_data_change does nothing.
+
+Every replica of master-data also subscribes to the topic to invalidate its own
+in-process caches (item book details, item details, snapshot versions) for changes made
+through other replicas.
+"""
+import asyncio
+from logging import getLogger
+from typing import Any, Optional
+
+from kugel_common.utils.master_data_events import (
+    MasterDataChangeEvent,
+    MasterDataEntity,
+    MasterDataEventPublisher,
+    MasterDataEventSubscriber,
+    MasterDataOperation,
+)
+
+from app.config.settings import settings
+from app.services.master_snapshot_service import invalidate_snapshot_version
+from app.utils.item_detail_cache import clear_item_caches, invalidate_item_caches, item_book_detail_cache
+from app.utils.settings_resolution_index import settings_resolution_cache
+
+logger = getLogger(__name__)
+
+EVENT_SOURCE_REPOSITORY = "repository"
+EVENT_SOURCE_CHANGE_STREAM = "change_stream"
+
+_publisher: Optional[MasterDataEventPublisher] = None
+# keep references to the background publish tasks until they are done
+_publish_tasks: set[asyncio.Task] = set()
+
+
+def get_master_data_event_publisher() -> MasterDataEventPublisher:
+    """Get the publisher shared by the service"""
+    global _publisher
+    if _publisher is None:
+        _publisher = MasterDataEventPublisher(settings.MASTER_DATA_PUBSUB_NAME, settings.MASTER_DATA_PUBSUB_TOPIC)
+    return _publisher
+
+
+def emit_master_data_change(
+    tenant_id: str,
+    entity: MasterDataEntity,
+    operation: MasterDataOperation,
+    keys: list[str],
+    store_code: str = None,
+    data: dict[str, Any] = None,
+) -> None:
+    """
+    Publish a change event of master data in the background.
+
+    Args:
+        tenant_id: Tenant whose master data changed
+        entity: Kind of the changed master data
+        operation: Kind of the change
+        keys: Keys of the changed documents
+        store_code: Store of store-specific data, None for tenant-wide data
+        data: Changed document, if available
+    """
+    if not settings.MASTER_DATA_EVENTS_ENABLED or settings.MASTER_DATA_EVENT_SOURCE != EVENT_SOURCE_REPOSITORY:
+        return
+    event = MasterDataChangeEvent(
+        tenant_id=tenant_id, entity=entity, operation=operation, keys=keys, store_code=store_code, data=data
+    )
+    try:
+        task = asyncio.get_running_loop().create_task(get_master_data_event_publisher().publish_async(event))
+    except RuntimeError:
+        logger.warning(f"No running event loop, master data event is not published: {event}")
+        return
+    _publish_tasks.add(task)
+    task.add_done_callback(_publish_tasks.discard)
+
+
+async def close_master_data_event_publisher_async() -> None:
+    """Wait for the pending events and close the publisher"""
+    global _publisher
+    if _publish_tasks:
+        await asyncio.gather(*_publish_tasks, return_exceptions=True)
+    if _publisher is not None:
+        await _publisher.close()
+        _publisher = None
+
+
+async def _on_item_changed(event: MasterDataChangeEvent) -> None:
+    if event.keys:
+        invalidate_item_caches(event.tenant_id, event.keys, event.store_code)
+    else:
+        clear_item_caches()
+
+
+async def _on_item_book_changed(event: MasterDataChangeEvent) -> None:
+    if not event.keys:
+        item_book_detail_cache.clear()
+    for item_book_id in event.keys:
+        item_book_detail_cache.invalidate_item_book(event.tenant_id, item_book_id)
+
+
+async def _on_settings_changed(event: MasterDataChangeEvent) -> None:
+    settings_resolution_cache.invalidate(event.tenant_id)
+
+
+async def _on_master_data_changed(event: MasterDataChangeEvent) -> None:
+    invalidate_snapshot_version(event.tenant_id)
+
+
+master_data_event_subscriber = MasterDataEventSubscriber()
+master_data_event_subscriber.register([MasterDataEntity.ITEM, MasterDataEntity.PRICE], _on_item_changed)
+master_data_event_subscriber.register(MasterDataEntity.ITEM_BOOK, _on_item_book_changed)
+master_data_event_subscriber.register(MasterDataEntity.SETTINGS, _on_settings_changed)
+master_data_event_subscriber.register_all(_on_master_data_changed)
@@ -0,0 +1,156 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Per-tenant index resolving settings values by name, store and terminal.
+
+Resolving a value used to load the settings document and scan its values for
+the store+terminal, store and global scopes on every request. The index is
+built from all settings of a tenant with one query and maps
+(name, store_code, terminal_no) directly to the value, so a lookup is at most
+three dictionary accesses. Indexes are invalidated by the settings repository
+and by settings change events. Without events, changes made on other replicas
+are only seen when the index expires, so the TTL is short unless
+MASTER_DATA_EVENTS_ENABLED is set.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, Optional
+
+from app.config.settings import settings
+from app.models.documents.settings_master_document import SettingsMasterDocument
+
+# Returned by resolve() for a setting that does not exist
+NOT_FOUND = object()
+
+
+class SettingsResolutionIndex:
+    """
+    Resolution index of the settings of one tenant
+    """
+
+    def __init__(self, settings_docs: Iterable[SettingsMasterDocument]):
+        """
+        Constructor
+
+        Args:
+            settings_docs: All settings documents of the tenant
+        """
+        self._values: dict[tuple[str, Optional[str], Optional[int]], str] = {}
+        self._defaults: dict[str, str] = {}
+        for settings_doc in settings_docs:
+            self._defaults[settings_doc.name] = settings_doc.default_value
+            for value in settings_doc.values or []:
+                # the first value of a scope wins, as in the former linear search
+                self._values.setdefault((settings_doc.name, value.store_code, value.terminal_no), value.value)
+
+    def resolve(self, name: str, store_code: Optional[str], terminal_no: Optional[int]):
+        """
+        Resolve the value of a setting for a terminal
+
+        The value for the store and terminal is used first, then the value for
+        the store, then the global value and finally the default value.
+
+        Args:
+            name: Name of the setting
+            store_code: Store code
+            terminal_no: Terminal number
+
+        Returns:
+            The resolved value, or NOT_FOUND if the setting does not exist
+        """
+        if name not in self._defaults:
+            return NOT_FOUND
+        for key in ((name, store_code, terminal_no), (name, store_code, None), (name, None, None)):
+            value = self._values.get(key, NOT_FOUND)
+            if value is not NOT_FOUND:
+                return value
+        return self._defaults[name]
+
+    @property
+    def names(self) -> list[str]:
+        """Names of all settings of the tenant"""
+        return list(self._defaults)
+
+    def __len__(self) -> int:
+        return len(self._defaults)
+
+
+class SettingsResolutionIndexCache:
+    """
+    Cache of the settings resolution indexes of the tenants
+    """
+
+    def __init__(self, ttl_seconds: int):
+        """
+        Constructor
+
+        Args:
+            ttl_seconds: Time to live of an index in seconds
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, SettingsResolutionIndex]] = {}
+        self._generations: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get_index_async(
+        self, tenant_id: str, load_async: Callable[[], Awaitable[list[SettingsMasterDocument]]]
+    ) -> SettingsResolutionIndex:
+        """
+        Get the index of a tenant, building it if it is missing or expired
+
+        Concurrent requests for the same tenant wait for a single build.
+
+        Args:
+            tenant_id: Tenant identifier
+            load_async: Function loading all settings documents of the tenant
+
+        Returns:
+            The resolution index of the tenant
+        """
+        index = self.__get_valid(tenant_id)
+        if index is not None:
+            return index
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            index = self.__get_valid(tenant_id)
+            if index is not None:
+                return index
+            generation = self._generations.get(tenant_id, 0)
+            index = SettingsResolutionIndex(await load_async())
+            # do not keep an index that was invalidated while it was being built
+            if self._generations.get(tenant_id, 0) == generation:
+                self._entries[tenant_id] = (time.monotonic() + self.ttl_seconds, index)
+            return index
+
+    def invalidate(self, tenant_id: str) -> None:
+        """
+        Remove the index of a tenant
+
+        Args:
+            tenant_id: Tenant identifier
+        """
+        self._entries.pop(tenant_id, None)
+        self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+
+    def clear(self) -> None:
+        """Remove all indexes"""
+        for tenant_id in list(self._entries):
+            self.invalidate(tenant_id)
+
+    def __get_valid(self, tenant_id: str) -> Optional[SettingsResolutionIndex]:
+        entry = self._entries.get(tenant_id)
+        if entry is None:
+            return None
+        expires_at, index = entry
+        if expires_at <= time.monotonic():
+            del self._entries[tenant_id]
+            return None
+        return index
+
+
+settings_resolution_cache = SettingsResolutionIndexCache(
+    ttl_seconds=(
+        settings.SETTINGS_RESOLUTION_INDEX_TTL_SECONDS_WITH_EVENTS
+        if settings.MASTER_DATA_EVENTS_ENABLED
+        else settings.SETTINGS_RESOLUTION_INDEX_TTL_SECONDS
+    )
+)
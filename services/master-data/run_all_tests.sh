@@ -22,6 +22,15 @@ test_files=(
     "tests/test_setup_data.py"
     "tests/test_health.py"
     "tests/test_operations.py"
+    "tests/test_item_book_detail.py"
+    "tests/test_master_snapshot.py"
+    "tests/test_master_data_events.py"
+    "tests/test_item_import.py"
+    "tests/test_settings_resolution.py"
+    "tests/test_grpc_master_data.py"
+    "tests/test_item_detail_cache.py"
+    "tests/test_grpc_server.py"
+    "tests/test_conditional_response.py"
 )
 
 TOTAL_TESTS=${#test_files[@]}
@@ -0,0 +1,110 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from datetime import datetime
+from typing import List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from kugel_common.schemas.api_response import ApiResponse
+from kugel_common.schemas.base_schemas import Metadata
+from kugel_common.schemas.pagination import PaginatedResult
+from kugel_common.security import get_tenant_id_with_security_by_query_optional
+
+from app.api.common.conditional_response import encode_response
+from app.api.v1 import category_master
+from app.api.v1.schemas import CategoryMasterResponse
+from app.models.documents.category_master_document import CategoryMasterDocument
+
+TENANT_ID = "T0001"
+
+
+def _make_response(description: str = "Food") -> ApiResponse:
+    category = CategoryMasterResponse(
+        category_code="01",
+        description=description,
+        description_short="F",
+        tax_code="01",
+        entry_datetime="2025-01-01T09:30:00.123Z",
+    )
+    return ApiResponse(
+        success=True,
+        code=200,
+        message="Categories found",
+        data=[category.model_dump()],
+        metadata=Metadata(total=1, page=1, limit=0, sort="categoryCode:1", filter=None).model_dump(),
+        operation="get_categories",
+    )
+
+
+def _make_client(description: str = "Food") -> TestClient:
+    service = MagicMock()
+    document = CategoryMasterDocument(
+        tenant_id=TENANT_ID,
+        category_code="01",
+        description=description,
+        description_short="F",
+        tax_code="01",
+        created_at=datetime(2025, 1, 1),
+    )
+    metadata = Metadata(total=1, page=1, limit=0, sort="category_code:1", filter=None)
+    service.get_categories_paginated_async = AsyncMock(
+        return_value=PaginatedResult(data=[document], metadata=metadata)
+    )
+    patcher = patch.object(category_master, "get_category_master_service_async", AsyncMock(return_value=service))
+    patcher.start()
+    app = FastAPI()
+    app.include_router(category_master.router, prefix="/api/v1")
+    app.dependency_overrides[get_tenant_id_with_security_by_query_optional] = lambda: TENANT_ID
+    client = TestClient(app)
+    client.patcher = patcher
+    return client
+
+
+def test_encoded_body_matches_fastapi_serialization():
+    response_model = ApiResponse[List[CategoryMasterResponse]]
+    app = FastAPI()
+
+    @app.get("/plain", response_model=response_model)
+    async def plain():
+        return _make_response()
+
+    body = TestClient(app).get("/plain").content
+    assert encode_response(_make_response(), response_model) == body
+
+
+def test_list_returns_etag_and_honors_if_none_match():
+    client = _make_client()
+    try:
+        url = f"/api/v1/tenants/{TENANT_ID}/categories?limit=0"
+        first = client.get(url)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+        assert first.json()["data"][0]["categoryCode"] == "01"
+
+        not_modified = client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+
+        assert client.get(url, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+    finally:
+        client.patcher.stop()
+
+
+def test_etag_changes_with_content():
+    client = _make_client("Food")
+    try:
+        etag = client.get(f"/api/v1/tenants/{TENANT_ID}/categories").headers["etag"]
+    finally:
+        client.patcher.stop()
+
+    client = _make_client("Drinks")
+    try:
+        changed = client.get(f"/api/v1/tenants/{TENANT_ID}/categories", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+    finally:
+        client.patcher.stop()
@@ -0,0 +1,136 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from kugel_common.grpc import item_service_pb2
+
+from app.grpc.item_service_impl import ItemServiceImpl
+from app.grpc.master_data_service_impl import MasterDataServiceImpl
+from app.models.documents.category_master_document import CategoryMasterDocument
+from app.models.documents.item_common_master_document import ItemCommonMasterDocument
+from app.models.documents.item_store_master_document import ItemStoreMasterDocument
+from app.services.item_store_master_service import ItemStoreMasterService
+from app.utils.item_detail_cache import item_detail_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_item_detail_cache():
+    item_detail_cache.clear()
+    yield
+    item_detail_cache.clear()
+
+
+def _item(item_code: str, unit_price: float) -> ItemCommonMasterDocument:
+    return ItemCommonMasterDocument(
+        tenant_id="T0001", item_code=item_code, description=f"Item {item_code}", unit_price=unit_price, tax_code="01"
+    )
+
+
+def _item_store_master_service(store_code: str) -> ItemStoreMasterService:
+    item_common_repo = MagicMock()
+    item_common_repo.tenant_id = "T0001"
+    item_common_repo.get_items_by_codes_async = AsyncMock(return_value=[_item("B", 200.0), _item("A", 100.0)])
+    item_store_repo = MagicMock()
+    item_store_repo.store_code = store_code
+    item_store_repo.get_item_stores_by_codes_async = AsyncMock(return_value={"A": _item_store("A", 90.0)})
+    return ItemStoreMasterService(item_store_repo, item_common_repo)
+
+
+def _item_store(item_code: str, store_price: float) -> ItemStoreMasterDocument:
+    return ItemStoreMasterDocument(
+        tenant_id="T0001",
+        store_code="S001",
+        item_code=item_code,
+        store_price=store_price,
+        created_at=datetime(2025, 2, 1),
+        updated_at=datetime(2025, 3, 1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_item_store_details_by_codes_keeps_request_order():
+    service = _item_store_master_service("S001")
+
+    items = await service.get_item_store_details_by_codes_async(["A", "MISSING", "B", "A"])
+
+    assert [item.item_code for item in items] == ["A", "B"]
+    assert items[0].store_price == 90.0
+    assert items[1].store_price is None
+    service.item_store_master_repo.get_item_stores_by_codes_async.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_item_store_detail_same_from_single_and_batch_lookup():
+    service = _item_store_master_service("S001")
+    service.item_common_master_repo.get_item_with_store_async = AsyncMock(
+        return_value=(_item("A", 100.0), _item_store("A", 90.0))
+    )
+
+    single = await service.get_item_store_detail_by_code_async("A")
+    item_detail_cache.clear()
+    (batch,) = await service.get_item_store_details_by_codes_async(["A"])
+
+    # both fill the item detail cache, so both apply the store-specific timestamps
+    assert batch == single
+    assert batch.updated_at == datetime(2025, 3, 1)
+    assert batch.created_at == datetime(2025, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_batch_get_item_details():
+    service = _item_store_master_service("S001")
+    context = MagicMock()
+    request = item_service_pb2.BatchItemDetailRequest(
+        tenant_id="T0001", store_code="S001", item_codes=["A", "B", "MISSING"]
+    )
+
+    with patch(
+        "app.grpc.item_service_impl.get_item_store_master_service_async", AsyncMock(return_value=service)
+    ):
+        response = await ItemServiceImpl().BatchGetItemDetails(request, context)
+
+    assert [(item.item_code, item.price) for item in response.items] == [("A", 90), ("B", 200)]
+    assert list(response.not_found_item_codes) == ["MISSING"]
+    context.set_code.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_settings_and_category_map():
+    settings_service = MagicMock()
+    settings_service.resolve_settings_values_async = AsyncMock(return_value={"RECEIPT_WIDTH": "40", "UNKNOWN": None})
+    category_service = MagicMock()
+    category_service.get_categories_async = AsyncMock(
+        return_value=[CategoryMasterDocument(tenant_id="T0001", category_code="C01", description="Food")]
+    )
+    context = MagicMock()
+
+    with patch(
+        "app.grpc.master_data_service_impl.get_settings_master_service_async", AsyncMock(return_value=settings_service)
+    ), patch(
+        "app.grpc.master_data_service_impl.get_category_master_service_async", AsyncMock(return_value=category_service)
+    ):
+        settings_response = await MasterDataServiceImpl().ResolveSettings(
+            item_service_pb2.SettingsResolveRequest(
+                tenant_id="T0001", store_code="S001", terminal_no=1, names=["RECEIPT_WIDTH", "UNKNOWN"]
+            ),
+            context,
+        )
+        category_response = await MasterDataServiceImpl().GetCategoryMap(
+            item_service_pb2.MasterDataRequest(tenant_id="T0001"), context
+        )
+        streamed = [
+            category
+            async for category in MasterDataServiceImpl().StreamCategories(
+                item_service_pb2.MasterDataRequest(tenant_id="T0001"), context
+            )
+        ]
+
+    assert [(v.name, v.value, v.found) for v in settings_response.values] == [
+        ("RECEIPT_WIDTH", "40", True),
+        ("UNKNOWN", "", False),
+    ]
+    settings_service.resolve_settings_values_async.assert_awaited_once_with(["RECEIPT_WIDTH", "UNKNOWN"], "S001", 1)
+    assert category_response.categories["C01"].description == "Food"
+    assert [category.category_code for category in streamed] == ["C01"]
+    context.set_code.assert_not_called()
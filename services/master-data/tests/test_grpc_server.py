@@ -0,0 +1,101 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import grpc
+import pytest
+from grpc import aio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from kugel_common.exceptions import DocumentNotFoundException
+from kugel_common.grpc import item_service_pb2, item_service_pb2_grpc
+
+from app.config.settings import settings
+from app.grpc.item_service_impl import ItemServiceImpl
+from app.grpc.metrics import GrpcServerMetrics, MethodMetrics, MetricsInterceptor
+from app.grpc.server import get_server_options, start_grpc_server
+from app.models.documents.item_store_detail_document import ItemStoreDetailDocument
+from app.utils.item_detail_cache import item_detail_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_item_detail_cache():
+    item_detail_cache.clear()
+    yield
+    item_detail_cache.clear()
+
+
+def _item_store_master_service():
+    async def get_item_store_detail_by_code_async(item_code):
+        if item_code == "MISSING":
+            raise DocumentNotFoundException("not found", None)
+        return ItemStoreDetailDocument(item_code=item_code, description=f"Item {item_code}", unit_price=100.0)
+
+    async def get_item_store_details_by_codes_async(item_codes):
+        return [ItemStoreDetailDocument(item_code=item_code, unit_price=100.0) for item_code in item_codes]
+
+    service = MagicMock()
+    service.get_item_store_detail_by_code_async = get_item_store_detail_by_code_async
+    service.get_item_store_details_by_codes_async = get_item_store_details_by_codes_async
+    return service
+
+
+@pytest.mark.asyncio
+async def test_metrics_interceptor_records_calls():
+    metrics = GrpcServerMetrics()
+    server = aio.server(interceptors=[MetricsInterceptor(metrics)], options=get_server_options())
+    item_service_pb2_grpc.add_ItemServiceServicer_to_server(ItemServiceImpl(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        with patch(
+            "app.grpc.item_service_impl.get_item_store_master_service_async",
+            AsyncMock(return_value=_item_store_master_service()),
+        ):
+            async with aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                stub = item_service_pb2_grpc.ItemServiceStub(channel)
+                response = await stub.GetItemDetail(
+                    item_service_pb2.ItemDetailRequest(tenant_id="T0001", store_code="S001", item_code="A")
+                )
+                assert response.item_code == "A"
+                with pytest.raises(grpc.RpcError) as error:
+                    await stub.GetItemDetail(
+                        item_service_pb2.ItemDetailRequest(tenant_id="T0001", store_code="S001", item_code="MISSING")
+                    )
+                assert error.value.code() == grpc.StatusCode.NOT_FOUND
+                streamed = [
+                    item.item_code
+                    async for item in stub.StreamItemDetails(
+                        item_service_pb2.BatchItemDetailRequest(tenant_id="T0001", item_codes=["A", "B"])
+                    )
+                ]
+                assert streamed == ["A", "B"]
+    finally:
+        await server.stop(None)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["in_flight"] == 0
+    get_item_detail = snapshot["methods"]["/item_service.ItemService/GetItemDetail"]
+    assert get_item_detail["calls"] == 2
+    assert get_item_detail["errors"] == 1
+    assert get_item_detail["status_codes"] == {"OK": 1, "NOT_FOUND": 1}
+    stream_item_details = snapshot["methods"]["/item_service.ItemService/StreamItemDetails"]
+    assert stream_item_details["status_codes"] == {"OK": 1}
+
+
+def test_method_metrics_latency_percentiles():
+    metrics = MethodMetrics()
+    for latency_ms in [0.5] * 98 + [30.0, 3000.0]:
+        metrics.start()
+        metrics.finish(grpc.StatusCode.OK, latency_ms)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["calls"] == 100
+    assert snapshot["in_flight"] == 0
+    assert snapshot["p50_latency_ms"] == 1
+    assert snapshot["p99_latency_ms"] == 50
+    assert snapshot["max_latency_ms"] == 3000.0
+
+
+@pytest.mark.asyncio
+async def test_start_grpc_server_rejects_invalid_compression():
+    with patch.object(settings, "GRPC_COMPRESSION", "brotli"):
+        with pytest.raises(ValueError):
+            await start_grpc_server(0)
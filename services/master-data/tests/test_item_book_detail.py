@@ -0,0 +1,105 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.documents.item_book_master_document import ItemBookMasterDocument
+from app.services.item_book_master_service import ItemBookMasterService
+from app.utils.item_detail_cache import ItemBookDetailCache, invalidate_item_caches, item_book_detail_cache
+
+
+def _item_book(updated_at: datetime) -> ItemBookMasterDocument:
+    buttons = [{"item_code": code} for code in ["A", "B", "C", "A"]]
+    return ItemBookMasterDocument(
+        tenant_id="T0001",
+        item_book_id="20250101-0001",
+        updated_at=updated_at,
+        categories=[{"category_number": 1, "tabs": [{"tab_number": 1, "buttons": buttons}]}],
+    )
+
+
+@pytest.fixture
+def service():
+    item_book_detail_cache.clear()
+    item_book_repo = MagicMock(tenant_id="T0001")
+    item_book_repo.get_item_book_async = AsyncMock(return_value=_item_book(datetime(2025, 1, 1)))
+    item_common_repo = MagicMock(tenant_id="T0001")
+    item_common_repo.get_item_details_by_codes_async = AsyncMock(
+        return_value={
+            "A": {"item_code": "A", "description": "Item A", "unit_price": 100.0},
+            "B": {"item_code": "B", "description": "Item B", "unit_price": 200.0},
+        }
+    )
+    item_store_repo = MagicMock(tenant_id="T0001", store_code="S001")
+    item_store_repo.get_store_prices_by_codes_async = AsyncMock(return_value={"B": 180.0})
+    yield ItemBookMasterService(item_book_repo, item_common_repo, item_store_repo)
+    item_book_detail_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_item_book_detail_is_enriched_with_two_queries(service):
+    item_book = await service.get_item_book_detail_by_id_async("20250101-0001")
+
+    buttons = item_book.categories[0].tabs[0].buttons
+    assert [(b.description, b.unit_price) for b in buttons] == [
+        ("Item A", 100.0),
+        ("Item B", 180.0),
+        ("not found", None),
+        ("Item A", 100.0),
+    ]
+    service.item_common_master_repo.get_item_details_by_codes_async.assert_awaited_once_with(["A", "B", "C"])
+    service.item_store_master_repo.get_store_prices_by_codes_async.assert_awaited_once_with(["A", "B"])
+
+
+@pytest.mark.asyncio
+async def test_item_book_detail_cache_version_and_invalidation(service):
+    await service.get_item_book_detail_by_id_async("20250101-0001")
+    await service.get_item_book_detail_by_id_async("20250101-0001")
+    assert service.item_common_master_repo.get_item_details_by_codes_async.await_count == 1
+
+    # a store price change of another store keeps the entry
+    item_book_detail_cache.invalidate_items("T0001", ["B"], store_code="S002")
+    await service.get_item_book_detail_by_id_async("20250101-0001")
+    assert service.item_common_master_repo.get_item_details_by_codes_async.await_count == 1
+
+    # an item change invalidates the entry
+    item_book_detail_cache.invalidate_items("T0001", ["C"])
+    await service.get_item_book_detail_by_id_async("20250101-0001")
+    assert service.item_common_master_repo.get_item_details_by_codes_async.await_count == 2
+
+    # a new version of the item book is never served from the entry of the old one
+    service.item_book_master_repo.get_item_book_async.return_value = _item_book(datetime(2025, 1, 2))
+    await service.get_item_book_detail_by_id_async("20250101-0001")
+    assert service.item_common_master_repo.get_item_details_by_codes_async.await_count == 3
+
+
+def test_item_book_detail_cache_lru_and_ttl():
+    cache = ItemBookDetailCache(ttl_seconds=60, max_entries=2)
+    cache.put("T0001", "S001", "book1", None, {}, cache.generation)
+    cache.put("T0001", "S001", "book2", None, {}, cache.generation)
+    assert cache.get("T0001", "S001", "book1", None) == {}
+    cache.put("T0001", "S001", "book3", None, {}, cache.generation)
+    assert cache.get("T0001", "S001", "book2", None) is None
+    assert len(cache) == 2
+
+    expired = ItemBookDetailCache(ttl_seconds=0, max_entries=2)
+    expired.put("T0001", "S001", "book1", None, {}, expired.generation)
+    assert expired.get("T0001", "S001", "book1", None) is None
+
+
+@pytest.mark.asyncio
+async def test_item_book_detail_loaded_before_an_invalidation_is_not_cached(service):
+    get_item_details = service.item_common_master_repo.get_item_details_by_codes_async
+
+    async def get_item_details_by_codes_async(item_codes):
+        # an item of the book is written while its details are loaded
+        invalidate_item_caches("T0001", ["A"])
+        return get_item_details.return_value
+
+    get_item_details.side_effect = get_item_details_by_codes_async
+    await service.get_item_book_detail_by_id_async("20250101-0001")
+    assert len(item_book_detail_cache) == 0
+
+    get_item_details.side_effect = None
+    await service.get_item_book_detail_by_id_async("20250101-0001")
+    assert len(item_book_detail_cache) == 1
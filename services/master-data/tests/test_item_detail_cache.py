@@ -0,0 +1,118 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from kugel_common.exceptions import DocumentNotFoundException
+
+from app.models.documents.item_common_master_document import ItemCommonMasterDocument
+from app.models.documents.item_store_detail_document import ItemStoreDetailDocument
+from app.models.documents.item_store_master_document import ItemStoreMasterDocument
+from app.models.repositories.item_common_master_repository import ItemCommonMasterRepository
+from app.services.item_store_master_service import ItemStoreMasterService
+from app.utils.item_detail_cache import ItemCache, ItemDetailCache, item_detail_cache
+from app.utils.master_data_events import master_data_event_subscriber
+from kugel_common.utils.master_data_events import MasterDataChangeEvent, MasterDataEntity, MasterDataOperation
+
+
+@pytest.fixture(autouse=True)
+def clear_item_detail_cache():
+    item_detail_cache.clear()
+    yield
+    item_detail_cache.clear()
+
+
+def _service(store_code: str = "S001") -> ItemStoreMasterService:
+    item_common_repo = MagicMock()
+    item_common_repo.tenant_id = "T0001"
+    item_common_repo.get_item_with_store_async = AsyncMock(
+        return_value=(
+            ItemCommonMasterDocument(tenant_id="T0001", item_code="A", description="Apple", unit_price=100.0),
+            ItemStoreMasterDocument(tenant_id="T0001", store_code=store_code, item_code="A", store_price=90.0),
+        )
+    )
+    item_store_repo = MagicMock()
+    item_store_repo.store_code = store_code
+    return ItemStoreMasterService(item_store_repo, item_common_repo)
+
+
+def test_item_detail_cache_generation_and_invalidation():
+    cache = ItemDetailCache(ttl_seconds=60, max_entries=2)
+    generation = cache.generation
+    cache.invalidate_items("T0001", ["A"])
+    # a detail loaded before the invalidation is not stored
+    cache.put("T0001", "S001", ItemStoreDetailDocument(item_code="A"), generation)
+    assert cache.get("T0001", "S001", "A") is None
+
+    for item_code in ["A", "B", "C"]:
+        cache.put("T0001", "S001", ItemStoreDetailDocument(item_code=item_code), cache.generation)
+    assert len(cache) == 2
+    assert cache.get("T0001", "S001", "A") is None
+
+    cache.put("T0001", "S002", ItemStoreDetailDocument(item_code="B"), cache.generation)
+    cache.invalidate_items("T0001", ["B"], store_code="S001")
+    assert cache.get("T0001", "S001", "B") is None
+    assert cache.get("T0001", "S002", "B") is not None
+    cache.invalidate_items("T0001", ["B"])
+    assert cache.get("T0001", "S002", "B") is None
+
+
+def test_item_cache_requires_contains_items():
+    # subclasses define which items an entry depends on
+    with pytest.raises(TypeError):
+        ItemCache(ttl_seconds=60, max_entries=10)
+
+
+def test_item_detail_cache_expires():
+    cache = ItemDetailCache(ttl_seconds=0, max_entries=10)
+    cache.put("T0001", None, ItemStoreDetailDocument(item_code="A"), cache.generation)
+    assert cache.get("T0001", None, "A") is None
+
+
+@pytest.mark.asyncio
+async def test_item_store_detail_read_through():
+    service = _service()
+
+    first = await service.get_item_store_detail_by_code_async("A")
+    first.description = "changed by the caller"
+    second = await service.get_item_store_detail_by_code_async("A")
+
+    assert second.description == "Apple"
+    assert second.store_price == 90.0
+    service.item_common_master_repo.get_item_with_store_async.assert_awaited_once_with("A", "S001")
+
+    # change events of the item drop the cached detail
+    await master_data_event_subscriber.dispatch_async(
+        MasterDataChangeEvent(
+            tenant_id="T0001",
+            entity=MasterDataEntity.PRICE,
+            operation=MasterDataOperation.UPDATED,
+            keys=["A"],
+            store_code="S001",
+        )
+    )
+    await service.get_item_store_detail_by_code_async("A")
+    assert service.item_common_master_repo.get_item_with_store_async.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_item_store_detail_not_found():
+    service = _service()
+    service.item_common_master_repo.get_item_with_store_async = AsyncMock(return_value=(None, None))
+
+    with pytest.raises(DocumentNotFoundException):
+        await service.get_item_store_detail_by_code_async("MISSING")
+    assert len(item_detail_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_item_invalidates_after_the_write():
+    repo = ItemCommonMasterRepository(MagicMock(), "T0001")
+
+    async def delete_async(filter):
+        # a GetItemDetail served while the delete is in flight caches the old detail
+        item_detail_cache.put("T0001", "S001", ItemStoreDetailDocument(item_code="A"), item_detail_cache.generation)
+        return True
+
+    repo.delete_async = delete_async
+    await repo.delete_item_async("A")
+    assert item_detail_cache.get("T0001", "S001", "A") is None
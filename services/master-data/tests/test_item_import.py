@@ -0,0 +1,213 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from pymongo.errors import BulkWriteError
+
+from app.models.documents.item_import_job_document import ItemImportJobDocument
+from app.services import item_import_service
+from app.services.item_import_service import ItemImportService, iter_lines_async, resolve_import_format
+from app.utils.bulk_upsert_helper import BulkUpsertResult, unordered_bulk_upsert_async
+
+
+async def _chunks(data: bytes, size: int = 7):
+    # small chunks so that lines are split across chunks
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _make_service(existing_codes: list[str] = None, upsert_errors: dict[int, str] = None) -> ItemImportService:
+    item_common_repo = MagicMock(tenant_id="T0001")
+    item_common_repo.bulk_upsert_items_async = AsyncMock(
+        side_effect=lambda items: BulkUpsertResult(upserted_count=len(items), errors=upsert_errors or {})
+    )
+    item_common_repo.get_item_details_by_codes_async = AsyncMock(
+        side_effect=lambda codes: {code: {"item_code": code} for code in codes if code in (existing_codes or [])}
+    )
+    item_store_repo = MagicMock(tenant_id="T0001", store_code="S001")
+    item_store_repo.bulk_upsert_item_stores_async = AsyncMock(
+        side_effect=lambda items: BulkUpsertResult(modified_count=len(items))
+    )
+    job_repo = MagicMock()
+    job_repo.create_job_async = AsyncMock(side_effect=lambda job: job)
+    job_repo.replace_job_async = AsyncMock(return_value=True)
+    return ItemImportService(item_common_repo, job_repo, item_store_repo)
+
+
+def _item(code: str, **fields) -> dict:
+    item = {
+        "itemCode": code,
+        "description": f"Item {code}",
+        "unitPrice": 100,
+        "unitCost": 50,
+        "itemDetails": [],
+        "imageUrls": [],
+        "categoryCode": "001",
+        "taxCode": "01",
+    }
+    item.update(fields)
+    return item
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_and_format():
+    lines = [line async for line in iter_lines_async(_chunks("﻿a,b\r\nc,d\n\ne".encode("utf-8"), size=3))]
+    assert lines == ["a,b", "c,d", "", "e"]
+    assert resolve_import_format(None, "text/csv; charset=utf-8") == "csv"
+    assert resolve_import_format(None, None) == "ndjson"
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_reports_row_errors():
+    service = _make_service(upsert_errors={0: "E11000 duplicate key"})
+    lines = [
+        json.dumps(_item("A001")),
+        "{not json",
+        json.dumps(_item("A002", unitPrice="abc")),
+        json.dumps(_item("A003")),
+        json.dumps(_item("A003", description="latest")),
+    ]
+    job = await service.import_items_async(_chunks("\n".join(lines).encode("utf-8")), "ndjson")
+
+    assert job.status == "completed"
+    assert job.total_rows == 5
+    # row 2 is not JSON, row 3 is invalid, row 4 is replaced by row 5, A001 fails in bulk_write
+    assert [(error.row, error.item_code) for error in job.errors] == [(2, None), (3, "A002"), (4, "A003"), (1, "A001")]
+    assert "unitPrice" in job.errors[1].message
+    assert job.errors[2].message == "replaced by row 5 with the same item_code"
+    # the last row of A003 wins
+    items = service.item_common_master_repo.bulk_upsert_items_async.call_args.args[0]
+    assert [item["item_code"] for item in items] == ["A001", "A003"]
+    assert items[1]["description"] == "latest"
+
+
+@pytest.mark.asyncio
+async def test_import_writes_in_chunks(monkeypatch):
+    monkeypatch.setattr(item_import_service.settings, "ITEM_IMPORT_CHUNK_SIZE", 2)
+    service = _make_service()
+    data = "\n".join(json.dumps(_item(f"A{i:03}")) for i in range(5)).encode("utf-8")
+    job = await service.import_items_async(_chunks(data), "ndjson")
+
+    assert job.upserted_count == 5
+    assert service.item_common_master_repo.bulk_upsert_items_async.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_import_item_stores_csv_requires_common_item():
+    service = _make_service(existing_codes=["A001"])
+    data = "item_code,store_price\nA001,120\nZ999,130\nA001\n"
+    job = await service.import_item_stores_async(_chunks(data.encode("utf-8")), "csv")
+
+    assert job.total_rows == 3
+    assert job.modified_count == 1
+    assert [(error.row, error.item_code) for error in job.errors] == [(3, None), (2, "Z999")]
+    items = service.item_store_master_repo.bulk_upsert_item_stores_async.call_args.args[0]
+    assert items == [{"item_code": "A001", "store_price": 120.0}]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_empty_lists_and_unset_fields():
+    service = _make_service()
+    data = (
+        "item_code,description,unit_price,unit_cost,item_details,image_urls,category_code,tax_code\n"
+        "A001,Apple,100,50,,a.png|b.png,001,01\n"
+    )
+    job = await service.import_items_async(_chunks(data.encode("utf-8")), "csv")
+
+    assert job.error_count == 0
+    items = service.item_common_master_repo.bulk_upsert_items_async.call_args.args[0]
+    assert items[0]["item_details"] == []
+    assert items[0]["image_urls"] == ["a.png", "b.png"]
+    # defaults are not written, the stored values are kept
+    assert "is_discount_restricted" not in items[0]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_quoted_values_span_lines():
+    service = _make_service()
+    data = (
+        "item_code,description,unit_price,unit_cost,item_details,image_urls,category_code,tax_code\n"
+        'A001,"Apple\r\n\n""Fuji""",100,50,,,001,01\n'
+        "A002,Banana,90,40,,,001,01\n"
+        'A003,"never closed,90,40,,,001,01\n'
+    )
+    job = await service.import_items_async(_chunks(data.encode("utf-8"), size=5), "csv")
+
+    assert job.total_rows == 3
+    assert [(error.row, error.message) for error in job.errors] == [(3, "unterminated quoted value")]
+    items = service.item_common_master_repo.bulk_upsert_items_async.call_args.args[0]
+    assert [item["description"] for item in items] == ['Apple\n\n"Fuji"', "Banana"]
+
+
+@pytest.mark.asyncio
+async def test_get_import_job_fails_stale_job():
+    service = _make_service()
+    running = ItemImportJobDocument(tenant_id="T0001", job_id="J1", status="running")
+    failed = ItemImportJobDocument(tenant_id="T0001", job_id="J1", status="failed", message="abandoned")
+    job_repo = service.item_import_job_repo
+    job_repo.get_job_async = AsyncMock(side_effect=[running, failed])
+    job_repo.fail_stale_job_async = AsyncMock(return_value=True)
+
+    job = await service.get_import_job_async("J1")
+    assert job.status == "failed"
+    assert job_repo.fail_stale_job_async.call_args.args[0] == "J1"
+
+    job_repo.get_job_async = AsyncMock(return_value=running)
+    job_repo.fail_stale_job_async = AsyncMock(return_value=False)
+    assert (await service.get_import_job_async("J1")).status == "running"
+
+
+@pytest.mark.asyncio
+async def test_import_job_runs_in_background():
+    service = _make_service()
+    data = "\n".join(json.dumps(_item(f"A{i:03}")) for i in range(3)).encode("utf-8")
+    job = await service.start_import_job_async(_chunks(data), "ndjson", "item_common")
+    assert job.status == "queued"
+
+    await asyncio.gather(*item_import_service._import_tasks)
+    stored = service.item_import_job_repo.replace_job_async.call_args.args[0]
+    assert stored.job_id == job.job_id
+    assert stored.status == "completed"
+    assert stored.upserted_count == 3
+
+
+@pytest.mark.asyncio
+async def test_import_job_spool_removed_when_upload_fails(monkeypatch):
+    service = _make_service()
+    spooled = []
+    named_temporary_file = item_import_service.tempfile.NamedTemporaryFile
+
+    def spool_file(**kwargs):
+        spooled.append(named_temporary_file(**kwargs))
+        return spooled[-1]
+
+    async def failing_chunks():
+        yield b"{}"
+        raise ConnectionError("client disconnected")
+
+    monkeypatch.setattr(item_import_service.tempfile, "NamedTemporaryFile", spool_file)
+    with pytest.raises(ConnectionError):
+        await service.start_import_job_async(failing_chunks(), "ndjson", "item_common")
+
+    assert spooled[0].closed
+    assert not item_import_service.os.path.exists(spooled[0].name)
+    service.item_import_job_repo.create_job_async.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unordered_bulk_upsert_maps_write_errors():
+    collection = MagicMock()
+    collection.name = "master_item_common"
+    collection.bulk_write = AsyncMock(
+        side_effect=BulkWriteError(
+            {"writeErrors": [{"index": 1, "errmsg": "E11000 duplicate key"}], "nUpserted": 1, "nModified": 1}
+        )
+    )
+    result = await unordered_bulk_upsert_async(collection, ["op1", "op2", "op3"])
+
+    assert collection.bulk_write.call_args.kwargs["ordered"] is False
+    assert result.upserted_count == 1
+    assert result.modified_count == 1
+    assert result.errors == {1: "E11000 duplicate key"}
@@ -0,0 +1,144 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from kugel_common.utils.master_data_events import MasterDataChangeEvent, MasterDataEntity, MasterDataOperation
+
+from app.config.settings import settings
+from app.services import master_snapshot_service
+from app.utils import master_data_events
+from app.utils.item_detail_cache import item_book_detail_cache
+from app.utils.master_data_change_stream import MasterDataChangeStreamWatcher, make_change_event
+
+DB_NAME = f"{settings.DB_NAME_PREFIX}_T0001"
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    item_book_detail_cache.clear()
+    master_snapshot_service._state_cache.clear()
+    yield
+    item_book_detail_cache.clear()
+    master_snapshot_service._state_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_emit_publishes_in_background_when_enabled():
+    publisher = AsyncMock()
+    with patch.object(master_data_events, "get_master_data_event_publisher", return_value=publisher), patch.object(
+        master_data_events, "settings"
+    ) as mock_settings:
+        mock_settings.MASTER_DATA_EVENTS_ENABLED = False
+        master_data_events.emit_master_data_change("T0001", MasterDataEntity.ITEM, MasterDataOperation.UPDATED, ["A"])
+        await asyncio.sleep(0)
+        publisher.publish_async.assert_not_awaited()
+
+        mock_settings.MASTER_DATA_EVENTS_ENABLED = True
+        mock_settings.MASTER_DATA_EVENT_SOURCE = master_data_events.EVENT_SOURCE_REPOSITORY
+        master_data_events.emit_master_data_change(
+            "T0001", MasterDataEntity.PRICE, MasterDataOperation.UPDATED, ["A"], store_code="S001"
+        )
+        await asyncio.gather(*master_data_events._publish_tasks)
+
+    event = publisher.publish_async.await_args.args[0]
+    assert (event.tenant_id, event.entity, event.keys, event.store_code) == (
+        "T0001",
+        MasterDataEntity.PRICE,
+        ["A"],
+        "S001",
+    )
+
+
+@pytest.mark.asyncio
+async def test_received_events_invalidate_local_caches():
+    details_1 = {"A": {"description": "Item A", "unit_price": 1.0}}
+    details_2 = {"B": {"description": "Item B", "unit_price": 2.0}}
+    item_book_detail_cache.put("T0001", "S001", "BOOK1", None, details_1, item_book_detail_cache.generation)
+    item_book_detail_cache.put("T0001", "S001", "BOOK2", None, details_2, item_book_detail_cache.generation)
+    master_snapshot_service._state_cache[("T0001", "S001")] = (float("inf"), 1, '"1-abc"')
+
+    event = MasterDataChangeEvent(
+        tenant_id="T0001", entity=MasterDataEntity.ITEM, operation=MasterDataOperation.UPDATED, keys=["A"]
+    )
+    result = await master_data_events.master_data_event_subscriber.handle_message_async(
+        {"data": event.model_dump(mode="json")}
+    )
+
+    assert result == {"status": "SUCCESS"}
+    assert item_book_detail_cache.get("T0001", "S001", "BOOK1", None) is None
+    assert item_book_detail_cache.get("T0001", "S001", "BOOK2", None) is not None
+    assert ("T0001", "S001") not in master_snapshot_service._state_cache
+
+    result = await master_data_events.master_data_event_subscriber.handle_message_async({"data": {"entity": "x"}})
+    assert result == {"status": "DROP"}
+
+
+def test_make_change_event_from_change_stream():
+    event = make_change_event(
+        {
+            "operationType": "update",
+            "ns": {"db": DB_NAME, "coll": "master_item_store"},
+            "fullDocument": {"tenant_id": "T0001", "store_code": "S001", "item_code": "A", "store_price": 90.0},
+        }
+    )
+    assert (event.entity, event.operation, event.keys, event.store_code) == (
+        MasterDataEntity.PRICE,
+        MasterDataOperation.UPDATED,
+        ["A"],
+        "S001",
+    )
+
+    # deletions only carry the _id: the tenant comes from the database name and the keys are unknown
+    event = make_change_event(
+        {"operationType": "delete", "ns": {"db": DB_NAME, "coll": "master_payment"}, "documentKey": {}}
+    )
+    assert (event.tenant_id, event.entity, event.operation, event.keys) == (
+        "T0001",
+        MasterDataEntity.PAYMENT,
+        MasterDataOperation.DELETED,
+        [],
+    )
+
+    assert make_change_event({"operationType": "insert", "ns": {"db": DB_NAME, "coll": "other"}}) is None
+
+
+def _make_lease(acquired: bool, resume_token=None) -> MagicMock:
+    lease = MagicMock()
+    lease.ttl_seconds = 0.03
+    lease.owner_id = "replica"
+    lease.acquire_async = AsyncMock(return_value=acquired)
+    lease.renew_async = AsyncMock(return_value=True)
+    lease.get_async = AsyncMock(return_value={"_id": "master_data_change_stream", "resume_token": resume_token})
+    lease.release_async = AsyncMock()
+    return lease
+
+
+@pytest.mark.asyncio
+async def test_change_stream_watched_only_by_lease_holder():
+    follower = MasterDataChangeStreamWatcher(MagicMock(), AsyncMock(), _make_lease(False))
+    follower._watch_async = AsyncMock()
+    follower.start()
+    await asyncio.sleep(0.05)
+    await follower.stop()
+    follower._watch_async.assert_not_awaited()
+    assert follower.lease.acquire_async.await_count >= 2
+
+    leader_lease = _make_lease(True, resume_token={"_data": "token"})
+    leader = MasterDataChangeStreamWatcher(MagicMock(), AsyncMock(), leader_lease)
+    watching = asyncio.Event()
+
+    async def watch():
+        watching.set()
+        await asyncio.sleep(3600)
+
+    leader._watch_async = watch
+    leader.start()
+    await asyncio.wait_for(watching.wait(), 1)
+    assert leader.is_leader
+    assert leader._resume_token == {"_data": "token"}
+    await asyncio.sleep(0.05)
+    leader_lease.renew_async.assert_awaited_with({"resume_token": {"_data": "token"}})
+    await leader.stop()
+    assert not leader.is_leader
+    leader_lease.release_async.assert_awaited_once()
@@ -0,0 +1,197 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import gzip
+import json
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from kugel_common.security import get_tenant_id_with_security_by_query_optional
+
+from app.api.v1 import master_snapshot
+from app.models.documents.tax_master_document import TaxMasterDocument
+from app.config.settings import settings
+from app.models.repositories.master_snapshot_repository import (
+    SNAPSHOT_SECTIONS,
+    MasterSnapshotRepository,
+    SnapshotScope,
+    from_version,
+    sections_for_scope,
+    to_version,
+)
+from app.services import master_snapshot_service
+from app.services.master_snapshot_service import MasterSnapshotService, encoding_etag
+
+UPDATED_AT = datetime(2025, 1, 1, 9, 30, 0, 123000)
+
+
+def _make_service(item_count: int = 2, scope: str = SnapshotScope.ALL) -> MasterSnapshotService:
+    snapshot_repo = MagicMock(tenant_id="T0001", store_code="S001")
+    states = {"items": (to_version(UPDATED_AT), item_count), "store_prices": (0, 0), "categories": (0, 0)}
+    snapshot_repo.get_section_states_async = AsyncMock(return_value=states)
+
+    async def get_documents_async(section, since=None):
+        if section.name == "items":
+            return [{"item_code": "A", "description": "Item A", "updated_at": UPDATED_AT}]
+        return []
+
+    snapshot_repo.get_documents_async = AsyncMock(side_effect=get_documents_async)
+    snapshot_repo.get_keys_async = AsyncMock(return_value=["A"])
+    tax_repo = MagicMock()
+    tax_repo.load_all_taxes = AsyncMock(return_value=[TaxMasterDocument(tax_code="01", rate=10.0)])
+    return MasterSnapshotService(snapshot_repo, tax_repo, scope)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    master_snapshot_service._state_cache.clear()
+    master_snapshot_service._body_cache.clear()
+    yield
+    master_snapshot_service._state_cache.clear()
+    master_snapshot_service._body_cache.clear()
+
+
+def test_version_round_trip():
+    assert from_version(to_version(UPDATED_AT)) == UPDATED_AT
+    assert to_version(None) == 0
+
+
+def _make_db(latest: dict):
+    """Database whose collections return the latest document by the sorted timestamp field."""
+    collection = MagicMock()
+
+    async def find_one(filter, projection, sort):
+        field = sort[-1][0]
+        return {field: latest[field]} if field in latest else None
+
+    collection.find_one = AsyncMock(side_effect=find_one)
+    collection.count_documents = AsyncMock(return_value=3)
+    collection.find.return_value.to_list = AsyncMock(return_value=[])
+    collection.create_index = AsyncMock()
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    return db, collection
+
+
+@pytest.mark.asyncio
+async def test_section_version_read_from_latest_documents():
+    db, collection = _make_db({"updated_at": UPDATED_AT, "created_at": UPDATED_AT - timedelta(days=1)})
+    repo = MasterSnapshotRepository(db, "T0001", "S001")
+
+    states = await repo.get_section_states_async(sections_for_scope(SnapshotScope.STORE))
+
+    assert states == {"store_prices": (to_version(UPDATED_AT), 3)}
+    # index-backed lookups of the latest document instead of an aggregation over the section
+    sorts = [call.kwargs["sort"] for call in collection.find_one.await_args_list]
+    assert sorts == [
+        [("tenant_id", 1), ("store_code", 1), ("updated_at", -1)],
+        [("tenant_id", 1), ("store_code", 1), ("created_at", -1)],
+    ]
+    collection.aggregate.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_delta_rereads_overlap_window():
+    db, collection = _make_db({})
+    repo = MasterSnapshotRepository(db, "T0001", None)
+
+    await repo.get_documents_async(SNAPSHOT_SECTIONS[0], since=to_version(UPDATED_AT))
+
+    filter = collection.find.call_args.args[0]
+    since_time = UPDATED_AT - timedelta(seconds=settings.MASTER_SNAPSHOT_DELTA_OVERLAP_SECONDS)
+    assert filter["$or"] == [{"updated_at": {"$gte": since_time}}, {"created_at": {"$gte": since_time}}]
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_matches_database_setup_names():
+    db, collection = _make_db({})
+
+    await MasterSnapshotRepository.ensure_indexes_async(db)
+
+    names = {call.kwargs["name"] for call in collection.create_index.await_args_list}
+    assert f"{settings.DB_COLLECTION_NAME_ITEM_COMMON_MASTER}_index_tenant_id_updated_at" in names
+    assert f"{settings.DB_COLLECTION_NAME_ITEM_STORE_MASTER}_index_tenant_id_store_code_created_at" in names
+    assert len(names) == len(SNAPSHOT_SECTIONS) * 2
+
+
+@pytest.mark.asyncio
+async def test_version_and_etag_track_deletions():
+    version, etag = await _make_service(item_count=2).get_version_async()
+    assert version == to_version(UPDATED_AT)
+    assert etag.startswith(f'"{version}-')
+
+    # same latest timestamp but one document less (deleted) gives another ETag
+    master_snapshot_service._state_cache.clear()
+    _, etag_after_delete = await _make_service(item_count=1).get_version_async()
+    assert etag_after_delete != etag
+
+
+@pytest.mark.asyncio
+async def test_full_and_delta_snapshot():
+    service = _make_service()
+    full = await service.get_snapshot_async()
+    assert full["full"] is True
+    assert "keys" not in full
+    assert full["sections"]["items"][0]["item_code"] == "A"
+    assert full["sections"]["taxes"][0]["tax_code"] == "01"
+
+    delta = await service.get_snapshot_async(since=to_version(UPDATED_AT))
+    assert delta["full"] is False
+    assert delta["keys"]["items"] == ["A"]
+
+
+@pytest.mark.asyncio
+async def test_encoded_snapshot_is_compressed_and_cached():
+    service = _make_service()
+    envelope = {"success": True, "code": 200}
+    body, etag = await service.get_encoded_snapshot_async(compress=True, envelope=envelope)
+    data = json.loads(gzip.decompress(body))
+    assert data["success"] is True
+    assert data["data"]["etag"] == etag
+    assert data["data"]["sections"]["items"][0]["updated_at"] == UPDATED_AT.isoformat()
+
+    cached_body, _ = await service.get_encoded_snapshot_async(compress=True, envelope=envelope)
+    assert cached_body is body
+    # versions are computed once within MASTER_SNAPSHOT_VERSION_CACHE_SECONDS
+    assert service.snapshot_repo.get_section_states_async.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_tenant_and_store_scopes_split_the_sections():
+    tenant_snapshot = await _make_service(scope=SnapshotScope.TENANT).get_snapshot_async()
+    assert "store_prices" not in tenant_snapshot["sections"]
+    assert {"items", "categories", "payments", "settings", "taxes"} <= set(tenant_snapshot["sections"])
+
+    master_snapshot_service._state_cache.clear()
+    store_service = _make_service(scope=SnapshotScope.STORE)
+    store_snapshot = await store_service.get_snapshot_async()
+    assert set(store_snapshot["sections"]) == {"store_prices"}
+    sections = store_service.snapshot_repo.get_section_states_async.await_args.args[0]
+    assert [section.name for section in sections] == ["store_prices"]
+
+
+def test_encoding_etag():
+    assert encoding_etag('"1000-abc"', False) == '"1000-abc"'
+    assert encoding_etag('"1000-abc"', True) == '"1000-abc-gzip"'
+
+
+def test_etag_varies_by_encoding_and_matches_either():
+    service = _make_service(scope=SnapshotScope.TENANT)
+    app = FastAPI()
+    app.include_router(master_snapshot.router, prefix="/api/v1")
+    app.dependency_overrides[get_tenant_id_with_security_by_query_optional] = lambda: "T0001"
+    url = "/api/v1/tenants/T0001/master-snapshot"
+
+    with patch.object(master_snapshot, "get_master_snapshot_service_async", AsyncMock(return_value=service)):
+        client = TestClient(app)
+        identity = client.get(url, headers={"Accept-Encoding": "identity"})
+        compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert identity.status_code == compressed.status_code == 200
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["etag"] == encoding_etag(identity.headers["etag"], True)
+
+        not_modified = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["etag"]})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == compressed.headers["etag"]
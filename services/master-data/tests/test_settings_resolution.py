@@ -0,0 +1,89 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from kugel_common.exceptions import DocumentNotFoundException
+from kugel_common.utils.master_data_events import MasterDataChangeEvent, MasterDataEntity, MasterDataOperation
+
+from app.models.documents.settings_master_document import SettingsMasterDocument, SettingsValue
+from app.services.settings_master_service import SettingsMasterService
+from app.utils.master_data_events import master_data_event_subscriber
+from app.utils.settings_resolution_index import NOT_FOUND, SettingsResolutionIndex, settings_resolution_cache
+
+
+def _settings_docs() -> list[SettingsMasterDocument]:
+    return [
+        SettingsMasterDocument(
+            name="RECEIPT_HEADER",
+            default_value="default",
+            values=[
+                SettingsValue(store_code=None, terminal_no=None, value="global"),
+                SettingsValue(store_code="S001", terminal_no=None, value="store"),
+                SettingsValue(store_code="S001", terminal_no=1, value="terminal"),
+                SettingsValue(store_code="S001", terminal_no=1, value="duplicate"),
+            ],
+        ),
+        SettingsMasterDocument(name="INVOICE_NO", default_value="T000", values=None),
+    ]
+
+
+def _make_service() -> SettingsMasterService:
+    repo = MagicMock(tenant_id="T0001")
+    repo.get_settings_for_resolution_async = AsyncMock(side_effect=lambda: _settings_docs())
+    return SettingsMasterService(repo)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    settings_resolution_cache.clear()
+    yield
+    settings_resolution_cache.clear()
+
+
+def test_resolution_priority():
+    index = SettingsResolutionIndex(_settings_docs())
+    assert index.resolve("RECEIPT_HEADER", "S001", 1) == "terminal"
+    assert index.resolve("RECEIPT_HEADER", "S001", 2) == "store"
+    assert index.resolve("RECEIPT_HEADER", "S002", 1) == "global"
+    assert index.resolve("INVOICE_NO", "S001", 1) == "T000"
+    assert index.resolve("UNKNOWN", "S001", 1) is NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_index_is_built_once_and_invalidated():
+    service = _make_service()
+    repo = service.settings_master_repo
+
+    results = await asyncio.gather(
+        *[service.get_settings_value_by_name_async("RECEIPT_HEADER", "S001", 1) for _ in range(5)]
+    )
+    assert results == ["terminal"] * 5
+    assert await service.resolve_settings_values_async(["INVOICE_NO", "UNKNOWN"], "S001", 1) == {
+        "INVOICE_NO": "T000",
+        "UNKNOWN": None,
+    }
+    assert repo.get_settings_for_resolution_async.call_count == 1
+
+    with pytest.raises(DocumentNotFoundException):
+        await service.get_settings_value_by_name_async("UNKNOWN", "S001", 1)
+
+    # a settings change event of another replica drops the index
+    event = MasterDataChangeEvent(
+        tenant_id="T0001",
+        entity=MasterDataEntity.SETTINGS,
+        operation=MasterDataOperation.UPDATED,
+        keys=["RECEIPT_HEADER"],
+    )
+    await master_data_event_subscriber.dispatch_async(event)
+    await service.get_settings_value_by_name_async("RECEIPT_HEADER", "S001", 1)
+    assert repo.get_settings_for_resolution_async.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_names_resolve_all_settings():
+    service = _make_service()
+    assert await service.resolve_settings_values_async([], "S001", 2) == {
+        "RECEIPT_HEADER": "store",
+        "INVOICE_NO": "T000",
+    }
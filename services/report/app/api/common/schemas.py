@@ -231,3 +231,47 @@ class BaseItemReportResponse(BaseSchemaModel):
     total_transaction_count: int
     receipt_text: Optional[str] = None
     journal_text: Optional[str] = None
+
+
+# Report job schemas
+class BaseReportJobRequest(BaseSchemaModel):
+    """
+    Base schema for submitting an asynchronous report generation job.
+
+    Takes the same parameters as the synchronous report endpoints.
+    A terminal report is generated when terminal_no is specified.
+    """
+
+    report_scope: str  # Scope of the report: flash, daily
+    report_type: str  # Type of the report: sales, category, item, payment
+    terminal_no: Optional[int] = None  # Terminal number, None for the store report
+    business_date: Optional[str] = None  # Business date (ignored if date range is specified)
+    business_date_from: Optional[str] = None  # Start date for date range (YYYYMMDD)
+    business_date_to: Optional[str] = None  # End date for date range (YYYYMMDD)
+    open_counter: Optional[int] = None  # Open counter, None for total in business date
+    business_counter: Optional[int] = None  # Business counter for the report
+    limit: int = 100  # Limit of the number of records to return
+    page: int = 1  # Page number to return
+    sort: Optional[str] = None  # Sort order, e.g. "field1:1,field2:-1"
+
+
+class BaseReportJobResponse(BaseSchemaModel):
+    """
+    Base schema for the status of an asynchronous report generation job.
+
+    The generated report is retrieved from the result endpoint once the
+    status is completed.
+    """
+
+    job_id: str  # Job identifier used for polling
+    tenant_id: str
+    store_code: str
+    terminal_no: Optional[int] = None
+    report_scope: Optional[str] = None
+    report_type: Optional[str] = None
+    status: str  # pending, running, completed, failed
+    error_code: Optional[str] = None  # Error code if the job failed
+    error_message: Optional[str] = None  # Error message if the job failed
+    submitted_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
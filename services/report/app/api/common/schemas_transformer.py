@@ -5,6 +5,7 @@ from app.api.common.schemas import *
 from app.models.documents.sales_report_document import SalesReportDocument
 from app.models.documents.category_report_document import CategoryReportDocument
 from app.models.documents.item_report_document import ItemReportDocument
+from app.models.documents.report_job_document import ReportJobDocument
 
 logger = getLogger(__name__)
 
@@ -239,3 +240,31 @@ class SchemasTransformer:
             receipt_text=report_doc.receipt_text,
             journal_text=report_doc.journal_text,
         )
+
+    def transform_report_job_response(self, job: ReportJobDocument) -> BaseReportJobResponse:
+        """
+        Transform a report job document into a report job response schema.
+
+        The generated report itself is not included; it is returned by the
+        result endpoint.
+
+        Args:
+            job: The report job document to transform
+
+        Returns:
+            BaseReportJobResponse: API response schema with the job status
+        """
+        return BaseReportJobResponse(
+            job_id=job.job_id,
+            tenant_id=job.tenant_id,
+            store_code=job.store_code,
+            terminal_no=job.terminal_no,
+            report_scope=job.report_scope,
+            report_type=job.report_type,
+            status=job.status,
+            error_code=job.error_code,
+            error_message=job.error_message,
+            submitted_at=job.created_at.isoformat() if job.created_at else None,
+            started_at=job.started_at,
+            completed_at=job.completed_at,
+        )
@@ -0,0 +1,94 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from fastapi import APIRouter, status, Query, Depends, Path
+from fastapi.responses import StreamingResponse
+from logging import getLogger
+
+from kugel_common.security import get_tenant_id_with_security_by_query_optional, verify_tenant_id
+
+from app.services.tranlog_export_service import TranlogExportService
+from app.dependencies.get_report_service import get_tranlog_export_service
+
+# Create a router instance for export-related endpoints
+router = APIRouter()
+
+# Get a logger instance for this module
+logger = getLogger(__name__)
+
+
+# API export transaction facts for store  #  token or (api_key and terminal_id) is required
+@router.get(
+    "/tenants/{tenant_id}/stores/{store_code}/exports/tranlog-facts",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Bad Request"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+    },
+)
+async def export_tranlog_facts(
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    store_code: str = Path(...),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    fact_type: str = Query(..., description="Type of the facts: line_items, payments, taxes"),
+    export_format: str = Query("arrow", alias="format", description="Output format: arrow, parquet"),
+    business_date_from: str = Query(..., description="Start date for date range (YYYYMMDD format)"),
+    business_date_to: str = Query(..., description="End date for date range (YYYYMMDD format)"),
+    terminal_no: int = Query(None, description="Terminal number, None for all terminals in the store"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Number of transactions read per batch"),
+    export_service: TranlogExportService = Depends(get_tranlog_export_service),
+):
+    """
+    Export flattened transaction facts for a date range in a columnar format.
+
+    Streams line item, payment or tax facts as an Apache Arrow IPC stream or a
+    Parquet file. Transactions are read from MongoDB in batches and encoded
+    batch by batch, so memory usage does not grow with the date range.
+
+    Args:
+        tenant_id: The tenant identifier
+        tenant_id_with_security: The tenant ID extracted from security credentials
+        store_code: The store code to export facts for
+        terminal_id: The terminal ID when using API key authentication
+        fact_type: The type of facts to export (line_items, payments, taxes)
+        export_format: The output format (arrow, parquet)
+        business_date_from: Start date in YYYYMMDD format
+        business_date_to: End date in YYYYMMDD format
+        terminal_no: Optional terminal number to filter by
+        batch_size: Number of transactions read per batch
+        export_service: Injected export service dependency
+
+    Returns:
+        StreamingResponse: The encoded facts
+    """
+    logger.info(
+        f"Exporting {fact_type} facts as {export_format} for tenant_id: {tenant_id}, store_code: {store_code}, "
+        f"date_range: {business_date_from} to {business_date_to}"
+    )
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+
+    # validate before streaming starts so that errors are returned as regular error responses
+    export_service.validate_export_request(
+        fact_type=fact_type,
+        export_format=export_format,
+        business_date_from=business_date_from,
+        business_date_to=business_date_to,
+    )
+
+    extension = "arrows" if export_format == "arrow" else "parquet"
+    filename = f"{tenant_id}_{store_code}_{fact_type}_{business_date_from}_{business_date_to}.{extension}"
+    return StreamingResponse(
+        export_service.stream_facts_async(
+            fact_type=fact_type,
+            export_format=export_format,
+            business_date_from=business_date_from,
+            business_date_to=business_date_to,
+            store_code=store_code,
+            terminal_no=terminal_no,
+            batch_size=batch_size,
+        ),
+        media_type=export_service.get_media_type(export_format),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -10,9 +10,16 @@ from kugel_common.status_codes import StatusCodes
 from kugel_common.exceptions import ServiceException
 
 from app.api.v1.schemas_transformer import SchemasTransformerV1
-from app.api.v1.schemas import SalesReportResponse, CategoryReportResponse, ItemReportResponse
+from app.api.v1.schemas import (
+    SalesReportResponse,
+    CategoryReportResponse,
+    ItemReportResponse,
+    ReportJobRequest,
+    ReportJobResponse,
+)
 from app.services.report_service import ReportService
-from app.dependencies.get_report_service import get_report_service
+from app.services.report_job_service import ReportJobService
+from app.dependencies.get_report_service import get_report_service, get_report_job_service
 from app.dependencies.get_staff_info import get_requesting_staff_id
 from app.models.documents.sales_report_document import SalesReportDocument
 from app.models.documents.category_report_document import CategoryReportDocument
@@ -52,6 +59,109 @@ def parse_sort(sort: str = Query(default=None, description="?sort=field1:1,field
     return sort_list
 
 
+def validate_report_dates(
+    report_scope: str, business_date: Optional[str], business_date_from: Optional[str], business_date_to: Optional[str]
+) -> None:
+    """
+    Validate the combination of single date and date range parameters.
+
+    Args:
+        report_scope: The time scope of the report (flash or daily)
+        business_date: The business date in YYYYMMDD format
+        business_date_from: Start date for date range
+        business_date_to: End date for date range
+
+    Raises:
+        HTTPException: If the date parameters are not valid for the scope
+    """
+    if business_date_from and business_date_to:
+        # Date range mode
+        if report_scope == "flash":
+            # Flash reports are for current session only, date range not applicable
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Date range is not supported for flash reports. Flash reports are for the current session only."
+            )
+        if business_date:
+            logger.warning("Both single date and date range specified, using date range")
+    elif not business_date and not (business_date_from and business_date_to):
+        # Neither single date nor date range specified
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either business_date or both business_date_from and business_date_to must be specified"
+        )
+
+
+def parse_requesting_terminal_no(terminal_id: Optional[str]) -> Optional[int]:
+    """
+    Extract the terminal number from a terminal ID (format: tenant_id-store_code-terminal_no).
+
+    Args:
+        terminal_id: The terminal ID when using API key authentication
+
+    Returns:
+        The terminal number, or None if terminal_id is not given or cannot be parsed
+    """
+    if not terminal_id:
+        return None
+    try:
+        parts = terminal_id.split("-")
+        if len(parts) >= 3:
+            return int(parts[-1])
+    except (ValueError, IndexError):
+        logger.warning(f"Could not parse terminal number from terminal_id: {terminal_id}")
+    return None
+
+
+def verify_requesting_store(store_code: str, terminal_id: Optional[str]) -> None:
+    """
+    Verify that a terminal authenticated with an API key belongs to the store in the path.
+
+    Terminal IDs are formatted as tenant_id-store_code-terminal_no. Token (user)
+    requests are not restricted to a store.
+
+    Args:
+        store_code: The store code from the path
+        terminal_id: The terminal ID when using API key authentication
+
+    Raises:
+        HTTPException: If the terminal belongs to another store
+    """
+    if not terminal_id:
+        return
+    parts = terminal_id.split("-")
+    if len(parts) < 3 or parts[-2] != store_code:
+        message = f"Terminal does not belong to the store : store_code->{store_code}, terminal_id->{terminal_id}"
+        logger.error(message)
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=message)
+
+
+def transform_report_document(report_doc) -> dict:
+    """
+    Transform a generated report into the response data format.
+
+    Args:
+        report_doc: The report returned by the report service
+
+    Returns:
+        dict: The report data for the API response
+    """
+    transformer = SchemasTransformerV1()
+    if isinstance(report_doc, ItemReportDocument):
+        return_report = transformer.transform_item_report_response(report_doc)
+    elif isinstance(report_doc, CategoryReportDocument):
+        return_report = transformer.transform_category_report_response(report_doc)
+    elif isinstance(report_doc, PaymentReportDocument):
+        # Payment report document - use model_dump to convert to dict
+        return report_doc.model_dump(by_alias=False)
+    elif isinstance(report_doc, dict):
+        # Legacy: Payment report returns a dict directly
+        return report_doc
+    else:
+        return_report = transformer.transform_sales_report_response(report_doc)
+    return return_report.model_dump(by_alias=True)
+
+
 # API get report for store  #  token or (api_key and terminal_id) is required
 @router.get(
     "/tenants/{tenant_id}/stores/{store_code}/reports",
@@ -115,32 +225,10 @@ async def get_report_for_store(
     verify_tenant_id(tenant_id, tenant_id_with_security, logger)
     
     # Validate date parameters
-    if business_date_from and business_date_to:
-        # Date range mode
-        if report_scope == "flash":
-            # Flash reports are for current session only, date range not applicable
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Date range is not supported for flash reports. Flash reports are for the current session only."
-            )
-        if business_date:
-            logger.warning("Both single date and date range specified, using date range")
-    elif not business_date and not (business_date_from and business_date_to):
-        # Neither single date nor date range specified
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Either business_date or both business_date_from and business_date_to must be specified"
-        )
+    validate_report_dates(report_scope, business_date, business_date_from, business_date_to)
 
     # Extract terminal number from terminal_id if available (format: tenant_id-store_code-terminal_no)
-    requesting_terminal_no = None
-    if terminal_id:
-        try:
-            parts = terminal_id.split("-")
-            if len(parts) >= 3:
-                requesting_terminal_no = int(parts[-1])
-        except (ValueError, IndexError):
-            logger.warning(f"Could not parse terminal number from terminal_id: {terminal_id}")
+    requesting_terminal_no = parse_requesting_terminal_no(terminal_id)
 
     try:
         # Determine if this is an API key request (terminal_id is provided)
@@ -164,19 +252,7 @@ async def get_report_for_store(
             business_date_to=business_date_to,
         )
         # Transform based on report type
-        transformer = SchemasTransformerV1()
-        if isinstance(report_doc, ItemReportDocument):
-            return_report = transformer.transform_item_report_response(report_doc)
-        elif isinstance(report_doc, CategoryReportDocument):
-            return_report = transformer.transform_category_report_response(report_doc)
-        elif isinstance(report_doc, PaymentReportDocument):
-            # Payment report document - use model_dump to convert to dict
-            return_report = report_doc.model_dump(by_alias=False)
-        elif isinstance(report_doc, dict):
-            # Legacy: Payment report returns a dict directly
-            return_report = report_doc
-        else:
-            return_report = transformer.transform_sales_report_response(report_doc)
+        return_report = transform_report_document(report_doc)
     except TerminalNotClosedException as e:
         # Return specific error for terminals not closed
         error_response = ApiResponse(
@@ -213,7 +289,7 @@ async def get_report_for_store(
         success=True,
         code=status.HTTP_200_OK,
         message=f"{report_type.capitalize()} report fetched successfully",
-        data=return_report if isinstance(return_report, dict) else return_report.model_dump(by_alias=True),
+        data=return_report,
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
     return response
@@ -300,33 +376,11 @@ async def get_report_for_terminal(
     verify_tenant_id(tenant_id, tenant_id_with_security, logger)
     
     # Validate date parameters
-    if business_date_from and business_date_to:
-        # Date range mode
-        if report_scope == "flash":
-            # Flash reports are for current session only, date range not applicable
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Date range is not supported for flash reports. Flash reports are for the current session only."
-            )
-        if business_date:
-            logger.warning("Both single date and date range specified, using date range")
-    elif not business_date and not (business_date_from and business_date_to):
-        # Neither single date nor date range specified
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Either business_date or both business_date_from and business_date_to must be specified"
-        )
+    validate_report_dates(report_scope, business_date, business_date_from, business_date_to)
 
     try:
         # For terminal-specific reports, extract requesting terminal from terminal_id if available
-        requesting_terminal_no = None
-        if terminal_id:
-            try:
-                parts = terminal_id.split("-")
-                if len(parts) >= 3:
-                    requesting_terminal_no = int(parts[-1])
-            except (ValueError, IndexError):
-                logger.warning(f"Could not parse terminal number from terminal_id: {terminal_id}")
+        requesting_terminal_no = parse_requesting_terminal_no(terminal_id)
 
         # If no terminal_id (JWT auth), use the terminal_no from the path
         if requesting_terminal_no is None:
@@ -354,19 +408,7 @@ async def get_report_for_terminal(
             business_date_to=business_date_to,
         )
         # Transform based on report type
-        transformer = SchemasTransformerV1()
-        if isinstance(report_doc, ItemReportDocument):
-            return_report = transformer.transform_item_report_response(report_doc)
-        elif isinstance(report_doc, CategoryReportDocument):
-            return_report = transformer.transform_category_report_response(report_doc)
-        elif isinstance(report_doc, PaymentReportDocument):
-            # Payment report document - use model_dump to convert to dict
-            return_report = report_doc.model_dump(by_alias=False)
-        elif isinstance(report_doc, dict):
-            # Legacy: Payment report returns a dict directly
-            return_report = report_doc
-        else:
-            return_report = transformer.transform_sales_report_response(report_doc)
+        return_report = transform_report_document(report_doc)
     except TerminalNotClosedException as e:
         # Return specific error for terminal not closed
         error_response = ApiResponse(
@@ -401,7 +443,470 @@ async def get_report_for_terminal(
         success=True,
         code=status.HTTP_200_OK,
         message=f"{report_type.capitalize()} report fetched successfully",
-        data=return_report if isinstance(return_report, dict) else return_report.model_dump(by_alias=True),
+        data=return_report,
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+    return response
+
+
+async def _get_combined_report(
+    report_service: ReportService,
+    tenant_id: str,
+    store_code: str,
+    terminal_no: Optional[int],
+    terminal_id: Optional[str],
+    report_scope: str,
+    report_types: str,
+    business_date: Optional[str],
+    business_date_from: Optional[str],
+    business_date_to: Optional[str],
+    open_counter: Optional[int],
+    business_counter: Optional[int],
+    limit: int,
+    page: int,
+    sort: list[tuple[str, int]],
+    requesting_staff_id: Optional[str],
+    operation: str,
+) -> ApiResponse:
+    """
+    Generate several reports in one pass and wrap them in the standard API response.
+
+    Returns:
+        ApiResponse: Dictionary mapping report type to the report data
+    """
+    validate_report_dates(report_scope, business_date, business_date_from, business_date_to)
+
+    requesting_terminal_no = parse_requesting_terminal_no(terminal_id)
+    if requesting_terminal_no is None:
+        # If no terminal_id (JWT auth), use the terminal_no from the path
+        requesting_terminal_no = terminal_no
+    type_list = [report_type.strip() for report_type in report_types.split(",") if report_type.strip()]
+
+    try:
+        reports = await report_service.get_combined_report_async(
+            store_code=store_code,
+            terminal_no=terminal_no,
+            report_scope=report_scope,
+            report_types=type_list,
+            business_date=business_date,
+            open_counter=open_counter,
+            business_counter=business_counter,
+            limit=limit,
+            page=page,
+            sort=sort,
+            requesting_terminal_no=requesting_terminal_no,
+            requesting_staff_id=requesting_staff_id,
+            is_api_key_request=terminal_id is not None,
+            business_date_from=business_date_from,
+            business_date_to=business_date_to,
+        )
+        return_reports = {report_type: transform_report_document(report) for report_type, report in reports.items()}
+    except ServiceException as e:
+        _raise_service_exception(e, operation)
+    except Exception as e:
+        message = f"Failed to fetch {report_types} reports for tenant_id: {tenant_id}, store_code: {store_code}, terminal_no: {terminal_no}, Error: {e}"
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=message)
+
+    return ApiResponse(
+        success=True,
+        code=status.HTTP_200_OK,
+        message="Reports fetched successfully",
+        data=return_reports,
+        operation=operation,
+    )
+
+
+# API get several reports for store in one pass  #  token or (api_key and terminal_id) is required
+@router.get(
+    "/tenants/{tenant_id}/stores/{store_code}/reports/combined",
+    response_model=ApiResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Bad Request"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Unprocessable Entity"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+    },
+)
+async def get_combined_report_for_store(
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    store_code: str = Path(...),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    report_scope: str = Query(..., description="Scope of the report: flash, daily"),
+    report_types: str = Query(..., description="Comma separated report types, e.g. sales,payment,category,item"),
+    business_date: str = Query(None, description="Business date for flash and daily (single date or ignored if date range is specified)"),
+    business_date_from: str = Query(None, description="Start date for date range (YYYYMMDD format)"),
+    business_date_to: str = Query(None, description="End date for date range (YYYYMMDD format)"),
+    open_counter: int = Query(None, description="Open counter for flash and daily, None for total in business date"),
+    business_counter: int = Query(None, description="Business counter for the report"),
+    limit: int = Query(100, description="Limit of the number of records to return"),
+    page: int = Query(1, description="Page number to return"),
+    sort: list[tuple[str, int]] = Depends(parse_sort),
+    report_service: ReportService = Depends(get_report_service),
+    requesting_staff_id: Optional[str] = Depends(get_requesting_staff_id),
+):
+    """
+    Get several reports for the entire store in one pass.
+
+    The transaction logs are aggregated once for all requested report types,
+    and for API key requests the reports are sent to the journal as one entry.
+
+    Args:
+        tenant_id: The tenant identifier
+        tenant_id_with_security: The tenant ID extracted from security credentials
+        store_code: The store code to generate the reports for
+        terminal_id: The terminal ID when using API key authentication
+        report_scope: The time scope of the reports (flash or daily)
+        report_types: Comma separated report types (sales, payment, category, item)
+        business_date: The business date in YYYYMMDD format
+        business_date_from: Start date for date range
+        business_date_to: End date for date range
+        open_counter: Optional counter for the specific terminal session
+        business_counter: Optional business counter for the report
+        limit: Maximum number of records to return
+        page: Page number for pagination
+        sort: Sorting criteria
+        report_service: Injected report service dependency
+        requesting_staff_id: The staff ID of the requester
+
+    Returns:
+        ApiResponse: Dictionary mapping report type to the report data
+    """
+    logger.info(f"Fetching {report_types} reports for tenant_id: {tenant_id}, store_code: {store_code}")
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+    return await _get_combined_report(
+        report_service=report_service,
+        tenant_id=tenant_id,
+        store_code=store_code,
+        terminal_no=None,
+        terminal_id=terminal_id,
+        report_scope=report_scope,
+        report_types=report_types,
+        business_date=business_date,
+        business_date_from=business_date_from,
+        business_date_to=business_date_to,
+        open_counter=open_counter,
+        business_counter=business_counter,
+        limit=limit,
+        page=page,
+        sort=sort,
+        requesting_staff_id=requesting_staff_id,
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+
+
+# API get several reports for terminal in one pass  #  token or (api_key and terminal_id) is required
+@router.get(
+    "/tenants/{tenant_id}/stores/{store_code}/terminals/{terminal_no}/reports/combined",
+    response_model=ApiResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Bad Request"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Unprocessable Entity"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+    },
+)
+async def get_combined_report_for_terminal(
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    store_code: str = Path(...),
+    terminal_no: int = Path(...),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    report_scope: str = Query(..., description="Scope of the report: flash, daily"),
+    report_types: str = Query(..., description="Comma separated report types, e.g. sales,payment,category,item"),
+    business_date: str = Query(None, description="Business date for flash and daily (single date or ignored if date range is specified)"),
+    business_date_from: str = Query(None, description="Start date for date range (YYYYMMDD format)"),
+    business_date_to: str = Query(None, description="End date for date range (YYYYMMDD format)"),
+    open_counter: int = Query(None, description="Open counter for flash and daily, None for total in business date"),
+    business_counter: int = Query(None, description="Business counter for the report"),
+    limit: int = Query(100, description="Limit of the number of records to return"),
+    page: int = Query(1, description="Page number to return"),
+    sort: list[tuple[str, int]] = Depends(parse_sort),
+    report_service: ReportService = Depends(get_report_service),
+    requesting_staff_id: Optional[str] = Depends(get_requesting_staff_id),
+):
+    """
+    Get several reports for a specific terminal in one pass.
+
+    The transaction logs are aggregated once for all requested report types,
+    and for API key requests the reports are sent to the journal as one entry.
+
+    Args:
+        tenant_id: The tenant identifier
+        tenant_id_with_security: The tenant ID extracted from security credentials
+        store_code: The store code
+        terminal_no: The terminal number to generate the reports for
+        terminal_id: The terminal ID when using API key authentication
+        report_scope: The time scope of the reports (flash or daily)
+        report_types: Comma separated report types (sales, payment, category, item)
+        business_date: The business date in YYYYMMDD format
+        business_date_from: Start date for date range
+        business_date_to: End date for date range
+        open_counter: Optional counter for the specific terminal session
+        business_counter: Optional business counter for the report
+        limit: Maximum number of records to return
+        page: Page number for pagination
+        sort: Sorting criteria
+        report_service: Injected report service dependency
+        requesting_staff_id: The staff ID of the requester
+
+    Returns:
+        ApiResponse: Dictionary mapping report type to the report data
+    """
+    logger.info(
+        f"Fetching {report_types} reports for tenant_id: {tenant_id}, store_code: {store_code}, terminal_no: {terminal_no}"
+    )
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+    return await _get_combined_report(
+        report_service=report_service,
+        tenant_id=tenant_id,
+        store_code=store_code,
+        terminal_no=terminal_no,
+        terminal_id=terminal_id,
+        report_scope=report_scope,
+        report_types=report_types,
+        business_date=business_date,
+        business_date_from=business_date_from,
+        business_date_to=business_date_to,
+        open_counter=open_counter,
+        business_counter=business_counter,
+        limit=limit,
+        page=page,
+        sort=sort,
+        requesting_staff_id=requesting_staff_id,
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+
+
+def _raise_service_exception(e: ServiceException, operation: str):
+    """
+    Convert a service exception into an HTTPException with the standard error response.
+
+    Args:
+        e: The service exception
+        operation: Name of the API operation
+
+    Raises:
+        HTTPException: Always
+    """
+    error_response = ApiResponse(
+        success=False,
+        code=e.error_code if hasattr(e, 'error_code') else "500001",
+        message=e.user_message if hasattr(e, 'user_message') else str(e),
+        data=None,
+        operation=operation,
+    )
+    raise HTTPException(
+        status_code=e.status_code if hasattr(e, 'status_code') else status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=error_response.model_dump()
+    )
+
+
+# API submit report job for store or terminal  #  token or (api_key and terminal_id) is required
+@router.post(
+    "/tenants/{tenant_id}/stores/{store_code}/reports/jobs",
+    response_model=ApiResponse[ReportJobResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Bad Request"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Unprocessable Entity"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Service Unavailable"},
+    },
+)
+async def submit_report_job(
+    request: ReportJobRequest,
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    store_code: str = Path(...),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    job_service: ReportJobService = Depends(get_report_job_service),
+    requesting_staff_id: Optional[str] = Depends(get_requesting_staff_id),
+):
+    """
+    Submit a report to be generated in the background.
+
+    Takes the same parameters as the report endpoints and returns a job
+    immediately. The job is polled with the job status endpoint and the
+    report is downloaded from the job result endpoint once completed.
+    If an identical request of the same requester is already pending or running, its job is returned.
+
+    Args:
+        request: The report parameters
+        tenant_id: The tenant identifier
+        tenant_id_with_security: The tenant ID extracted from security credentials
+        store_code: The store code to generate a report for
+        terminal_id: The terminal ID when using API key authentication
+        job_service: Injected report job service dependency
+        requesting_staff_id: The staff ID of the requester
+
+    Returns:
+        ApiResponse[ReportJobResponse]: The submitted job
+
+    Raises:
+        HTTPException: For various error conditions with appropriate status codes
+    """
+    logger.info(
+        f"Submitting {request.report_type} report job for tenant_id: {tenant_id}, store_code: {store_code}, terminal_no: {request.terminal_no}"
+    )
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+    verify_requesting_store(store_code, terminal_id)
+    validate_report_dates(
+        request.report_scope, request.business_date, request.business_date_from, request.business_date_to
+    )
+
+    requesting_terminal_no = parse_requesting_terminal_no(terminal_id)
+    if requesting_terminal_no is None and request.terminal_no is not None:
+        # If no terminal_id (JWT auth), use the requested terminal
+        requesting_terminal_no = request.terminal_no
+
+    request_params = {
+        "store_code": store_code,
+        "terminal_no": request.terminal_no,
+        "report_scope": request.report_scope,
+        "report_type": request.report_type,
+        "business_date": request.business_date,
+        "open_counter": request.open_counter,
+        "business_counter": request.business_counter,
+        "limit": request.limit,
+        "page": request.page,
+        "sort": parse_sort(request.sort),
+        "requesting_terminal_no": requesting_terminal_no,
+        "requesting_staff_id": requesting_staff_id,
+        "is_api_key_request": terminal_id is not None,
+        "business_date_from": request.business_date_from,
+        "business_date_to": request.business_date_to,
+    }
+
+    try:
+        job = await job_service.submit_job_async(request_params, transform_report_document)
+    except ServiceException as e:
+        _raise_service_exception(e, f"{inspect.currentframe().f_code.co_name}")
+
+    response = ApiResponse(
+        success=True,
+        code=status.HTTP_202_ACCEPTED,
+        message=f"{request.report_type.capitalize()} report job submitted successfully",
+        data=SchemasTransformerV1().transform_report_job_response(job).model_dump(by_alias=True),
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+    return response
+
+
+# API get report job status  #  token or (api_key and terminal_id) is required
+@router.get(
+    "/tenants/{tenant_id}/stores/{store_code}/reports/jobs/{job_id}",
+    response_model=ApiResponse[ReportJobResponse],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_404_NOT_FOUND: {"description": "Not Found"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+    },
+)
+async def get_report_job(
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    store_code: str = Path(...),
+    job_id: str = Path(...),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    job_service: ReportJobService = Depends(get_report_job_service),
+):
+    """
+    Get the status of a report job.
+
+    Args:
+        tenant_id: The tenant identifier
+        tenant_id_with_security: The tenant ID extracted from security credentials
+        store_code: The store code
+        job_id: The job identifier returned on submission
+        terminal_id: The terminal ID when using API key authentication
+        job_service: Injected report job service dependency
+
+    Returns:
+        ApiResponse[ReportJobResponse]: The job status
+
+    Raises:
+        HTTPException: For various error conditions with appropriate status codes
+    """
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+    verify_requesting_store(store_code, terminal_id)
+
+    try:
+        job = await job_service.get_job_async(store_code, job_id)
+    except ServiceException as e:
+        _raise_service_exception(e, f"{inspect.currentframe().f_code.co_name}")
+
+    response = ApiResponse(
+        success=True,
+        code=status.HTTP_200_OK,
+        message=f"Report job is {job.status}",
+        data=SchemasTransformerV1().transform_report_job_response(job).model_dump(by_alias=True),
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+    return response
+
+
+# API get report job result  #  token or (api_key and terminal_id) is required
+@router.get(
+    "/tenants/{tenant_id}/stores/{store_code}/reports/jobs/{job_id}/result",
+    response_model=ApiResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_404_NOT_FOUND: {"description": "Not Found"},
+        status.HTTP_409_CONFLICT: {"description": "Job not completed yet"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+    },
+)
+async def get_report_job_result(
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    store_code: str = Path(...),
+    job_id: str = Path(...),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    job_service: ReportJobService = Depends(get_report_job_service),
+):
+    """
+    Get the report generated by a completed job.
+
+    The result is kept until the job expires, so it can be downloaded repeatedly.
+
+    Args:
+        tenant_id: The tenant identifier
+        tenant_id_with_security: The tenant ID extracted from security credentials
+        store_code: The store code
+        job_id: The job identifier returned on submission
+        terminal_id: The terminal ID when using API key authentication
+        job_service: Injected report job service dependency
+
+    Returns:
+        ApiResponse: The report data, in the same format as the report endpoints
+
+    Raises:
+        HTTPException: For various error conditions with appropriate status codes
+    """
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+    verify_requesting_store(store_code, terminal_id)
+
+    try:
+        result = await job_service.get_job_result_async(store_code, job_id)
+    except ServiceException as e:
+        _raise_service_exception(e, f"{inspect.currentframe().f_code.co_name}")
+
+    response = ApiResponse(
+        success=True,
+        code=status.HTTP_200_OK,
+        message="Report fetched successfully",
+        data=result,
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
     return response
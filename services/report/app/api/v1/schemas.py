@@ -73,3 +73,27 @@ class ItemReportResponse(BaseItemReportResponse):
     """
 
     pass
+
+
+class ReportJobRequest(BaseReportJobRequest):
+    """
+    Report job submission request model for API version 1.
+
+    Extends the base report job request model with version-specific fields
+    if needed. Currently inherits all functionality from BaseReportJobRequest.
+    Used to request a report that is generated in the background.
+    """
+
+    pass
+
+
+class ReportJobResponse(BaseReportJobResponse):
+    """
+    Report job status response model for API version 1.
+
+    Extends the base report job response model with version-specific fields
+    if needed. Currently inherits all functionality from BaseReportJobResponse.
+    Used to poll the progress of a report generation job.
+    """
+
+    pass
@@ -7,6 +7,7 @@ from app.api.v1.schemas import *
 from app.models.documents.sales_report_document import SalesReportDocument
 from app.models.documents.category_report_document import CategoryReportDocument
 from app.models.documents.item_report_document import ItemReportDocument
+from app.models.documents.report_job_document import ReportJobDocument
 
 
 class SchemasTransformerV1(SchemasTransformer):
@@ -24,3 +25,6 @@ class SchemasTransformerV1(SchemasTransformer):
 
     def transform_item_report_response(self, report_doc: ItemReportDocument) -> ItemReportResponse:
         return super().transform_item_report_response(report_doc)
+
+    def transform_report_job_response(self, job: ReportJobDocument) -> ReportJobResponse:
+        return super().transform_report_job_response(job)
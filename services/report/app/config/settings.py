@@ -30,6 +30,17 @@ class Settings(
     DEBUG: str = "false"
     DEBUG_PORT: int = 5678
 
+    # Report job queue settings
+    REPORT_JOB_MAX_WORKERS: int = 4  # Number of reports generated concurrently
+    REPORT_JOB_MAX_QUEUE_SIZE: int = 100  # Number of jobs waiting for a worker
+    REPORT_JOB_TIMEOUT_SECONDS: int = 600  # Jobs running longer than this are treated as failed
+    REPORT_JOB_RETENTION_DAYS: int = 7  # Days to keep finished jobs and their results
+
+    # gRPC settings for master-data reads (items, categories)
+    USE_GRPC: bool = Field(default=False, description="Use gRPC for master-data communication")
+    GRPC_TIMEOUT: float = Field(default=5.0, description="gRPC request timeout in seconds")
+    MASTER_DATA_GRPC_URL: str = Field(default="master-data:50051", description="Master-data gRPC server URL")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_ignore_empty=True,  # Ignore empty values from .env file
@@ -4,6 +4,8 @@ from logging import getLogger
 
 from kugel_common.database import database as db_helper
 from app.config.settings import settings
+from app.models.repositories.report_job_repository import ReportJobRepository
+from app.models.repositories.tranlog_repository import TranlogRepository
 
 # setup logger
 logger = getLogger(__name__)
@@ -33,6 +35,9 @@ async def create_tran_collection(tenant_id: str):
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
     )
+    # business date index used by the report aggregations
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    await TranlogRepository(db, tenant_id).ensure_business_date_index_async()
 
 
 # create cash_in_out_log collection
@@ -77,6 +82,20 @@ async def create_open_close_log_collection(tenant_id: str):
     )
 
 
+# create report job collection
+async def create_report_job_collection(tenant_id: str):
+    name = settings.DB_COLLECTION_NAME_REPORT_JOB
+    index_key_list = [
+        {"keys": {"tenant_id": 1, "job_id": 1}, "unique": True},
+    ]
+    await create_some_collection(
+        tenant_id=tenant_id, collection_name=name, index_keys_list=index_key_list, index_name=name + "_index"
+    )
+    # partial unique index for deduplication and TTL index for retention
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    await ReportJobRepository(db, tenant_id).ensure_indexes_async(settings.REPORT_JOB_RETENTION_DAYS)
+
+
 # create request log collection
 async def create_request_log_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_REQUEST_LOG
@@ -93,11 +112,38 @@ async def create_collections(tenant_id: str):
     await create_tran_collection(tenant_id)
     await create_cash_in_out_log_collection(tenant_id)
     await create_open_close_log_collection(tenant_id)
+    await create_report_job_collection(tenant_id)
     await create_request_log_collection(tenant_id)
 
     # add more collections here
 
 
+# create collections and indexes added after the tenant was set up
+async def upgrade_collections(tenant_id: str):
+    await create_report_job_collection(tenant_id)
+    # business date index used by the report aggregations
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    await TranlogRepository(db, tenant_id).ensure_business_date_index_async()
+
+    # add more upgrade steps here
+
+
+# upgrade the collections of all existing tenants
+async def upgrade_all_tenants():
+    client = await db_helper.get_client_async()
+    prefix = f"{settings.DB_NAME_PREFIX}_"
+    for db_name in await client.list_database_names():
+        if not db_name.startswith(prefix):
+            continue
+        tenant_id = db_name[len(prefix) :]
+        try:
+            await upgrade_collections(tenant_id)
+        except Exception as e:
+            # one broken tenant must not stop the upgrade of the others
+            logger.error(f"Failed to upgrade collections for tenant_id:{tenant_id}: {e}")
+    logger.info("Upgrading collections of existing tenants completed")
+
+
 # setup database
 async def execute(tenant_id: str):
     logger.info(f"Setting up database for tenant_id:{tenant_id} execution started...")
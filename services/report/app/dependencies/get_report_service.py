@@ -8,6 +8,7 @@ report service instances with all necessary repositories and services.
 """
 
 from fastapi import Depends, Path, Query, Security
+from functools import partial
 from typing import Optional
 from logging import getLogger
 
@@ -15,6 +16,9 @@ from kugel_common.database import database as db_helper
 from kugel_common.security import api_key_header, oauth2_scheme
 
 from app.services.report_service import ReportService
+from app.services.tranlog_export_service import TranlogExportService
+from app.services.report_job_service import ReportJobService
+from app.models.repositories.report_job_repository import ReportJobRepository
 from app.models.repositories.tranlog_repository import TranlogRepository
 from app.models.repositories.cash_in_out_log_repository import CashInOutLogRepository
 from app.models.repositories.open_close_log_repository import OpenCloseLogRepository
@@ -26,6 +30,44 @@ from app.config.settings import settings
 logger = getLogger(__name__)
 
 
+async def create_report_service_async(
+    tenant_id: str,
+    store_code: str,
+    terminal_id: Optional[str] = None,
+    api_key: Optional[str] = None,
+    token: Optional[str] = None,
+) -> ReportService:
+    """
+    Create a ReportService instance with all required repositories.
+
+    Args:
+        tenant_id: The tenant identifier
+        store_code: The store code
+        terminal_id: Optional terminal ID for API key authentication
+        api_key: Optional API key
+        token: Optional OAuth2 token
+
+    Returns:
+        ReportService: Configured instance with all required repositories
+    """
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    tran_repo = TranlogRepository(db=db, tenant_id=tenant_id)
+    cash_repo = CashInOutLogRepository(db=db, tenant_id=tenant_id)
+    open_close_repo = OpenCloseLogRepository(db=db, tenant_id=tenant_id)
+    daily_info_repo = DailyInfoDocumentRepository(db=db, tenant_id=tenant_id)
+    terminal_info_repo = TerminalInfoWebRepository(
+        tenant_id=tenant_id, store_code=store_code, terminal_id=terminal_id, api_key=api_key, token=token
+    )
+
+    return ReportService(
+        tran_repository=tran_repo,
+        cash_in_out_log_repository=cash_repo,
+        open_close_log_repository=open_close_repo,
+        daily_info_repository=daily_info_repo,
+        terminal_info_repository=terminal_info_repo,
+    )
+
+
 async def get_report_service(
     tenant_id: str = Path(...),
     store_code: str = Path(...),
@@ -50,20 +92,52 @@ async def get_report_service(
         ReportService: Configured instance with all required repositories
     """
     logger.debug(f"get_report_service: tenant_id->{tenant_id}, store_code->{store_code}")
+    return await create_report_service_async(tenant_id, store_code, terminal_id, api_key, token)
+
+
+async def get_tranlog_export_service(tenant_id: str = Path(...)) -> TranlogExportService:
+    """
+    Dependency function to create and inject a TranlogExportService instance.
+
+    Args:
+        tenant_id: The tenant identifier from the path
+
+    Returns:
+        TranlogExportService: Configured instance with the transaction log repository
+    """
+    logger.debug(f"get_tranlog_export_service: tenant_id->{tenant_id}")
 
     db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
-    tran_repo = TranlogRepository(db=db, tenant_id=tenant_id)
-    cash_repo = CashInOutLogRepository(db=db, tenant_id=tenant_id)
-    open_close_repo = OpenCloseLogRepository(db=db, tenant_id=tenant_id)
-    daily_info_repo = DailyInfoDocumentRepository(db=db, tenant_id=tenant_id)
-    terminal_info_repo = TerminalInfoWebRepository(
-        tenant_id=tenant_id, store_code=store_code, terminal_id=terminal_id, api_key=api_key, token=token
-    )
+    return TranlogExportService(tran_repository=TranlogRepository(db=db, tenant_id=tenant_id))
 
-    return ReportService(
-        tran_repository=tran_repo,
-        cash_in_out_log_repository=cash_repo,
-        open_close_log_repository=open_close_repo,
-        daily_info_repository=daily_info_repo,
-        terminal_info_repository=terminal_info_repo,
+
+async def get_report_job_service(
+    tenant_id: str = Path(...),
+    store_code: str = Path(...),
+    terminal_id: Optional[str] = Query(None),
+    api_key: Optional[str] = Security(api_key_header),
+    token: Optional[str] = Depends(oauth2_scheme),
+) -> ReportJobService:
+    """
+    Dependency function to create and inject a ReportJobService instance.
+
+    Jobs run after the request has finished, so each job creates its own
+    ReportService with the credentials of the request that submitted it.
+
+    Args:
+        tenant_id: The tenant identifier from the path
+        store_code: The store code from the path
+        terminal_id: Optional terminal ID from the query parameters
+        api_key: Optional API key from the security header
+        token: Optional OAuth2 token
+
+    Returns:
+        ReportJobService: Configured instance with the report job repository
+    """
+    logger.debug(f"get_report_job_service: tenant_id->{tenant_id}, store_code->{store_code}")
+
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    return ReportJobService(
+        report_service_factory=partial(create_report_service_async, tenant_id, store_code, terminal_id, api_key, token),
+        job_repository=ReportJobRepository(db=db, tenant_id=tenant_id),
     )
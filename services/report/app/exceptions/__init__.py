@@ -36,6 +36,9 @@ from app.exceptions.report_exceptions import (
     ReportScopeException,
     ReportDateException,
     ReportDataException,
+    ReportJobNotFoundException,
+    ReportJobNotReadyException,
+    ReportJobQueueFullException,
     TerminalNotClosedException,
     LogsMissingException,
     LogCountMismatchException,
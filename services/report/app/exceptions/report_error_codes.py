@@ -27,6 +27,9 @@ class ReportErrorCode:
     REPORT_SCOPE_ERROR = "412005"  # レポートスコープエラー
     REPORT_DATE_ERROR = "412006"  # レポート日付エラー
     REPORT_DATA_ERROR = "412007"  # レポートデータエラー
+    REPORT_JOB_NOT_FOUND = "412008"  # レポートジョブが見つからない
+    REPORT_JOB_NOT_READY = "412009"  # レポートジョブが未完了
+    REPORT_JOB_QUEUE_FULL = "412010"  # レポートジョブキューが満杯
 
     # レポート検証関連 (4121x)
     TERMINAL_NOT_CLOSED = "412101"  # 端末がクローズされていない
@@ -63,6 +66,9 @@ class ReportErrorMessage:
             ReportErrorCode.REPORT_SCOPE_ERROR: "不正なレポートスコープです",
             ReportErrorCode.REPORT_DATE_ERROR: "レポート日付に問題があります",
             ReportErrorCode.REPORT_DATA_ERROR: "レポートデータに問題があります",
+            ReportErrorCode.REPORT_JOB_NOT_FOUND: "レポートジョブが見つかりません",
+            ReportErrorCode.REPORT_JOB_NOT_READY: "レポートジョブはまだ完了していません",
+            ReportErrorCode.REPORT_JOB_QUEUE_FULL: "レポートジョブが混み合っています。しばらくしてから再度お試しください",
             # レポート検証関連
             ReportErrorCode.TERMINAL_NOT_CLOSED: "端末がクローズされていないため、レポートを生成できません",
             ReportErrorCode.LOGS_MISSING: "必要なログが欠落しています",
@@ -89,6 +95,9 @@ class ReportErrorMessage:
             ReportErrorCode.REPORT_SCOPE_ERROR: "Invalid report scope",
             ReportErrorCode.REPORT_DATE_ERROR: "Issue with report date",
             ReportErrorCode.REPORT_DATA_ERROR: "Issue with report data",
+            ReportErrorCode.REPORT_JOB_NOT_FOUND: "Report job not found",
+            ReportErrorCode.REPORT_JOB_NOT_READY: "Report job has not completed yet",
+            ReportErrorCode.REPORT_JOB_QUEUE_FULL: "Too many report jobs, please try again later",
             # レポート検証関連
             ReportErrorCode.TERMINAL_NOT_CLOSED: "Terminal is not closed, cannot generate report",
             ReportErrorCode.LOGS_MISSING: "Required logs are missing",
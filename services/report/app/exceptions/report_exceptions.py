@@ -123,6 +123,54 @@ class ReportDataException(ServiceException):
         )
 
 
+class ReportJobNotFoundException(ServiceException):
+    """
+    レポートジョブが見つからない場合に発生する例外
+    """
+
+    def __init__(self, message, logger=None, original_exception=None):
+        super().__init__(
+            message,
+            logger,
+            original_exception,
+            ReportErrorCode.REPORT_JOB_NOT_FOUND,
+            ReportErrorMessage.get_message(ReportErrorCode.REPORT_JOB_NOT_FOUND),
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+
+
+class ReportJobNotReadyException(ServiceException):
+    """
+    レポートジョブが完了していないため結果を取得できない場合に発生する例外
+    """
+
+    def __init__(self, message, logger=None, original_exception=None):
+        super().__init__(
+            message,
+            logger,
+            original_exception,
+            ReportErrorCode.REPORT_JOB_NOT_READY,
+            ReportErrorMessage.get_message(ReportErrorCode.REPORT_JOB_NOT_READY),
+            status_code=status.HTTP_409_CONFLICT,
+        )
+
+
+class ReportJobQueueFullException(ServiceException):
+    """
+    レポートジョブのキューが満杯で受け付けられない場合に発生する例外
+    """
+
+    def __init__(self, message, logger=None, original_exception=None):
+        super().__init__(
+            message,
+            logger,
+            original_exception,
+            ReportErrorCode.REPORT_JOB_QUEUE_FULL,
+            ReportErrorMessage.get_message(ReportErrorCode.REPORT_JOB_QUEUE_FULL),
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
 class TerminalNotClosedException(ServiceException):
     """
     端末がクローズされていないため、レポートを生成できない場合に発生する例外
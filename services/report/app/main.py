@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from logging import getLogger, config
+import asyncio
 import platform
 import os
 
@@ -20,10 +21,13 @@ from kugel_common.schemas.health import HealthCheckResponse, HealthStatus, Compo
 from kugel_common.utils.health_check import HealthChecker
 from kugel_common.exceptions import register_exception_handlers
 from kugel_common.middleware.log_requests import log_requests
+from app.database import database_setup
 from app.api.v1.report import router as v1_report_router
 from app.api.v1.tran import router as v1_tran_router
 from app.api.v1.tenant import router as v1_tenant_router
+from app.api.v1.export import router as v1_export_router
 from app.config.settings import settings
+from app.services.report_job_service import report_job_worker_pool
 
 # Create a FastAPI instance with API documentation URLs enabled
 app = FastAPI(docs_url="/docs", redoc_url="/redoc")
@@ -43,6 +47,7 @@ if IS_DEBUG:
 app.include_router(v1_report_router, prefix="/api/v1")
 app.include_router(v1_tran_router, prefix="/api/v1")
 app.include_router(v1_tenant_router, prefix="/api/v1")
+app.include_router(v1_export_router, prefix="/api/v1")
 
 # Add CORS middleware to allow cross-origin requests  # Currently configured to allow any origin, method, and header
 app.add_middleware(
@@ -126,6 +131,10 @@ async def health_check():
     return HealthCheckResponse(status=overall_status, service="report", version="1.0.0", checks=checks)
 
 
+# Background task creating missing collections and indexes for existing tenants
+upgrade_task: asyncio.Task = None
+
+
 # Application startup event handler
 async def startup_event():
     """
@@ -151,6 +160,11 @@ async def startup_event():
         logger.error(f"Error connecting to the database: {e}")
         raise e
 
+    # Create the collections and indexes added after existing tenants were set up
+    # Runs in the background because building an index on a large collection takes a while
+    global upgrade_task
+    upgrade_task = asyncio.create_task(database_setup.upgrade_all_tenants())
+
 
 # Application shutdown event handler
 async def close_event():
@@ -163,10 +177,24 @@ async def close_event():
     """
     logger.info("closing the application")
 
+    # Stop the collection upgrade if it is still running
+    if upgrade_task is not None and not upgrade_task.done():
+        upgrade_task.cancel()
+
+    # Stop the report job workers before the database connection is closed
+    logger.info("stop report job workers...")
+    await report_job_worker_pool.shutdown()
+
     # Close the database connection
     logger.info("close database connection for all tenants...")
     await db_helper.close_client_async()
 
+    # Close gRPC channels to master-data
+    logger.info("Closing gRPC channels")
+    from kugel_common.utils.grpc_client_helper import close_all_grpc_channels
+
+    await close_all_grpc_channels()
+
     # add close tasks here
     logger.info("Application closed")
 
@@ -0,0 +1,36 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import Any, Optional
+
+from kugel_common.models.documents.abstract_document import AbstractDocument
+
+
+class ReportJobDocument(AbstractDocument):
+    """
+    Document class representing an asynchronous report generation job.
+
+    A job is created when a client submits a report request and is processed
+    by the report job worker pool. The generated report is stored in the job
+    so that it can be downloaded again until the job expires.
+
+    Identical requests of the same requester share the same request_hash.
+    While a job is pending or running it is marked as active, and a partial
+    unique index on (tenant_id, request_hash) for active jobs lets concurrent
+    identical requests attach to the same job instead of generating the report
+    twice.
+    """
+
+    job_id: Optional[str] = None  # Unique identifier of the job
+    tenant_id: Optional[str] = None  # Identifier for the tenant
+    store_code: Optional[str] = None  # Identifier for the store
+    terminal_no: Optional[int] = None  # Terminal number, None for store reports
+    report_scope: Optional[str] = None  # Scope of the report (flash, daily)
+    report_type: Optional[str] = None  # Type of the report (sales, category, item, payment)
+    request_hash: Optional[str] = None  # Hash of the normalized request parameters
+    request_params: Optional[dict[str, Any]] = None  # Parameters passed to the report service
+    status: Optional[str] = None  # Job status (pending, running, completed, failed)
+    is_active: Optional[bool] = None  # True while the job is pending or running
+    result: Optional[Any] = None  # Generated report (response format)
+    error_code: Optional[str] = None  # Error code if the job failed
+    error_message: Optional[str] = None  # Error message if the job failed
+    started_at: Optional[str] = None  # Timestamp when a worker started the job
+    completed_at: Optional[str] = None  # Timestamp when the job completed or failed
@@ -0,0 +1,56 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import Dict
+import logging
+
+import grpc
+from kugel_common.grpc import item_service_pb2, item_service_pb2_grpc
+from kugel_common.utils.grpc_client_helper import GrpcClientHelper
+from app.config.settings import settings
+from app.exceptions import CategoryMasterDataNotFoundException
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryMasterGrpcRepository:
+    """
+    Repository for retrieving category master data from the master-data service via gRPC.
+
+    Provides the same interface as CategoryMasterWebRepository; the categories are
+    read with one GetCategoryMap call over the pooled gRPC channel.
+    """
+
+    def __init__(self, tenant_id: str):
+        """
+        Initialize the CategoryMasterGrpcRepository.
+
+        Args:
+            tenant_id: The tenant identifier
+        """
+        self.tenant_id = tenant_id
+
+    async def get_categories(self) -> Dict[str, str]:
+        """
+        Retrieve all categories for the tenant as a mapping of category code to description.
+
+        Returns:
+            Dict[str, str]: Mapping of category_code to description
+
+        Raises:
+            CategoryMasterDataNotFoundException: If category data cannot be retrieved
+        """
+        try:
+            channel = await GrpcClientHelper(target=settings.MASTER_DATA_GRPC_URL).get_channel()
+            stub = item_service_pb2_grpc.MasterDataServiceStub(channel)
+            response = await stub.GetCategoryMap(
+                item_service_pb2.MasterDataRequest(tenant_id=self.tenant_id), timeout=settings.GRPC_TIMEOUT
+            )
+        except grpc.RpcError as e:
+            logger.error(f"gRPC error while getting categories: {e.code()} - {e.details()}")
+            raise CategoryMasterDataNotFoundException(
+                f"Failed to retrieve category master data via gRPC: {e.details()}", logger, e
+            ) from e
+
+        return {
+            category_code: category.description or category_code
+            for category_code, category in response.categories.items()
+        }
@@ -53,8 +53,9 @@ class CategoryMasterWebRepository:
                 
                 url = f"{self.master_data_base_url}/tenants/{self.tenant_id}/categories"
                 logger.info(f"Requesting categories from URL: {url}")
-                # HttpClientHelper.get() returns the JSON data directly, not a response object
-                data = await client.get(url, headers=headers)
+                # Request every category (limit=0) and revalidate the previous list with its ETag,
+                # an unchanged master costs a 304 and the cached data is returned
+                data = await client.get_conditional(url, params={"limit": 0}, headers=headers)
                 
                 logger.info(f"Received response from master-data service: success={data.get('success')}, data count={len(data.get('data', []))}")
                 logger.debug(f"Full response data: {data}")
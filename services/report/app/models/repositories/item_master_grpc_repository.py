@@ -0,0 +1,65 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import Optional, Dict, List
+import logging
+
+import grpc
+from kugel_common.grpc import item_service_pb2, item_service_pb2_grpc
+from kugel_common.utils.grpc_client_helper import GrpcClientHelper
+from app.config.settings import settings
+from app.exceptions.report_exceptions import ItemMasterDataNotFoundException
+
+logger = logging.getLogger(__name__)
+
+
+class ItemMasterGrpcRepository:
+    """
+    Repository for retrieving item master data from the master-data service via gRPC.
+
+    Provides the same interface as ItemMasterWebRepository; the items are read
+    with one BatchGetItemDetails call over the pooled gRPC channel.
+    """
+
+    def __init__(self, tenant_id: str):
+        """
+        Initialize the ItemMasterGrpcRepository.
+
+        Args:
+            tenant_id: The tenant identifier
+        """
+        self.tenant_id = tenant_id
+
+    async def get_items(self, item_codes: Optional[List[str]] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Retrieve items for the tenant as a mapping of item code to item details.
+
+        Args:
+            item_codes: Item codes to retrieve. Items are looked up by code over gRPC,
+                        so an empty mapping is returned when no codes are given.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Mapping of item_code to dict containing:
+                - name: Item name
+                - category_code: Category code for the item
+
+        Raises:
+            ItemMasterDataNotFoundException: If item data cannot be retrieved
+        """
+        if not item_codes:
+            return {}
+        try:
+            channel = await GrpcClientHelper(target=settings.MASTER_DATA_GRPC_URL).get_channel()
+            stub = item_service_pb2_grpc.ItemServiceStub(channel)
+            response = await stub.BatchGetItemDetails(
+                item_service_pb2.BatchItemDetailRequest(tenant_id=self.tenant_id, item_codes=item_codes),
+                timeout=settings.GRPC_TIMEOUT,
+            )
+        except grpc.RpcError as e:
+            logger.error(f"gRPC error while getting items: {e.code()} - {e.details()}")
+            raise ItemMasterDataNotFoundException(
+                f"Failed to retrieve item master data via gRPC: {e.details()}", logger, e
+            ) from e
+
+        return {
+            item.item_code: {"name": item.item_name or item.item_code, "category_code": item.category_code}
+            for item in response.items
+        }
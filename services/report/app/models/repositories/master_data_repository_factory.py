@@ -0,0 +1,43 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Master Data Repository Factory
+
+Provides runtime selection between HTTP and gRPC implementations of the
+repositories reading master-data (items and categories).
+"""
+from typing import Union
+import logging
+
+from app.config.settings import settings
+from app.models.repositories.category_master_grpc_repository import CategoryMasterGrpcRepository
+from app.models.repositories.category_master_web_repository import CategoryMasterWebRepository
+from app.models.repositories.item_master_grpc_repository import ItemMasterGrpcRepository
+from app.models.repositories.item_master_web_repository import ItemMasterWebRepository
+
+logger = logging.getLogger(__name__)
+
+
+def create_category_master_repository(
+    tenant_id: str,
+) -> Union[CategoryMasterWebRepository, CategoryMasterGrpcRepository]:
+    """
+    Create category master repository based on configuration
+
+    Returns:
+        CategoryMasterWebRepository or CategoryMasterGrpcRepository depending on USE_GRPC setting
+    """
+    if settings.USE_GRPC:
+        return CategoryMasterGrpcRepository(tenant_id=tenant_id)
+    return CategoryMasterWebRepository(tenant_id=tenant_id, master_data_base_url=settings.BASE_URL_MASTER_DATA)
+
+
+def create_item_master_repository(tenant_id: str) -> Union[ItemMasterWebRepository, ItemMasterGrpcRepository]:
+    """
+    Create item master repository based on configuration
+
+    Returns:
+        ItemMasterWebRepository or ItemMasterGrpcRepository depending on USE_GRPC setting
+    """
+    if settings.USE_GRPC:
+        return ItemMasterGrpcRepository(tenant_id=tenant_id)
+    return ItemMasterWebRepository(tenant_id=tenant_id, master_data_base_url=settings.BASE_URL_MASTER_DATA)
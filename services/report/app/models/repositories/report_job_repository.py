@@ -0,0 +1,264 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from datetime import timedelta
+from logging import getLogger
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.exceptions import CannotCreateException, DuplicateKeyException
+from kugel_common.utils.misc import get_app_time, get_app_time_str
+
+from app.config.settings import settings
+from app.models.documents.report_job_document import ReportJobDocument
+
+logger = getLogger(__name__)
+
+
+class ReportJobStatus:
+    """
+    Status values of a report job.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ReportJobRepository(AbstractRepository[ReportJobDocument]):
+    """
+    Repository for report job document operations.
+
+    This class provides methods for creating report jobs, attaching identical
+    requests to an active job, and recording the progress and result of a job.
+    """
+
+    ACTIVE_JOB_INDEX_NAME = "active_request_hash_unique"
+    TTL_INDEX_NAME = "created_at_ttl"
+
+    def __init__(self, db: AsyncIOMotorDatabase, tenant_id: str) -> None:
+        """
+        Initialize the report job repository.
+
+        Args:
+            db: AsyncIOMotorDatabase instance for database operations
+            tenant_id: Identifier for the tenant
+        """
+        super().__init__(settings.DB_COLLECTION_NAME_REPORT_JOB, ReportJobDocument, db)
+        self.tenant_id = tenant_id
+
+    async def create_job_async(self, job: ReportJobDocument) -> tuple[ReportJobDocument, bool]:
+        """
+        Create a new report job, or return the active job for the same request.
+
+        The partial unique index on (tenant_id, request_hash) for active jobs
+        makes the insert fail when an identical request is already pending or
+        running. In that case the existing job is returned instead.
+
+        Args:
+            job: Report job document to store
+
+        Returns:
+            Tuple of the job to follow and True if the job was newly created
+
+        Raises:
+            CannotCreateException: If the job cannot be created
+        """
+        job.shard_key = self.__get_shard_key(job)
+        # retry once: the active job may finish between the failed insert and the lookup
+        for _ in range(2):
+            try:
+                if not await self.create_async(job):
+                    raise Exception("insert returned no id")
+                return job, True
+            except DuplicateKeyException:
+                active_job = await self.get_active_job_async(job.request_hash)
+                if active_job is not None:
+                    logger.info(f"Identical report job is already active. job_id: {active_job.job_id}")
+                    return active_job, False
+            except Exception as e:
+                message = f"Cannot create report job: {job}"
+                raise CannotCreateException(message, self.collection_name, job, logger, e) from e
+
+        message = f"Cannot create report job: {job}"
+        raise CannotCreateException(message, self.collection_name, job, logger)
+
+    async def get_job_async(self, store_code: str, job_id: str) -> Optional[ReportJobDocument]:
+        """
+        Retrieve a report job of a store by its identifier.
+
+        Jobs of other stores are not returned, so a job identifier alone does
+        not give access to the report of another store.
+
+        Args:
+            store_code: Store the job was submitted for
+            job_id: Identifier of the job
+
+        Returns:
+            The report job document, or None if not found
+        """
+        return await self.get_one_async({"tenant_id": self.tenant_id, "store_code": store_code, "job_id": job_id})
+
+    async def get_active_job_async(self, request_hash: str) -> Optional[ReportJobDocument]:
+        """
+        Retrieve the pending or running job for a request.
+
+        Args:
+            request_hash: Hash of the normalized request parameters
+
+        Returns:
+            The active report job document, or None if there is no active job
+        """
+        return await self.get_one_async({"tenant_id": self.tenant_id, "request_hash": request_hash, "is_active": True})
+
+    async def mark_running_async(self, job_id: str) -> bool:
+        """
+        Mark a pending job as running.
+
+        Args:
+            job_id: Identifier of the job
+
+        Returns:
+            True if the job was pending and is now running
+        """
+        return await self.update_one_async(
+            {"tenant_id": self.tenant_id, "job_id": job_id, "status": ReportJobStatus.PENDING},
+            {"status": ReportJobStatus.RUNNING, "started_at": get_app_time_str()},
+        )
+
+    async def mark_completed_async(self, job_id: str, result: dict) -> bool:
+        """
+        Store the result of a job and mark it as completed.
+
+        A job that was expired or failed in the meantime is left unchanged.
+
+        Args:
+            job_id: Identifier of the job
+            result: Generated report in response format
+
+        Returns:
+            True if the job was updated
+        """
+        return await self.update_one_async(
+            {"tenant_id": self.tenant_id, "job_id": job_id, "status": ReportJobStatus.RUNNING, "is_active": True},
+            {
+                "status": ReportJobStatus.COMPLETED,
+                "is_active": False,
+                "result": result,
+                "completed_at": get_app_time_str(),
+            },
+        )
+
+    async def mark_failed_async(self, job_id: str, error_code: str, error_message: str) -> bool:
+        """
+        Mark a job as failed.
+
+        Args:
+            job_id: Identifier of the job
+            error_code: Error code of the failure
+            error_message: Error message of the failure
+
+        Returns:
+            True if the job was updated
+        """
+        return await self.update_one_async(
+            {"tenant_id": self.tenant_id, "job_id": job_id},
+            {
+                "status": ReportJobStatus.FAILED,
+                "is_active": False,
+                "error_code": error_code,
+                "error_message": error_message,
+                "completed_at": get_app_time_str(),
+            },
+        )
+
+    async def expire_stale_job_async(self, job_id: str, timeout_seconds: int, max_age_seconds: int) -> bool:
+        """
+        Mark an active job as failed if it can no longer be running or queued.
+
+        A running job is stale once it has run longer than the job timeout,
+        measured from started_at, so time spent waiting in the queue does not
+        count. A pending job is left alone while it may still be queued. Jobs
+        are queued in memory, so a job can be left active when the service
+        restarts; any active job submitted more than max_age_seconds ago is
+        therefore stale as well. Expiring a job releases the request hash so
+        that the same request can be submitted again.
+
+        Args:
+            job_id: Identifier of the job
+            timeout_seconds: Run time in seconds after which a running job is stale
+            max_age_seconds: Age in seconds (queue wait plus run time) after which any active job is stale
+
+        Returns:
+            True if the job was stale and has been marked as failed
+        """
+        now = get_app_time()
+        return await self.update_one_async(
+            {
+                "tenant_id": self.tenant_id,
+                "job_id": job_id,
+                "is_active": True,
+                "$or": [
+                    # started_at is an ISO string in the application timezone, so it compares chronologically
+                    {
+                        "status": ReportJobStatus.RUNNING,
+                        "started_at": {"$lt": get_app_time_str(now - timedelta(seconds=timeout_seconds))},
+                    },
+                    {"created_at": {"$lt": now - timedelta(seconds=max_age_seconds)}},
+                ],
+            },
+            {
+                "status": ReportJobStatus.FAILED,
+                "is_active": False,
+                "error_message": "Report job did not complete in time",
+                "completed_at": get_app_time_str(),
+            },
+        )
+
+    async def ensure_indexes_async(self, retention_days: int) -> None:
+        """
+        Ensure the deduplication and TTL indexes exist.
+
+        These indexes use options that create_collection_with_indexes_async
+        does not support (partial filter and expireAfterSeconds).
+
+        Args:
+            retention_days: Days to keep jobs after they were submitted
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        await self.dbcollection.create_index(
+            [("tenant_id", 1), ("request_hash", 1)],
+            name=self.ACTIVE_JOB_INDEX_NAME,
+            unique=True,
+            partialFilterExpression={"is_active": True},
+        )
+
+        # recreate the TTL index when the retention period has changed
+        indexes = await self.dbcollection.list_indexes().to_list(None)
+        for index in indexes:
+            if index.get("name") == self.TTL_INDEX_NAME:
+                if index.get("expireAfterSeconds") == retention_days * 86400:
+                    return
+                await self.dbcollection.drop_index(self.TTL_INDEX_NAME)
+                break
+        await self.dbcollection.create_index(
+            "created_at", name=self.TTL_INDEX_NAME, expireAfterSeconds=retention_days * 86400
+        )
+
+    def __get_shard_key(self, job: ReportJobDocument) -> str:
+        """
+        Generate a shard key for database partitioning.
+
+        Args:
+            job: Report job document
+
+        Returns:
+            String representation of the shard key
+        """
+        keys = []
+        keys.append(job.tenant_id)
+        keys.append(job.store_code)
+        keys.append(job.job_id)
+        return self.make_shard_key(keys)
@@ -0,0 +1,176 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Batch the aggregation pipelines of several report makers into one $facet query.
+
+When several reports are generated for the same close, every report maker runs
+its own aggregation over the same transaction logs. TranlogFacetBatch hands each
+maker its own repository handle; the first pipeline of every maker is held back
+until all makers have either submitted a pipeline or finished, and then all of
+them are executed as a single aggregation:
+
+    [{"$match": <conditions shared by all pipelines>},
+     {"$facet": {"pipeline_0": [...], "pipeline_1": [...], ...}}]
+
+The shared $match lets the query use the tranlog indexes once; each facet still
+contains the complete maker pipeline, so the results are identical to running
+the pipelines one by one. If no condition is shared, or the $facet query fails
+(for example because the combined result exceeds the 16MB document limit), the
+pipelines are executed individually.
+"""
+import asyncio
+from logging import getLogger
+from typing import Any, Optional
+
+from app.models.repositories.tranlog_repository import TranlogRepository
+
+logger = getLogger(__name__)
+
+
+class _BatchedTranlogRepository:
+    """
+    Repository handle given to one report maker.
+
+    The first execute_pipeline call is batched, later calls are executed directly.
+    All other attributes are delegated to the wrapped repository.
+    """
+
+    def __init__(self, batch: "TranlogFacetBatch", slot: int):
+        self._batch = batch
+        self._slot = slot
+        self._submitted = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._batch.repository, name)
+
+    async def execute_pipeline(self, pipeline: list[dict]) -> list[dict]:
+        if self._submitted or self._batch.flushed:
+            return await self._batch.repository.execute_pipeline(pipeline)
+        self._submitted = True
+        return await self._batch.submit(self._slot, pipeline)
+
+    def close(self) -> None:
+        """
+        Tell the batch that the maker will not submit (more) pipelines.
+        """
+        if not self._submitted:
+            self._submitted = True
+            self._batch.release(self._slot)
+
+
+class TranlogFacetBatch:
+    """
+    Collects one pipeline per report maker and executes them as one $facet aggregation.
+    """
+
+    def __init__(self, repository: TranlogRepository, size: int):
+        """
+        Initialize the batch.
+
+        Args:
+            repository: Transaction log repository that executes the aggregation
+            size: Number of report makers taking part in the batch
+        """
+        self.repository = repository
+        self.flushed = False
+        self._pending: dict[int, tuple[list[dict], asyncio.Future]] = {}
+        self._open_slots = set(range(size))
+        self._handles = [_BatchedTranlogRepository(self, slot) for slot in range(size)]
+
+    def handle(self, slot: int) -> _BatchedTranlogRepository:
+        """
+        Get the repository handle for a report maker.
+
+        Args:
+            slot: Index of the report maker in the batch
+
+        Returns:
+            Repository handle to use as the maker's tran_repository
+        """
+        return self._handles[slot]
+
+    async def submit(self, slot: int, pipeline: list[dict]) -> list[dict]:
+        """
+        Add a pipeline to the batch and wait for its result.
+
+        Args:
+            slot: Index of the report maker in the batch
+            pipeline: Aggregation pipeline of the maker
+
+        Returns:
+            Result of the pipeline
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending[slot] = (pipeline, future)
+        self._open_slots.discard(slot)
+        if not self._open_slots:
+            await self._flush()
+        return await future
+
+    def release(self, slot: int) -> None:
+        """
+        Remove a report maker that finished without submitting a pipeline.
+
+        Args:
+            slot: Index of the report maker in the batch
+        """
+        self._open_slots.discard(slot)
+        if not self._open_slots and self._pending and not self.flushed:
+            asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self) -> None:
+        if self.flushed:
+            return
+        self.flushed = True
+        pending = list(self._pending.items())
+        self._pending = {}
+
+        try:
+            results = await self._execute_async([pipeline for _, (pipeline, _) in pending])
+        except Exception as e:
+            for _, (_, future) in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, (_, future)), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _execute_async(self, pipelines: list[list[dict]]) -> list[list[dict]]:
+        if len(pipelines) > 1:
+            shared_match = self.make_shared_match(pipelines)
+            if shared_match:
+                facet = {f"pipeline_{i}": pipeline for i, pipeline in enumerate(pipelines)}
+                try:
+                    logger.info(f"Executing {len(pipelines)} report pipelines in one $facet aggregation")
+                    combined = await self.repository.execute_pipeline([{"$match": shared_match}, {"$facet": facet}])
+                    return [combined[0][f"pipeline_{i}"] for i in range(len(pipelines))]
+                except Exception as e:
+                    logger.warning(f"$facet aggregation failed, executing pipelines individually: {e}")
+
+        return [await self.repository.execute_pipeline(pipeline) for pipeline in pipelines]
+
+    @staticmethod
+    def make_shared_match(pipelines: list[list[dict]]) -> Optional[dict]:
+        """
+        Make the $match conditions shared by the first stage of all pipelines.
+
+        Args:
+            pipelines: Aggregation pipelines
+
+        Returns:
+            Dictionary of the shared conditions, or None if a pipeline does not start with $match
+        """
+        matches = []
+        for pipeline in pipelines:
+            if not pipeline or "$match" not in pipeline[0]:
+                return None
+            matches.append(pipeline[0]["$match"])
+
+        shared = {}
+        for key, value in matches[0].items():
+            if key.startswith("$"):
+                continue
+            if all(key in match and match[key] == value for match in matches[1:]):
+                shared[key] = value
+        return shared or None
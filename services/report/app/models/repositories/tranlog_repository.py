@@ -1,5 +1,6 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from typing import Type
+from datetime import date, datetime
+from typing import Type, AsyncIterator
 from logging import getLogger
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -9,9 +10,42 @@ from kugel_common.exceptions import CannotCreateException, DuplicateKeyException
 from kugel_common.models.documents.base_tranlog import BaseTransaction
 
 from app.config.settings import settings
+from app.exceptions import ReportDateException
 
 logger = getLogger(__name__)
 
+# Index serving the business date range conditions of the report aggregations and exports.
+# The closed business_date range bounds the index scan by itself.
+BUSINESS_DATE_INDEX_NAME = "tranlog_business_date"
+BUSINESS_DATE_INDEX_KEYS = [
+    ("tenant_id", 1),
+    ("store_code", 1),
+    ("business_date", 1),
+    ("terminal_no", 1),
+]
+
+
+def parse_business_date(business_date: str) -> date:
+    """
+    Parse a business date in YYYYMMDD format.
+
+    Args:
+        business_date: Business date in YYYYMMDD format
+
+    Returns:
+        The parsed date
+
+    Raises:
+        ReportDateException: If the business date is not a valid YYYYMMDD date
+    """
+    try:
+        if not isinstance(business_date, str) or len(business_date) != 8 or not business_date.isdigit():
+            raise ValueError("not in YYYYMMDD format")
+        return datetime.strptime(business_date, "%Y%m%d").date()
+    except ValueError as e:
+        message = f"Invalid business date: {business_date}. The format should be YYYYMMDD"
+        raise ReportDateException(message, logger, e) from e
+
 
 class TranlogRepository(AbstractRepository[BaseTransaction]):
     """
@@ -130,6 +164,74 @@ class TranlogRepository(AbstractRepository[BaseTransaction]):
         )
         return await self.get_paginated_list_async(filter=query, limit=limit, page=page, sort=sort)
 
+    async def iter_tranlog_batches_async(
+        self,
+        business_date_from: str,
+        business_date_to: str,
+        store_code: str = None,
+        terminal_no: int = None,
+        projection: dict = None,
+        batch_size: int = 1000,
+        include_cancelled: bool = False,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Iterate over raw transaction log documents in batches.
+
+        Unlike get_tranlog_list_by_query_async, documents are returned as raw
+        dictionaries straight from the MongoDB cursor without pydantic validation
+        or skip/limit paging, so that bulk extraction only pays for the fields
+        requested in the projection.
+
+        Args:
+            business_date_from: Start business date (YYYYMMDD, inclusive)
+            business_date_to: End business date (YYYYMMDD, inclusive)
+            store_code: Optional store code to filter by
+            terminal_no: Optional terminal number to filter by
+            projection: Optional MongoDB projection to limit returned fields
+            batch_size: Number of documents fetched per round trip and yielded per batch
+            include_cancelled: Whether to include cancelled transactions (default: False)
+
+        Yields:
+            Lists of raw transaction log documents, at most batch_size long
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        query = {
+            "tenant_id": self.tenant_id,
+            "business_date": {"$gte": business_date_from, "$lte": business_date_to},
+        }
+        if store_code is not None:
+            query["store_code"] = store_code
+        if terminal_no is not None:
+            query["terminal_no"] = terminal_no
+        if not include_cancelled:
+            query["sales.is_cancelled"] = False
+        logger.debug(
+            f"TranlogRepository.iter_tranlog_batches_async: query->{query} projection->{projection} batch_size->{batch_size}"
+        )
+
+        cursor = self.dbcollection.find(query, projection).batch_size(batch_size)
+        try:
+            batch = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            await cursor.close()
+
+    async def ensure_business_date_index_async(self) -> None:
+        """
+        Ensure the business date index exists.
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+        await self.dbcollection.create_index(BUSINESS_DATE_INDEX_KEYS, name=BUSINESS_DATE_INDEX_NAME)
+
     def __get_shard_key(self, tranlog: BaseTransaction) -> str:
         """
         Generate a shard key for database partitioning.
@@ -7,12 +7,12 @@ from kugel_common.utils.misc import get_app_time_str
 from app.models.repositories.tranlog_repository import TranlogRepository
 from app.models.repositories.cash_in_out_log_repository import CashInOutLogRepository
 from app.models.repositories.open_close_log_repository import OpenCloseLogRepository
-from app.models.repositories.category_master_web_repository import CategoryMasterWebRepository
-from app.config.settings import Settings
+from app.models.repositories.master_data_repository_factory import create_category_master_repository
 from app.models.documents.category_report_document import CategoryReportDocument
 from app.enums.transaction_type import TransactionType
 from app.services.report_plugin_interface import IReportPlugin
 from app.services.plugins.category_report_receipt_data import CategoryReportReceiptData
+from app.services.plugins.report_aggregation_helper import sum_fields
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +42,8 @@ class CategoryReportMaker(IReportPlugin):
         self.cash_in_out_log_repository = cash_in_out_log_repository
         self.open_close_log_repository = open_close_log_repository
         
-        # Initialize category master repository
-        settings = Settings()
-        self.category_repository = CategoryMasterWebRepository(
-            tenant_id=tran_repository.tenant_id,
-            master_data_base_url=settings.BASE_URL_MASTER_DATA
-        )
+        # Initialize category master repository (HTTP or gRPC depending on USE_GRPC)
+        self.category_repository = create_category_master_repository(tran_repository.tenant_id)
 
     async def generate_report(
         self,
@@ -126,12 +122,10 @@ class CategoryReportMaker(IReportPlugin):
         
         # Calculate totals
         logger.debug("Calculating totals...")
-        total_gross_amount = sum(cat.gross_amount for cat in categories)
-        total_discount_amount = sum(cat.discount_amount for cat in categories)
-        total_net_amount = sum(cat.net_amount for cat in categories)
-        total_quantity = sum(cat.quantity for cat in categories)
-        total_discount_quantity = sum(cat.discount_quantity for cat in categories)
-        total_transaction_count = sum(cat.transaction_count for cat in categories)
+        totals = sum_fields(
+            categories,
+            ["gross_amount", "discount_amount", "net_amount", "quantity", "discount_quantity", "transaction_count"],
+        )
         logger.debug("Totals calculated successfully")
 
         # Create category report document
@@ -152,12 +146,12 @@ class CategoryReportMaker(IReportPlugin):
                 report_scope=report_scope,
                 report_type=report_type,
                 categories=categories,
-                total_gross_amount=total_gross_amount,
-                total_discount_amount=total_discount_amount,
-                total_net_amount=total_net_amount,
-                total_quantity=total_quantity,
-                total_discount_quantity=total_discount_quantity,
-                total_transaction_count=total_transaction_count,
+                total_gross_amount=totals["gross_amount"],
+                total_discount_amount=totals["discount_amount"],
+                total_net_amount=totals["net_amount"],
+                total_quantity=totals["quantity"],
+                total_discount_quantity=totals["discount_quantity"],
+                total_transaction_count=totals["transaction_count"],
                 generate_date_time=get_app_time_str(),
                 staff=None,  # HACK: Staff information is not included in data model
             )
@@ -7,9 +7,10 @@ from kugel_common.utils.misc import get_app_time_str
 from app.models.repositories.tranlog_repository import TranlogRepository
 from app.models.repositories.cash_in_out_log_repository import CashInOutLogRepository
 from app.models.repositories.open_close_log_repository import OpenCloseLogRepository
-from app.models.repositories.category_master_web_repository import CategoryMasterWebRepository
-from app.models.repositories.item_master_web_repository import ItemMasterWebRepository
-from app.config.settings import Settings
+from app.models.repositories.master_data_repository_factory import (
+    create_category_master_repository,
+    create_item_master_repository,
+)
 from app.models.documents.item_report_document import ItemReportDocument
 from app.enums.transaction_type import TransactionType
 from app.services.report_plugin_interface import IReportPlugin
@@ -43,16 +44,9 @@ class ItemReportMaker(IReportPlugin):
         self.cash_in_out_log_repository = cash_in_out_log_repository
         self.open_close_log_repository = open_close_log_repository
         
-        # Initialize master data repositories
-        settings = Settings()
-        self.category_repository = CategoryMasterWebRepository(
-            tenant_id=tran_repository.tenant_id,
-            master_data_base_url=settings.BASE_URL_MASTER_DATA
-        )
-        self.item_repository = ItemMasterWebRepository(
-            tenant_id=tran_repository.tenant_id,
-            master_data_base_url=settings.BASE_URL_MASTER_DATA
-        )
+        # Initialize master data repositories (HTTP or gRPC depending on USE_GRPC)
+        self.category_repository = create_category_master_repository(tran_repository.tenant_id)
+        self.item_repository = create_item_master_repository(tran_repository.tenant_id)
 
     async def generate_report(
         self,
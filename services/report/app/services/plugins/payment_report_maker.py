@@ -11,9 +11,9 @@ from app.models.repositories.tranlog_repository import TranlogRepository
 from app.models.repositories.cash_in_out_log_repository import CashInOutLogRepository
 from app.models.repositories.open_close_log_repository import OpenCloseLogRepository
 from app.models.documents.payment_report_document import PaymentReportDocument
-from app.enums.transaction_type import TransactionType
 from app.services.report_plugin_interface import IReportPlugin
 from app.services.plugins.payment_report_receipt_data import PaymentReportReceiptData
+from app.services.plugins.report_aggregation_helper import sum_fields, transaction_type_factor
 from app.config.settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -115,8 +115,9 @@ class PaymentReportMaker(IReportPlugin):
         logger.info(f"Payment summary: {payment_summary}")
 
         # Calculate totals and composition ratios
-        total_amount = sum(p["amount"] for p in payment_summary)
-        total_count = sum(p["count"] for p in payment_summary)
+        totals = sum_fields(payment_summary, ["amount", "count"])
+        total_amount = totals["amount"]
+        total_count = totals["count"]
 
         # Add composition ratio to each payment
         for payment in payment_summary:
@@ -407,13 +408,10 @@ class PaymentReportMaker(IReportPlugin):
         Raises:
             ValueError: If an invalid transaction type is specified
         """
-        match transaction_type:
-            case TransactionType.NormalSales.value | TransactionType.VoidReturn.value:
-                logger.debug(f"Transaction type: {transaction_type} Factor: 1")
-                return 1
-            case TransactionType.ReturnSales.value | TransactionType.VoidSales.value:
-                logger.debug(f"Transaction type: {transaction_type} Factor: -1")
-                return -1
-            case _:
-                logger.error(f"Invalid transaction type: {transaction_type}")
-                raise ValueError(f"Invalid transaction type: {transaction_type}")
\ No newline at end of file
+        try:
+            factor = transaction_type_factor(transaction_type)
+        except ValueError:
+            logger.error(f"Invalid transaction type: {transaction_type}")
+            raise
+        logger.debug(f"Transaction type: {transaction_type} Factor: {factor}")
+        return factor
\ No newline at end of file
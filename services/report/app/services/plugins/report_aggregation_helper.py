@@ -0,0 +1,148 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+"""
+Shared helpers for the Python post-processing step of the report makers.
+
+The aggregation pipelines return one row per group (transaction type, payment
+code, category, ...). Merging those rows used to be done with linear searches
+inside nested loops; the helpers here keep keyed accumulators instead so that
+each row is merged in constant time.
+"""
+from typing import Any, Iterable
+
+from app.enums.transaction_type import TransactionType
+
+
+def transaction_type_factor(transaction_type: int) -> int:
+    """
+    Return the factor for aggregation based on transaction type
+    Normal transactions and void returns are 1, return transactions and void sales are -1
+
+    Args:
+        transaction_type: Transaction type
+
+    Returns:
+        Aggregation factor (1 or -1)
+
+    Raises:
+        ValueError: If an invalid transaction type is specified
+    """
+    match transaction_type:
+        case TransactionType.NormalSales.value | TransactionType.VoidReturn.value:
+            return 1
+        case TransactionType.ReturnSales.value | TransactionType.VoidSales.value:
+            return -1
+        case _:
+            raise ValueError(f"Invalid transaction type: {transaction_type}")
+
+
+def index_by_transaction_type(results: list[dict]) -> dict[int, dict[str, Any]]:
+    """
+    Index pipeline results by transaction type
+
+    When several results share a transaction type the first one wins, which
+    matches the behaviour of a linear search over the results.
+
+    Args:
+        results: Pipeline results whose _id contains transaction_type
+
+    Returns:
+        Dictionary mapping transaction type to result
+    """
+    index: dict[int, dict[str, Any]] = {}
+    for result in results:
+        index.setdefault(result["_id"]["transaction_type"], result)
+    return index
+
+
+def sum_fields(items: Iterable[Any], names: list[str]) -> dict[str, Any]:
+    """
+    Sum several fields of a list of rows in a single pass
+
+    Args:
+        items: Rows to sum, either dictionaries or objects (e.g. report items)
+        names: Field (key or attribute) names to sum
+
+    Returns:
+        Dictionary mapping field name to total
+    """
+    totals = {name: 0 for name in names}
+    for item in items:
+        if isinstance(item, dict):
+            for name in names:
+                totals[name] += item[name]
+        else:
+            for name in names:
+                totals[name] += getattr(item, name)
+    return totals
+
+
+class KeyedAccumulator:
+    """
+    Accumulator that merges rows sharing the same key
+
+    Rows are merged into a dictionary keyed by key_field. The first row seen for
+    a key provides the descriptive attributes (e.g. tax_name), numeric fields are
+    summed after being multiplied by the given factor. Insertion order is kept so
+    the output order is the same as the order in which keys first appeared.
+    Rows whose key is None are ignored (e.g. empty taxes/payments arrays).
+    """
+
+    def __init__(self, key_field: str, sum_fields: list[str], attr_fields: list[str] = None):
+        """
+        Constructor
+
+        Args:
+            key_field: Name of the field used as the key
+            sum_fields: Names of the numeric fields to sum
+            attr_fields: Names of the fields copied from the first row seen for a key
+        """
+        self.key_field = key_field
+        self.sum_fields = sum_fields
+        self.attr_fields = attr_fields or []
+        self._entries: dict[Any, dict[str, Any]] = {}
+
+    def add(self, row: dict[str, Any], factor: int = 1) -> None:
+        """
+        Merge a row into the accumulator
+
+        Args:
+            row: Row to merge
+            factor: Factor applied to the numeric fields (1 or -1)
+        """
+        key = row.get(self.key_field)
+        if key is None:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {self.key_field: key}
+            for name in self.attr_fields:
+                entry[name] = row.get(name)
+            for name in self.sum_fields:
+                entry[name] = row.get(name, 0) * factor
+            self._entries[key] = entry
+        else:
+            for name in self.sum_fields:
+                entry[name] += row.get(name, 0) * factor
+
+    def add_all(self, rows: Iterable[dict[str, Any]], factor: int = 1) -> None:
+        """
+        Merge several rows into the accumulator
+
+        Args:
+            rows: Rows to merge
+            factor: Factor applied to the numeric fields (1 or -1)
+        """
+        for row in rows:
+            self.add(row, factor)
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """
+        Get the accumulated rows
+
+        Returns:
+            List of accumulated rows in first-seen key order
+        """
+        return list(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -14,6 +14,11 @@ from app.models.documents.open_close_log import OpenCloseLog
 from app.enums.transaction_type import TransactionType
 from app.services.report_plugin_interface import IReportPlugin
 from app.services.plugins.sales_report_receipt_data import SalesReportReceiptData
+from app.services.plugins.report_aggregation_helper import (
+    KeyedAccumulator,
+    index_by_transaction_type,
+    transaction_type_factor,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -140,11 +145,12 @@ class SalesReportMaker(IReportPlugin):
 
         # Create sales report document
         # Issue #85: Calculate components for net sales formula
-        sales_gross = self._make_sales_gross(tran_results)
-        returns = self._make_returns(tran_results)
+        results_by_type = index_by_transaction_type(tran_results)
+        sales_gross = self._make_sales_gross(results_by_type)
+        returns = self._make_returns(results_by_type)
         discount_for_lineitems = self._make_discount_for_lineitem(summarized_tran_result)
         discount_for_subtotal = self._make_discount_for_subtotal(summarized_tran_result)
-        net_tax = self._make_net_tax(tran_results)
+        net_tax = self._make_net_tax(results_by_type)
 
         return_doc = SalesReportDocument(
             tenant_id=self.tran_repository.tenant_id,
@@ -607,6 +613,9 @@ class SalesReportMaker(IReportPlugin):
         """
         Aggregate sales report results
 
+        Taxes and payments are merged with keyed accumulators (by tax code and
+        payment code) so each bucket is merged in constant time.
+
         Args:
             results: Sales report retrieval results
 
@@ -629,76 +638,32 @@ class SalesReportMaker(IReportPlugin):
             "total_sub_total_discount_amount": 0,
             "total_sub_total_discount_count": 0,
             "total_sub_total_discount_quantity": 0,
-            "taxes": [],
-            "payments": [],
         }
+        total_fields = list(total.keys())
+        taxes = KeyedAccumulator(
+            "tax_code", sum_fields=["tax_amount", "target_amount", "target_quantity"], attr_fields=["tax_name"]
+        )
+        payments = KeyedAccumulator("payment_code", sum_fields=["amount", "count"], attr_fields=["description"])
 
         for result in results:
             transaction_type = result["_id"]["transaction_type"]
-            logger.debug(f"Summarize sales report Transaction type: {transaction_type}")
-            logger.debug(f"Summarize sales report: result -> {result}")
+            # lazy formatting: the result dump is expensive for large date ranges
+            logger.debug("Summarize sales report Transaction type: %s", transaction_type)
+            logger.debug("Summarize sales report: result -> %s", result)
             factor = self._return_factor(transaction_type)
-            total["total_amount"] += result["total_amount"] * factor
-            total["total_amount_with_tax"] += result["total_amount_with_tax"] * factor
-            total["total_tax_amount"] += result["total_tax_amount"] * factor
-            total["total_quantity"] += result["total_quantity"] * factor
-            total["total_change_amount"] += result["total_change_amount"] * factor
-            total["total_discount_amount"] += result["total_discount_amount"] * factor
-            total["total_transaction_count"] += result["total_transaction_count"] * factor
-            total["total_line_items_discount_amount"] += result["total_line_items_discount_amount"] * factor
-            total["total_line_items_discount_count"] += result["total_line_items_discount_count"] * factor
-            total["total_line_items_discount_quantity"] += result["total_line_items_discount_quantity"] * factor
-            total["total_sub_total_discount_amount"] += result["total_sub_total_discount_amount"] * factor
-            total["total_sub_total_discount_count"] += result["total_sub_total_discount_count"] * factor
-            total["total_sub_total_discount_quantity"] += result["total_sub_total_discount_quantity"] * factor
-
-            # Aggregate tax amounts
-            for tax in result["taxes"]:
-                tax_code = tax.get("tax_code")
-                tax_name = tax.get("tax_name")
-                # Skip if tax_code is None (e.g., empty taxes array)
-                if tax_code is None:
-                    continue
-                tax_amount = tax.get("tax_amount", 0) * factor
-                target_amount = tax.get("target_amount", 0) * factor
-                target_quantity = tax.get("target_quantity", 0) * factor
-                tax_dict = next((tax for tax in total["taxes"] if tax.get("tax_code") == tax_code), None)
-                if tax_dict is None:
-                    total["taxes"].append(
-                        {
-                            "tax_code": tax_code,
-                            "tax_name": tax_name,
-                            "tax_amount": tax_amount,
-                            "target_amount": target_amount,
-                            "target_quantity": target_quantity,
-                        }
-                    )
-                else:
-                    tax_dict["tax_amount"] += tax_amount
-                    tax_dict["target_amount"] += target_amount
-                    tax_dict["target_quantity"] += target_quantity
-
-            # Aggregate payment methods
-            for payment in result["payments"]:
-                payment_code = payment.get("payment_code")
-                description = payment.get("description")
-                # Skip if payment_code is None (e.g., empty payments array)
-                if payment_code is None:
-                    continue
-                amount = payment.get("amount", 0) * factor
-                count = payment.get("count", 0) * factor
-                payment_dict = next((payment for payment in total["payments"] if payment.get("payment_code") == payment_code), None)
-                if payment_dict is None:
-                    total["payments"].append(
-                        {"payment_code": payment_code, "description": description, "amount": amount, "count": count}
-                    )
-                else:
-                    payment_dict["amount"] += amount
-                    payment_dict["count"] += count
-            logger.debug(f"Summarize sales report: total -> {total}")
+            for field in total_fields:
+                total[field] += result[field] * factor
+
+            # Aggregate tax amounts and payment methods
+            taxes.add_all(result["taxes"], factor)
+            payments.add_all(result["payments"], factor)
+
+        total["taxes"] = taxes.to_list()
+        total["payments"] = payments.to_list()
+        logger.debug("Summarize sales report: total -> %s", total)
         return total
 
-    def _make_sales_gross(self, results: list[dict]) -> dict[str, Any]:
+    def _make_sales_gross(self, results_by_type: dict[int, dict]) -> dict[str, Any]:
         """
         Create gross sales information (tax-inclusive amount after discount + discount amount)
 
@@ -706,14 +671,14 @@ class SalesReportMaker(IReportPlugin):
         This works for both external tax (外税) and internal tax (内税).
 
         Args:
-            results: Sales report retrieval results
+            results_by_type: Sales report retrieval results indexed by transaction type
 
         Returns:
             Gross sales information (tax-inclusive amount before discounts)
         """
 
-        normal_sales = self._get_result_by_transaction_type(results, TransactionType.NormalSales.value)
-        void_sales = self._get_result_by_transaction_type(results, TransactionType.VoidSales.value)
+        normal_sales = self._get_result_by_transaction_type(results_by_type, TransactionType.NormalSales.value)
+        void_sales = self._get_result_by_transaction_type(results_by_type, TransactionType.VoidSales.value)
 
         if normal_sales is None:
             normal_sales = {"total_amount_with_tax": 0, "total_discount_amount": 0, "total_quantity": 0, "total_transaction_count": 0}
@@ -829,7 +794,7 @@ class SalesReportMaker(IReportPlugin):
         logger.debug(f"Discount for subtotal: {return_dict}")
         return return_dict
 
-    def _make_returns(self, results: list[dict]) -> dict[str, Any]:
+    def _make_returns(self, results_by_type: dict[int, dict]) -> dict[str, Any]:
         """
         Create return information (tax-inclusive amount)
 
@@ -837,14 +802,14 @@ class SalesReportMaker(IReportPlugin):
         This works for both external tax (外税) and internal tax (内税).
 
         Args:
-            results: Sales report retrieval results
+            results_by_type: Sales report retrieval results indexed by transaction type
 
         Returns:
             Return information
         """
 
-        return_sales = self._get_result_by_transaction_type(results, TransactionType.ReturnSales.value)
-        void_return = self._get_result_by_transaction_type(results, TransactionType.VoidReturn.value)
+        return_sales = self._get_result_by_transaction_type(results_by_type, TransactionType.ReturnSales.value)
+        void_return = self._get_result_by_transaction_type(results_by_type, TransactionType.VoidReturn.value)
 
         if return_sales is None:
             return_sales = {"total_amount_with_tax": 0, "total_quantity": 0, "total_transaction_count": 0}
@@ -888,7 +853,7 @@ class SalesReportMaker(IReportPlugin):
         logger.debug(f"Taxes: {return_list}")
         return return_list
 
-    def _make_net_tax(self, results: list[dict]) -> float:
+    def _make_net_tax(self, results_by_type: dict[int, dict]) -> float:
         """
         Calculate net tax amount (sales tax - returns tax)
 
@@ -899,19 +864,19 @@ class SalesReportMaker(IReportPlugin):
         Now uses total_tax_amount calculated from taxes array in aggregation pipeline.
 
         Args:
-            results: Sales report retrieval results
+            results_by_type: Sales report retrieval results indexed by transaction type
 
         Returns:
             Net tax amount (can be negative if returns exceed sales)
         """
 
         # Get sales transactions
-        normal_sales = self._get_result_by_transaction_type(results, TransactionType.NormalSales.value)
-        void_sales = self._get_result_by_transaction_type(results, TransactionType.VoidSales.value)
+        normal_sales = self._get_result_by_transaction_type(results_by_type, TransactionType.NormalSales.value)
+        void_sales = self._get_result_by_transaction_type(results_by_type, TransactionType.VoidSales.value)
 
         # Get return transactions
-        return_sales = self._get_result_by_transaction_type(results, TransactionType.ReturnSales.value)
-        void_return = self._get_result_by_transaction_type(results, TransactionType.VoidReturn.value)
+        return_sales = self._get_result_by_transaction_type(results_by_type, TransactionType.ReturnSales.value)
+        void_return = self._get_result_by_transaction_type(results_by_type, TransactionType.VoidReturn.value)
 
         # Calculate sales tax (NormalSales - VoidSales)
         sales_tax = 0.0
@@ -989,18 +954,20 @@ class SalesReportMaker(IReportPlugin):
             "cash_out": {"amount": cash_out_amount, "count": cash_summary["cash_out_count"]},
         }
 
-    def _get_result_by_transaction_type(self, results: list[dict], transaction_type: int) -> dict[str, Any]:
+    def _get_result_by_transaction_type(
+        self, results_by_type: dict[int, dict], transaction_type: int
+    ) -> dict[str, Any]:
         """
         Retrieve results based on transaction type
 
         Args:
-            results: Sales report retrieval results
+            results_by_type: Sales report retrieval results indexed by transaction type
             transaction_type: Transaction type
 
         Returns:
             Results matching the transaction type, or None if not found
         """
-        return next((result for result in results if result["_id"]["transaction_type"] == transaction_type), None)
+        return results_by_type.get(transaction_type)
 
     def _return_factor(self, transaction_type: int) -> int:
         """
@@ -1016,13 +983,10 @@ class SalesReportMaker(IReportPlugin):
         Raises:
             ValueError: If an invalid transaction type is specified
         """
-        match transaction_type:
-            case TransactionType.NormalSales.value | TransactionType.VoidReturn.value:
-                logger.debug(f"Transaction type: {transaction_type} Factor: 1")
-                return 1
-            case TransactionType.ReturnSales.value | TransactionType.VoidSales.value:
-                logger.debug(f"Transaction type: {transaction_type} Factor: -1")
-                return -1
-            case _:
-                logger.error(f"Invalid transaction type: {transaction_type}")
-                raise ValueError(f"Invalid transaction type: {transaction_type}")
+        try:
+            factor = transaction_type_factor(transaction_type)
+        except ValueError:
+            logger.error(f"Invalid transaction type: {transaction_type}")
+            raise
+        logger.debug(f"Transaction type: {transaction_type} Factor: {factor}")
+        return factor
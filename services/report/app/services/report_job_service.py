@@ -0,0 +1,357 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import asyncio
+import hashlib
+import json
+import math
+import uuid
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Optional
+
+from kugel_common.exceptions import ServiceException
+
+from app.config.settings import settings
+from app.models.documents.report_job_document import ReportJobDocument
+from app.models.repositories.report_job_repository import ReportJobRepository, ReportJobStatus
+from app.services.report_service import ReportService
+from app.exceptions import (
+    ReportGenerationException,
+    ReportJobNotFoundException,
+    ReportJobNotReadyException,
+    ReportJobQueueFullException,
+)
+
+logger = getLogger(__name__)
+
+
+class ReportJobWorkerPool:
+    """
+    Bounded pool of workers that generate reports in the background.
+
+    Jobs are put on an in-memory queue and processed by a fixed number of
+    worker tasks, so at most max_workers reports are generated at the same
+    time regardless of how many requests are submitted. The workers are
+    started lazily on the first submit because they need a running event loop.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, timeout_seconds: int):
+        """
+        Initialize the worker pool.
+
+        Args:
+            max_workers: Number of jobs processed concurrently
+            max_queue_size: Number of jobs that can wait for a worker
+            timeout_seconds: Maximum time a single job may run
+        """
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.timeout_seconds = timeout_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._running_jobs = 0
+        self._stopping = False
+
+    def submit(self, job_id: str, job_func: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Queue a job for processing.
+
+        Args:
+            job_id: Identifier of the job (for logging)
+            job_func: Coroutine function that processes the job
+
+        Returns:
+            True if the job was queued, False if the queue is full
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((job_id, job_func))
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Report job queue is full. job_id: {job_id}")
+            return False
+
+    def get_status(self) -> dict[str, int]:
+        """
+        Get the current load of the worker pool.
+
+        Returns:
+            Dictionary with the number of workers, running and queued jobs
+        """
+        return {
+            "max_workers": self.max_workers,
+            "running_jobs": self._running_jobs,
+            "queued_jobs": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def get_max_job_age_seconds(self) -> int:
+        """
+        Get the longest time a job can stay active in this pool.
+
+        A queued job waits at most for the jobs ahead of it, which run on
+        max_workers workers and are each cancelled after timeout_seconds.
+
+        Returns:
+            Maximum queue wait plus run time of a job in seconds
+        """
+        return (math.ceil(self.max_queue_size / self.max_workers) + 1) * self.timeout_seconds
+
+    async def shutdown(self) -> None:
+        """
+        Stop all workers. Jobs still in the queue are dropped and expire as stale jobs.
+        """
+        # the flag stops workers whose cancellation is swallowed by a job finishing at the same time
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._stopping = False
+
+    def _ensure_started(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker_loop(worker_no), name=f"report-job-worker-{worker_no}")
+            for worker_no in range(self.max_workers)
+        ]
+        logger.info(f"Started {self.max_workers} report job workers")
+
+    async def _worker_loop(self, worker_no: int) -> None:
+        while not self._stopping:
+            job_id, job_func = await self._queue.get()
+            self._running_jobs += 1
+            try:
+                logger.debug(f"Worker {worker_no} processing report job: {job_id}")
+                await asyncio.wait_for(job_func(), timeout=self.timeout_seconds)
+            except asyncio.TimeoutError:
+                logger.error(f"Report job timed out after {self.timeout_seconds} seconds. job_id: {job_id}")
+            except Exception as e:
+                # job_func records its own failures; this only guards the worker loop
+                logger.error(f"Unexpected error in report job worker. job_id: {job_id}, error: {e}")
+            finally:
+                self._running_jobs -= 1
+                self._queue.task_done()
+
+
+# shared by all tenants of this service instance
+report_job_worker_pool = ReportJobWorkerPool(
+    max_workers=settings.REPORT_JOB_MAX_WORKERS,
+    max_queue_size=settings.REPORT_JOB_MAX_QUEUE_SIZE,
+    timeout_seconds=settings.REPORT_JOB_TIMEOUT_SECONDS,
+)
+
+
+class ReportJobService:
+    """
+    Service for asynchronous report generation.
+
+    Clients submit a report request and receive a job identifier immediately.
+    The report is generated in the background by the existing ReportService
+    (and therefore the configured report makers) and stored in the job
+    document, from where it can be polled and downloaded repeatedly.
+    Identical requests of the same requester submitted while a job is active
+    share that job (see make_request_hash).
+    """
+
+    def __init__(
+        self,
+        report_service_factory: Callable[[], Awaitable[ReportService]],
+        job_repository: ReportJobRepository,
+        worker_pool: ReportJobWorkerPool = report_job_worker_pool,
+    ):
+        """
+        Initialize the ReportJobService.
+
+        Args:
+            report_service_factory: Coroutine function creating the report service that
+                generates a job. Jobs outlive the request, so they do not share its service.
+            job_repository: Repository for report jobs
+            worker_pool: Worker pool that processes the jobs
+        """
+        self.report_service_factory = report_service_factory
+        self.job_repository = job_repository
+        self.worker_pool = worker_pool
+        self.tenant_id = job_repository.tenant_id
+
+    @staticmethod
+    def make_request_hash(tenant_id: str, request_params: dict[str, Any]) -> str:
+        """
+        Make a hash that identifies identical report requests.
+
+        The hash covers the tenant and every request parameter, which includes
+        the requester (requesting_terminal_no, requesting_staff_id and
+        is_api_key_request) besides the report parameters. A job runs with the
+        parameters of the request that created it and journals the report for
+        that requester only, so only identical requests of the same requester
+        share a job.
+
+        Args:
+            tenant_id: Identifier for the tenant
+            request_params: Parameters passed to the report service
+
+        Returns:
+            Hex digest of the normalized request
+        """
+        normalized = json.dumps({"tenant_id": tenant_id, **request_params}, sort_keys=True, default=str)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    async def submit_job_async(
+        self, request_params: dict[str, Any], result_converter: Callable[[Any], dict]
+    ) -> ReportJobDocument:
+        """
+        Submit a report generation job.
+
+        Args:
+            request_params: Keyword arguments for ReportService.get_report_for_store_async,
+                or get_report_for_terminal_async when terminal_no is set
+            result_converter: Function that converts the generated report into the
+                format stored in the job (the API response format)
+
+        Returns:
+            The job to poll. If an identical request is already active, that job is returned.
+
+        Raises:
+            ReportJobQueueFullException: If the worker pool cannot accept more jobs
+        """
+        request_hash = self.make_request_hash(self.tenant_id, request_params)
+
+        active_job = await self.job_repository.get_active_job_async(request_hash)
+        if active_job is not None:
+            if not await self._expire_stale_job_async(active_job.job_id):
+                logger.info(f"Attaching request to active report job: {active_job.job_id}")
+                return active_job
+            logger.warning(f"Expired stale report job: {active_job.job_id}")
+
+        job = ReportJobDocument(
+            job_id=uuid.uuid4().hex,
+            tenant_id=self.tenant_id,
+            store_code=request_params.get("store_code"),
+            terminal_no=request_params.get("terminal_no"),
+            report_scope=request_params.get("report_scope"),
+            report_type=request_params.get("report_type"),
+            request_hash=request_hash,
+            request_params=request_params,
+            status=ReportJobStatus.PENDING,
+            is_active=True,
+        )
+        job, created = await self.job_repository.create_job_async(job)
+        if not created:
+            return job
+
+        async def run_job():
+            await self._run_job_async(job, result_converter)
+
+        if not self.worker_pool.submit(job.job_id, run_job):
+            message = f"Report job queue is full. job_id: {job.job_id}"
+            await self.job_repository.mark_failed_async(job.job_id, None, message)
+            raise ReportJobQueueFullException(message, logger)
+
+        logger.info(f"Report job submitted. job_id: {job.job_id}, pool: {self.worker_pool.get_status()}")
+        return job
+
+    async def get_job_async(self, store_code: str, job_id: str) -> ReportJobDocument:
+        """
+        Get a report job of a store.
+
+        Active jobs that ran longer than the job timeout, or that can no longer
+        be waiting in the queue, are marked as failed first, so that a job lost
+        by a restart does not stay pending forever.
+
+        Args:
+            store_code: Store the job was submitted for
+            job_id: Identifier of the job
+
+        Returns:
+            The report job document
+
+        Raises:
+            ReportJobNotFoundException: If the job does not exist
+        """
+        job = await self.job_repository.get_job_async(store_code, job_id)
+        if job is None:
+            raise ReportJobNotFoundException(
+                f"Report job not found. store_code: {store_code}, job_id: {job_id}", logger
+            )
+        if job.is_active and await self._expire_stale_job_async(job_id):
+            job = await self.job_repository.get_job_async(store_code, job_id)
+        return job
+
+    async def get_job_result_async(self, store_code: str, job_id: str) -> Any:
+        """
+        Get the generated report of a completed job.
+
+        Args:
+            store_code: Store the job was submitted for
+            job_id: Identifier of the job
+
+        Returns:
+            The generated report in response format
+
+        Raises:
+            ReportJobNotFoundException: If the job does not exist
+            ReportJobNotReadyException: If the job is still pending or running
+            ReportGenerationException: If the job failed
+        """
+        job = await self.get_job_async(store_code, job_id)
+        if job.status == ReportJobStatus.COMPLETED:
+            return job.result
+        if job.status == ReportJobStatus.FAILED:
+            raise ReportGenerationException(
+                f"Report job failed. job_id: {job_id}, error: {job.error_message}", logger
+            )
+        raise ReportJobNotReadyException(f"Report job is {job.status}. job_id: {job_id}", logger)
+
+    async def _expire_stale_job_async(self, job_id: str) -> bool:
+        """
+        Expire an active job that exceeded the limits of the worker pool.
+
+        Args:
+            job_id: Identifier of the job
+
+        Returns:
+            True if the job was stale and has been marked as failed
+        """
+        return await self.job_repository.expire_stale_job_async(
+            job_id, self.worker_pool.timeout_seconds, self.worker_pool.get_max_job_age_seconds()
+        )
+
+    async def _run_job_async(self, job: ReportJobDocument, result_converter: Callable[[Any], dict]) -> None:
+        """
+        Generate the report of a job and store the result.
+
+        Args:
+            job: Report job document
+            result_converter: Function that converts the generated report
+        """
+        if not await self.job_repository.mark_running_async(job.job_id):
+            logger.warning(f"Report job is no longer pending, skipped. job_id: {job.job_id}")
+            return
+
+        try:
+            params = dict(job.request_params)
+            if params.get("sort"):
+                # stored as JSON arrays, the repositories expect tuples
+                params["sort"] = [tuple(item) for item in params["sort"]]
+            report_service = await self.report_service_factory()
+            if params.get("terminal_no") is not None:
+                report = await report_service.get_report_for_terminal_async(**params)
+            else:
+                params.pop("terminal_no", None)
+                report = await report_service.get_report_for_store_async(**params)
+            if await self.job_repository.mark_completed_async(job.job_id, result_converter(report)):
+                logger.info(f"Report job completed. job_id: {job.job_id}")
+            else:
+                logger.warning(f"Report job was expired before it completed, result discarded. job_id: {job.job_id}")
+        except asyncio.CancelledError:
+            # cancelled by the worker pool timeout or shutdown
+            await self.job_repository.mark_failed_async(job.job_id, None, "Report job was cancelled")
+            raise
+        except ServiceException as e:
+            logger.warning(f"Report job failed. job_id: {job.job_id}, error: {e}")
+            await self.job_repository.mark_failed_async(
+                job.job_id, getattr(e, "error_code", None), getattr(e, "user_message", None) or str(e)
+            )
+        except Exception as e:
+            logger.error(f"Report job failed. job_id: {job.job_id}, error: {e}")
+            await self.job_repository.mark_failed_async(job.job_id, None, str(e))
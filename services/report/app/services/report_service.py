@@ -1,4 +1,6 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.  # report_service.py
+import asyncio
+import copy
 from typing import Any
 from collections import defaultdict
 from logging import getLogger
@@ -13,10 +15,11 @@ from kugel_common.utils.service_auth import create_service_token
 from kugel_common.enums import TransactionType
 
 from app.models.repositories.terminal_info_web_repository import TerminalInfoWebRepository
-from app.models.repositories.tranlog_repository import TranlogRepository
+from app.models.repositories.tranlog_repository import TranlogRepository, parse_business_date
 from app.models.repositories.cash_in_out_log_repository import CashInOutLogRepository
 from app.models.repositories.open_close_log_repository import OpenCloseLogRepository
 from app.models.repositories.daily_info_document_repository import DailyInfoDocumentRepository
+from app.models.repositories.tranlog_facet_batch import TranlogFacetBatch
 from app.models.documents.daily_info_document import DailyInfoDocument
 from app.services.report_plugin_manager import ReportPluginManager
 from app.exceptions import (
@@ -127,6 +130,7 @@ class ReportService:
             TerminalNotClosedException: If any terminal in the store is not closed (single date mode only)
             ReportGenerationException: If an error occurs during report generation
             ReportNotFoundException: If the requested report type does not exist
+            ReportDateException: If a business date is malformed or the date range is reversed
         """
         logger.debug(
             f"get_report_for_store_async: {store_code}, {report_scope}, {report_type}, {business_date}, {open_counter}, {limit}, {page}, {sort}"
@@ -136,6 +140,9 @@ class ReportService:
         if report_scope == "flush":
             report_scope = "flash"
 
+        # reject malformed dates before the generic error handling turns them into a server error
+        self._validate_business_dates(business_date, business_date_from, business_date_to)
+
         # check if conditions are met for daily report
         # Skip terminal closed check if date range is specified
         if report_scope == "daily" and not (business_date_from and business_date_to):
@@ -150,39 +157,21 @@ class ReportService:
 
         if report_type in self.report_makers:
             try:
-                maker = self.report_makers[report_type]
-                
-                # Check if the maker supports date range parameters
-                if hasattr(maker.generate_report, '__code__') and 'business_date_from' in maker.generate_report.__code__.co_varnames:
-                    # Maker supports date range parameters
-                    report_data = await maker.generate_report(
-                        store_code=store_code,
-                        terminal_no=None,
-                        business_counter=business_counter,
-                        business_date=business_date,
-                        open_counter=open_counter,
-                        report_scope=report_scope,
-                        report_type=report_type,
-                        limit=limit,
-                        page=page,
-                        sort=sort,
-                        business_date_from=business_date_from,
-                        business_date_to=business_date_to,
-                    )
-                else:
-                    # Maker doesn't support date range parameters (legacy)
-                    report_data = await maker.generate_report(
-                        store_code=store_code,
-                        terminal_no=None,
-                        business_counter=business_counter,
-                        business_date=business_date,
-                        open_counter=open_counter,
-                        report_scope=report_scope,
-                        report_type=report_type,
-                        limit=limit,
-                        page=page,
-                        sort=sort,
-                    )
+                report_data = await self._generate_with_maker_async(
+                    maker=self.report_makers[report_type],
+                    store_code=store_code,
+                    terminal_no=None,
+                    report_scope=report_scope,
+                    report_type=report_type,
+                    business_date=business_date,
+                    open_counter=open_counter,
+                    business_counter=business_counter,
+                    limit=limit,
+                    page=page,
+                    sort=sort,
+                    business_date_from=business_date_from,
+                    business_date_to=business_date_to,
+                )
 
                 # Send report to journal service only for API key requests
                 if is_api_key_request:
@@ -263,6 +252,7 @@ class ReportService:
             TerminalNotClosedException: If the terminal is not closed
             ReportGenerationException: If an error occurs during report generation
             ReportNotFoundException: If the requested report type does not exist
+            ReportDateException: If a business date is malformed or the date range is reversed
         """
         logger.debug(
             f"get_report_for_terminal_async: {store_code}, {terminal_no}, {report_scope}, {report_type}, {business_date}, {open_counter}, {limit}, {page}, {sort}"
@@ -272,6 +262,9 @@ class ReportService:
         if report_scope == "flush":
             report_scope = "flash"
 
+        # reject malformed dates before the generic error handling turns them into a server error
+        self._validate_business_dates(business_date, business_date_from, business_date_to)
+
         # check if conditions are met for daily report
         # Skip terminal closed check if date range is specified
         if report_scope == "daily" and not (business_date_from and business_date_to):
@@ -289,39 +282,21 @@ class ReportService:
 
         if report_type in self.report_makers:
             try:
-                maker = self.report_makers[report_type]
-                
-                # Check if the maker supports date range parameters
-                if hasattr(maker.generate_report, '__code__') and 'business_date_from' in maker.generate_report.__code__.co_varnames:
-                    # Maker supports date range parameters
-                    report_data = await maker.generate_report(
-                        store_code=store_code,
-                        terminal_no=terminal_no,
-                        report_scope=report_scope,
-                        report_type=report_type,
-                        business_date=business_date,
-                        open_counter=open_counter,
-                        business_counter=business_counter,
-                        limit=limit,
-                        page=page,
-                        sort=sort,
-                        business_date_from=business_date_from,
-                        business_date_to=business_date_to,
-                    )
-                else:
-                    # Maker doesn't support date range parameters (legacy)
-                    report_data = await maker.generate_report(
-                        store_code=store_code,
-                        terminal_no=terminal_no,
-                        report_scope=report_scope,
-                        report_type=report_type,
-                        business_date=business_date,
-                        open_counter=open_counter,
-                        business_counter=business_counter,
-                        limit=limit,
-                        page=page,
-                        sort=sort,
-                    )
+                report_data = await self._generate_with_maker_async(
+                    maker=self.report_makers[report_type],
+                    store_code=store_code,
+                    terminal_no=terminal_no,
+                    report_scope=report_scope,
+                    report_type=report_type,
+                    business_date=business_date,
+                    open_counter=open_counter,
+                    business_counter=business_counter,
+                    limit=limit,
+                    page=page,
+                    sort=sort,
+                    business_date_from=business_date_from,
+                    business_date_to=business_date_to,
+                )
 
                 # Send report to journal service only for API key requests
                 if is_api_key_request:
@@ -352,6 +327,180 @@ class ReportService:
             message = f"Invalid report type: {report_type}"
             raise ReportNotFoundException(message, logger)
 
+    async def get_combined_report_async(
+        self,
+        store_code: str,
+        report_scope: str,
+        report_types: list[str],
+        terminal_no: int = None,
+        business_date: str = None,
+        open_counter: int = None,
+        business_counter: int = None,
+        limit: int = 100,
+        page: int = 1,
+        sort: list[tuple[str, int]] = None,
+        requesting_terminal_no: int = None,
+        requesting_staff_id: str = None,
+        is_api_key_request: bool = False,
+        business_date_from: str = None,
+        business_date_to: str = None,
+    ) -> dict[str, Any]:
+        """
+        Generate several reports for a store or terminal in a single pass.
+
+        Terminals usually request the sales, payment, category and item reports
+        for the same close one after another. This method checks the close once,
+        runs the requested report makers together and executes their transaction
+        log aggregations as one $facet query (see TranlogFacetBatch). For API key
+        requests the reports are sent to the journal as one entry.
+
+        Args:
+            store_code: Identifier for the store
+            report_scope: Scope of the report (e.g., 'flash', 'daily')
+            report_types: Types of the reports to generate (each must correspond to a loaded plugin)
+            terminal_no: Terminal number, None for store-wide reports
+            business_date: Date for which the reports are generated (single date mode)
+            open_counter: Optional counter for terminal open/close cycles
+            business_counter: Optional business counter for the day
+            limit: Maximum number of records to include
+            page: Page number for pagination
+            sort: List of tuples containing field name and sort direction
+            requesting_terminal_no: Terminal number that requested the reports (for journal tracking)
+            requesting_staff_id: Staff ID who requested the reports (for journal tracking)
+            is_api_key_request: Whether this request came from API key authentication (determines if journal entry is created)
+            business_date_from: Start date for date range mode (optional)
+            business_date_to: End date for date range mode (optional)
+
+        Returns:
+            Dictionary mapping report type to the generated report data, in the requested order
+
+        Raises:
+            TerminalNotClosedException: If the store or terminal is not closed (daily, single date mode only)
+            ReportGenerationException: If an error occurs during report generation
+            ReportNotFoundException: If a requested report type does not exist
+            ReportDateException: If a business date is malformed or the date range is reversed
+        """
+        logger.debug(
+            f"get_combined_report_async: {store_code}, {terminal_no}, {report_scope}, {report_types}, {business_date}, {open_counter}"
+        )
+
+        # Normalize report_scope: treat "flush" as "flash" for backward compatibility
+        if report_scope == "flush":
+            report_scope = "flash"
+
+        # reject malformed dates before the generic error handling turns them into a server error
+        self._validate_business_dates(business_date, business_date_from, business_date_to)
+
+        report_types = list(dict.fromkeys(report_types))
+        invalid_types = [report_type for report_type in report_types if report_type not in self.report_makers]
+        if not report_types or invalid_types:
+            message = f"Invalid report type: {invalid_types or report_types}"
+            raise ReportNotFoundException(message, logger)
+
+        # check the close once for all reports (single date mode only)
+        if report_scope == "daily" and not (business_date_from and business_date_to):
+            try:
+                await self._check_if_terminal_closed(
+                    store_code=store_code,
+                    business_date=business_date,
+                    open_counter=open_counter,
+                    terminal_no=terminal_no,
+                )
+            except ServiceException as e:
+                message = f"check_if_terminal_closed->false. store_code->{store_code}, terminal_no->{terminal_no}, business_date->{business_date}, open_counter->{open_counter}"
+                raise TerminalNotClosedException(message, logger, e) from e
+
+        # each maker gets its own handle on the batch; the makers themselves are unchanged
+        batch = TranlogFacetBatch(self.tran_repository, len(report_types))
+
+        async def generate(slot: int, report_type: str):
+            maker = copy.copy(self.report_makers[report_type])
+            maker.tran_repository = batch.handle(slot)
+            try:
+                return await self._generate_with_maker_async(
+                    maker=maker,
+                    store_code=store_code,
+                    terminal_no=terminal_no,
+                    report_scope=report_scope,
+                    report_type=report_type,
+                    business_date=business_date,
+                    open_counter=open_counter,
+                    business_counter=business_counter,
+                    limit=limit,
+                    page=page,
+                    sort=sort,
+                    business_date_from=business_date_from,
+                    business_date_to=business_date_to,
+                )
+            finally:
+                batch.handle(slot).close()
+
+        try:
+            results = await asyncio.gather(
+                *[generate(slot, report_type) for slot, report_type in enumerate(report_types)]
+            )
+        except Exception as e:
+            message = f"Error occurred during combined report generation: report_types->{report_types}, store_code->{store_code}, terminal_no->{terminal_no}, business_date->{business_date or f'{business_date_from} to {business_date_to}'}"
+            raise ReportGenerationException(message, logger, e) from e
+        reports = dict(zip(report_types, results))
+
+        # Send reports to journal service only for API key requests
+        if is_api_key_request:
+            logger.info("API key request detected for combined report, sending to journal")
+            await self._send_reports_to_journal(
+                store_code=store_code,
+                terminal_no=terminal_no,
+                report_scope=report_scope,
+                reports=reports,
+                business_date=business_date if business_date else business_date_from,
+                open_counter=open_counter,
+                business_counter=business_counter,
+                requesting_terminal_no=requesting_terminal_no or terminal_no,
+                requesting_staff_id=requesting_staff_id,
+            )
+
+        return reports
+
+    async def _generate_with_maker_async(
+        self,
+        maker: Any,
+        store_code: str,
+        terminal_no: int,
+        report_scope: str,
+        report_type: str,
+        business_date: str,
+        open_counter: int,
+        business_counter: int,
+        limit: int,
+        page: int,
+        sort: list[tuple[str, int]],
+        business_date_from: str = None,
+        business_date_to: str = None,
+    ) -> Any:
+        """
+        Call a report maker, passing the date range only to makers that support it.
+
+        Returns:
+            The generated report data
+        """
+        params = dict(
+            store_code=store_code,
+            terminal_no=terminal_no,
+            report_scope=report_scope,
+            report_type=report_type,
+            business_date=business_date,
+            open_counter=open_counter,
+            business_counter=business_counter,
+            limit=limit,
+            page=page,
+            sort=sort,
+        )
+        # Check if the maker supports date range parameters
+        if hasattr(maker.generate_report, '__code__') and 'business_date_from' in maker.generate_report.__code__.co_varnames:
+            # Maker supports date range parameters
+            params.update(business_date_from=business_date_from, business_date_to=business_date_to)
+        return await maker.generate_report(**params)
+
     async def _create_daily_info(self, daily_info: DailyInfoDocument, verified: bool, verified_message: str):
         """
         Create or update a daily information document with verification status.
@@ -375,6 +524,26 @@ class ReportService:
                 message, self.daily_info_repository.collection_name, daily_info, logger, e
             ) from e
 
+    @staticmethod
+    def _validate_business_dates(business_date: str, business_date_from: str, business_date_to: str) -> None:
+        """
+        Validate the business date parameters of a report request.
+
+        Args:
+            business_date: Business date in YYYYMMDD format (single date mode)
+            business_date_from: Start date for date range mode
+            business_date_to: End date for date range mode
+
+        Raises:
+            ReportDateException: If a date is malformed or the range is reversed
+        """
+        for value in (business_date, business_date_from, business_date_to):
+            if value:
+                parse_business_date(value)
+        if business_date_from and business_date_to and business_date_from > business_date_to:
+            message = f"Invalid date range: business_date_from->{business_date_from}, business_date_to->{business_date_to}"
+            raise ReportDateException(message, logger)
+
     async def _check_if_terminal_closed(
         self, store_code: str, business_date: str, open_counter: int, terminal_no: int = None
     ) -> None:
@@ -626,10 +795,6 @@ class ReportService:
         """
         Send generated report to journal service for archival.
 
-        This method sends reports to the journal service so they can be stored
-        and retrieved later. It determines the transaction type based on the
-        report scope (flash/daily) and constructs the journal data accordingly.
-
         Args:
             store_code: Identifier for the store
             terminal_no: Terminal number (None for store-wide reports)
@@ -642,8 +807,53 @@ class ReportService:
             requesting_terminal_no: Terminal that requested the report (for store-wide reports)
             requesting_staff_id: Staff ID who requested the report
         """
+        await self._send_reports_to_journal(
+            store_code=store_code,
+            terminal_no=terminal_no,
+            report_scope=report_scope,
+            reports={report_type: report_data},
+            business_date=business_date,
+            open_counter=open_counter,
+            business_counter=business_counter,
+            requesting_terminal_no=requesting_terminal_no,
+            requesting_staff_id=requesting_staff_id,
+        )
+
+    async def _send_reports_to_journal(
+        self,
+        store_code: str,
+        terminal_no: int,
+        report_scope: str,
+        reports: dict[str, Any],
+        business_date: str,
+        open_counter: int,
+        business_counter: int,
+        requesting_terminal_no: int = None,
+        requesting_staff_id: str = None,
+    ) -> None:
+        """
+        Send generated reports to journal service for archival.
+
+        This method sends reports to the journal service so they can be stored
+        and retrieved later. It determines the transaction type based on the
+        report scope (flash/daily) and constructs the journal data accordingly.
+        Several reports are sent as one journal entry whose texts are the
+        report texts in order.
+
+        Args:
+            store_code: Identifier for the store
+            terminal_no: Terminal number (None for store-wide reports)
+            report_scope: Scope of the report ('flash' or 'daily')
+            reports: Dictionary mapping report type to the generated report data
+            business_date: Date for which the reports were generated
+            open_counter: Counter for terminal open/close cycles
+            business_counter: Business counter for the day
+            requesting_terminal_no: Terminal that requested the reports (for store-wide reports)
+            requesting_staff_id: Staff ID who requested the reports
+        """
+        report_types = ",".join(reports.keys())
         logger.info(
-            f"_send_report_to_journal called with: store_code={store_code}, terminal_no={terminal_no}, report_scope={report_scope}, requesting_terminal_no={requesting_terminal_no}"
+            f"_send_reports_to_journal called with: store_code={store_code}, terminal_no={terminal_no}, report_scope={report_scope}, report_types={report_types}, requesting_terminal_no={requesting_terminal_no}"
         )
         try:
             # Determine transaction type based on report scope
@@ -655,28 +865,14 @@ class ReportService:
                 logger.warning(f"Unknown report scope '{report_scope}', skipping journal")
                 return
 
-            # Extract receipt data if available
-            receipt_text = ""
-            journal_text = ""
-
-            # The report_data is a SalesReportDocument instance (not wrapped in another object)
-            if hasattr(report_data, "receipt_text") and report_data.receipt_text:
-                receipt_text = report_data.receipt_text
-            if hasattr(report_data, "journal_text") and report_data.journal_text:
-                journal_text = report_data.journal_text
-            else:
-                # Convert report data to string representation if no journal_text
-                import json
-
-                journal_text = json.dumps(
-                    report_data.model_dump() if hasattr(report_data, "model_dump") else report_data,
-                    ensure_ascii=False,
-                    indent=2,
+            receipt_texts = []
+            journal_texts = []
+            for report_type, report_data in reports.items():
+                receipt_text, journal_text = self._make_journal_texts(
+                    store_code, report_scope, report_type, business_date, report_data
                 )
-
-            # Set default receipt text if not available
-            if not receipt_text:
-                receipt_text = f"Report: {report_type} ({report_scope})\nStore: {store_code}\nDate: {business_date}"
+                receipt_texts.append(receipt_text)
+                journal_texts.append(journal_text)
 
             # Prepare journal data
             # The journal API schema uses camelCase due to alias_generator=to_lower_camel
@@ -699,8 +895,8 @@ class ReportService:
                 "quantity": 0,  # Will be set from report data if available
                 "staffId": requesting_staff_id or "SYSTEM",  # Default to SYSTEM for reports
                 "userId": None,  # Set to None as requested
-                "journalText": journal_text,
-                "receiptText": receipt_text,
+                "journalText": "\n".join(journal_texts),
+                "receiptText": "\n".join(receipt_texts),
             }
 
             # For reports, amount and quantity are not applicable
@@ -719,7 +915,7 @@ class ReportService:
             async with get_service_client("journal") as client:
                 response = await client.post(endpoint, json=journal_data, headers=headers)
                 logger.info(
-                    f"Report sent to journal successfully: {report_type} ({report_scope}) for {store_code}/{terminal_no or 'store'} (requested by terminal {journal_terminal_no})"
+                    f"Report sent to journal successfully: {report_types} ({report_scope}) for {store_code}/{terminal_no or 'store'} (requested by terminal {journal_terminal_no})"
                 )
 
         except HttpClientError as e:
@@ -730,3 +926,44 @@ class ReportService:
         except Exception as e:
             # Log any other errors but don't fail the report generation
             logger.error(f"Unexpected error sending report to journal: {str(e)}")
+
+    def _make_journal_texts(
+        self, store_code: str, report_scope: str, report_type: str, business_date: str, report_data: Any
+    ) -> tuple[str, str]:
+        """
+        Make the receipt text and journal text of a report.
+
+        Args:
+            store_code: Identifier for the store
+            report_scope: Scope of the report ('flash' or 'daily')
+            report_type: Type of report (e.g., 'sales')
+            business_date: Date for which the report was generated
+            report_data: The generated report data
+
+        Returns:
+            Tuple of receipt text and journal text
+        """
+        # Extract receipt data if available
+        receipt_text = ""
+        journal_text = ""
+
+        # The report_data is a SalesReportDocument instance (not wrapped in another object)
+        if hasattr(report_data, "receipt_text") and report_data.receipt_text:
+            receipt_text = report_data.receipt_text
+        if hasattr(report_data, "journal_text") and report_data.journal_text:
+            journal_text = report_data.journal_text
+        else:
+            # Convert report data to string representation if no journal_text
+            import json
+
+            journal_text = json.dumps(
+                report_data.model_dump() if hasattr(report_data, "model_dump") else report_data,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+        # Set default receipt text if not available
+        if not receipt_text:
+            receipt_text = f"Report: {report_type} ({report_scope})\nStore: {store_code}\nDate: {business_date}"
+
+        return receipt_text, journal_text
@@ -0,0 +1,306 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import Any, AsyncIterator
+from logging import getLogger
+
+from app.models.repositories.tranlog_repository import TranlogRepository, parse_business_date
+from app.exceptions import ReportValidationException, ReportDateException, ExportException
+
+logger = getLogger(__name__)
+
+
+# Transaction header columns repeated on every fact row, as (column name, pyarrow type factory name).
+# pyarrow is an export-only dependency and is imported lazily, so types are referenced by name here.
+_HEADER_FIELDS = [
+    ("tenant_id", "string"),
+    ("store_code", "string"),
+    ("terminal_no", "int64"),
+    ("business_date", "string"),
+    ("open_counter", "int64"),
+    ("business_counter", "int64"),
+    ("transaction_no", "int64"),
+    ("transaction_type", "int64"),
+    ("receipt_no", "int64"),
+    ("generate_date_time", "string"),
+]
+
+_FACT_FIELDS = {
+    "line_items": [
+        ("line_no", "int64"),
+        ("item_code", "string"),
+        ("category_code", "string"),
+        ("description", "string"),
+        ("unit_price", "float64"),
+        ("unit_price_original", "float64"),
+        ("quantity", "int64"),
+        ("amount", "float64"),
+        ("discount_amount", "float64"),
+        ("discount_allocated_amount", "float64"),
+        ("tax_code", "string"),
+        ("is_cancelled", "bool_"),
+    ],
+    "payments": [
+        ("payment_no", "int64"),
+        ("payment_code", "string"),
+        ("description", "string"),
+        ("amount", "float64"),
+        ("deposit_amount", "float64"),
+    ],
+    "taxes": [
+        ("tax_no", "int64"),
+        ("tax_code", "string"),
+        ("tax_type", "string"),
+        ("tax_name", "string"),
+        ("tax_amount", "float64"),
+        ("target_amount", "float64"),
+        ("target_quantity", "int64"),
+    ],
+}
+
+# Only the fields needed to build the facts are read from MongoDB (no receipt/journal text)
+_PROJECTION = {"_id": 0, **{name: 1 for name, _ in _HEADER_FIELDS}}
+_PROJECTION.update({"line_items": 1, "payments": 1, "taxes": 1})
+
+SUPPORTED_FACT_TYPES = list(_FACT_FIELDS.keys())
+SUPPORTED_FORMATS = {"arrow": "application/vnd.apache.arrow.stream", "parquet": "application/vnd.apache.parquet"}
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow for the export code path.
+
+    Returns:
+        Tuple of the pyarrow, pyarrow.ipc and pyarrow.parquet modules
+
+    Raises:
+        ExportException: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as pa_ipc
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportException("pyarrow is required for columnar exports but is not installed", logger, e) from e
+    return pa, pa_ipc, pq
+
+
+class _ChunkSink:
+    """
+    Write-only file object that buffers written bytes until drained.
+
+    Keeps an absolute position so that writers relying on tell() (the Parquet
+    footer records column chunk offsets) stay correct while the buffer is
+    handed off to the HTTP response piece by piece.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class TranlogExportService:
+    """
+    Service for bulk extraction of transaction facts in columnar formats.
+
+    Transaction logs are read from a MongoDB cursor in batches, flattened into
+    line item, payment or tax fact rows, and encoded as Apache Arrow IPC stream
+    or Parquet record batches which are yielded as they are produced. This avoids
+    per-document pydantic validation and skip/limit paging of the JSON APIs.
+    """
+
+    def __init__(self, tran_repository: TranlogRepository):
+        """
+        Initialize the TranlogExportService.
+
+        Args:
+            tran_repository: Repository for transaction logs
+        """
+        self.tran_repository = tran_repository
+        self.tenant_id = tran_repository.tenant_id
+
+    def validate_export_request(
+        self, fact_type: str, export_format: str, business_date_from: str, business_date_to: str
+    ) -> None:
+        """
+        Validate export parameters before the response starts streaming.
+
+        Args:
+            fact_type: Fact type to export (line_items, payments, taxes)
+            export_format: Output format (arrow, parquet)
+            business_date_from: Start business date (YYYYMMDD)
+            business_date_to: End business date (YYYYMMDD)
+
+        Raises:
+            ReportValidationException: If the fact type or format is not supported
+            ReportDateException: If the date range is invalid
+            ExportException: If pyarrow is not installed
+        """
+        _import_pyarrow()
+        if fact_type not in _FACT_FIELDS:
+            message = f"Unsupported fact type: {fact_type}. supported->{SUPPORTED_FACT_TYPES}"
+            raise ReportValidationException(message, logger)
+        if export_format not in SUPPORTED_FORMATS:
+            message = f"Unsupported export format: {export_format}. supported->{list(SUPPORTED_FORMATS.keys())}"
+            raise ReportValidationException(message, logger)
+        if not business_date_from or not business_date_to or business_date_from > business_date_to:
+            message = (
+                f"Invalid date range: business_date_from->{business_date_from}, business_date_to->{business_date_to}"
+            )
+            raise ReportDateException(message, logger)
+        parse_business_date(business_date_from)
+        parse_business_date(business_date_to)
+
+    @staticmethod
+    def get_media_type(export_format: str) -> str:
+        """
+        Get the HTTP media type for an export format.
+
+        Args:
+            export_format: Output format (arrow, parquet)
+
+        Returns:
+            Media type string
+        """
+        return SUPPORTED_FORMATS[export_format]
+
+    @staticmethod
+    def get_schema(fact_type: str):
+        """
+        Get the Arrow schema for a fact type.
+
+        Args:
+            fact_type: Fact type (line_items, payments, taxes)
+
+        Returns:
+            Arrow schema (pyarrow.Schema) with the transaction header columns followed by the fact columns
+        """
+        pa, _, _ = _import_pyarrow()
+        fields = _HEADER_FIELDS + _FACT_FIELDS[fact_type]
+        return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in fields])
+
+    async def stream_facts_async(
+        self,
+        fact_type: str,
+        export_format: str,
+        business_date_from: str,
+        business_date_to: str,
+        store_code: str = None,
+        terminal_no: int = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream flattened transaction facts for a date range.
+
+        Args:
+            fact_type: Fact type to export (line_items, payments, taxes)
+            export_format: Output format (arrow, parquet)
+            business_date_from: Start business date (YYYYMMDD, inclusive)
+            business_date_to: End business date (YYYYMMDD, inclusive)
+            store_code: Optional store code to filter by
+            terminal_no: Optional terminal number to filter by
+            batch_size: Number of transactions read from MongoDB per batch
+
+        Yields:
+            Encoded bytes of the Arrow IPC stream or Parquet file
+
+        Raises:
+            ExportException: If reading or encoding fails
+        """
+        pa, pa_ipc, pq = _import_pyarrow()
+        schema = self.get_schema(fact_type)
+        sink = _ChunkSink()
+        if export_format == "parquet":
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        else:
+            writer = pa_ipc.new_stream(sink, schema)
+
+        row_count = 0
+        try:
+            async for tranlogs in self.tran_repository.iter_tranlog_batches_async(
+                business_date_from=business_date_from,
+                business_date_to=business_date_to,
+                store_code=store_code,
+                terminal_no=terminal_no,
+                projection=_PROJECTION,
+                batch_size=batch_size,
+            ):
+                columns = self.flatten_facts(fact_type, tranlogs)
+                record_batch = pa.RecordBatch.from_pydict(columns, schema=schema)
+                if record_batch.num_rows == 0:
+                    continue
+                writer.write_batch(record_batch)
+                row_count += record_batch.num_rows
+                data = sink.drain()
+                if data:
+                    yield data
+            writer.close()
+            yield sink.drain()
+        except Exception as e:
+            message = (
+                f"Failed to export {fact_type} facts: tenant_id->{self.tenant_id}, store_code->{store_code}, "
+                f"date_range->{business_date_from} to {business_date_to}"
+            )
+            raise ExportException(message, logger, e) from e
+
+        logger.info(
+            f"Exported {row_count} {fact_type} facts as {export_format}: tenant_id->{self.tenant_id}, "
+            f"store_code->{store_code}, date_range->{business_date_from} to {business_date_to}"
+        )
+
+    @staticmethod
+    def flatten_facts(fact_type: str, tranlogs: list[dict]) -> dict[str, list[Any]]:
+        """
+        Flatten raw transaction log documents into column lists.
+
+        Each element of the transaction's line_items, payments or taxes array
+        becomes one row, prefixed with the transaction header columns.
+
+        Args:
+            fact_type: Fact type (line_items, payments, taxes)
+            tranlogs: Raw transaction log documents
+
+        Returns:
+            Dictionary mapping column name to list of values
+        """
+        header_names = [name for name, _ in _HEADER_FIELDS]
+        fact_names = [name for name, _ in _FACT_FIELDS[fact_type]]
+        columns: dict[str, list[Any]] = {name: [] for name in header_names + fact_names}
+
+        for tranlog in tranlogs:
+            for fact in tranlog.get(fact_type) or []:
+                for name in header_names:
+                    columns[name].append(tranlog.get(name))
+                if fact_type == "line_items":
+                    fact = {
+                        **fact,
+                        "discount_amount": sum(d.get("discount_amount") or 0 for d in fact.get("discounts") or []),
+                        "discount_allocated_amount": sum(
+                            d.get("discount_amount") or 0 for d in fact.get("discounts_allocated") or []
+                        ),
+                    }
+                for name in fact_names:
+                    columns[name].append(fact.get(name))
+        return columns
@@ -37,6 +37,12 @@ test_files=(
     "tests/test_void_transactions.py"  # Void transaction tests
     "tests/test_edge_cases.py"  # Edge case tests (empty arrays, rounding, etc.)
     "tests/test_cancelled_transactions.py"  # Cancelled transaction handling tests
+    "tests/test_tranlog_export.py"  # Columnar export of transaction facts
+    "tests/test_report_aggregation_helper.py"  # Keyed accumulators for report post-processing
+    "tests/test_report_job.py"  # Asynchronous report jobs
+    "tests/test_tranlog_facet_batch.py"  # Single-pass multi-report aggregation
+    "tests/test_tranlog_business_date.py"  # Business date validation and index for tranlog aggregations
+    "tests/test_master_data_grpc_repository.py"  # gRPC master-data repositories
     "tests/test_split_payment_bug.py"  # Run last to avoid affecting other tests
 )
 
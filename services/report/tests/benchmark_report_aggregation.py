@@ -0,0 +1,96 @@
+# Copyright 2025 masa@kugel
+# Micro-benchmark for the sales report post-processing step
+#
+# Compares the previous linear-search merge of taxes/payments buckets with the
+# keyed accumulators now used by SalesReportMaker._summarize_sales_report.
+#
+# Usage (from services/report):
+#     pipenv run python -m tests.benchmark_report_aggregation [rows] [codes]
+
+import sys
+import timeit
+
+from app.enums.transaction_type import TransactionType
+from app.services.plugins.sales_report_maker import SalesReportMaker
+
+
+def make_results(rows: int, codes: int) -> list[dict]:
+    """
+    Create synthetic pipeline results with many tax and payment codes
+    """
+    transaction_types = [
+        TransactionType.NormalSales.value,
+        TransactionType.ReturnSales.value,
+        TransactionType.VoidSales.value,
+        TransactionType.VoidReturn.value,
+    ]
+    results = []
+    for i in range(rows):
+        result = {
+            "_id": {"transaction_type": transaction_types[i % len(transaction_types)], "business_date": str(i)},
+            "total_amount": 1000,
+            "total_amount_with_tax": 1100,
+            "total_tax_amount": 100,
+            "total_quantity": 10,
+            "total_change_amount": 0,
+            "total_discount_amount": 0,
+            "total_transaction_count": 1,
+            "total_line_items_discount_amount": 0,
+            "total_line_items_discount_count": 0,
+            "total_line_items_discount_quantity": 0,
+            "total_sub_total_discount_amount": 0,
+            "total_sub_total_discount_count": 0,
+            "total_sub_total_discount_quantity": 0,
+            "taxes": [
+                {"tax_code": f"T{c}", "tax_name": f"Tax {c}", "tax_amount": 1, "target_amount": 10, "target_quantity": 1}
+                for c in range(codes)
+            ],
+            "payments": [
+                {"payment_code": f"P{c}", "description": f"Payment {c}", "amount": 10, "count": 1} for c in range(codes)
+            ],
+        }
+        results.append(result)
+    return results
+
+
+def linear_merge(results: list[dict]) -> dict:
+    """
+    Previous implementation: linear search of the buckets for every tax/payment
+    """
+    taxes: list[dict] = []
+    payments: list[dict] = []
+    for result in results:
+        for tax in result["taxes"]:
+            tax_dict = next((t for t in taxes if t.get("tax_code") == tax["tax_code"]), None)
+            if tax_dict is None:
+                taxes.append(dict(tax))
+            else:
+                tax_dict["tax_amount"] += tax["tax_amount"]
+                tax_dict["target_amount"] += tax["target_amount"]
+                tax_dict["target_quantity"] += tax["target_quantity"]
+        for payment in result["payments"]:
+            payment_dict = next((p for p in payments if p.get("payment_code") == payment["payment_code"]), None)
+            if payment_dict is None:
+                payments.append(dict(payment))
+            else:
+                payment_dict["amount"] += payment["amount"]
+                payment_dict["count"] += payment["count"]
+    return {"taxes": taxes, "payments": payments}
+
+
+def main(rows: int = 2000, codes: int = 50, number: int = 5) -> None:
+    results = make_results(rows, codes)
+    maker = SalesReportMaker(None, None, None)
+
+    linear = timeit.timeit(lambda: linear_merge(results), number=number) / number
+    keyed = timeit.timeit(lambda: maker._summarize_sales_report(results), number=number) / number
+
+    print(f"rows={rows} codes={codes}")
+    print(f"linear search merge : {linear * 1000:.2f} ms")
+    print(f"keyed accumulators  : {keyed * 1000:.2f} ms")
+    print(f"speedup             : {linear / keyed:.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
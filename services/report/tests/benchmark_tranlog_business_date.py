@@ -0,0 +1,109 @@
+# Copyright 2025 masa@kugel
+# Benchmark of the business date index of transaction logs
+#
+# Compares the latency of a date range report aggregation on the tranlog
+# collection with:
+#   1. only the generic unique index
+#   2. the (tenant_id, store_code, business_date, terminal_no) index used by TranlogRepository
+# Requires a MongoDB instance (MONGODB_URI, default mongodb://localhost:27017/).
+# The benchmark uses its own database, which is dropped at the end.
+#
+# Usage (from services/report):
+#     pipenv run python -m tests.benchmark_tranlog_business_date [months] [logs_per_day]
+
+import asyncio
+import os
+import sys
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.repositories.tranlog_repository import TranlogRepository
+
+TENANT_ID = "BENCH"
+STORES = ["S001", "S002", "S003", "S004"]
+DATE_FROM, DATE_TO = "20240301", "20240415"
+
+
+def make_tranlogs(month_index: int, logs_per_day: int) -> list[dict]:
+    """
+    Create synthetic transaction logs for one month of every store
+    """
+    year, month = 2023 + month_index // 12, month_index % 12 + 1
+    docs = []
+    for store_code in STORES:
+        for day in range(1, 29):
+            business_date = f"{year:04d}{month:02d}{day:02d}"
+            for n in range(logs_per_day):
+                docs.append(
+                    {
+                        "tenant_id": TENANT_ID,
+                        "store_code": store_code,
+                        "terminal_no": n % 4 + 1,
+                        "transaction_no": month_index * 100000 + day * 1000 + n,
+                        "transaction_type": 101,
+                        "business_date": business_date,
+                        "sales": {"total_amount": 1000.0, "is_cancelled": False},
+                        "line_items": [{"category_code": f"C{n % 10}", "amount": 500.0, "quantity": 1}] * 2,
+                    }
+                )
+    return docs
+
+
+def make_pipeline(store_code: str) -> list[dict]:
+    """
+    Category style aggregation over a business date range
+    """
+    match = {
+        "tenant_id": TENANT_ID,
+        "store_code": store_code,
+        "business_date": {"$gte": DATE_FROM, "$lte": DATE_TO},
+        "sales.is_cancelled": False,
+    }
+    return [
+        {"$match": match},
+        {"$unwind": "$line_items"},
+        {"$group": {"_id": "$line_items.category_code", "amount": {"$sum": "$line_items.amount"}}},
+    ]
+
+
+async def measure(func, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await func()
+    return (time.perf_counter() - start) / number
+
+
+async def main(months: int = 24, logs_per_day: int = 50, number: int = 10) -> None:
+    client = AsyncIOMotorClient(os.environ.get("MONGODB_URI", "mongodb://localhost:27017/"))
+    db = client["db_report_benchmark_business_date"]
+    try:
+        repo = TranlogRepository(db, TENANT_ID)
+        await repo.initialize()
+        collection = db[repo.collection_name]
+        await collection.drop()
+        await collection.create_index(
+            [("tenant_id", 1), ("store_code", 1), ("terminal_no", 1), ("transaction_no", 1)], unique=True
+        )
+        for month_index in range(months):
+            await collection.insert_many(make_tranlogs(month_index, logs_per_day))
+
+        pipeline = make_pipeline("S002")
+
+        generic = await measure(lambda: collection.aggregate(pipeline).to_list(None), number)
+
+        await repo.ensure_business_date_index_async()
+        business_date = await measure(lambda: repo.execute_pipeline(pipeline), number)
+
+        print(f"logs={await collection.count_documents({})} range={DATE_FROM}-{DATE_TO} store=S002")
+        print(f"generic index       : {generic * 1000:.2f} ms")
+        print(f"business date index : {business_date * 1000:.2f} ms")
+        print(f"speedup             : {generic / business_date:.2f}x")
+    finally:
+        await client.drop_database("db_report_benchmark_business_date")
+        client.close()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*args))
@@ -0,0 +1,84 @@
+# Copyright 2025 masa@kugel
+# Unit tests for the gRPC master-data repositories
+#
+# These tests verify that:
+# 1. CategoryMasterGrpcRepository maps the category map to code -> description
+# 2. ItemMasterGrpcRepository reads items with one batch call and skips the call for no codes
+# 3. gRPC errors are raised as the report master-data exceptions
+
+import grpc
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from kugel_common.grpc import item_service_pb2
+from app.exceptions import CategoryMasterDataNotFoundException
+from app.models.repositories.category_master_grpc_repository import CategoryMasterGrpcRepository
+from app.models.repositories.item_master_grpc_repository import ItemMasterGrpcRepository
+
+
+class _RpcError(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "unavailable"
+
+
+@pytest.mark.asyncio
+async def test_get_categories():
+    response = item_service_pb2.CategoryMapResponse(
+        categories={
+            "C01": item_service_pb2.Category(category_code="C01", description="Food"),
+            "C02": item_service_pb2.Category(category_code="C02"),
+        }
+    )
+    stub = MagicMock()
+    stub.GetCategoryMap = AsyncMock(return_value=response)
+    with patch("app.models.repositories.category_master_grpc_repository.GrpcClientHelper") as helper, patch(
+        "app.models.repositories.category_master_grpc_repository.item_service_pb2_grpc.MasterDataServiceStub",
+        return_value=stub,
+    ):
+        helper.return_value.get_channel = AsyncMock()
+        categories = await CategoryMasterGrpcRepository("T0001").get_categories()
+
+    assert categories == {"C01": "Food", "C02": "C02"}
+
+
+@pytest.mark.asyncio
+async def test_get_categories_grpc_error():
+    stub = MagicMock()
+    stub.GetCategoryMap = AsyncMock(side_effect=_RpcError())
+    with patch("app.models.repositories.category_master_grpc_repository.GrpcClientHelper") as helper, patch(
+        "app.models.repositories.category_master_grpc_repository.item_service_pb2_grpc.MasterDataServiceStub",
+        return_value=stub,
+    ):
+        helper.return_value.get_channel = AsyncMock()
+        with pytest.raises(CategoryMasterDataNotFoundException):
+            await CategoryMasterGrpcRepository("T0001").get_categories()
+
+
+@pytest.mark.asyncio
+async def test_get_items():
+    response = item_service_pb2.BatchItemDetailResponse(
+        items=[
+            item_service_pb2.ItemDetailResponse(item_code="A", item_name="Apple", category_code="C01"),
+            item_service_pb2.ItemDetailResponse(item_code="B", category_code="C02"),
+        ],
+        not_found_item_codes=["X"],
+    )
+    stub = MagicMock()
+    stub.BatchGetItemDetails = AsyncMock(return_value=response)
+    with patch("app.models.repositories.item_master_grpc_repository.GrpcClientHelper") as helper, patch(
+        "app.models.repositories.item_master_grpc_repository.item_service_pb2_grpc.ItemServiceStub",
+        return_value=stub,
+    ):
+        helper.return_value.get_channel = AsyncMock()
+        repository = ItemMasterGrpcRepository("T0001")
+        items = await repository.get_items(["A", "B", "X"])
+        assert await repository.get_items([]) == {}
+
+    assert items == {
+        "A": {"name": "Apple", "category_code": "C01"},
+        "B": {"name": "B", "category_code": "C02"},
+    }
+    stub.BatchGetItemDetails.assert_awaited_once()
@@ -0,0 +1,111 @@
+# Copyright 2025 masa@kugel
+# Unit tests for the keyed accumulators used by the report makers
+#
+# These tests verify that:
+# 1. KeyedAccumulator merges rows by key, applies the factor and keeps first-seen order
+# 2. SalesReportMaker._summarize_sales_report produces the same taxes/payments buckets
+#    as the previous linear-search implementation
+# 3. Results indexed by transaction type keep the first result of each type
+
+import pytest
+
+from app.enums.transaction_type import TransactionType
+from app.services.plugins.report_aggregation_helper import (
+    KeyedAccumulator,
+    index_by_transaction_type,
+    sum_fields,
+    transaction_type_factor,
+)
+from app.services.plugins.sales_report_maker import SalesReportMaker
+
+
+def _make_result(transaction_type: int, tax_codes: list[str], payment_codes: list[str]) -> dict:
+    result = {
+        "_id": {"transaction_type": transaction_type},
+        "total_amount": 1000,
+        "total_amount_with_tax": 1100,
+        "total_tax_amount": 100,
+        "total_quantity": 10,
+        "total_change_amount": 0,
+        "total_discount_amount": 50,
+        "total_transaction_count": 2,
+        "total_line_items_discount_amount": 30,
+        "total_line_items_discount_count": 1,
+        "total_line_items_discount_quantity": 1,
+        "total_sub_total_discount_amount": 20,
+        "total_sub_total_discount_count": 1,
+        "total_sub_total_discount_quantity": 3,
+    }
+    result["taxes"] = [
+        {"tax_code": code, "tax_name": f"Tax {code}", "tax_amount": 10, "target_amount": 100, "target_quantity": 1}
+        for code in tax_codes
+    ] + [{"tax_code": None}]
+    result["payments"] = [
+        {"payment_code": code, "description": f"Payment {code}", "amount": 100, "count": 1} for code in payment_codes
+    ]
+    return result
+
+
+def test_keyed_accumulator_merges_by_key():
+    accumulator = KeyedAccumulator("payment_code", sum_fields=["amount", "count"], attr_fields=["description"])
+    accumulator.add({"payment_code": "11", "description": "Card", "amount": 300, "count": 1})
+    accumulator.add({"payment_code": "01", "description": "Cash", "amount": 100, "count": 1})
+    accumulator.add({"payment_code": "11", "description": "Card (dup)", "amount": 200, "count": 1}, factor=-1)
+    accumulator.add({"payment_code": None, "amount": 999})
+
+    assert accumulator.to_list() == [
+        {"payment_code": "11", "description": "Card", "amount": 100, "count": 0},
+        {"payment_code": "01", "description": "Cash", "amount": 100, "count": 1},
+    ]
+
+
+def test_transaction_type_factor():
+    assert transaction_type_factor(TransactionType.NormalSales.value) == 1
+    assert transaction_type_factor(TransactionType.VoidReturn.value) == 1
+    assert transaction_type_factor(TransactionType.ReturnSales.value) == -1
+    assert transaction_type_factor(TransactionType.VoidSales.value) == -1
+    with pytest.raises(ValueError):
+        transaction_type_factor(999)
+
+
+def test_index_by_transaction_type_keeps_first():
+    first = _make_result(TransactionType.NormalSales.value, ["01"], ["01"])
+    second = _make_result(TransactionType.NormalSales.value, ["02"], ["02"])
+    index = index_by_transaction_type([first, second])
+    assert index[TransactionType.NormalSales.value] is first
+
+
+def test_sum_fields_dicts_and_objects():
+    class Row:
+        def __init__(self, amount, count):
+            self.amount = amount
+            self.count = count
+
+    assert sum_fields([{"amount": 1, "count": 2}, {"amount": 3, "count": 4}], ["amount", "count"]) == {
+        "amount": 4,
+        "count": 6,
+    }
+    assert sum_fields([Row(1, 2), Row(3, 4)], ["amount"]) == {"amount": 4}
+
+
+def test_summarize_sales_report_buckets():
+    maker = SalesReportMaker(None, None, None)
+    results = [
+        _make_result(TransactionType.NormalSales.value, ["01", "02"], ["01", "11"]),
+        _make_result(TransactionType.ReturnSales.value, ["02"], ["11"]),
+        _make_result(TransactionType.VoidReturn.value, ["03"], ["01"]),
+    ]
+
+    total = maker._summarize_sales_report(results)
+
+    assert total["total_amount"] == 1000
+    assert total["total_transaction_count"] == 2
+    assert total["taxes"] == [
+        {"tax_code": "01", "tax_name": "Tax 01", "tax_amount": 10, "target_amount": 100, "target_quantity": 1},
+        {"tax_code": "02", "tax_name": "Tax 02", "tax_amount": 0, "target_amount": 0, "target_quantity": 0},
+        {"tax_code": "03", "tax_name": "Tax 03", "tax_amount": 10, "target_amount": 100, "target_quantity": 1},
+    ]
+    assert total["payments"] == [
+        {"payment_code": "01", "description": "Payment 01", "amount": 200, "count": 2},
+        {"payment_code": "11", "description": "Payment 11", "amount": 0, "count": 0},
+    ]
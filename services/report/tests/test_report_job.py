@@ -0,0 +1,211 @@
+# Copyright 2025 masa@kugel
+# Asynchronous report job tests
+#
+# These tests verify that:
+# 1. ReportJobWorkerPool never runs more jobs than max_workers at the same time
+# 2. Identical requests of the same requester share the same active job,
+#    other report parameters or other requesters get their own job
+# 3. The generated report is stored in the job and can be fetched repeatedly
+# 4. Jobs are only visible to the store they were submitted for
+# 5. Queued jobs are not expired, running jobs expire after the job timeout
+# 6. An expired job is not overwritten when its report completes late
+
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+
+from app.models.repositories.report_job_repository import ReportJobRepository, ReportJobStatus
+from app.services.report_job_service import ReportJobService, ReportJobWorkerPool
+from app.exceptions import ReportJobNotFoundException, ReportJobNotReadyException
+from app.api.v1.report import verify_requesting_store
+
+
+class _SlowReportService:
+    """Report service replacement that counts calls and waits until released"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def get_report_for_store_async(self, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        return {"store_code": kwargs["store_code"], "report_type": kwargs["report_type"]}
+
+
+def _make_params(store_code: str) -> dict:
+    return {
+        "store_code": store_code,
+        "terminal_no": None,
+        "report_scope": "daily",
+        "report_type": "sales",
+        "business_date": "20240501",
+        "sort": [("store_code", 1)],
+    }
+
+
+def test_request_hash():
+    params = {
+        **_make_params("5678"),
+        "requesting_terminal_no": 1,
+        "requesting_staff_id": "S1",
+        "is_api_key_request": True,
+    }
+
+    def make_hash(**changes):
+        return ReportJobService.make_request_hash("T1", {**params, **changes})
+
+    # the same request of the same requester shares a job
+    assert make_hash() == make_hash(**dict(params))
+
+    # report parameters and the requester (each requester journals its own report) make a different job
+    hashes = {
+        make_hash(),
+        make_hash(business_date="20240502"),
+        make_hash(requesting_terminal_no=2),
+        make_hash(requesting_staff_id="S2"),
+        make_hash(requesting_terminal_no=None, requesting_staff_id=None, is_api_key_request=False),
+    }
+    assert len(hashes) == 5
+    assert ReportJobService.make_request_hash("T2", params) != make_hash()
+
+
+@pytest.mark.asyncio
+async def test_expire_stale_job_keeps_queued_jobs():
+    job_repo = ReportJobRepository(MagicMock(), "T1")
+    job_repo.update_one_async = AsyncMock(return_value=False)
+    pool = ReportJobWorkerPool(max_workers=4, max_queue_size=100, timeout_seconds=600)
+
+    # a job may wait for 25 rounds of jobs ahead of it and then run for the timeout
+    assert pool.get_max_job_age_seconds() == 26 * 600
+
+    job_service = ReportJobService(AsyncMock(), job_repo, worker_pool=pool)
+    assert not await job_service._expire_stale_job_async("J1")
+
+    filter = job_repo.update_one_async.call_args.args[0]
+    run_timeout, max_age = filter["$or"]
+    # the run timeout only applies to running jobs and is measured from started_at
+    assert run_timeout["status"] == ReportJobStatus.RUNNING
+    assert "started_at" in run_timeout and "created_at" not in run_timeout
+    # pending jobs only expire once they cannot be in the queue anymore
+    assert list(max_age.keys()) == ["created_at"]
+
+
+@pytest.mark.asyncio
+async def test_mark_completed_skips_expired_job():
+    job_repo = ReportJobRepository(MagicMock(), "T1")
+    job_repo.update_one_async = AsyncMock(return_value=False)
+
+    assert not await job_repo.mark_completed_async("J1", {"report": 1})
+    filter = job_repo.update_one_async.call_args.args[0]
+    assert filter["status"] == ReportJobStatus.RUNNING
+    assert filter["is_active"] is True
+
+
+def test_verify_requesting_store():
+    verify_requesting_store("5678", None)
+    verify_requesting_store("5678", "T1-5678-1")
+    with pytest.raises(HTTPException) as e:
+        verify_requesting_store("5678", "T1-9999-1")
+    assert e.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_is_bounded():
+    pool = ReportJobWorkerPool(max_workers=2, max_queue_size=10, timeout_seconds=10)
+    running = 0
+    max_running = 0
+
+    async def job():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    try:
+        for i in range(6):
+            assert pool.submit(str(i), job)
+        await pool._queue.join()
+    finally:
+        await pool.shutdown()
+
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_rejects_when_queue_is_full():
+    pool = ReportJobWorkerPool(max_workers=1, max_queue_size=1, timeout_seconds=10)
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+
+    try:
+        assert pool.submit("1", job)
+        await asyncio.sleep(0)  # let the worker take the first job
+        assert pool.submit("2", job)
+        assert not pool.submit("3", job)
+    finally:
+        release.set()
+        await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_report_job_dedup_and_result(set_env_vars, clean_test_data):
+    from kugel_common.database import database as local_db_helper
+
+    tenant_id = os.environ.get("TENANT_ID")
+    db = await local_db_helper.get_db_async(f"{os.environ.get('DB_NAME_PREFIX')}_{tenant_id}")
+    job_repo = ReportJobRepository(db, tenant_id)
+    await job_repo.ensure_indexes_async(retention_days=1)
+
+    report_service = _SlowReportService()
+    pool = ReportJobWorkerPool(max_workers=2, max_queue_size=10, timeout_seconds=10)
+    created_services = []
+
+    async def report_service_factory():
+        created_services.append(report_service)
+        return report_service
+
+    job_service = ReportJobService(report_service_factory, job_repo, worker_pool=pool)
+
+    try:
+        first = await job_service.submit_job_async(_make_params("5678"), lambda report: report)
+        second = await job_service.submit_job_async(_make_params("5678"), lambda report: report)
+        other = await job_service.submit_job_async(_make_params("9999"), lambda report: report)
+
+        # identical concurrent request attaches to the active job
+        assert second.job_id == first.job_id
+        assert other.job_id != first.job_id
+
+        with pytest.raises(ReportJobNotReadyException):
+            await job_service.get_job_result_async("5678", first.job_id)
+
+        # a job is not visible to another store
+        with pytest.raises(ReportJobNotFoundException):
+            await job_service.get_job_async("9999", first.job_id)
+
+        report_service.release.set()
+        await pool._queue.join()
+
+        job = await job_service.get_job_async("5678", first.job_id)
+        assert job.status == ReportJobStatus.COMPLETED
+        assert report_service.calls == 2
+        # each job creates its own report service
+        assert len(created_services) == 2
+
+        # result can be downloaded repeatedly
+        for _ in range(2):
+            result = await job_service.get_job_result_async("5678", first.job_id)
+            assert result == {"store_code": "5678", "report_type": "sales"}
+
+        # once the job is finished, the same request creates a new job
+        again = await job_service.submit_job_async(_make_params("5678"), lambda report: report)
+        assert again.job_id != first.job_id
+        await pool._queue.join()
+    finally:
+        await pool.shutdown()
+        await db[job_repo.collection_name].delete_many({})
@@ -0,0 +1,27 @@
+# Copyright 2025 masa@kugel
+# Business date handling of transaction log aggregations
+#
+# These tests verify that:
+# 1. Malformed business dates are rejected as a request error instead of a server error
+
+import pytest
+
+from app.exceptions import ReportDateException
+from app.models.repositories.tranlog_repository import parse_business_date
+from app.services.report_service import ReportService
+
+
+@pytest.mark.parametrize("business_date", ["2024ab01", "2024053", "20241301", "2024-05-01", None])
+def test_parse_business_date_rejects_malformed_dates(business_date):
+    with pytest.raises(ReportDateException):
+        parse_business_date(business_date)
+
+
+def test_report_dates_are_validated():
+    ReportService._validate_business_dates("20240501", None, None)
+    ReportService._validate_business_dates(None, "20240501", "20240531")
+    with pytest.raises(ReportDateException):
+        ReportService._validate_business_dates("2024-05-01", None, None)
+    with pytest.raises(ReportDateException):
+        ReportService._validate_business_dates(None, "20240531", "20240501")
+
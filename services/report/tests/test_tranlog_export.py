@@ -0,0 +1,106 @@
+# Copyright 2025 masa@kugel
+# Columnar export tests for transaction facts
+#
+# These tests verify that TranlogExportService:
+# 1. Flattens line items, payments and taxes into one row per array element
+# 2. Streams a readable Arrow IPC stream and Parquet file across multiple batches
+# 3. Restricts the export to the requested business date range
+
+import io
+import os
+import pytest
+from datetime import datetime
+
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+from kugel_common.enums import TransactionType
+from kugel_common.models.documents.base_tranlog import BaseTransaction
+from app.models.repositories.tranlog_repository import TranlogRepository
+from app.services.tranlog_export_service import TranlogExportService
+
+
+def _make_transaction(tenant_id: str, transaction_no: int, business_date: str) -> BaseTransaction:
+    return BaseTransaction(
+        tenant_id=tenant_id,
+        store_code="STORE001",
+        terminal_no=1,
+        business_date=business_date,
+        open_counter=1,
+        business_counter=1,
+        transaction_no=transaction_no,
+        transaction_type=TransactionType.NormalSales.value,
+        generate_date_time=datetime.now().isoformat(),
+        sales={"total_amount": 300.0, "total_amount_with_tax": 330.0, "is_cancelled": False},
+        line_items=[
+            {
+                "line_no": 1,
+                "item_code": "ITEM001",
+                "quantity": 1,
+                "unit_price": 100.0,
+                "amount": 100.0,
+                "tax_code": "01",
+                "discounts": [{"seq_no": 1, "discount_amount": 10.0}],
+            },
+            {"line_no": 2, "item_code": "ITEM002", "quantity": 2, "unit_price": 100.0, "amount": 200.0, "tax_code": "01"},
+        ],
+        payments=[{"payment_no": 1, "payment_code": "01", "amount": 330.0, "description": "Cash"}],
+        taxes=[{"tax_no": 1, "tax_code": "01", "tax_name": "消費税10%", "tax_amount": 30.0, "target_amount": 300.0}],
+    )
+
+
+def test_flatten_facts_line_items():
+    tranlog = _make_transaction("T0000", 1, "20240501").model_dump()
+    columns = TranlogExportService.flatten_facts("line_items", [tranlog])
+
+    assert columns["item_code"] == ["ITEM001", "ITEM002"]
+    assert columns["transaction_no"] == [1, 1]
+    assert columns["discount_amount"] == [10.0, 0]
+
+
+@pytest.mark.asyncio
+async def test_export_line_items_arrow_and_parquet(set_env_vars, clean_test_data):
+    from kugel_common.database import database as local_db_helper
+
+    tenant_id = os.environ.get("TENANT_ID")
+    db = await local_db_helper.get_db_async(f"{os.environ.get('DB_NAME_PREFIX')}_{tenant_id}")
+    tran_repo = TranlogRepository(db, tenant_id)
+    collection = db[tran_repo.collection_name]
+
+    # 3 transactions in range, 1 outside of range
+    for transaction_no, business_date in [(1, "20240501"), (2, "20240502"), (3, "20240503"), (4, "20240601")]:
+        await collection.insert_one(_make_transaction(tenant_id, transaction_no, business_date).model_dump())
+
+    export_service = TranlogExportService(tran_repo)
+
+    # Arrow IPC stream, batch_size=2 forces multiple record batches
+    chunks = [
+        chunk
+        async for chunk in export_service.stream_facts_async(
+            fact_type="line_items",
+            export_format="arrow",
+            business_date_from="20240501",
+            business_date_to="20240531",
+            store_code="STORE001",
+            batch_size=2,
+        )
+    ]
+    table = pa_ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.num_rows == 6
+    assert sorted(set(table.column("transaction_no").to_pylist())) == [1, 2, 3]
+
+    # Parquet
+    chunks = [
+        chunk
+        async for chunk in export_service.stream_facts_async(
+            fact_type="payments",
+            export_format="parquet",
+            business_date_from="20240501",
+            business_date_to="20240531",
+            store_code="STORE001",
+            batch_size=2,
+        )
+    ]
+    table = pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert table.num_rows == 3
+    assert sum(table.column("amount").to_pylist()) == 990.0
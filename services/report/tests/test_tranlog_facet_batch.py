@@ -0,0 +1,87 @@
+# Copyright 2025 masa@kugel
+# Single-pass multi-report aggregation tests
+#
+# These tests verify that TranlogFacetBatch:
+# 1. Executes the first pipeline of every report maker as one $facet aggregation
+# 2. Does not wait for makers that finish without submitting a pipeline
+# 3. Falls back to individual pipelines when the $facet aggregation fails
+
+import asyncio
+import pytest
+
+from app.models.repositories.tranlog_facet_batch import TranlogFacetBatch
+
+
+class _RecordingRepository:
+    """Repository replacement that records the executed pipelines"""
+
+    tenant_id = "T0000"
+
+    def __init__(self, fail_facet: bool = False):
+        self.executed = []
+        self.fail_facet = fail_facet
+
+    async def execute_pipeline(self, pipeline):
+        self.executed.append(pipeline)
+        if "$facet" in pipeline[-1]:
+            if self.fail_facet:
+                raise Exception("BSONObjectTooLarge")
+            return [{name: [{"facet": name}] for name in pipeline[-1]["$facet"]}]
+        return [{"single": pipeline[0]["$match"]["report"]}]
+
+
+def _pipeline(report: str, **match) -> list[dict]:
+    return [{"$match": {"tenant_id": "T0000", "store_code": "5678", "report": report, **match}}, {"$group": {"_id": 1}}]
+
+
+@pytest.mark.asyncio
+async def test_pipelines_are_executed_in_one_facet():
+    repo = _RecordingRepository()
+    batch = TranlogFacetBatch(repo, 3)
+
+    async def maker(slot: int, report: str, submit: bool):
+        handle = batch.handle(slot)
+        try:
+            assert handle.tenant_id == "T0000"  # delegated to the repository
+            if submit:
+                await asyncio.sleep(0.01 * slot)
+                return await handle.execute_pipeline(_pipeline(report, terminal_no=slot))
+            return None
+        finally:
+            handle.close()
+
+    results = await asyncio.gather(maker(0, "sales", True), maker(1, "item", True), maker(2, "other", False))
+
+    assert len(repo.executed) == 1
+    combined = repo.executed[0]
+    assert combined[0] == {"$match": {"tenant_id": "T0000", "store_code": "5678"}}
+    assert list(combined[1]["$facet"].keys()) == ["pipeline_0", "pipeline_1"]
+    assert results == [[{"facet": "pipeline_0"}], [{"facet": "pipeline_1"}], None]
+
+    # later pipelines are executed directly
+    await batch.handle(0).execute_pipeline(_pipeline("sales"))
+    assert len(repo.executed) == 2
+
+
+@pytest.mark.asyncio
+async def test_facet_failure_falls_back_to_individual_pipelines():
+    repo = _RecordingRepository(fail_facet=True)
+    batch = TranlogFacetBatch(repo, 2)
+
+    results = await asyncio.gather(
+        batch.handle(0).execute_pipeline(_pipeline("sales")),
+        batch.handle(1).execute_pipeline(_pipeline("payment")),
+    )
+
+    assert results == [[{"single": "sales"}], [{"single": "payment"}]]
+    assert len(repo.executed) == 3
+
+
+def test_make_shared_match():
+    pipelines = [_pipeline("sales", business_date="20240501"), _pipeline("item", business_date="20240501")]
+    assert TranlogFacetBatch.make_shared_match(pipelines) == {
+        "tenant_id": "T0000",
+        "store_code": "5678",
+        "business_date": "20240501",
+    }
+    assert TranlogFacetBatch.make_shared_match([[{"$group": {"_id": 1}}], _pipeline("sales")]) is None
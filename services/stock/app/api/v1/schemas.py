@@ -3,6 +3,7 @@ from typing import Optional, List
 from datetime import datetime
 from pydantic import Field, ConfigDict
 
+from kugel_common.schemas.pagination import PaginatedResult
 from app.enums.update_type import UpdateType
 from app.api.common.schemas import *
 
@@ -68,6 +69,34 @@ class StockUpdateResponse(BaseSchemaModel):
     note: Optional[str] = Field(None, description="Additional notes")
 
 
+class StockHistoryResult(PaginatedResult[StockUpdateResponse]):
+    """在庫更新履歴ページ（キーセットページング）"""
+
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, None on the last page")
+
+
+class StockUpdateDailyResponse(BaseSchemaModel):
+    """日次集約済み在庫更新履歴レスポンス"""
+
+    tenant_id: str = Field(..., description="Tenant ID")
+    store_code: str = Field(..., description="Store code")
+    item_code: str = Field(..., description="Item code")
+    date: str = Field(..., description="Day of the updates (YYYY-MM-DD, UTC)")
+    update_type: UpdateType = Field(..., description="Type of stock update")
+    quantity_change: float = Field(..., description="Sum of the quantity changes of the day")
+    update_count: int = Field(..., description="Number of compacted updates")
+    before_quantity: float = Field(..., description="Stock quantity before the first update of the day")
+    after_quantity: float = Field(..., description="Stock quantity after the last update of the day")
+    first_timestamp: datetime = Field(..., description="Timestamp of the first update of the day")
+    last_timestamp: datetime = Field(..., description="Timestamp of the last update of the day")
+
+
+class StockDailyHistoryResult(PaginatedResult[StockUpdateDailyResponse]):
+    """日次集約済み在庫更新履歴ページ（キーセットページング）"""
+
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, None on the last page")
+
+
 class StockSnapshotItemResponse(BaseSchemaModel):
     """スナップショット内の在庫アイテム"""
 
@@ -83,9 +112,13 @@ class StockSnapshotResponse(BaseSchemaModel):
 
     tenant_id: str = Field(..., description="Tenant ID")
     store_code: str = Field(..., description="Store code")
+    snapshot_id: Optional[str] = Field(None, description="Snapshot ID")
     total_items: int = Field(..., description="Total number of items")
     total_quantity: float = Field(..., description="Total stock quantity")
-    stocks: List[StockSnapshotItemResponse] = Field(..., description="Stock details by item")
+    chunk_count: int = Field(0, description="Number of item pages")
+    chunk_size: int = Field(0, description="Maximum number of items per page")
+    page: Optional[int] = Field(None, description="Page of the items in stocks")
+    stocks: List[StockSnapshotItemResponse] = Field(..., description="Stock details by item (one page)")
     created_by: str = Field(..., description="User or system that created the snapshot")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
@@ -1,9 +1,21 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timezone
 
-from app.models.documents import StockDocument, StockUpdateDocument, StockSnapshotDocument, StockSnapshotItem
-from app.api.v1.schemas import StockResponse, StockUpdateResponse, StockSnapshotResponse, StockSnapshotItemResponse
+from app.models.documents import (
+    StockDocument,
+    StockUpdateDocument,
+    StockUpdateDailyDocument,
+    StockSnapshotDocument,
+    StockSnapshotItem,
+)
+from app.api.v1.schemas import (
+    StockResponse,
+    StockUpdateResponse,
+    StockUpdateDailyResponse,
+    StockSnapshotResponse,
+    StockSnapshotItemResponse,
+)
 
 
 class StockTransformer:
@@ -46,6 +58,27 @@ class StockUpdateTransformer:
         )
 
 
+class StockUpdateDailyTransformer:
+    """Transform between document models and API schemas for compacted stock history"""
+
+    @staticmethod
+    def to_response(document: StockUpdateDailyDocument) -> StockUpdateDailyResponse:
+        """Convert StockUpdateDailyDocument to StockUpdateDailyResponse"""
+        return StockUpdateDailyResponse(
+            tenant_id=document.tenant_id,
+            store_code=document.store_code,
+            item_code=document.item_code,
+            date=document.date,
+            update_type=document.update_type,
+            quantity_change=document.quantity_change,
+            update_count=document.update_count,
+            before_quantity=document.before_quantity,
+            after_quantity=document.after_quantity,
+            first_timestamp=document.first_timestamp,
+            last_timestamp=document.last_timestamp,
+        )
+
+
 class SnapshotTransformer:
     """Transform between document models and API schemas for snapshots"""
 
@@ -61,13 +94,17 @@ class SnapshotTransformer:
         )
 
     @staticmethod
-    def to_response(document: StockSnapshotDocument) -> StockSnapshotResponse:
+    def to_response(document: StockSnapshotDocument, page: Optional[int] = None) -> StockSnapshotResponse:
         """Convert StockSnapshotDocument to StockSnapshotResponse"""
         return StockSnapshotResponse(
             tenant_id=document.tenant_id,
             store_code=document.store_code,
+            snapshot_id=document.snapshot_id,
             total_items=document.total_items,
             total_quantity=document.total_quantity,
+            chunk_count=document.chunk_count,
+            chunk_size=document.chunk_size,
+            page=page,
             stocks=[SnapshotTransformer.snapshot_item_to_response(item) for item in document.stocks],
             created_by=document.created_by,
             created_at=document.created_at,
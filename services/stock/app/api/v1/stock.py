@@ -22,14 +22,26 @@ from app.api.v1.schemas import (
     SetReorderParametersRequest,
     StockResponse,
     StockUpdateResponse,
+    StockHistoryResult,
+    StockDailyHistoryResult,
     StockSnapshotResponse,
 )
-from app.api.v1.schemas_transformer import StockTransformer, StockUpdateTransformer, SnapshotTransformer
+from app.api.v1.schemas_transformer import (
+    StockTransformer,
+    StockUpdateTransformer,
+    StockUpdateDailyTransformer,
+    SnapshotTransformer,
+)
 from app.models.schemas.snapshot_schedule import SnapshotScheduleCreate, SnapshotScheduleResponse
 from app.dependencies.get_stock_service import get_stock_service, get_snapshot_service
 from app.services.stock_service import StockService
 from app.services.snapshot_service import SnapshotService
-from app.exceptions.stock_exceptions import StockNotFoundError, SnapshotNotFoundError, ExternalServiceError
+from app.exceptions.stock_exceptions import (
+    StockNotFoundError,
+    SnapshotNotFoundError,
+    SnapshotRunInProgressError,
+    ExternalServiceError,
+)
 from app.utils.state_store_manager import state_store_manager
 
 # setup logger
@@ -173,7 +185,7 @@ async def create_snapshot(
         success=True,
         code=status.HTTP_201_CREATED,
         message="Snapshot created successfully",
-        data=SnapshotTransformer.to_response(snapshot),
+        data=SnapshotTransformer.to_response(snapshot, page=1),
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
 
@@ -216,7 +228,10 @@ async def get_snapshots_by_date_range(
     )
 
     # Transform documents to response models
-    items = [SnapshotTransformer.to_response(snapshot) for snapshot in snapshots]
+    # chunked snapshots carry their first page of items
+    items = [
+        SnapshotTransformer.to_response(snapshot, 1 if snapshot.snapshot_id else None) for snapshot in snapshots
+    ]
 
     # Build filter metadata
     filter_metadata = {}
@@ -251,7 +266,7 @@ async def get_snapshots_by_date_range(
     response_model=ApiResponse[StockSnapshotResponse],
     status_code=status.HTTP_200_OK,
     summary="Get stock snapshot by ID",
-    description="Get a specific stock snapshot by its ID",
+    description="Get a specific stock snapshot by its ID. Items are returned one page (chunk) at a time.",
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Bad Request"},
         status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
@@ -267,14 +282,15 @@ async def get_snapshot_by_id(
     store_code: str = Path(...),
     snapshot_id: str = Path(...),
     terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    page: int = Query(1, ge=1, description="Page of the snapshot items (1 to chunkCount)"),
     snapshot_service: SnapshotService = Depends(get_snapshot_service),
 ):
-    """Get a specific snapshot"""
+    """Get a specific snapshot with one page of its items"""
 
     # Verify tenant ID matches security context
     verify_tenant_id(tenant_id, tenant_id_with_security, logger)
 
-    snapshot = await snapshot_service.get_snapshot_by_id_async(snapshot_id)
+    snapshot = await snapshot_service.get_snapshot_by_id_async(tenant_id, store_code, snapshot_id, page)
 
     if snapshot is None:
         raise SnapshotNotFoundError(message=f"Snapshot {snapshot_id} not found", logger=logger)
@@ -283,7 +299,7 @@ async def get_snapshot_by_id(
         success=True,
         code=status.HTTP_200_OK,
         message="Snapshot retrieved successfully",
-        data=SnapshotTransformer.to_response(snapshot),
+        data=SnapshotTransformer.to_response(snapshot, page if snapshot.snapshot_id else None),
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
 
@@ -430,10 +446,12 @@ async def update_stock(
 
 @router.get(
     "/tenants/{tenant_id}/stores/{store_code}/stock/{item_code}/history",
-    response_model=ApiResponse[PaginatedResult[StockUpdateResponse]],
+    response_model=ApiResponse[StockHistoryResult],
     status_code=status.HTTP_200_OK,
     summary="Get stock update history",
-    description="Get stock update history for an item",
+    description="Get stock update history for an item, newest first. "
+    "Pages are selected by page, or by cursor (nextCursor of the previous page) when given. "
+    "Cursor pages report the total according to total (exact, estimate or none).",
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Bad Request"},
         status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
@@ -448,8 +466,10 @@ async def get_stock_history(
     store_code: str = Path(...),
     item_code: str = Path(...),
     terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number, ignored when cursor is given"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor of the previous page"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
+    total: str = Query("estimate", pattern="^(exact|estimate|none)$", description="Total for cursor paging"),
     stock_service: StockService = Depends(get_stock_service),
 ):
     """Get stock update history for an item"""
@@ -460,21 +480,82 @@ async def get_stock_history(
     # Calculate skip from page
     skip = (page - 1) * limit
 
-    updates, total_count = await stock_service.get_stock_history_async(tenant_id, store_code, item_code, skip, limit)
+    updates, total_count, total_is_estimate, next_cursor = await stock_service.get_stock_history_async(
+        tenant_id, store_code, item_code, limit, cursor, skip, total_mode=total
+    )
 
     # Transform documents to response models
     items = [StockUpdateTransformer.to_response(update) for update in updates]
 
-    # Create paginated result
-    paginated_result = PaginatedResult(
-        data=items, metadata=Metadata(total=total_count, page=page, limit=limit, sort=None, filter=None)
+    history_result = StockHistoryResult(
+        data=items,
+        metadata=Metadata(
+            total=total_count,
+            page=page,
+            limit=limit,
+            sort="timestamp:-1",
+            filter=None,
+            total_is_estimate=total_is_estimate,
+        ),
+        next_cursor=next_cursor,
     )
 
     return ApiResponse(
         success=True,
         code=status.HTTP_200_OK,
         message="Stock history retrieved successfully",
-        data=paginated_result,
+        data=history_result,
+        operation=f"{inspect.currentframe().f_code.co_name}",
+    )
+
+
+@router.get(
+    "/tenants/{tenant_id}/stores/{store_code}/stock/{item_code}/history/daily",
+    response_model=ApiResponse[StockDailyHistoryResult],
+    status_code=status.HTTP_200_OK,
+    summary="Get compacted daily stock history",
+    description="Get daily aggregates of the compacted sale history for an item, newest day first.",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Bad Request"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+    },
+)
+async def get_stock_daily_history(
+    request: Request,
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+    store_code: str = Path(...),
+    item_code: str = Path(...),
+    terminal_id: str = Query(None, description="Terminal ID for api_key, None for token"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
+    stock_service: StockService = Depends(get_stock_service),
+):
+    """Get compacted daily stock history for an item"""
+
+    # Verify tenant ID matches security context
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+
+    aggregates, next_cursor = await stock_service.get_stock_daily_history_async(
+        tenant_id, store_code, item_code, limit, cursor
+    )
+
+    items = [StockUpdateDailyTransformer.to_response(aggregate) for aggregate in aggregates]
+
+    # Keyset pagination: the aggregates are not counted, so no total is reported
+    history_result = StockDailyHistoryResult(
+        data=items,
+        metadata=Metadata(total=None, page=1, limit=limit, sort="date:-1", filter=None),
+        next_cursor=next_cursor,
+    )
+
+    return ApiResponse(
+        success=True,
+        code=status.HTTP_200_OK,
+        message="Daily stock history retrieved successfully",
+        data=history_result,
         operation=f"{inspect.currentframe().f_code.co_name}",
     )
 
@@ -674,10 +755,11 @@ async def handle_transaction_log(request: Request):
         from kugel_common.database import database as db_helper
         from app.config.settings import settings
         from app.dependencies.get_alert_service import get_alert_service
+        from app.dependencies.get_history_writer import get_history_writer
 
         db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
         alert_service = get_alert_service()
-        stock_service = StockService(db, alert_service)
+        stock_service = StockService(db, alert_service, get_history_writer())
 
         # Check for duplicate processing
         existing_state, error_msg = await state_store_manager.get_state(event_id)
@@ -717,6 +799,33 @@ async def handle_transaction_log(request: Request):
         )
 
 
+@router.post(
+    "/stock-alerts",
+    summary="Handle stock alert fan-out",
+    description="Deliver a stock alert published by any replica to the WebSocket clients of this replica",
+)
+async def handle_stock_alert(request: Request):
+    """Handle stock alert from pubsub"""
+    try:
+        message = await request.json()
+        data = message.get("data", {})
+
+        from app.dependencies.get_alert_service import get_alert_service
+
+        alert_service = get_alert_service()
+        if not alert_service:
+            logger.warning("Alert service not available, dropping stock alert")
+            return JSONResponse(content={"status": "DROP"}, status_code=status.HTTP_200_OK)
+
+        # Alerts are transient, so failures are not retried
+        await alert_service.broadcaster.deliver_local_async(data)
+        return JSONResponse(content={"status": "SUCCESS"}, status_code=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error delivering stock alert: {e}")
+        return JSONResponse(content={"status": "DROP", "message": str(e)}, status_code=status.HTTP_200_OK)
+
+
 # Snapshot Schedule Management endpoints
 @router.get(
     "/tenants/{tenant_id}/stock/snapshot-schedule",
@@ -856,6 +965,61 @@ async def update_snapshot_schedule(
         raise
 
 
+@router.post(
+    "/tenants/{tenant_id}/stock/snapshot-schedule/resume",
+    response_model=ApiResponse[dict],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Resume the latest snapshot run",
+    description="Retry the stores that did not complete in the latest scheduled snapshot run of a tenant",
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized"},
+        status.HTTP_403_FORBIDDEN: {"description": "Forbidden"},
+        status.HTTP_409_CONFLICT: {"description": "Snapshot run in progress"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"},
+    },
+)
+async def resume_snapshot_run(
+    request: Request,
+    tenant_id: str = Path(...),
+    tenant_id_with_security: str = Depends(get_tenant_id_with_security_by_query_optional),
+):
+    """Resume the latest snapshot run of a tenant."""
+    from app.config.settings import settings
+    from kugel_common.database import database as db_helper
+    from app.repositories.snapshot_run_repository import SnapshotRunRepository
+    from app.models.documents.snapshot_run_document import SnapshotRunStatus
+    from app.dependencies.get_scheduler import get_scheduler
+    from app.services.snapshot_executor import stale_heartbeat_before
+
+    # Verify tenant ID
+    verify_tenant_id(tenant_id, tenant_id_with_security, logger)
+
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    run = await SnapshotRunRepository(db).get_latest_run(tenant_id)
+
+    scheduler = get_scheduler()
+    if (scheduler is not None and scheduler.is_tenant_running(tenant_id)) or (
+        run is not None and run.is_owned(stale_heartbeat_before())
+    ):
+        raise SnapshotRunInProgressError(message=f"Snapshot run is in progress for tenant {tenant_id}", logger=logger)
+
+    resumable = scheduler is not None and run is not None and run.status != SnapshotRunStatus.COMPLETED
+    if resumable:
+        scheduler.start_resume_tenant_snapshot(tenant_id)
+
+    return ApiResponse[dict](
+        code=status.HTTP_202_ACCEPTED,
+        message="Snapshot run resumed" if resumable else "No snapshot run to resume",
+        success=True,
+        data={
+            "resumed": resumable,
+            "runId": run.run_id if run else None,
+            "status": run.status if run else None,
+            "pendingStores": run.pending_stores() if run else [],
+        },
+    )
+
+
 @router.delete(
     "/tenants/{tenant_id}/stock/snapshot-schedule",
     response_model=ApiResponse[dict],
@@ -981,8 +1145,11 @@ async def websocket_endpoint(websocket: WebSocket, tenant_id: str, store_code: s
     await connection_manager.connect(websocket, tenant_id, store_code)
 
     try:
-        # Send initial connection confirmation
-        await websocket.send_text(
+        # Send initial connection confirmation (through the send queue of this connection)
+        await connection_manager.send_to_connection(
+            websocket,
+            tenant_id,
+            store_code,
             json.dumps(
                 {
                     "type": "connection",
@@ -1000,8 +1167,9 @@ async def websocket_endpoint(websocket: WebSocket, tenant_id: str, store_code: s
 
         # Get items below reorder point
         reorder_alerts, _ = await stock_service.get_reorder_alerts_async(tenant_id, store_code)
+        current_alerts = []
         for stock in reorder_alerts:
-            await alert_service.send_alert(
+            current_alerts.append(
                 {
                     "type": "stock_alert",
                     "alert_type": "reorder_point",
@@ -1018,7 +1186,7 @@ async def websocket_endpoint(websocket: WebSocket, tenant_id: str, store_code: s
         # Get items below minimum stock
         low_stocks, _ = await stock_service.get_low_stocks_async(tenant_id, store_code)
         for stock in low_stocks:
-            await alert_service.send_alert(
+            current_alerts.append(
                 {
                     "type": "stock_alert",
                     "alert_type": "minimum_stock",
@@ -1032,6 +1200,9 @@ async def websocket_endpoint(websocket: WebSocket, tenant_id: str, store_code: s
                 }
             )
 
+        # Send current alerts to the new connection only, as one frame per store
+        await alert_service.send_alerts_to_connection(websocket, tenant_id, store_code, current_alerts)
+
         # Keep connection alive and handle messages
         while True:
             # Wait for messages from client (ping/pong)
@@ -1039,7 +1210,7 @@ async def websocket_endpoint(websocket: WebSocket, tenant_id: str, store_code: s
 
             # Handle ping messages
             if data == "ping":
-                await websocket.send_text("pong")
+                await connection_manager.send_to_connection(websocket, tenant_id, store_code, "pong")
 
     except WebSocketDisconnect:
         await connection_manager.disconnect(websocket, tenant_id, store_code)
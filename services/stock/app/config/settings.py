@@ -1,7 +1,7 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Any
+from typing import Any, Dict
 
 from kugel_common.config.settings import (
     DBCollectionCommonSettings,
@@ -46,10 +46,70 @@ class Settings(
     MAX_SNAPSHOT_RETENTION_DAYS: int = Field(default=365, description="Maximum allowed snapshot retention days")
     MIN_SNAPSHOT_RETENTION_DAYS: int = Field(default=1, description="Minimum allowed snapshot retention days")
 
+    # Snapshot execution settings
+    SNAPSHOT_MAX_CONCURRENCY_PER_TENANT: int = Field(
+        default=4, description="Maximum number of store snapshots created concurrently for one tenant"
+    )
+    SNAPSHOT_MAX_CONCURRENCY_GLOBAL: int = Field(
+        default=16, description="Maximum number of store snapshots created concurrently for all tenants"
+    )
+    SNAPSHOT_RUN_HEARTBEAT_SECONDS: int = Field(
+        default=30, description="Interval in seconds at which the owner of a snapshot run refreshes its heartbeat"
+    )
+    SNAPSHOT_RUN_STALE_SECONDS: int = Field(
+        default=120, description="Age in seconds of the heartbeat after which a running snapshot run can be taken over"
+    )
+
+    # Snapshot storage settings
+    SNAPSHOT_CHUNK_SIZE: int = Field(default=1000, description="Maximum number of items per snapshot page")
+    SNAPSHOT_CHUNKS_PER_INSERT: int = Field(
+        default=10, description="Number of snapshot pages written with one insert_many"
+    )
+
     # Alert settings
     ALERT_COOLDOWN_SECONDS: int = Field(
         default=60, description="Cooldown period in seconds between duplicate alerts for the same item"
     )
+    ALERT_COOLDOWN_MAX_ENTRIES: int = Field(
+        default=100000, description="Maximum number of alert cooldowns kept in memory (oldest evicted first)"
+    )
+    ALERT_COALESCE_WINDOW_SECONDS: float = Field(
+        default=0.5, description="Window in which updates of one item are coalesced into one alert check (0 disables)"
+    )
+    ALERT_FANOUT_MODE: str = Field(
+        default="local", description="Alert fan-out across replicas: local (this process only), dapr (pub/sub)"
+    )
+    ALERT_PUBSUB_NAME: str = Field(default="pubsub-stock-alert", description="Dapr pub/sub component for alerts")
+    ALERT_PUBSUB_TOPIC: str = Field(default="topic-stock-alert", description="Dapr topic for alerts")
+
+    # WebSocket settings
+    WEBSOCKET_SEND_QUEUE_SIZE: int = Field(default=100, description="Maximum queued messages per WebSocket connection")
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = Field(
+        default=5.0, description="Time allowed for one WebSocket send before the connection is closed"
+    )
+    WEBSOCKET_SLOW_CONSUMER_POLICY: str = Field(
+        default="drop", description="Action when a send queue is full: drop (message), disconnect (connection)"
+    )
+
+    # Stock update history settings
+    STOCK_HISTORY_DEFAULT_DURABILITY: str = Field(
+        default="sync", description="Default history durability: sync, batched, disabled"
+    )
+    STOCK_HISTORY_DURABILITY: Dict[str, str] = Field(
+        default_factory=dict,
+        description='History durability per update type, e.g. {"sale": "batched", "adjustment": "sync"}',
+    )
+    STOCK_HISTORY_BATCH_SIZE: int = Field(default=500, description="Number of buffered history records per insert")
+    STOCK_HISTORY_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=1.0, description="Maximum time batched history records stay in memory"
+    )
+    STOCK_HISTORY_MAX_BUFFER_SIZE: int = Field(
+        default=10000, description="Buffered history records above which records are written synchronously"
+    )
+    STOCK_HISTORY_COMPACTION_AFTER_DAYS: int = Field(
+        default=0, description="Age in days after which sale history is compacted into daily aggregates (0 disables)"
+    )
+    STOCK_HISTORY_COMPACTION_HOUR: int = Field(default=3, description="History compaction execution hour (0-23)")
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -5,4 +5,7 @@ from pydantic_settings import BaseSettings
 class DBCollectionSettings(BaseSettings):
     DB_COLLECTION_NAME_STOCK: str = "stocks"
     DB_COLLECTION_NAME_STOCK_UPDATE: str = "stock_updates"
+    DB_COLLECTION_NAME_STOCK_UPDATE_DAILY: str = "stock_updates_daily"
     DB_COLLECTION_NAME_STOCK_SNAPSHOT: str = "stock_snapshots"
+    DB_COLLECTION_NAME_STOCK_SNAPSHOT_CHUNK: str = "stock_snapshot_chunks"
+    DB_COLLECTION_NAME_SNAPSHOT_RUN: str = "snapshot_runs"
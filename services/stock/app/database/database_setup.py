@@ -36,6 +36,12 @@ async def create_stock_collection(tenant_id: str):
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_keys_list, index_name=name + "_index"
     )
 
+    # partial indexes on the low-stock / reorder flags (not supported by create_collection_with_indexes_async)
+    from app.models.repositories.stock_repository import StockRepository
+
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    await StockRepository(db).ensure_alert_flags_async()
+
 
 # create stock_updates collection
 async def create_stock_update_collection(tenant_id: str):
@@ -51,10 +57,50 @@ async def create_stock_update_collection(tenant_id: str):
     )
 
 
+# create stock_updates_daily collection
+async def create_stock_update_daily_collection(tenant_id: str):
+    name = settings.DB_COLLECTION_NAME_STOCK_UPDATE_DAILY
+    index_key_list = [
+        # unique key used by $merge when compacting stock_updates
+        {
+            "keys": {"tenant_id": 1, "store_code": 1, "item_code": 1, "date": 1, "update_type": 1},
+            "unique": True,
+        },
+    ]
+    await create_some_collection(
+        tenant_id=tenant_id, collection_name=name, index_keys_list=index_key_list, index_name=name + "_index"
+    )
+
+
 # create stock_snapshots collection
 async def create_stock_snapshot_collection(tenant_id: str):
     name = settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT
-    index_key_list = [{"keys": {"tenant_id": 1, "store_code": 1, "snapshot_time": -1}}, {"keys": {"created_at": -1}}]
+    index_key_list = [
+        {"keys": {"tenant_id": 1, "store_code": 1, "snapshot_time": -1}},
+        {"keys": {"created_at": -1}},
+        {"keys": {"snapshot_id": 1}},
+    ]
+    await create_some_collection(
+        tenant_id=tenant_id, collection_name=name, index_keys_list=index_key_list, index_name=name + "_index"
+    )
+
+
+# create stock_snapshot_chunks collection
+async def create_stock_snapshot_chunk_collection(tenant_id: str):
+    name = settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT_CHUNK
+    index_key_list = [{"keys": {"snapshot_id": 1, "chunk_no": 1}, "unique": True}]
+    await create_some_collection(
+        tenant_id=tenant_id, collection_name=name, index_keys_list=index_key_list, index_name=name + "_index"
+    )
+
+
+# create snapshot_runs collection
+async def create_snapshot_run_collection(tenant_id: str):
+    name = settings.DB_COLLECTION_NAME_SNAPSHOT_RUN
+    index_key_list = [
+        {"keys": {"run_id": 1}, "unique": True},
+        {"keys": {"tenant_id": 1, "started_at": -1}},
+    ]
     await create_some_collection(
         tenant_id=tenant_id, collection_name=name, index_keys_list=index_key_list, index_name=name + "_index"
     )
@@ -75,12 +121,48 @@ async def create_request_log_collection(tenant_id: str):
 async def create_collections(tenant_id: str):
     await create_stock_collection(tenant_id)
     await create_stock_update_collection(tenant_id)
+    await create_stock_update_daily_collection(tenant_id)
     await create_stock_snapshot_collection(tenant_id)
+    await create_stock_snapshot_chunk_collection(tenant_id)
+    await create_snapshot_run_collection(tenant_id)
     await create_request_log_collection(tenant_id)
 
     # add more collections here
 
 
+# upgrade the collections of a tenant created before later changes
+async def upgrade_collections(tenant_id: str):
+    from app.models.repositories import StockRepository, StockSnapshotRepository, StockSnapshotChunkRepository
+    from app.repositories.snapshot_run_repository import SnapshotRunRepository
+
+    db = await db_helper.get_db_async(f"{settings.DB_NAME_PREFIX}_{tenant_id}")
+    # low-stock / reorder flags and their partial indexes
+    await StockRepository(db).ensure_alert_flags_async()
+    # snapshot_id lookups and unique pages of chunked snapshots
+    await StockSnapshotRepository(db).ensure_snapshot_id_index_async()
+    await StockSnapshotChunkRepository(db).ensure_indexes_async()
+    # run_id lookups and the latest run of multi-store snapshot executions
+    await SnapshotRunRepository(db).ensure_indexes_async()
+
+    # add more upgrade steps here
+
+
+# upgrade the collections of all existing tenants
+async def upgrade_all_tenants():
+    client = await db_helper.get_client_async()
+    prefix = f"{settings.DB_NAME_PREFIX}_"
+    for db_name in await client.list_database_names():
+        if not db_name.startswith(prefix):
+            continue
+        tenant_id = db_name[len(prefix) :]
+        try:
+            await upgrade_collections(tenant_id)
+        except Exception as e:
+            # one broken tenant must not stop the upgrade of the others
+            logger.error(f"Failed to upgrade collections for tenant_id:{tenant_id}: {e}")
+    logger.info("Upgrading collections of existing tenants completed")
+
+
 # setup database
 async def execute(tenant_id: str):
     logger.info(f"Setting up database for tenant_id:{tenant_id} execution started...")
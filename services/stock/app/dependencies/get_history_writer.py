@@ -0,0 +1,17 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import Optional
+from app.services.stock_history_writer import StockHistoryWriter
+
+# Global stock history writer instance
+_history_writer: Optional[StockHistoryWriter] = None
+
+
+def set_history_writer(history_writer: Optional[StockHistoryWriter]) -> None:
+    """Set the global stock history writer instance"""
+    global _history_writer
+    _history_writer = history_writer
+
+
+def get_history_writer() -> Optional[StockHistoryWriter]:
+    """Get the global stock history writer instance"""
+    return _history_writer
@@ -7,6 +7,7 @@ from app.services.stock_service import StockService
 from app.services.snapshot_service import SnapshotService
 from app.config.settings import settings
 from app.dependencies.get_alert_service import get_alert_service
+from app.dependencies.get_history_writer import get_history_writer
 
 
 async def get_db_from_tenant(tenant_id: str) -> AsyncIOMotorDatabase:
@@ -18,7 +19,7 @@ async def get_stock_service(request: Request, tenant_id: str) -> StockService:
     """Get stock service instance"""
     db = await get_db_from_tenant(tenant_id)
     alert_service = get_alert_service()
-    return StockService(db, alert_service)
+    return StockService(db, alert_service, get_history_writer())
 
 
 async def get_stock_service_from_request(request: Request) -> StockService:
@@ -34,7 +35,7 @@ async def get_stock_service_from_request(request: Request) -> StockService:
         return None
     db = await get_db_from_tenant(tenant_id)
     alert_service = get_alert_service()
-    return StockService(db, alert_service)
+    return StockService(db, alert_service, get_history_writer())
 
 
 async def get_snapshot_service(request: Request, tenant_id: str) -> SnapshotService:
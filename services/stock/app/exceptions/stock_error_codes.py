@@ -38,6 +38,7 @@ class StockErrorCode:
     SNAPSHOT_NOT_FOUND = "414202"  # スナップショットが見つからない
     SNAPSHOT_VALIDATION_ERROR = "414203"  # スナップショットのバリデーションエラー
     SNAPSHOT_DELETION_FAILED = "414204"  # スナップショット削除失敗
+    SNAPSHOT_RUN_IN_PROGRESS = "414205"  # スナップショット実行中
 
     # 外部サービス操作関連 (4143xx)
     EXTERNAL_SERVICE_ERROR = "414301"  # 外部サービスエラー
@@ -75,6 +76,7 @@ class StockErrorMessage:
             StockErrorCode.SNAPSHOT_NOT_FOUND: "スナップショットが見つかりません",
             StockErrorCode.SNAPSHOT_VALIDATION_ERROR: "スナップショットのバリデーションエラーが発生しました",
             StockErrorCode.SNAPSHOT_DELETION_FAILED: "スナップショットの削除に失敗しました",
+            StockErrorCode.SNAPSHOT_RUN_IN_PROGRESS: "スナップショットは実行中です",
             # 外部サービス操作関連
             StockErrorCode.EXTERNAL_SERVICE_ERROR: "外部サービスエラーが発生しました",
             StockErrorCode.PUBSUB_ERROR: "Pub/Subエラーが発生しました",
@@ -102,6 +104,7 @@ class StockErrorMessage:
             StockErrorCode.SNAPSHOT_NOT_FOUND: "Snapshot not found",
             StockErrorCode.SNAPSHOT_VALIDATION_ERROR: "Snapshot validation error occurred",
             StockErrorCode.SNAPSHOT_DELETION_FAILED: "Failed to delete snapshot",
+            StockErrorCode.SNAPSHOT_RUN_IN_PROGRESS: "Snapshot run is already in progress",
             # 外部サービス操作関連
             StockErrorCode.EXTERNAL_SERVICE_ERROR: "External service error occurred",
             StockErrorCode.PUBSUB_ERROR: "Pub/Sub error occurred",
@@ -150,6 +150,20 @@ class SnapshotNotFoundError(ServiceException):
         )
 
 
+class SnapshotRunInProgressError(ServiceException):
+    """スナップショット実行中に再開が要求された場合の例外"""
+
+    def __init__(self, message: str, logger: Optional[Logger] = None, original_exception: Optional[Exception] = None):
+        super().__init__(
+            error_code=StockErrorCode.SNAPSHOT_RUN_IN_PROGRESS,
+            user_message=get_message(StockErrorCode.SNAPSHOT_RUN_IN_PROGRESS),
+            message=message,
+            status_code=status.HTTP_409_CONFLICT,
+            logger=logger,
+            original_exception=original_exception,
+        )
+
+
 class ExternalServiceError(ServiceException):
     """外部サービスエラーが発生した場合の例外"""
 
@@ -5,6 +5,7 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from logging import getLogger, config
 from datetime import datetime
+import asyncio
 import platform
 import os
 import json
@@ -25,20 +26,25 @@ from kugel_common.middleware.log_requests import log_requests
 from app.api.v1.stock import router as v1_stock_router
 from app.api.v1.tenant import router as v1_tenant_router
 from app.config.settings import settings
+from app.database import database_setup
 from app.utils.state_store_manager import state_store_manager
 from app.services.multi_tenant_snapshot_scheduler import MultiTenantSnapshotScheduler
 from app.dependencies.get_scheduler import set_scheduler
 from app.dependencies.get_alert_service import set_alert_service
 from app.dependencies.get_stock_service import get_db_from_tenant
 from app.websocket.connection_manager import ConnectionManager
+from app.websocket.alert_broadcaster import AlertFanoutMode, create_alert_broadcaster
 from app.services.alert_service import AlertService
+from app.services.stock_history_writer import StockHistoryWriter
+from app.dependencies.get_history_writer import set_history_writer
 
 # Create a FastAPI instance with API documentation URLs enabled
 app = FastAPI(docs_url="/docs", redoc_url="/redoc")
 
 # Create global instances for WebSocket support
 connection_manager = ConnectionManager()
-alert_service = AlertService(connection_manager)
+alert_service = AlertService(connection_manager, create_alert_broadcaster(connection_manager))
+history_writer = StockHistoryWriter()
 
 # Enable remote debugging if DEBUG flag is set to "true"  # This allows attaching a debugger to the running service
 IS_DEBUG = settings.DEBUG.lower() == "true"
@@ -84,7 +90,18 @@ def subscribe_topics():
     Returns:
         list: List of subscription configurations with pubsubname, topic, and route
     """
-    return [{"pubsubname": "pubsub-tranlog-report", "topic": "topic-tranlog", "route": "/api/v1/tranlog"}]
+    subscriptions = [{"pubsubname": "pubsub-tranlog-report", "topic": "topic-tranlog", "route": "/api/v1/tranlog"}]
+
+    # Stock alerts are fanned out to the WebSocket clients of every replica
+    if settings.ALERT_FANOUT_MODE == AlertFanoutMode.DAPR:
+        subscriptions.append(
+            {
+                "pubsubname": settings.ALERT_PUBSUB_NAME,
+                "topic": settings.ALERT_PUBSUB_TOPIC,
+                "route": "/api/v1/stock-alerts",
+            }
+        )
+    return subscriptions
 
 
 @app.get("/")
@@ -131,12 +148,19 @@ async def health_check():
         details=scheduler.get_status() if scheduler else None,
     )
 
+    # Report WebSocket alert connections and slow consumer counters
+    websocket_health = ComponentHealth(
+        status=HealthStatus.HEALTHY,
+        details=connection_manager.get_stats(),
+    )
+
     # Build health check response
     checks = {
         "mongodb": mongodb_health,
         "dapr_sidecar": dapr_sidecar_health,  # Required for statestore and pub/sub subscription
         "dapr_statestore": dapr_statestore_health,  # Used for event deduplication
         "snapshot_scheduler": scheduler_health,  # Snapshot scheduler status
+        "websocket_alerts": websocket_health,  # Alert connections and slow consumer counters
     }
 
     overall_status = health_checker.determine_overall_status(checks)
@@ -144,6 +168,10 @@ async def health_check():
     return HealthCheckResponse(status=overall_status, service="stock", version="1.0.0", checks=checks)
 
 
+# Background task creating missing fields and indexes for existing tenants
+upgrade_task: asyncio.Task = None
+
+
 # Application startup event handler
 async def startup_event():
     """
@@ -169,6 +197,11 @@ async def startup_event():
         logger.error(f"Error connecting to the database: {e}")
         raise e
 
+    # Backfill the fields and indexes added after existing tenants were set up
+    # Runs in the background because updating a large stock collection takes a while
+    global upgrade_task
+    upgrade_task = asyncio.create_task(database_setup.upgrade_all_tenants())
+
     # Initialize and start the snapshot scheduler
     logger.info("Initializing snapshot scheduler...")
     scheduler = MultiTenantSnapshotScheduler()
@@ -186,6 +219,12 @@ async def startup_event():
     alert_service.start()
     logger.info("Alert service started successfully")
 
+    # Start the stock history writer (write-behind for batched update types)
+    logger.info("Starting stock history writer...")
+    set_history_writer(history_writer)
+    history_writer.start()
+    logger.info(f"Stock history writer started: {history_writer.get_status()}")
+
 
 # Application shutdown event handler
 async def close_event():
@@ -198,10 +237,20 @@ async def close_event():
     """
     logger.info("closing the application")
 
+    # Stop the collection upgrade if it is still running
+    if upgrade_task is not None and not upgrade_task.done():
+        upgrade_task.cancel()
+
     # Stop the alert service
     logger.info("Stopping alert service...")
     await alert_service.stop()
     set_alert_service(None)  # Clear the alert service instance
+    await connection_manager.close()
+
+    # Stop the stock history writer, flushing buffered records before the database is closed
+    logger.info("Stopping stock history writer...")
+    await history_writer.stop()
+    set_history_writer(None)
 
     # Shutdown the snapshot scheduler
     logger.info("Shutting down snapshot scheduler...")
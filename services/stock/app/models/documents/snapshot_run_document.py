@@ -0,0 +1,55 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from pydantic import Field
+
+from kugel_common.models.documents.abstract_document import AbstractDocument
+
+
+class SnapshotRunStatus:
+    RUNNING = "running"
+    COMPLETED = "completed"
+    PARTIAL = "partial"  # finished with failed stores
+
+
+class SnapshotRunDocument(AbstractDocument):
+    """Document model for the progress of one multi-store snapshot execution."""
+
+    tenant_id: str
+    run_id: str
+    status: str = SnapshotRunStatus.RUNNING
+    target_stores: List[str] = Field(default_factory=list)
+    completed_stores: List[str] = Field(default_factory=list)
+    failed_stores: Dict[str, str] = Field(default_factory=dict)  # {store_code: error message}
+    store_durations: Dict[str, float] = Field(default_factory=dict)  # {store_code: seconds}
+    resume_count: int = 0
+    owner_id: Optional[str] = None  # executor instance that runs the stores
+    heartbeat_at: Optional[datetime] = None  # refreshed by the owner while the run is running
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "snapshot_runs"
+        indexes = [
+            {"keys": [("tenant_id", 1), ("started_at", -1)]},
+            {"keys": [("run_id", 1)], "unique": True},
+        ]
+
+    def pending_stores(self) -> List[str]:
+        """Target stores that have not been snapshotted successfully yet."""
+        completed = set(self.completed_stores)
+        return [store_code for store_code in self.target_stores if store_code not in completed]
+
+    def is_owned(self, stale_before: datetime) -> bool:
+        """Whether the run is running with a heartbeat newer than stale_before."""
+        return (
+            self.status == SnapshotRunStatus.RUNNING
+            and self.heartbeat_at is not None
+            and _as_utc(self.heartbeat_at) >= stale_before
+        )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # MongoDB returns naive UTC datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -20,3 +20,7 @@ class StockDocument(AbstractDocument):
     reorder_point: float = Field(0.0, description="Reorder point - quantity that triggers reorder")
     reorder_quantity: float = Field(0.0, description="Quantity to order when reorder point is reached")
     last_transaction_id: Optional[str] = Field(None, description="Last transaction reference")
+    is_below_minimum: bool = Field(False, description="current_quantity < minimum_quantity (maintained on update)")
+    is_below_reorder: bool = Field(
+        False, description="reorder_point > 0 and current_quantity <= reorder_point (maintained on update)"
+    )
@@ -15,10 +15,20 @@ class StockSnapshotItem(BaseDocumentModel):
 
 
 class StockSnapshotDocument(AbstractDocument):
+    """
+    Snapshot header document.
+
+    Items of snapshots created with snapshot_id are stored as pages in
+    StockSnapshotChunkDocument; older snapshots embed them in stocks.
+    """
+
     tenant_id: str = Field(..., description="Tenant ID")
     store_code: str = Field(..., description="Store code")
+    snapshot_id: Optional[str] = Field(None, description="Snapshot ID (None for snapshots with embedded stocks)")
     total_items: int = Field(..., description="Total number of items")
     total_quantity: float = Field(..., description="Total stock quantity")
+    chunk_count: int = Field(0, description="Number of item pages stored in the chunk collection")
+    chunk_size: int = Field(0, description="Maximum number of items per page")
     stocks: List[StockSnapshotItem] = Field(default_factory=list, description="Stock details by item")
     created_by: str = Field(..., description="User or system that created the snapshot")
     generate_date_time: Optional[str] = Field(None, description="Snapshot generation datetime in ISO format")
@@ -28,4 +38,21 @@ class StockSnapshotDocument(AbstractDocument):
         indexes = [
             {"keys": [("tenant_id", 1), ("store_code", 1), ("created_at", -1)]},
             {"keys": [("tenant_id", 1), ("store_code", 1), ("generate_date_time", -1)]},
+            {"keys": [("snapshot_id", 1)]},
+        ]
+
+
+class StockSnapshotChunkDocument(AbstractDocument):
+    """One page of the items of a snapshot"""
+
+    tenant_id: str = Field(..., description="Tenant ID")
+    store_code: str = Field(..., description="Store code")
+    snapshot_id: str = Field(..., description="Snapshot ID of the header document")
+    chunk_no: int = Field(..., description="Page number starting from 1")
+    stocks: List[StockSnapshotItem] = Field(default_factory=list, description="Stock details by item")
+
+    class Settings:
+        name = "stock_snapshot_chunks"
+        indexes = [
+            {"keys": [("snapshot_id", 1), ("chunk_no", 1)], "unique": True},
         ]
@@ -0,0 +1,30 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from datetime import datetime
+from typing import List
+from pydantic import Field
+from kugel_common.models.documents.abstract_document import AbstractDocument
+from app.enums.update_type import UpdateType
+
+
+class StockUpdateDailyDocument(AbstractDocument):
+    """
+    Document class representing compacted stock update history.
+
+    Per-sale history older than the compaction threshold is rolled up into
+    one document per item, day and update type.
+    """
+
+    tenant_id: str = Field(..., description="Tenant ID")
+    store_code: str = Field(..., description="Store code")
+    item_code: str = Field(..., description="Item code")
+    date: str = Field(..., description="Day of the updates (YYYY-MM-DD, UTC)")
+    update_type: UpdateType = Field(..., description="Type of stock update")
+    quantity_change: float = Field(..., description="Sum of the quantity changes of the day")
+    update_count: int = Field(..., description="Number of compacted updates")
+    before_quantity: float = Field(..., description="Stock quantity before the first update of the day")
+    after_quantity: float = Field(..., description="Stock quantity after the last update of the day")
+    first_timestamp: datetime = Field(..., description="Timestamp of the first update of the day")
+    last_timestamp: datetime = Field(..., description="Timestamp of the last update of the day")
+    compaction_ids: List[str] = Field(
+        default_factory=list, description="Compaction runs merged into this aggregate, so a run is merged only once"
+    )
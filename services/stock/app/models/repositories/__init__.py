@@ -1,6 +1,14 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from .stock_repository import StockRepository
 from .stock_update_repository import StockUpdateRepository
+from .stock_update_daily_repository import StockUpdateDailyRepository
 from .stock_snapshot_repository import StockSnapshotRepository
+from .stock_snapshot_chunk_repository import StockSnapshotChunkRepository
 
-__all__ = ["StockRepository", "StockUpdateRepository", "StockSnapshotRepository"]
+__all__ = [
+    "StockRepository",
+    "StockUpdateRepository",
+    "StockUpdateDailyRepository",
+    "StockSnapshotRepository",
+    "StockSnapshotChunkRepository",
+]
@@ -1,16 +1,113 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from typing import Optional, List
+import asyncio
+from typing import Optional, List, Dict, AsyncIterator
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
 from kugel_common.utils.misc import get_app_time
 from app.models.documents.stock_document import StockDocument
 from app.config.settings import settings
 
+# Aggregation stage that recomputes the alert flags from the values of the updated document.
+# The flags are what find_low_stock_async / find_reorder_alerts_async query, through partial indexes.
+ALERT_FLAGS_STAGE = {
+    "$set": {
+        "is_below_minimum": {"$lt": ["$current_quantity", "$minimum_quantity"]},
+        "is_below_reorder": {
+            "$and": [{"$gt": ["$reorder_point", 0]}, {"$lte": ["$current_quantity", "$reorder_point"]}]
+        },
+    }
+}
+
+# Partial indexes holding only the flagged stocks: (index name suffix, flag field)
+ALERT_FLAG_INDEXES = [("below_minimum", "is_below_minimum"), ("below_reorder", "is_below_reorder")]
+
+
+def compute_alert_flags(current_quantity: float, minimum_quantity: float, reorder_point: float) -> Dict[str, bool]:
+    """Compute the alert flags in Python (same rules as ALERT_FLAGS_STAGE)"""
+    return {
+        "is_below_minimum": current_quantity < minimum_quantity,
+        "is_below_reorder": reorder_point > 0 and current_quantity <= reorder_point,
+    }
+
+
+def _quantity_change_pipeline(
+    tenant_id: str, store_code: str, item_code: str, quantity_change: float, transaction_id: Optional[str], now
+) -> List[dict]:
+    """
+    Update pipeline adding quantity_change to current_quantity (upsert-safe) and refreshing the alert flags
+
+    Pipeline updates cannot use $setOnInsert, so the insert defaults are applied with $ifNull.
+    """
+    return [
+        {
+            "$set": {
+                "tenant_id": {"$literal": tenant_id},
+                "store_code": {"$literal": store_code},
+                "item_code": {"$literal": item_code},
+                "current_quantity": {"$add": [{"$ifNull": ["$current_quantity", 0.0]}, quantity_change]},
+                "minimum_quantity": {"$ifNull": ["$minimum_quantity", 0.0]},
+                "reorder_point": {"$ifNull": ["$reorder_point", 0.0]},
+                "reorder_quantity": {"$ifNull": ["$reorder_quantity", 0.0]},
+                "last_transaction_id": {"$literal": transaction_id},
+                "created_at": {"$ifNull": ["$created_at", now]},
+                "updated_at": now,
+            }
+        },
+        ALERT_FLAGS_STAGE,
+    ]
+
 
 class StockRepository(AbstractRepository[StockDocument]):
     def __init__(self, database: AsyncIOMotorDatabase):
         super().__init__(settings.DB_COLLECTION_NAME_STOCK, StockDocument, database)
 
+    async def create_async(self, document: StockDocument) -> bool:
+        """Create a stock document with its alert flags set"""
+        flags = compute_alert_flags(document.current_quantity, document.minimum_quantity, document.reorder_point)
+        document.is_below_minimum = flags["is_below_minimum"]
+        document.is_below_reorder = flags["is_below_reorder"]
+        return await super().create_async(document)
+
+    async def ensure_alert_flags_async(self) -> None:
+        """
+        Ensure the partial indexes used by the low-stock and reorder queries exist
+
+        Stocks written before the flags existed are backfilled first; the backfill
+        runs only while the indexes are missing, so later calls are cheap.
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        index_names = set((await self.dbcollection.index_information()).keys())
+        missing = [
+            (suffix, flag)
+            for suffix, flag in ALERT_FLAG_INDEXES
+            if f"{self.collection_name}_index_{suffix}" not in index_names
+        ]
+        if not missing:
+            return
+
+        await self.dbcollection.update_many(
+            {"$or": [{"is_below_minimum": {"$exists": False}}, {"is_below_reorder": {"$exists": False}}]},
+            [ALERT_FLAGS_STAGE],
+        )
+        for suffix, flag in missing:
+            await self.dbcollection.create_index(
+                [("tenant_id", 1), ("store_code", 1), (flag, 1), ("item_code", 1)],
+                name=f"{self.collection_name}_index_{suffix}",
+                partialFilterExpression={flag: True},
+            )
+
+    async def _update_with_flags_async(self, filter: dict, new_values: dict) -> bool:
+        """Set new_values and refresh the alert flags in one pipeline update"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        values = {key: {"$literal": value} for key, value in new_values.items()}
+        values["updated_at"] = get_app_time()
+        response = await self.dbcollection.update_one(filter, [{"$set": values}, ALERT_FLAGS_STAGE])
+        return response.modified_count == 1
+
     async def find_by_item_async(self, tenant_id: str, store_code: str, item_code: str) -> Optional[StockDocument]:
         """Find stock by tenant, store and item code"""
         return await self.get_one_async({"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code})
@@ -32,18 +129,34 @@ class StockRepository(AbstractRepository[StockDocument]):
         documents = await cursor.to_list(length=limit if limit > 0 else None)
         return [StockDocument(**doc) for doc in documents]
 
+    async def iter_store_stocks_async(
+        self, tenant_id: str, store_code: str, batch_size: int = 1000
+    ) -> AsyncIterator[List[StockDocument]]:
+        """Stream all stocks of a store in item_code order, batch_size documents at a time"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        cursor = (
+            self.dbcollection.find({"tenant_id": tenant_id, "store_code": store_code})
+            .sort("item_code", 1)
+            .batch_size(batch_size)
+        )
+
+        batch = []
+        async for doc in cursor:
+            batch.append(StockDocument(**doc))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     async def find_low_stock_async(self, tenant_id: str, store_code: str) -> List[StockDocument]:
         """Find items with stock below minimum quantity"""
         if self.dbcollection is None:
             await self.initialize()
 
-        cursor = self.dbcollection.find(
-            {
-                "tenant_id": tenant_id,
-                "store_code": store_code,
-                "$expr": {"$lt": ["$current_quantity", "$minimum_quantity"]},
-            }
-        )
+        cursor = self.dbcollection.find({"tenant_id": tenant_id, "store_code": store_code, "is_below_minimum": True})
         documents = await cursor.to_list(length=None)
         return [StockDocument(**doc) for doc in documents]
 
@@ -52,7 +165,7 @@ class StockRepository(AbstractRepository[StockDocument]):
     ) -> bool:
         """Update stock quantity"""
         update_data = {"current_quantity": new_quantity, "last_transaction_id": transaction_id}
-        return await self.update_one_async(
+        return await self._update_with_flags_async(
             {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code}, update_data
         )
 
@@ -70,22 +183,10 @@ class StockRepository(AbstractRepository[StockDocument]):
 
         now = get_app_time()
 
-        # Use findAndModify with upsert for atomic update
+        # Use findAndModify with upsert for atomic update; the pipeline also refreshes the alert flags
         result = await self.dbcollection.find_one_and_update(
             filter={"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code},
-            update={
-                "$inc": {"current_quantity": quantity_change},
-                "$set": {"last_transaction_id": transaction_id, "updated_at": now},
-                "$setOnInsert": {
-                    "tenant_id": tenant_id,
-                    "store_code": store_code,
-                    "item_code": item_code,
-                    "minimum_quantity": 0.0,
-                    "reorder_point": 0.0,
-                    "reorder_quantity": 0.0,
-                    "created_at": now,
-                },
-            },
+            update=_quantity_change_pipeline(tenant_id, store_code, item_code, quantity_change, transaction_id, now),
             upsert=True,  # Create document if it doesn't exist
             return_document=True,  # Return the document after update
         )
@@ -94,6 +195,55 @@ class StockRepository(AbstractRepository[StockDocument]):
             return StockDocument(**result)
         return None
 
+    async def update_quantities_atomic_async(
+        self,
+        tenant_id: str,
+        store_code: str,
+        quantity_changes: Dict[str, float],
+        transaction_id: Optional[str] = None,
+    ) -> Dict[str, StockDocument]:
+        """
+        Apply quantity changes for several items and return their exact post-images
+
+        This is not a single bulk write: each item gets its own findAndModify pipeline
+        upsert, as in update_quantity_atomic_async, and the calls are issued concurrently,
+        so a transaction costs one round trip per distinct item but no sequential waits.
+        Every result is the document right after its own change, so the derived
+        before/after quantities stay exact when other writers update the same items at
+        the same time (a bulk_write followed by an $in read back would not be).
+
+        Args:
+            tenant_id: Tenant ID
+            store_code: Store code
+            quantity_changes: Quantity change per item code
+            transaction_id: Reference of the transaction causing the changes
+
+        Returns:
+            Updated stock documents keyed by item code
+        """
+        if not quantity_changes:
+            return {}
+
+        if self.dbcollection is None:
+            await self.initialize()
+
+        now = get_app_time()
+        item_codes = list(quantity_changes.keys())
+        results = await asyncio.gather(
+            *[
+                self.dbcollection.find_one_and_update(
+                    filter={"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code},
+                    update=_quantity_change_pipeline(
+                        tenant_id, store_code, item_code, quantity_changes[item_code], transaction_id, now
+                    ),
+                    upsert=True,
+                    return_document=True,
+                )
+                for item_code in item_codes
+            ]
+        )
+        return {item_code: StockDocument(**result) for item_code, result in zip(item_codes, results) if result}
+
     async def count_by_store_async(self, tenant_id: str, store_code: str) -> int:
         """Count all stocks for a store"""
         if self.dbcollection is None:
@@ -106,18 +256,7 @@ class StockRepository(AbstractRepository[StockDocument]):
         if self.dbcollection is None:
             await self.initialize()
 
-        cursor = self.dbcollection.find(
-            {
-                "tenant_id": tenant_id,
-                "store_code": store_code,
-                "$expr": {
-                    "$and": [
-                        {"$gt": ["$reorder_point", 0]},  # Only check if reorder point is set
-                        {"$lte": ["$current_quantity", "$reorder_point"]},
-                    ]
-                },
-            }
-        )
+        cursor = self.dbcollection.find({"tenant_id": tenant_id, "store_code": store_code, "is_below_reorder": True})
         documents = await cursor.to_list(length=None)
         return [StockDocument(**doc) for doc in documents]
 
@@ -126,6 +265,15 @@ class StockRepository(AbstractRepository[StockDocument]):
     ) -> bool:
         """Update reorder point and quantity for an item"""
         update_data = {"reorder_point": reorder_point, "reorder_quantity": reorder_quantity}
-        return await self.update_one_async(
+        return await self._update_with_flags_async(
             {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code}, update_data
         )
+
+    async def update_minimum_quantity_async(
+        self, tenant_id: str, store_code: str, item_code: str, minimum_quantity: float
+    ) -> bool:
+        """Update minimum quantity for an item"""
+        return await self._update_with_flags_async(
+            {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code},
+            {"minimum_quantity": minimum_quantity},
+        )
@@ -0,0 +1,69 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.utils.misc import get_app_time
+from app.models.documents.stock_snapshot_document import StockSnapshotChunkDocument, StockSnapshotItem
+from app.config.settings import settings
+
+
+class StockSnapshotChunkRepository(AbstractRepository[StockSnapshotChunkDocument]):
+    def __init__(self, database: AsyncIOMotorDatabase):
+        super().__init__(settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT_CHUNK, StockSnapshotChunkDocument, database)
+
+    async def ensure_indexes_async(self) -> None:
+        """Ensure the unique (snapshot_id, chunk_no) index exists (collections created before the index existed)"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        # same name as the index created by database_setup so that both paths are idempotent
+        await self.dbcollection.create_index(
+            [("snapshot_id", 1), ("chunk_no", 1)],
+            unique=True,
+            name=f"{self.collection_name}_index_snapshot_id_chunk_no",
+        )
+
+    async def create_many_async(self, chunks: List[StockSnapshotChunkDocument]) -> None:
+        """Insert several snapshot pages with one insert_many"""
+        if not chunks:
+            return
+
+        if self.dbcollection is None:
+            await self.initialize()
+
+        now = get_app_time()
+        documents = []
+        for chunk in chunks:
+            chunk.created_at = now
+            documents.append(chunk.model_dump())
+        await self.dbcollection.insert_many(documents, ordered=False)
+
+    async def find_chunk_async(self, snapshot_id: str, chunk_no: int) -> Optional[StockSnapshotChunkDocument]:
+        """Find one page of a snapshot"""
+        return await self.get_one_async({"snapshot_id": snapshot_id, "chunk_no": chunk_no})
+
+    async def find_first_chunks_async(self, snapshot_ids: List[str]) -> Dict[str, List[StockSnapshotItem]]:
+        """Find the first page of several snapshots with one query, keyed by snapshot ID"""
+        if not snapshot_ids:
+            return {}
+
+        if self.dbcollection is None:
+            await self.initialize()
+
+        chunks = await self.dbcollection.find({"snapshot_id": {"$in": snapshot_ids}, "chunk_no": 1}).to_list(
+            length=len(snapshot_ids)
+        )
+        return {
+            chunk["snapshot_id"]: [StockSnapshotItem(**item) for item in chunk.get("stocks", [])] for chunk in chunks
+        }
+
+    async def delete_by_snapshot_ids_async(self, snapshot_ids: List[str]) -> int:
+        """Delete all pages of the given snapshots"""
+        if not snapshot_ids:
+            return 0
+
+        if self.dbcollection is None:
+            await self.initialize()
+
+        result = await self.dbcollection.delete_many({"snapshot_id": {"$in": snapshot_ids}})
+        return result.deleted_count
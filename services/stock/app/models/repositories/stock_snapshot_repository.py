@@ -1,12 +1,35 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from typing import List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
 from kugel_common.models.repositories.abstract_repository import AbstractRepository
 from app.models.documents.stock_snapshot_document import StockSnapshotDocument
 from app.config.settings import settings
 
 
+async def ensure_created_at_ttl_index(collection: AsyncIOMotorCollection, retention_days: int):
+    """Ensure a TTL index named created_at_ttl with the given retention exists on the collection"""
+    # Get existing indexes
+    indexes = await collection.list_indexes().to_list(None)
+
+    # Check if TTL index already exists
+    ttl_index_exists = False
+    for index in indexes:
+        if index.get("name") == "created_at_ttl":
+            # Check if TTL value is different
+            if index.get("expireAfterSeconds") != retention_days * 86400:
+                # Drop old index and recreate with new TTL
+                await collection.drop_index("created_at_ttl")
+            else:
+                ttl_index_exists = True
+            break
+
+    # Create TTL index if it doesn't exist
+    if not ttl_index_exists:
+        await collection.create_index("created_at", name="created_at_ttl", expireAfterSeconds=retention_days * 86400)
+
+
 class StockSnapshotRepository(AbstractRepository[StockSnapshotDocument]):
     def __init__(self, database: AsyncIOMotorDatabase):
         super().__init__(settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT, StockSnapshotDocument, database)
@@ -46,6 +69,17 @@ class StockSnapshotRepository(AbstractRepository[StockSnapshotDocument]):
         )
         return snapshots[0] if snapshots else None
 
+    async def find_old_snapshot_ids_async(self, tenant_id: str, store_code: str, retention_days: int = 90) -> List[str]:
+        """Find snapshot IDs of snapshots older than retention days"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        snapshot_ids = await self.dbcollection.distinct(
+            "snapshot_id", {"tenant_id": tenant_id, "store_code": store_code, "created_at": {"$lt": cutoff_date}}
+        )
+        return [snapshot_id for snapshot_id in snapshot_ids if snapshot_id]
+
     async def delete_old_snapshots_async(self, tenant_id: str, store_code: str, retention_days: int = 90) -> int:
         """Delete snapshots older than retention days"""
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
@@ -93,28 +127,29 @@ class StockSnapshotRepository(AbstractRepository[StockSnapshotDocument]):
 
         return snapshots, total_count
 
+    async def find_by_snapshot_id_async(
+        self, tenant_id: str, store_code: str, snapshot_id: str
+    ) -> Optional[StockSnapshotDocument]:
+        """Find a snapshot by snapshot_id, or by _id for snapshots created before snapshot_id existed"""
+        id_filters = [{"snapshot_id": snapshot_id}]
+        if ObjectId.is_valid(snapshot_id):
+            id_filters.append({"_id": ObjectId(snapshot_id)})
+        return await self.get_one_async({"tenant_id": tenant_id, "store_code": store_code, "$or": id_filters})
+
+    async def ensure_snapshot_id_index_async(self) -> None:
+        """Ensure the snapshot_id lookup index exists (collections created before snapshot_id existed)"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        # same name as the index created by database_setup so that both paths are idempotent
+        await self.dbcollection.create_index([("snapshot_id", 1)], name=f"{self.collection_name}_index_snapshot_id")
+
     async def ensure_ttl_index(self, retention_days: int):
-        """Ensure TTL index exists on created_at field"""
+        """Ensure TTL index exists on created_at field of the snapshots and their pages"""
         if self.dbcollection is None:
             await self.initialize()
 
-        # Get existing indexes
-        indexes = await self.dbcollection.list_indexes().to_list(None)
-
-        # Check if TTL index already exists
-        ttl_index_exists = False
-        for index in indexes:
-            if index.get("name") == "created_at_ttl":
-                # Check if TTL value is different
-                if index.get("expireAfterSeconds") != retention_days * 86400:
-                    # Drop old index and recreate with new TTL
-                    await self.dbcollection.drop_index("created_at_ttl")
-                else:
-                    ttl_index_exists = True
-                break
-
-        # Create TTL index if it doesn't exist
-        if not ttl_index_exists:
-            await self.dbcollection.create_index(
-                "created_at", name="created_at_ttl", expireAfterSeconds=retention_days * 86400
-            )
+        await ensure_created_at_ttl_index(self.dbcollection, retention_days)
+        await ensure_created_at_ttl_index(
+            self.db[settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT_CHUNK], retention_days
+        )
@@ -0,0 +1,73 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.models.repositories.keyset_pagination import (
+    normalize_keyset_sort,
+    encode_cursor,
+    decode_cursor,
+    build_keyset_filter,
+)
+from app.models.documents.stock_update_daily_document import StockUpdateDailyDocument
+from app.config.settings import settings
+
+MERGE_KEYS = ["tenant_id", "store_code", "item_code", "date", "update_type"]
+
+# Newest day first
+DAILY_HISTORY_SORT = normalize_keyset_sort([("date", -1), ("update_type", -1)])
+
+
+class StockUpdateDailyRepository(AbstractRepository[StockUpdateDailyDocument]):
+    def __init__(self, database: AsyncIOMotorDatabase):
+        super().__init__(settings.DB_COLLECTION_NAME_STOCK_UPDATE_DAILY, StockUpdateDailyDocument, database)
+
+    async def ensure_merge_index_async(self) -> None:
+        """Ensure the unique index required by $merge exists (collections created before compaction existed)"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        # same name as the index created by database_setup so that both paths are idempotent
+        index_name = f"{self.collection_name}_index_" + "_".join(MERGE_KEYS)
+        await self.dbcollection.create_index([(key, 1) for key in MERGE_KEYS], unique=True, name=index_name)
+
+    async def find_by_item_async(
+        self, tenant_id: str, store_code: str, item_code: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[StockUpdateDailyDocument], Optional[str]]:
+        """
+        Find daily aggregates by item code, newest day first, with keyset pagination
+
+        Args:
+            tenant_id: Tenant ID
+            store_code: Store code
+            item_code: Item code
+            limit: Maximum number of aggregates to return
+            cursor: Cursor returned with the previous page, None for the first page
+
+        Returns:
+            Aggregates of the page and the cursor of the next page (None on the last page)
+
+        Raises:
+            InvalidRequestDataException: If the cursor is invalid
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        filter_dict = {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code}
+        page = 1
+        if cursor:
+            values, previous_page = decode_cursor(cursor, DAILY_HISTORY_SORT)
+            page = previous_page + 1
+            filter_dict = {"$and": [filter_dict, build_keyset_filter(DAILY_HISTORY_SORT, values)]}
+
+        documents = (
+            await self.dbcollection.find(filter_dict)
+            .sort(DAILY_HISTORY_SORT)
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1], DAILY_HISTORY_SORT, page)
+        return [StockUpdateDailyDocument(**doc) for doc in documents], next_cursor
@@ -1,33 +1,292 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from kugel_common.models.repositories.abstract_repository import AbstractRepository
+from kugel_common.models.repositories.abstract_repository import AbstractRepository, KEYSET_ESTIMATE_COUNT_LIMIT
+from kugel_common.models.repositories.keyset_pagination import (
+    TotalMode,
+    normalize_keyset_sort,
+    encode_cursor,
+    decode_cursor,
+    build_keyset_filter,
+)
+from kugel_common.utils.misc import get_app_time
 from app.models.documents.stock_update_document import StockUpdateDocument
+from app.models.repositories.stock_update_daily_repository import MERGE_KEYS
 from app.config.settings import settings
 from app.enums.update_type import UpdateType
 
 
+# Newest first; _id breaks ties between updates with the same timestamp
+HISTORY_SORT = normalize_keyset_sort([("timestamp", -1)])
+
+
+# Field marking the updates claimed by a compaction run until they are deleted
+COMPACTION_ID_FIELD = "compaction_id"
+
+
 class StockUpdateRepository(AbstractRepository[StockUpdateDocument]):
     def __init__(self, database: AsyncIOMotorDatabase):
         super().__init__(settings.DB_COLLECTION_NAME_STOCK_UPDATE, StockUpdateDocument, database)
 
     async def find_by_item_async(
-        self, tenant_id: str, store_code: str, item_code: str, skip: int = 0, limit: int = 100
-    ) -> List[StockUpdateDocument]:
-        """Find stock updates by item code"""
+        self,
+        tenant_id: str,
+        store_code: str,
+        item_code: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+    ) -> Tuple[List[StockUpdateDocument], Optional[str]]:
+        """
+        Find stock updates by item code, newest first
+
+        With a cursor, pages are delimited by (timestamp, _id) instead of skip so
+        that each page is an index range scan on (tenant_id, store_code, item_code,
+        timestamp). Without a cursor, skip selects the page as before.
+
+        Args:
+            tenant_id: Tenant ID
+            store_code: Store code
+            item_code: Item code
+            limit: Maximum number of updates to return
+            cursor: Cursor returned with the previous page, None for offset paging
+            skip: Number of updates to skip, ignored when a cursor is given
+
+        Returns:
+            Updates of the page and the cursor of the next page (None on the last page)
+
+        Raises:
+            InvalidRequestDataException: If the cursor is invalid
+        """
         if self.dbcollection is None:
             await self.initialize()
 
-        cursor = (
-            self.dbcollection.find({"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code})
-            .sort("timestamp", -1)
-            .skip(skip)
-            .limit(limit)
+        filter_dict = {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code}
+        page = skip // limit + 1
+        if cursor:
+            values, previous_page = decode_cursor(cursor, HISTORY_SORT)
+            page = previous_page + 1
+            filter_dict = {"$and": [filter_dict, build_keyset_filter(HISTORY_SORT, values)]}
+
+        # fetch one more document to know whether there is a next page
+        documents = (
+            await self.dbcollection.find(filter_dict)
+            .sort(HISTORY_SORT)
+            .skip(0 if cursor else skip)
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
         )
 
-        documents = await cursor.to_list(length=limit if limit > 0 else None)
-        return [StockUpdateDocument(**doc) for doc in documents]
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1], HISTORY_SORT, page)
+        return [StockUpdateDocument(**doc) for doc in documents], next_cursor
+
+    async def count_by_item_async(
+        self, tenant_id: str, store_code: str, item_code: str, total_mode: str = TotalMode.EXACT
+    ) -> Tuple[Optional[int], Optional[bool]]:
+        """
+        Count stock updates by item code according to the total mode
+
+        Returns:
+            Tuple of the count (None for "none") and whether it is an estimate (None for "none")
+        """
+        if total_mode == TotalMode.NONE:
+            return None, None
+
+        if self.dbcollection is None:
+            await self.initialize()
+
+        query = {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code}
+        if total_mode == TotalMode.EXACT:
+            return await self.dbcollection.count_documents(query), False
+        count = await self.dbcollection.count_documents(query, limit=KEYSET_ESTIMATE_COUNT_LIMIT)
+        # below the limit the count is exact
+        return count, count >= KEYSET_ESTIMATE_COUNT_LIMIT
+
+    async def create_many_async(self, updates: List[StockUpdateDocument]) -> None:
+        """Insert several stock update records with one insert_many"""
+        if not updates:
+            return
+
+        if self.dbcollection is None:
+            await self.initialize()
+
+        now = get_app_time()
+        documents = []
+        for update in updates:
+            update.created_at = now
+            documents.append(update.model_dump())
+        await self.dbcollection.insert_many(documents, ordered=True)
+
+    async def ensure_compaction_index_async(self) -> None:
+        """Ensure the sparse index finding the updates claimed by a compaction run exists"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        await self.dbcollection.create_index(
+            [(COMPACTION_ID_FIELD, 1)], sparse=True, name=f"{self.collection_name}_index_{COMPACTION_ID_FIELD}"
+        )
+
+    async def claim_for_compaction_async(
+        self, cutoff: datetime, update_types: List[UpdateType], compaction_id: str
+    ) -> int:
+        """
+        Mark the unclaimed updates older than cutoff as belonging to a compaction run
+
+        Args:
+            cutoff: Updates with a timestamp before this time are claimed
+            update_types: Update types to compact
+            compaction_id: Identifier of the compaction run
+
+        Returns:
+            Number of claimed updates
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        result = await self.dbcollection.update_many(
+            {
+                "timestamp": {"$lt": cutoff},
+                "update_type": {"$in": [t.value for t in update_types]},
+                COMPACTION_ID_FIELD: {"$exists": False},
+            },
+            {"$set": {COMPACTION_ID_FIELD: compaction_id}},
+        )
+        return result.modified_count
+
+    async def find_pending_compaction_ids_async(self) -> List[str]:
+        """Find the compaction runs whose claimed updates were not deleted yet (interrupted runs)"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        return await self.dbcollection.distinct(COMPACTION_ID_FIELD, {COMPACTION_ID_FIELD: {"$exists": True}})
+
+    async def merge_compaction_async(self, compaction_id: str, daily_collection_name: str) -> None:
+        """
+        Roll up the updates claimed by a compaction run into daily per-item aggregates
+
+        The updates are grouped by item, day (UTC) and update type and merged into
+        the daily collection, adding to aggregates written by other runs. Every
+        aggregate records the runs merged into it and a run already recorded is
+        skipped, so merging the same run again (after an interruption before its
+        updates were deleted) does not count its updates twice.
+
+        Args:
+            compaction_id: Identifier of the compaction run
+            daily_collection_name: Name of the daily aggregate collection
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        already_merged = {"$in": [compaction_id, {"$ifNull": ["$compaction_ids", []]}]}
+        pipeline = [
+            {"$match": {COMPACTION_ID_FIELD: compaction_id}},
+            {"$sort": {"timestamp": 1}},
+            {
+                "$group": {
+                    "_id": {
+                        "tenant_id": "$tenant_id",
+                        "store_code": "$store_code",
+                        "item_code": "$item_code",
+                        "update_type": "$update_type",
+                        "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                    },
+                    "quantity_change": {"$sum": "$quantity_change"},
+                    "update_count": {"$sum": 1},
+                    "before_quantity": {"$first": "$before_quantity"},
+                    "after_quantity": {"$last": "$after_quantity"},
+                    "first_timestamp": {"$first": "$timestamp"},
+                    "last_timestamp": {"$last": "$timestamp"},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    **{key: f"$_id.{key}" for key in MERGE_KEYS},
+                    "quantity_change": 1,
+                    "update_count": 1,
+                    "before_quantity": 1,
+                    "after_quantity": 1,
+                    "first_timestamp": 1,
+                    "last_timestamp": 1,
+                    "compaction_ids": [compaction_id],
+                    "created_at": "$$NOW",
+                }
+            },
+            {
+                "$merge": {
+                    "into": daily_collection_name,
+                    "on": MERGE_KEYS,
+                    "whenMatched": [
+                        {
+                            "$replaceWith": {
+                                "$cond": [
+                                    already_merged,
+                                    "$$ROOT",
+                                    {
+                                        "$mergeObjects": [
+                                            "$$ROOT",
+                                            {
+                                                "quantity_change": {
+                                                    "$add": ["$quantity_change", "$$new.quantity_change"]
+                                                },
+                                                "update_count": {"$add": ["$update_count", "$$new.update_count"]},
+                                                "before_quantity": {
+                                                    "$cond": [
+                                                        {"$lte": ["$first_timestamp", "$$new.first_timestamp"]},
+                                                        "$before_quantity",
+                                                        "$$new.before_quantity",
+                                                    ]
+                                                },
+                                                "after_quantity": {
+                                                    "$cond": [
+                                                        {"$gte": ["$last_timestamp", "$$new.last_timestamp"]},
+                                                        "$after_quantity",
+                                                        "$$new.after_quantity",
+                                                    ]
+                                                },
+                                                "first_timestamp": {
+                                                    "$min": ["$first_timestamp", "$$new.first_timestamp"]
+                                                },
+                                                "last_timestamp": {"$max": ["$last_timestamp", "$$new.last_timestamp"]},
+                                                "compaction_ids": {
+                                                    "$concatArrays": [
+                                                        {"$ifNull": ["$compaction_ids", []]},
+                                                        [compaction_id],
+                                                    ]
+                                                },
+                                                "updated_at": "$$NOW",
+                                            },
+                                        ]
+                                    },
+                                ]
+                            }
+                        }
+                    ],
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+        await self.dbcollection.aggregate(pipeline).to_list(length=None)
+
+    async def delete_compacted_async(self, compaction_id: str) -> int:
+        """
+        Delete the updates of a compaction run after they were merged
+
+        Args:
+            compaction_id: Identifier of the compaction run
+
+        Returns:
+            Number of deleted updates
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        result = await self.dbcollection.delete_many({COMPACTION_ID_FIELD: compaction_id})
+        return result.deleted_count
 
     async def find_by_reference_async(self, reference_id: str) -> Optional[StockUpdateDocument]:
         """Find stock update by reference ID"""
@@ -70,12 +329,3 @@ class StockUpdateRepository(AbstractRepository[StockUpdateDocument]):
         documents = await cursor.to_list(length=1)
         updates = [StockUpdateDocument(**doc) for doc in documents]
         return updates[0] if updates else None
-
-    async def count_by_item_async(self, tenant_id: str, store_code: str, item_code: str) -> int:
-        """Count stock updates by item code"""
-        if self.dbcollection is None:
-            await self.initialize()
-
-        return await self.dbcollection.count_documents(
-            {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code}
-        )
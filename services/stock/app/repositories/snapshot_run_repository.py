@@ -0,0 +1,112 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from datetime import datetime, timezone
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.config.settings import settings
+from app.models.documents.snapshot_run_document import SnapshotRunDocument, SnapshotRunStatus
+from kugel_common.models.repositories.abstract_repository import AbstractRepository
+
+
+class SnapshotRunRepository(AbstractRepository[SnapshotRunDocument]):
+    """Repository for snapshot execution progress documents."""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(settings.DB_COLLECTION_NAME_SNAPSHOT_RUN, SnapshotRunDocument, db)
+
+    async def ensure_indexes_async(self) -> None:
+        """Ensure the run_id and latest-run indexes exist (collections created before the indexes existed)"""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        # same names as the indexes created by database_setup so that both paths are idempotent
+        await self.dbcollection.create_index([("run_id", 1)], unique=True, name=f"{self.collection_name}_index_run_id")
+        await self.dbcollection.create_index(
+            [("tenant_id", 1), ("started_at", -1)], name=f"{self.collection_name}_index_tenant_id_started_at"
+        )
+
+    async def get_latest_run(self, tenant_id: str) -> Optional[SnapshotRunDocument]:
+        """Get the most recently started run for a tenant."""
+        runs = await self.get_list_async_with_sort_and_paging(
+            filter={"tenant_id": tenant_id}, limit=1, page=1, sort=[("started_at", -1)]
+        )
+        return runs[0] if runs else None
+
+    async def mark_store_completed(self, run_id: str, store_code: str, duration: float) -> None:
+        """Record a successful store snapshot."""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        await self.dbcollection.update_one(
+            {"run_id": run_id},
+            {
+                "$addToSet": {"completed_stores": store_code},
+                "$set": {f"store_durations.{store_code}": duration},
+                "$unset": {f"failed_stores.{store_code}": ""},
+            },
+        )
+
+    async def mark_store_failed(self, run_id: str, store_code: str, error: str, duration: float) -> None:
+        """Record a failed store snapshot."""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        await self.dbcollection.update_one(
+            {"run_id": run_id},
+            {"$set": {f"failed_stores.{store_code}": error, f"store_durations.{store_code}": duration}},
+        )
+
+    async def claim_for_resume(self, run_id: str, owner_id: str, stale_before: datetime) -> bool:
+        """
+        Atomically mark a run as running again under owner_id before its pending stores are retried.
+
+        The claim only succeeds when the run has finished, or when it is running
+        without a heartbeat newer than stale_before (its owner stopped).
+
+        Returns:
+            True if the run was claimed, False if another owner is still running it
+        """
+        if self.dbcollection is None:
+            await self.initialize()
+
+        claimed = await self.dbcollection.find_one_and_update(
+            {
+                "run_id": run_id,
+                "$or": [
+                    {"status": {"$ne": SnapshotRunStatus.RUNNING}},
+                    {"heartbeat_at": None},
+                    {"heartbeat_at": {"$lt": stale_before}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": SnapshotRunStatus.RUNNING,
+                    "finished_at": None,
+                    "owner_id": owner_id,
+                    "heartbeat_at": datetime.now(timezone.utc),
+                },
+                "$inc": {"resume_count": 1},
+            },
+        )
+        return claimed is not None
+
+    async def heartbeat(self, run_id: str, owner_id: str) -> None:
+        """Refresh the heartbeat of a run owned by owner_id."""
+        if self.dbcollection is None:
+            await self.initialize()
+
+        await self.dbcollection.update_one(
+            {"run_id": run_id, "owner_id": owner_id}, {"$set": {"heartbeat_at": datetime.now(timezone.utc)}}
+        )
+
+    async def mark_finished(self, run_id: str) -> Optional[SnapshotRunDocument]:
+        """Set the final status of a run from its failed stores and return the run."""
+        run = await self.get_one_async({"run_id": run_id})
+        if run is None:
+            return None
+
+        run.status = SnapshotRunStatus.PARTIAL if run.failed_stores else SnapshotRunStatus.COMPLETED
+        run.finished_at = datetime.now(timezone.utc)
+        await self.update_one_async({"run_id": run_id}, {"status": run.status, "finished_at": run.finished_at})
+        return run
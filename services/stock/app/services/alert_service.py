@@ -1,80 +1,90 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from typing import Dict, Any
-from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
 from logging import getLogger
 import asyncio
 import json
 
+from fastapi import WebSocket
+
 from app.models.documents.stock_document import StockDocument
+from app.utils.cooldown_cache import CooldownCache
 from app.websocket.connection_manager import ConnectionManager
+from app.websocket.alert_broadcaster import AlertBroadcaster, LocalAlertBroadcaster
 
 logger = getLogger(__name__)
 
 
 class AlertService:
-    """Service for managing stock alerts and notifications"""
+    """
+    Service for managing stock alerts and notifications
+
+    While started, stock updates are coalesced per item for a short window: only
+    the latest state of each item is evaluated when the window closes, and the
+    resulting alerts are pushed as one frame per store. Without the background
+    task (or with a zero window) updates are evaluated immediately.
+    """
 
-    def __init__(self, connection_manager: ConnectionManager):
+    def __init__(self, connection_manager: ConnectionManager, broadcaster: Optional[AlertBroadcaster] = None):
         self.connection_manager = connection_manager
+        # Fan-out to the WebSocket clients of every replica
+        self.broadcaster = broadcaster or LocalAlertBroadcaster(connection_manager)
         # Get cooldown from settings, default to 60 seconds
         from app.config.settings import settings
 
         self.alert_cooldown = settings.ALERT_COOLDOWN_SECONDS
-        self.recent_alerts: Dict[str, datetime] = {}  # Track recent alerts to prevent spam
-        self._cleanup_task = None
+        self.coalesce_window = settings.ALERT_COALESCE_WINDOW_SECONDS
+        # Track recent alerts to prevent spam (bounded, expired entries are evicted on access)
+        self.recent_alerts = CooldownCache(self.alert_cooldown, settings.ALERT_COOLDOWN_MAX_ENTRIES)
+
+        # Latest stock state per (tenant_id, store_code, item_code) waiting for the window to close
+        self._pending: Dict[Tuple[str, str, str], StockDocument] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._flush_task: Optional[asyncio.Task] = None
 
     def start(self):
         """Start the alert service background tasks"""
-        self._cleanup_task = asyncio.create_task(self._cleanup_old_alerts())
+        if self.coalesce_window > 0:
+            self._stopping = False
+            self._flush_task = asyncio.create_task(self._flush_loop())
 
     async def stop(self):
-        """Stop the alert service"""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
-
-    async def _cleanup_old_alerts(self):
-        """Periodically clean up old alert records"""
-        while True:
-            try:
-                await asyncio.sleep(600)  # Run every 10 minutes
-                now = datetime.now(timezone.utc)
-                cutoff = now - timedelta(seconds=self.alert_cooldown)
-
-                # Remove old alert records
-                keys_to_remove = [key for key, timestamp in self.recent_alerts.items() if timestamp < cutoff]
-                for key in keys_to_remove:
-                    del self.recent_alerts[key]
-
-            except asyncio.CancelledError:
+        """Stop the alert service, sending the alerts still waiting for their window"""
+        if self._flush_task:
+            self._stopping = True
+            self._wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+        await self.flush_async()
+        await self.broadcaster.close()
+
+    async def _flush_loop(self):
+        """Evaluate the coalesced updates once per window"""
+        while not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopping:
                 break
+            await asyncio.sleep(self.coalesce_window)
+            try:
+                await self.flush_async()
             except Exception as e:
-                logger.error(f"Error in alert cleanup: {e}")
+                logger.error(f"Error sending coalesced alerts: {e}")
 
     def _should_send_alert(self, alert_key: str) -> bool:
         """Check if we should send an alert based on cooldown"""
-        now = datetime.now(timezone.utc)
+        return self.recent_alerts.try_acquire(alert_key)
 
-        if alert_key in self.recent_alerts:
-            last_alert = self.recent_alerts[alert_key]
-            if (now - last_alert).total_seconds() < self.alert_cooldown:
-                return False
-
-        self.recent_alerts[alert_key] = now
-        return True
-
-    async def check_and_send_alerts(self, stock: StockDocument) -> None:
-        """Check stock levels and send alerts if necessary"""
-        alerts_to_send = []
+    def _evaluate(self, stock: StockDocument) -> List[Dict[str, Any]]:
+        """Build the alerts raised by a stock state"""
+        alerts = []
 
         # Check reorder point
         if stock.reorder_point > 0 and stock.current_quantity <= stock.reorder_point:
             alert_key = f"reorder_{stock.tenant_id}_{stock.store_code}_{stock.item_code}"
             if self._should_send_alert(alert_key):
-                alerts_to_send.append(
+                alerts.append(
                     {
                         "type": "stock_alert",
                         "alert_type": "reorder_point",
@@ -92,7 +102,7 @@ class AlertService:
         if stock.minimum_quantity > 0 and stock.current_quantity < stock.minimum_quantity:
             alert_key = f"minimum_{stock.tenant_id}_{stock.store_code}_{stock.item_code}"
             if self._should_send_alert(alert_key):
-                alerts_to_send.append(
+                alerts.append(
                     {
                         "type": "stock_alert",
                         "alert_type": "minimum_stock",
@@ -106,9 +116,86 @@ class AlertService:
                     }
                 )
 
-        # Send alerts via WebSocket
-        for alert in alerts_to_send:
-            await self.send_alert(alert)
+        return alerts
+
+    async def check_and_send_alerts(self, stock: StockDocument) -> None:
+        """Check stock levels and send alerts if necessary"""
+        await self.check_and_send_alerts_many([stock])
+
+    async def check_and_send_alerts_many(self, stocks: List[StockDocument]) -> None:
+        """Check several stock levels; the alerts are sent as one frame per store"""
+        if self._flush_task and not self._stopping:
+            for stock in stocks:
+                self._pending[(stock.tenant_id, stock.store_code, stock.item_code)] = stock
+            self._wakeup.set()
+            return
+
+        await self.send_alerts([alert for stock in stocks for alert in self._evaluate(stock)])
+
+    async def flush_async(self) -> None:
+        """Evaluate the coalesced stock updates and send the resulting alerts"""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        await self.send_alerts([alert for stock in pending.values() for alert in self._evaluate(stock)])
+
+    def _group_by_store(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Group alerts into one message per store
+
+        A store with a single alert gets the plain alert message; several
+        alerts are combined into one "stock_alert_batch" frame.
+        """
+        by_store: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for alert in alerts:
+            by_store.setdefault((alert.get("tenant_id"), alert.get("store_code")), []).append(alert)
+
+        messages = []
+        for (tenant_id, store_code), store_alerts in by_store.items():
+            if len(store_alerts) == 1:
+                messages.append(store_alerts[0])
+                continue
+
+            messages.append(
+                {
+                    "type": "stock_alert_batch",
+                    "tenant_id": tenant_id,
+                    "store_code": store_code,
+                    "alerts": store_alerts,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+        return messages
+
+    async def send_alerts(self, alerts: List[Dict[str, Any]]) -> None:
+        """Send alerts to the clients of every replica, one frame per store"""
+        for message in self._group_by_store(alerts):
+            if message["type"] != "stock_alert_batch":
+                await self.send_alert(message)
+                continue
+
+            if not message["tenant_id"] or not message["store_code"]:
+                logger.warning("Alert missing tenant_id or store_code")
+                continue
+
+            await self.broadcaster.publish_async(message)
+            logger.info(
+                f"Sent {len(message['alerts'])} alerts for tenant {message['tenant_id']}, "
+                f"store {message['store_code']}"
+            )
+
+    async def send_alerts_to_connection(
+        self, websocket: WebSocket, tenant_id: str, store_code: str, alerts: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Send alerts to a single connection (the current alerts of a new client)
+
+        Nothing is published to the other clients or replicas and the cooldown
+        is not touched.
+        """
+        for message in self._group_by_store(alerts):
+            await self.connection_manager.send_to_connection(websocket, tenant_id, store_code, json.dumps(message))
 
     async def send_alert(self, alert_data: Dict[str, Any]) -> None:
         """Send an alert to connected clients"""
@@ -119,8 +206,8 @@ class AlertService:
             logger.warning("Alert missing tenant_id or store_code")
             return
 
-        # Send to all connections for this tenant/store
-        await self.connection_manager.send_to_store(tenant_id, store_code, json.dumps(alert_data))
+        # Send to all connections for this tenant/store on every replica
+        await self.broadcaster.publish_async(alert_data)
 
         logger.info(f"Sent {alert_data['alert_type']} alert for item {alert_data['item_code']}")
 
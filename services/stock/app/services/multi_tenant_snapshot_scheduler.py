@@ -9,7 +9,10 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.config.settings import settings
 from app.models.documents.snapshot_schedule_document import SnapshotScheduleDocument
 from app.repositories.snapshot_schedule_repository import SnapshotScheduleRepository
-from app.services.snapshot_service import SnapshotService
+from app.models.documents.snapshot_run_document import SnapshotRunStatus
+from app.repositories.snapshot_run_repository import SnapshotRunRepository
+from app.services.snapshot_executor import SnapshotExecutor, stale_heartbeat_before
+from app.services.stock_history_compaction_service import StockHistoryCompactionService
 from logging import getLogger
 
 
@@ -24,6 +27,10 @@ class MultiTenantSnapshotScheduler:
         self.tenant_jobs: Dict[str, str] = {}  # {tenant_id: job_id}
         self.logger = logger
         self._lock = asyncio.Lock()  # For thread-safe operations
+        self.executor = SnapshotExecutor()
+        self._resume_task: Optional[asyncio.Task] = None
+        self._background_tasks: set = set()
+        self._running_tenants: set = set()  # tenants with a scheduled or resumed snapshot in progress
 
     async def initialize(self, get_db_func):
         """Initialize scheduler with all tenant schedules."""
@@ -44,7 +51,12 @@ class MultiTenantSnapshotScheduler:
                 except Exception as e:
                     self.logger.error(f"Failed to initialize schedule for tenant {tenant_id}: {e}")
 
+            self._schedule_history_compaction()
+
             self.scheduler.start()
+
+            # Resume interrupted runs in the background so that startup is not delayed
+            self._resume_task = asyncio.create_task(self._resume_interrupted_runs(tenant_ids))
             self.logger.info(f"Snapshot scheduler initialized with {len(self.tenant_jobs)} active jobs")
 
         except Exception as e:
@@ -145,36 +157,27 @@ class MultiTenantSnapshotScheduler:
 
         # Simple in-memory lock for now (can be replaced with distributed lock)
         if hasattr(self, "_execution_locks"):
-            if lock_key in self._execution_locks:
+            if self.is_tenant_running(tenant_id):
                 self.logger.warning(f"Snapshot already running for tenant {tenant_id}")
                 return
         else:
             self._execution_locks = set()
 
         self._execution_locks.add(lock_key)
+        self._running_tenants.add(tenant_id)
 
         try:
             self.logger.info(f"Starting scheduled snapshot for tenant {tenant_id}")
 
             db = await self.get_db_func(tenant_id)
-            snapshot_service = SnapshotService(db)
 
             # Get target stores
             stores = await self._get_target_stores(tenant_id, schedule.target_stores)
 
-            # Create snapshots for each store
-            success_count = 0
-            error_count = 0
-
-            for store_code in stores:
-                try:
-                    await snapshot_service.create_snapshot_async(
-                        tenant_id=tenant_id, store_code=store_code, created_by="scheduled_system"
-                    )
-                    success_count += 1
-                except Exception as e:
-                    error_count += 1
-                    self.logger.error(f"Failed to create snapshot for tenant {tenant_id}, store {store_code}: {e}")
+            # Create snapshots for the stores concurrently (bounded per tenant and globally)
+            run = await self.executor.execute_async(tenant_id, db, stores)
+            success_count = len(run.completed_stores)
+            error_count = len(run.failed_stores)
 
             # Update last execution time
             try:
@@ -192,6 +195,92 @@ class MultiTenantSnapshotScheduler:
             self.logger.error(f"Failed to execute snapshot for tenant {tenant_id}: {e}")
         finally:
             self._execution_locks.discard(lock_key)
+            self._running_tenants.discard(tenant_id)
+
+    def is_tenant_running(self, tenant_id: str) -> bool:
+        """Whether a scheduled or resumed snapshot of the tenant is running in this process."""
+        return tenant_id in self._running_tenants
+
+    async def resume_tenant_snapshot(self, tenant_id: str):
+        """Retry the stores that did not complete in the latest snapshot run of a tenant."""
+        if self.is_tenant_running(tenant_id):
+            self.logger.warning(f"Snapshot already running for tenant {tenant_id}")
+            return None
+
+        self._running_tenants.add(tenant_id)
+
+        try:
+            db = await self.get_db_func(tenant_id)
+            run = await self.executor.resume_async(tenant_id, db)
+            if run:
+                self.logger.info(
+                    f"Resumed snapshot run {run.run_id} for tenant {tenant_id}: status {run.status}, "
+                    f"{len(run.completed_stores)}/{len(run.target_stores)} stores completed"
+                )
+            return run
+        except Exception as e:
+            self.logger.error(f"Failed to resume snapshot for tenant {tenant_id}: {e}")
+            return None
+        finally:
+            self._running_tenants.discard(tenant_id)
+
+    def start_resume_tenant_snapshot(self, tenant_id: str) -> None:
+        """Resume the latest snapshot run of a tenant in the background."""
+        task = asyncio.create_task(self.resume_tenant_snapshot(tenant_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _resume_interrupted_runs(self, tenant_ids: List[str]):
+        """
+        Resume runs left in running state by a process that stopped during execution.
+
+        A run whose heartbeat is still fresh may be owned by another replica, or
+        by a process that stopped just before this one started. Those runs are
+        checked again once their heartbeat would be stale; resume_async only
+        takes a run over if its owner did not refresh the heartbeat meanwhile.
+        """
+        recently_owned = []
+        for tenant_id in tenant_ids:
+            try:
+                db = await self.get_db_func(tenant_id)
+                run = await SnapshotRunRepository(db).get_latest_run(tenant_id)
+                if run and run.status == SnapshotRunStatus.RUNNING:
+                    if run.is_owned(stale_heartbeat_before()):
+                        recently_owned.append(tenant_id)
+                    else:
+                        await self.resume_tenant_snapshot(tenant_id)
+            except Exception as e:
+                self.logger.error(f"Failed to check interrupted snapshot run for tenant {tenant_id}: {e}")
+
+        if recently_owned:
+            await asyncio.sleep(settings.SNAPSHOT_RUN_STALE_SECONDS)
+            for tenant_id in recently_owned:
+                await self.resume_tenant_snapshot(tenant_id)
+
+    def _schedule_history_compaction(self):
+        """Schedule the daily stock history compaction for all tenants."""
+        if settings.STOCK_HISTORY_COMPACTION_AFTER_DAYS <= 0:
+            self.logger.info("Stock history compaction is disabled")
+            return
+
+        self.scheduler.add_job(
+            self._execute_history_compaction,
+            trigger=CronTrigger(hour=settings.STOCK_HISTORY_COMPACTION_HOUR, minute=0),
+            id="history_compaction",
+            name="Stock history compaction",
+            replace_existing=True,
+            misfire_grace_time=3600,
+        )
+        self.logger.info(f"Scheduled stock history compaction at {settings.STOCK_HISTORY_COMPACTION_HOUR:02d}:00")
+
+    async def _execute_history_compaction(self):
+        """Compact old stock history of every tenant (each tenant under its own lease, see the service)."""
+        for tenant_id in await self._get_all_tenant_ids():
+            try:
+                db = await self.get_db_func(tenant_id)
+                await StockHistoryCompactionService(db).compact_async()
+            except Exception as e:
+                self.logger.error(f"Failed to compact stock history for tenant {tenant_id}: {e}")
 
     async def _get_all_tenant_ids(self) -> List[str]:
         """Get all tenant IDs from the system."""
@@ -242,6 +331,8 @@ class MultiTenantSnapshotScheduler:
 
     def shutdown(self):
         """Shutdown the scheduler."""
+        if self._resume_task and not self._resume_task.done():
+            self._resume_task.cancel()
         if self.scheduler.running:
             self.scheduler.shutdown()
             self.logger.info("Snapshot scheduler shutdown completed")
@@ -252,4 +343,5 @@ class MultiTenantSnapshotScheduler:
             "running": self.scheduler.running,
             "active_jobs": len(self.tenant_jobs),
             "tenant_jobs": list(self.tenant_jobs.keys()),
+            "snapshot_runs": self.executor.get_status(),
         }
@@ -0,0 +1,161 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.config.settings import settings
+from app.models.documents.snapshot_run_document import SnapshotRunDocument, SnapshotRunStatus
+from app.repositories.snapshot_run_repository import SnapshotRunRepository
+from app.services.snapshot_service import SnapshotService
+
+logger = getLogger(__name__)
+
+
+def stale_heartbeat_before() -> datetime:
+    """Heartbeats older than this belong to runs whose owner stopped."""
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.SNAPSHOT_RUN_STALE_SECONDS)
+
+
+class SnapshotExecutor:
+    """
+    Creates snapshots for many stores concurrently.
+
+    Store snapshots of one tenant run with at most max_concurrency_per_tenant
+    in flight, and all tenants together share max_concurrency_global slots.
+    Progress is written to the snapshot_runs collection after every store, so
+    a run that failed or was interrupted can be resumed with only the stores
+    that have not completed. The executor owning a running run refreshes its
+    heartbeat, and a run is only resumed after claiming it atomically, so two
+    replicas never run the same stores at once.
+    """
+
+    def __init__(self, max_concurrency_per_tenant: int = None, max_concurrency_global: int = None):
+        self.max_concurrency_per_tenant = max_concurrency_per_tenant or settings.SNAPSHOT_MAX_CONCURRENCY_PER_TENANT
+        self.max_concurrency_global = max_concurrency_global or settings.SNAPSHOT_MAX_CONCURRENCY_GLOBAL
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency_global)
+        self.progress: Dict[str, dict] = {}  # {tenant_id: progress of the current/last run}
+        self.store_durations: Dict[str, Dict[str, float]] = {}  # {tenant_id: {store_code: seconds}}
+        self.owner_id = uuid4().hex
+
+    async def execute_async(
+        self, tenant_id: str, db: AsyncIOMotorDatabase, stores: List[str], created_by: str = "scheduled_system"
+    ) -> SnapshotRunDocument:
+        """Start a new run for the given stores."""
+        run = SnapshotRunDocument(
+            tenant_id=tenant_id,
+            run_id=uuid4().hex,
+            target_stores=list(dict.fromkeys(stores)),
+            started_at=datetime.now(timezone.utc),
+            owner_id=self.owner_id,
+            heartbeat_at=datetime.now(timezone.utc),
+        )
+        repo = SnapshotRunRepository(db)
+        await repo.create_async(run)
+        return await self._run_stores_async(repo, run, run.target_stores, db, created_by)
+
+    async def resume_async(
+        self, tenant_id: str, db: AsyncIOMotorDatabase, created_by: str = "scheduled_system"
+    ) -> Optional[SnapshotRunDocument]:
+        """
+        Retry the pending stores of the latest run if it did not complete.
+
+        Returns None if there is nothing to resume, or if the run is still
+        running under an owner whose heartbeat is not stale.
+        """
+        repo = SnapshotRunRepository(db)
+        run = await repo.get_latest_run(tenant_id)
+        if run is None or run.status == SnapshotRunStatus.COMPLETED:
+            return None
+
+        if not await repo.claim_for_resume(run.run_id, self.owner_id, stale_heartbeat_before()):
+            logger.info(f"Snapshot run {run.run_id} for tenant {tenant_id} is still running under another owner")
+            return None
+
+        pending = run.pending_stores()
+        logger.info(f"Resuming snapshot run {run.run_id} for tenant {tenant_id}: {len(pending)} stores pending")
+        return await self._run_stores_async(repo, run, pending, db, created_by)
+
+    async def _run_stores_async(
+        self,
+        repo: SnapshotRunRepository,
+        run: SnapshotRunDocument,
+        stores: List[str],
+        db: AsyncIOMotorDatabase,
+        created_by: str,
+    ) -> SnapshotRunDocument:
+        tenant_id = run.tenant_id
+        progress = {
+            "run_id": run.run_id,
+            "status": SnapshotRunStatus.RUNNING,
+            "total": len(run.target_stores),
+            "completed": len(run.completed_stores),
+            "failed": 0,
+            "in_progress": 0,
+            "started_at": run.started_at.isoformat() if run.started_at else None,
+        }
+        self.progress[tenant_id] = progress
+        durations = self.store_durations.setdefault(tenant_id, {})
+        tenant_semaphore = asyncio.Semaphore(self.max_concurrency_per_tenant)
+        snapshot_service = SnapshotService(db)
+
+        async def snapshot_store(store_code: str):
+            async with tenant_semaphore, self._global_semaphore:
+                progress["in_progress"] += 1
+                started = time.perf_counter()
+                try:
+                    await snapshot_service.create_snapshot_async(
+                        tenant_id=tenant_id, store_code=store_code, created_by=created_by
+                    )
+                    await repo.mark_store_completed(run.run_id, store_code, time.perf_counter() - started)
+                    progress["completed"] += 1
+                except Exception as e:
+                    duration = time.perf_counter() - started
+                    progress["failed"] += 1
+                    logger.error(f"Failed to create snapshot for tenant {tenant_id}, store {store_code}: {e}")
+                    try:
+                        await repo.mark_store_failed(run.run_id, store_code, str(e), duration)
+                    except Exception as mark_error:
+                        logger.error(f"Failed to record snapshot failure for store {store_code}: {mark_error}")
+                finally:
+                    # also reached on cancellation, so the duration is measured here
+                    progress["in_progress"] -= 1
+                    durations[store_code] = time.perf_counter() - started
+
+        async def keep_heartbeat():
+            while True:
+                await asyncio.sleep(settings.SNAPSHOT_RUN_HEARTBEAT_SECONDS)
+                try:
+                    await repo.heartbeat(run.run_id, self.owner_id)
+                except Exception as e:
+                    logger.warning(f"Failed to refresh heartbeat of snapshot run {run.run_id}: {e}")
+
+        heartbeat_task = asyncio.create_task(keep_heartbeat())
+        try:
+            await asyncio.gather(*(snapshot_store(store_code) for store_code in stores))
+        finally:
+            heartbeat_task.cancel()
+
+        finished = await repo.mark_finished(run.run_id)
+        progress["status"] = finished.status if finished else SnapshotRunStatus.PARTIAL
+        progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+        return finished or run
+
+    def get_status(self) -> dict:
+        """Get progress and per-store duration metrics of the latest run of each tenant."""
+        return {
+            "max_concurrency_per_tenant": self.max_concurrency_per_tenant,
+            "max_concurrency_global": self.max_concurrency_global,
+            "tenants": {
+                tenant_id: {
+                    **progress,
+                    "store_durations": self.store_durations.get(tenant_id, {}),
+                    "max_store_duration": max(self.store_durations.get(tenant_id, {}).values(), default=None),
+                }
+                for tenant_id, progress in self.progress.items()
+            },
+        }
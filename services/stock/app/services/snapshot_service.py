@@ -1,12 +1,14 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from typing import List, Optional, Tuple
 from datetime import datetime
+from uuid import uuid4
 from logging import getLogger
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from kugel_common.utils.misc import get_app_time_str
 
-from app.models.documents import StockSnapshotDocument, StockSnapshotItem
-from app.models.repositories import StockRepository, StockSnapshotRepository
+from app.models.documents import StockSnapshotDocument, StockSnapshotItem, StockSnapshotChunkDocument
+from app.models.repositories import StockRepository, StockSnapshotRepository, StockSnapshotChunkRepository
+from app.exceptions.stock_exceptions import SnapshotCreationFailedError
 from app.config.settings import settings
 
 logger = getLogger(__name__)
@@ -17,62 +19,93 @@ class SnapshotService:
         self._database = database
         self._stock_repository = StockRepository(database)
         self._snapshot_repository = StockSnapshotRepository(database)
+        self._chunk_repository = StockSnapshotChunkRepository(database)
 
     async def create_snapshot_async(
         self, tenant_id: str, store_code: str, created_by: str = "system"
     ) -> StockSnapshotDocument:
-        """Create a snapshot of current stock levels"""
-
-        # Get all stocks for the store
-        stocks = await self._stock_repository.find_by_store_async(
-            tenant_id, store_code, skip=0, limit=10000  # Get all stocks
-        )
-
-        # Prepare snapshot items
-        snapshot_items = []
+        """
+        Create a snapshot of current stock levels
+
+        Stocks are streamed from a cursor and stored as pages of SNAPSHOT_CHUNK_SIZE
+        items, SNAPSHOT_CHUNKS_PER_INSERT pages per insert_many, so neither memory
+        usage nor document size grows with the number of items. The header is
+        written last; a snapshot is only visible once all of its pages exist.
+        """
+        snapshot_id = uuid4().hex
+        chunk_size = settings.SNAPSHOT_CHUNK_SIZE
+
+        chunk_count = 0
+        total_items = 0
         total_quantity = 0.0
-
-        for stock in stocks:
-            snapshot_item = StockSnapshotItem(
-                item_code=stock.item_code,
-                quantity=stock.current_quantity,
-                minimum_quantity=stock.minimum_quantity,
-                reorder_point=stock.reorder_point,
-                reorder_quantity=stock.reorder_quantity,
+        pending_chunks: List[StockSnapshotChunkDocument] = []
+        first_page: List[StockSnapshotItem] = []
+
+        try:
+            async for stocks in self._stock_repository.iter_store_stocks_async(tenant_id, store_code, chunk_size):
+                chunk_count += 1
+                snapshot_items = [
+                    StockSnapshotItem(
+                        item_code=stock.item_code,
+                        quantity=stock.current_quantity,
+                        minimum_quantity=stock.minimum_quantity,
+                        reorder_point=stock.reorder_point,
+                        reorder_quantity=stock.reorder_quantity,
+                    )
+                    for stock in stocks
+                ]
+                if chunk_count == 1:
+                    first_page = snapshot_items
+                total_items += len(snapshot_items)
+                total_quantity += sum(item.quantity for item in snapshot_items)
+                pending_chunks.append(
+                    StockSnapshotChunkDocument(
+                        tenant_id=tenant_id,
+                        store_code=store_code,
+                        snapshot_id=snapshot_id,
+                        chunk_no=chunk_count,
+                        stocks=snapshot_items,
+                    )
+                )
+
+                if len(pending_chunks) >= settings.SNAPSHOT_CHUNKS_PER_INSERT:
+                    await self._chunk_repository.create_many_async(pending_chunks)
+                    pending_chunks = []
+
+            await self._chunk_repository.create_many_async(pending_chunks)
+
+            # Create snapshot header
+            snapshot = StockSnapshotDocument(
+                tenant_id=tenant_id,
+                store_code=store_code,
+                snapshot_id=snapshot_id,
+                total_items=total_items,
+                total_quantity=total_quantity,
+                chunk_count=chunk_count,
+                chunk_size=chunk_size,
+                created_by=created_by,
+                generate_date_time=get_app_time_str(),
             )
-            snapshot_items.append(snapshot_item)
-            total_quantity += stock.current_quantity
-
-        # Create snapshot document
-        snapshot = StockSnapshotDocument(
-            tenant_id=tenant_id,
-            store_code=store_code,
-            total_items=len(snapshot_items),
-            total_quantity=total_quantity,
-            stocks=snapshot_items,
-            created_by=created_by,
-            generate_date_time=get_app_time_str(),
-        )
-
-        # Save snapshot
-        success = await self._snapshot_repository.create_async(snapshot)
+            success = await self._snapshot_repository.create_async(snapshot)
+        except Exception as e:
+            await self._chunk_repository.delete_by_snapshot_ids_async([snapshot_id])
+            raise SnapshotCreationFailedError(
+                message=f"Failed to create snapshot for store {store_code}: {e}", logger=logger, original_exception=e
+            ) from e
 
         if not success:
-            logger.error(f"Failed to create snapshot for store {store_code}")
-            raise Exception("Failed to create snapshot")
-
-        logger.info(f"Snapshot created for store {store_code} with {len(snapshot_items)} items")
+            await self._chunk_repository.delete_by_snapshot_ids_async([snapshot_id])
+            raise SnapshotCreationFailedError(
+                message=f"Failed to create snapshot for store {store_code}", logger=logger
+            )
 
-        # Retrieve the created snapshot to get the ID
-        # Since we just created it, get the most recent one
-        created_snapshot = await self._snapshot_repository.get_latest_snapshot_async(tenant_id, store_code)
+        # the header is stored without items; return it with the first page like get_snapshot_by_id_async
+        snapshot.stocks = first_page
 
-        if created_snapshot:
-            return created_snapshot
-        else:
-            # If retrieval fails, return the original snapshot without ID
-            logger.warning(f"Could not retrieve created snapshot for store {store_code}")
-            return snapshot
+        logger.info(
+            f"Snapshot {snapshot_id} created for store {store_code} with {total_items} items in {chunk_count} pages"
+        )
+        return snapshot
 
     async def get_snapshots_async(
         self, tenant_id: str, store_code: str, skip: int = 0, limit: int = 20
@@ -80,20 +113,36 @@ class SnapshotService:
         """Get snapshots for a store with total count"""
         snapshots = await self._snapshot_repository.find_by_store_async(tenant_id, store_code, skip, limit)
         total_count = await self._snapshot_repository.count_by_store_async(tenant_id, store_code)
-        return snapshots, total_count
+        return await self._with_first_chunks_async(snapshots), total_count
+
+    async def get_snapshot_by_id_async(
+        self, tenant_id: str, store_code: str, snapshot_id: str, page: int = 1
+    ) -> Optional[StockSnapshotDocument]:
+        """Get a specific snapshot by ID with the items of the requested page in stocks"""
+        snapshot = await self._snapshot_repository.find_by_snapshot_id_async(tenant_id, store_code, snapshot_id)
+        if snapshot is None or snapshot.snapshot_id is None:
+            # not found, or an older snapshot with embedded stocks
+            return snapshot
 
-    async def get_snapshot_by_id_async(self, snapshot_id: str) -> Optional[StockSnapshotDocument]:
-        """Get a specific snapshot by ID"""
-        return await self._snapshot_repository.get_by_id_async(snapshot_id)
+        chunk = await self._chunk_repository.find_chunk_async(snapshot.snapshot_id, page)
+        snapshot.stocks = chunk.stocks if chunk else []
+        return snapshot
 
     async def get_snapshots_by_date_range_async(
         self, tenant_id: str, store_code: str, start_date: datetime, end_date: datetime
     ) -> List[StockSnapshotDocument]:
         """Get snapshots within a date range"""
-        return await self._snapshot_repository.find_by_date_range_async(tenant_id, store_code, start_date, end_date)
+        snapshots = await self._snapshot_repository.find_by_date_range_async(
+            tenant_id, store_code, start_date, end_date
+        )
+        return await self._with_first_chunks_async(snapshots)
 
     async def cleanup_old_snapshots_async(self, tenant_id: str, store_code: str, retention_days: int = 90) -> int:
         """Delete snapshots older than retention days"""
+        snapshot_ids = await self._snapshot_repository.find_old_snapshot_ids_async(
+            tenant_id, store_code, retention_days
+        )
+        await self._chunk_repository.delete_by_snapshot_ids_async(snapshot_ids)
         deleted_count = await self._snapshot_repository.delete_old_snapshots_async(
             tenant_id, store_code, retention_days
         )
@@ -112,6 +161,21 @@ class SnapshotService:
         limit: int = 100,
     ) -> Tuple[List[StockSnapshotDocument], int]:
         """Get snapshots by generate_date_time range with pagination"""
-        return await self._snapshot_repository.find_by_generate_date_time_async(
+        snapshots, total_count = await self._snapshot_repository.find_by_generate_date_time_async(
             tenant_id, store_code, start_date, end_date, skip, limit
         )
+        return await self._with_first_chunks_async(snapshots), total_count
+
+    async def _with_first_chunks_async(self, snapshots: List[StockSnapshotDocument]) -> List[StockSnapshotDocument]:
+        """
+        Put the first page of items in stocks of chunked snapshots, as create and get by ID do
+
+        The pages of all snapshots are read with one query; further pages are
+        read by ID with ?page= up to chunk_count.
+        """
+        snapshot_ids = [snapshot.snapshot_id for snapshot in snapshots if snapshot.snapshot_id]
+        first_chunks = await self._chunk_repository.find_first_chunks_async(snapshot_ids)
+        for snapshot in snapshots:
+            if snapshot.snapshot_id:
+                snapshot.stocks = first_chunks.get(snapshot.snapshot_id, [])
+        return snapshots
@@ -0,0 +1,90 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+import uuid
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from kugel_common.utils.mongo_lease import MongoLease
+
+from app.config.settings import settings
+from app.enums.update_type import UpdateType
+from app.models.repositories import StockUpdateRepository, StockUpdateDailyRepository
+
+logger = getLogger(__name__)
+
+# Per-sale history types; manual updates (purchase, adjustment, ...) are kept as they are
+COMPACTABLE_UPDATE_TYPES = [UpdateType.SALE, UpdateType.RETURN, UpdateType.VOID, UpdateType.VOID_RETURN]
+
+COMPACTION_LEASE_NAME = "stock_history_compaction"
+COMPACTION_LEASE_SECONDS = 600
+
+
+class StockHistoryCompactionService:
+    """
+    Rolls old per-sale stock update history into daily per-item aggregates
+
+    Every replica schedules the compaction, so a tenant is compacted only by the
+    replica holding its compaction lease. A run first claims the updates with
+    its own compaction id, merges them and deletes them; a run interrupted in
+    between is finished by the next one, which skips the aggregates the
+    interrupted run already merged into.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self._database = database
+        self._stock_update_repository = StockUpdateRepository(database)
+        self._stock_update_daily_repository = StockUpdateDailyRepository(database)
+
+    async def compact_async(self, older_than_days: int = None) -> int:
+        """
+        Compact history older than the given number of days
+
+        Args:
+            older_than_days: Age in days, defaults to STOCK_HISTORY_COMPACTION_AFTER_DAYS
+
+        Returns:
+            Number of compacted updates, 0 if another replica is compacting the tenant
+        """
+        if older_than_days is None:
+            older_than_days = settings.STOCK_HISTORY_COMPACTION_AFTER_DAYS
+
+        # compact whole days only so that a day is never split between raw and compacted history
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        cutoff = today - timedelta(days=older_than_days)
+
+        lease = MongoLease(self._database, COMPACTION_LEASE_NAME, COMPACTION_LEASE_SECONDS)
+        if not await lease.acquire_async():
+            logger.info("Stock history compaction is running on another replica, skipped")
+            return 0
+        try:
+            compacted = await self.__compact_before_async(cutoff, lease)
+        finally:
+            await lease.release_async()
+        logger.info(f"Compacted {compacted} stock updates older than {cutoff.isoformat()}")
+        return compacted
+
+    async def __compact_before_async(self, cutoff: datetime, lease: MongoLease) -> int:
+        await self._stock_update_daily_repository.ensure_merge_index_async()
+        await self._stock_update_repository.ensure_compaction_index_async()
+
+        # finish interrupted runs first, then claim the updates for a new run
+        compaction_ids = await self._stock_update_repository.find_pending_compaction_ids_async()
+        if compaction_ids:
+            logger.warning(f"Resuming interrupted stock history compactions: {compaction_ids}")
+        compaction_id = uuid.uuid4().hex
+        if await self._stock_update_repository.claim_for_compaction_async(
+            cutoff, COMPACTABLE_UPDATE_TYPES, compaction_id
+        ):
+            compaction_ids.append(compaction_id)
+
+        compacted = 0
+        for compaction_id in compaction_ids:
+            if not await lease.renew_async():
+                # another replica took over and finishes the remaining runs
+                break
+            await self._stock_update_repository.merge_compaction_async(
+                compaction_id, self._stock_update_daily_repository.collection_name
+            )
+            compacted += await self._stock_update_repository.delete_compacted_async(compaction_id)
+        return compacted
@@ -0,0 +1,164 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from typing import Dict, List, Optional, Tuple
+from logging import getLogger
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.config.settings import settings
+from app.enums.history_durability import HistoryDurability
+from app.enums.update_type import UpdateType
+from app.models.documents import StockUpdateDocument
+from app.models.repositories import StockUpdateRepository
+
+logger = getLogger(__name__)
+
+
+class StockHistoryWriter:
+    """
+    Write-behind writer for stock update history
+
+    Each update type has a durability: sync records are inserted before the stock
+    update returns, batched records are buffered in memory and inserted with
+    insert_many by a background task, disabled records are not stored at all.
+    Batched records that are still buffered when the process dies are lost, so
+    only update types whose history can be rebuilt from tranlogs (sales, returns,
+    voids) should be batched.
+    """
+
+    def __init__(
+        self,
+        default_durability: Optional[str] = None,
+        durability_by_type: Optional[Dict[str, str]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_buffer_size: Optional[int] = None,
+    ):
+        self.default_durability = HistoryDurability(default_durability or settings.STOCK_HISTORY_DEFAULT_DURABILITY)
+        durability_by_type = (
+            durability_by_type if durability_by_type is not None else settings.STOCK_HISTORY_DURABILITY
+        )
+        self.durability_by_type: Dict[UpdateType, HistoryDurability] = {
+            UpdateType(update_type): HistoryDurability(durability)
+            for update_type, durability in durability_by_type.items()
+        }
+        self.batch_size = batch_size or settings.STOCK_HISTORY_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.STOCK_HISTORY_FLUSH_INTERVAL_SECONDS
+        self.max_buffer_size = max_buffer_size or settings.STOCK_HISTORY_MAX_BUFFER_SIZE
+
+        # {database name: (database, records)}
+        self._buffers: Dict[str, Tuple[AsyncIOMotorDatabase, List[StockUpdateDocument]]] = {}
+        self._buffered_count = 0
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._written_count = 0
+        self._dropped_count = 0
+
+    def get_durability(self, update_type: UpdateType) -> HistoryDurability:
+        """Get the durability configured for an update type"""
+        return self.durability_by_type.get(update_type, self.default_durability)
+
+    @property
+    def running(self) -> bool:
+        return self._flush_task is not None and not self._flush_task.done()
+
+    def start(self):
+        """Start the background flush task"""
+        self._stopping = False
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the background flush task and write the remaining records"""
+        if self._flush_task:
+            self._stopping = True
+            self._flush_event.set()
+            await self._flush_task
+            self._flush_task = None
+        await self.flush_async()
+
+    async def write_async(self, database: AsyncIOMotorDatabase, records: List[StockUpdateDocument]) -> None:
+        """Write history records according to the durability of their update type"""
+        sync_records = []
+        for record in records:
+            durability = self.get_durability(record.update_type)
+            if durability == HistoryDurability.DISABLED:
+                continue
+            if durability == HistoryDurability.BATCHED and self.running:
+                if self._buffered_count < self.max_buffer_size:
+                    self._buffer(database, record)
+                    continue
+                logger.warning("Stock history buffer is full, writing record synchronously")
+            sync_records.append(record)
+
+        if sync_records:
+            await StockUpdateRepository(database).create_many_async(sync_records)
+            self._written_count += len(sync_records)
+
+        if self._buffered_count >= self.batch_size:
+            self._flush_event.set()
+
+    def _buffer(self, database: AsyncIOMotorDatabase, record: StockUpdateDocument) -> None:
+        _, buffer = self._buffers.setdefault(database.name, (database, []))
+        buffer.append(record)
+        self._buffered_count += 1
+
+    async def flush_async(self) -> None:
+        """Insert all buffered records, batch_size records per insert_many"""
+        if not self._buffers:
+            return
+
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            buffers, self._buffers = self._buffers, {}
+            self._buffered_count = 0
+
+            for database, records in buffers.values():
+                repository = StockUpdateRepository(database)
+                for i in range(0, len(records), self.batch_size):
+                    chunk = records[i : i + self.batch_size]
+                    try:
+                        await repository.create_many_async(chunk)
+                        self._written_count += len(chunk)
+                    except Exception as e:
+                        logger.error(f"Failed to write {len(chunk)} stock history records to {database.name}: {e}")
+                        self._requeue(database, chunk)
+
+    def _requeue(self, database: AsyncIOMotorDatabase, records: List[StockUpdateDocument]) -> None:
+        """Put records back into the buffer after a failed write, dropping what does not fit"""
+        room = max(self.max_buffer_size - self._buffered_count, 0)
+        if self._stopping:
+            room = 0
+        for record in records[:room]:
+            self._buffer(database, record)
+        dropped = len(records) - min(room, len(records))
+        if dropped:
+            self._dropped_count += dropped
+            logger.error(f"Dropped {dropped} stock history records for {database.name}")
+
+    async def _flush_loop(self):
+        """Flush the buffer every flush_interval seconds or when batch_size records are buffered"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush_async()
+            except Exception as e:
+                logger.error(f"Error in stock history flush: {e}")
+
+    def get_status(self) -> dict:
+        """Get writer status"""
+        return {
+            "running": self.running,
+            "buffered": self._buffered_count,
+            "written": self._written_count,
+            "dropped": self._dropped_count,
+            "default_durability": self.default_durability.value,
+            "durability_by_type": {k.value: v.value for k, v in self.durability_by_type.items()},
+        }
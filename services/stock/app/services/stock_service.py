@@ -4,22 +4,32 @@ from datetime import datetime, timezone
 from logging import getLogger
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.models.documents import StockDocument, StockUpdateDocument
-from app.models.repositories import StockRepository, StockUpdateRepository
+from kugel_common.models.repositories.keyset_pagination import TotalMode
+
+from app.models.documents import StockDocument, StockUpdateDocument, StockUpdateDailyDocument
+from app.models.repositories import StockRepository, StockUpdateRepository, StockUpdateDailyRepository
 from app.enums.update_type import UpdateType
 from app.exceptions.stock_exceptions import StockNotFoundError
 from app.config.settings import settings
 from app.services.alert_service import AlertService
+from app.services.stock_history_writer import StockHistoryWriter
 
 logger = getLogger(__name__)
 
 
 class StockService:
-    def __init__(self, database: AsyncIOMotorDatabase, alert_service: Optional[AlertService] = None):
+    def __init__(
+        self,
+        database: AsyncIOMotorDatabase,
+        alert_service: Optional[AlertService] = None,
+        history_writer: Optional[StockHistoryWriter] = None,
+    ):
         self._database = database
         self._stock_repository = StockRepository(database)
         self._stock_update_repository = StockUpdateRepository(database)
+        self._stock_update_daily_repository = StockUpdateDailyRepository(database)
         self._alert_service = alert_service
+        self._history_writer = history_writer
 
     async def get_stock_async(self, tenant_id: str, store_code: str, item_code: str) -> Optional[StockDocument]:
         """Get current stock for an item"""
@@ -87,7 +97,7 @@ class StockService:
             note=note,
         )
 
-        await self._stock_update_repository.create_async(update_record)
+        await self._record_updates_async([update_record])
 
         logger.info(
             f"Stock updated - Item: {item_code}, Before: {before_quantity}, "
@@ -100,13 +110,48 @@ class StockService:
 
         return update_record
 
+    async def _record_updates_async(self, update_records: List[StockUpdateDocument]) -> None:
+        """Store update records, through the history writer when one is configured"""
+        if self._history_writer:
+            await self._history_writer.write_async(self._database, update_records)
+        else:
+            await self._stock_update_repository.create_many_async(update_records)
+
     async def get_stock_history_async(
-        self, tenant_id: str, store_code: str, item_code: str, skip: int = 0, limit: int = 100
-    ) -> Tuple[List[StockUpdateDocument], int]:
-        """Get stock update history for an item with total count"""
-        updates = await self._stock_update_repository.find_by_item_async(tenant_id, store_code, item_code, skip, limit)
-        total_count = await self._stock_update_repository.count_by_item_async(tenant_id, store_code, item_code)
-        return updates, total_count
+        self,
+        tenant_id: str,
+        store_code: str,
+        item_code: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        total_mode: str = TotalMode.ESTIMATE,
+    ) -> Tuple[List[StockUpdateDocument], Optional[int], Optional[bool], Optional[str]]:
+        """
+        Get stock update history for an item, newest first
+
+        Offset pages always count the total exactly. Cursor pages count it
+        according to total_mode, so walking a long history by cursor does not
+        repeat a full count on every page.
+
+        Returns:
+            Tuple of the updates, the total count, whether the total is an estimate and the cursor of the next page
+        """
+        updates, next_cursor = await self._stock_update_repository.find_by_item_async(
+            tenant_id, store_code, item_code, limit, cursor, skip
+        )
+        total_count, total_is_estimate = await self._stock_update_repository.count_by_item_async(
+            tenant_id, store_code, item_code, total_mode if cursor else TotalMode.EXACT
+        )
+        return updates, total_count, total_is_estimate, next_cursor
+
+    async def get_stock_daily_history_async(
+        self, tenant_id: str, store_code: str, item_code: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[StockUpdateDailyDocument], Optional[str]]:
+        """Get compacted daily stock history for an item, newest first, with the cursor of the next page"""
+        return await self._stock_update_daily_repository.find_by_item_async(
+            tenant_id, store_code, item_code, limit, cursor
+        )
 
     async def process_transaction_async(self, transaction_data: Dict[str, Any]) -> None:
         """Process transaction from pubsub"""
@@ -157,29 +202,15 @@ class StockService:
                 )
                 return
 
-            # Process each item in the transaction
-            for item in line_items:
-                item_code = item.get("item_code")
-                quantity = item.get("quantity", 0)
-                is_item_cancelled = item.get("is_cancelled", False)
-
-                # Skip cancelled items
-                if is_item_cancelled:
-                    logger.info(
-                        f"Item {item_code} in transaction {transaction_no} is cancelled, skipping stock update."
-                    )
-                    continue
-
-                if quantity > 0:
-                    # Sales reduce stock (negative change)
-                    await self.update_stock_async(
-                        tenant_id=tenant_id,
-                        store_code=store_code,
-                        item_code=item_code,
-                        quantity_change=quantity * sign,  # negative for sales, positive for returns
-                        update_type=update_type,
-                        reference_id=transaction_no_str,
-                    )
+            # Merge line items of the same item so that each stock document is updated once
+            quantity_changes = self.merge_line_item_quantities(line_items, sign, transaction_no)
+            await self.apply_quantity_changes_async(
+                tenant_id=tenant_id,
+                store_code=store_code,
+                quantity_changes=quantity_changes,
+                update_type=update_type,
+                reference_id=transaction_no_str,
+            )
 
             logger.info(
                 f"Transaction processed successfully. tenant_id: {tenant_id}, store_code: {store_code}, terminal_no: {terminal_no}, transaction_no: {transaction_no}"
@@ -189,6 +220,92 @@ class StockService:
             logger.error(f"Error processing transaction: {e}")
             raise
 
+    @staticmethod
+    def merge_line_item_quantities(
+        line_items: List[Dict[str, Any]], sign: int, transaction_no: Any = None
+    ) -> Dict[str, float]:
+        """Merge line item quantities per item code, skipping cancelled and non-positive lines"""
+        quantity_changes: Dict[str, float] = {}
+        for item in line_items:
+            item_code = item.get("item_code")
+            quantity = item.get("quantity", 0)
+
+            # Skip cancelled items
+            if item.get("is_cancelled", False):
+                logger.info(f"Item {item_code} in transaction {transaction_no} is cancelled, skipping stock update.")
+                continue
+
+            if quantity > 0:
+                # negative for sales, positive for returns
+                quantity_changes[item_code] = quantity_changes.get(item_code, 0) + quantity * sign
+        return quantity_changes
+
+    async def apply_quantity_changes_async(
+        self,
+        tenant_id: str,
+        store_code: str,
+        quantity_changes: Dict[str, float],
+        update_type: UpdateType,
+        reference_id: Optional[str] = None,
+        operator_id: Optional[str] = None,
+        note: Optional[str] = None,
+    ) -> List[StockUpdateDocument]:
+        """Update several items concurrently from their exact post-images and record the updates with one insert"""
+        if not quantity_changes:
+            return []
+
+        updated_stocks = await self._stock_repository.update_quantities_atomic_async(
+            tenant_id, store_code, quantity_changes, reference_id
+        )
+
+        timestamp = datetime.now(timezone.utc)
+        update_records = []
+        for item_code, quantity_change in quantity_changes.items():
+            updated_stock = updated_stocks.get(item_code)
+            if updated_stock is None:
+                raise StockNotFoundError(message=f"Failed to update stock for item {item_code}")
+
+            after_quantity = updated_stock.current_quantity
+            before_quantity = after_quantity - quantity_change
+
+            # Allow negative stock (backorders are permitted)
+            if after_quantity < 0:
+                logger.warning(
+                    f"Stock going negative for item {item_code}. "
+                    f"Available: {before_quantity}, After: {after_quantity}, "
+                    f"Change: {quantity_change}"
+                )
+
+            update_records.append(
+                StockUpdateDocument(
+                    tenant_id=tenant_id,
+                    store_code=store_code,
+                    item_code=item_code,
+                    update_type=update_type,
+                    quantity_change=quantity_change,
+                    before_quantity=before_quantity,
+                    after_quantity=after_quantity,
+                    reference_id=reference_id,
+                    timestamp=timestamp,
+                    operator_id=operator_id,
+                    note=note,
+                )
+            )
+
+        await self._record_updates_async(update_records)
+
+        logger.info(
+            f"Stock updated - Items: {len(update_records)}, Reference: {reference_id}, Type: {update_type.value}"
+        )
+
+        # Check for alerts on the post-images if alert service is available
+        if self._alert_service:
+            await self._alert_service.check_and_send_alerts_many(
+                [updated_stocks[item_code] for item_code in quantity_changes]
+            )
+
+        return update_records
+
     async def set_minimum_quantity_async(
         self, tenant_id: str, store_code: str, item_code: str, minimum_quantity: float
     ) -> bool:
@@ -210,9 +327,8 @@ class StockService:
             return True
         else:
             # Update existing stock
-            return await self._stock_repository.update_one_async(
-                {"tenant_id": tenant_id, "store_code": store_code, "item_code": item_code},
-                {"minimum_quantity": minimum_quantity},
+            return await self._stock_repository.update_minimum_quantity_async(
+                tenant_id, store_code, item_code, minimum_quantity
             )
 
     async def set_reorder_parameters_async(
@@ -0,0 +1,52 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from collections import OrderedDict
+from typing import Hashable, Optional
+import time
+
+
+class CooldownCache:
+    """
+    Bounded cooldown tracker
+
+    Remembers when a key was last accepted and rejects it again until ttl_seconds
+    have passed. Entries are kept in acceptance order, so expired entries are
+    evicted from the front on every call and the oldest entry is evicted when
+    max_size is reached; memory stays bounded without a cleanup task.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def try_acquire(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """
+        Accept the key unless it is still cooling down
+
+        Returns:
+            True if the key was accepted (and its cooldown restarted), False otherwise
+        """
+        now = time.monotonic() if now is None else now
+        self._evict_expired(now)
+
+        if key in self._entries:
+            return False
+
+        self._entries[key] = now
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+    def _evict_expired(self, now: float) -> None:
+        cutoff = now - self.ttl_seconds
+        while self._entries:
+            key, accepted_at = next(iter(self._entries.items()))
+            if accepted_at > cutoff:
+                break
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,4 +1,18 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
 from app.websocket.connection_manager import ConnectionManager
+from app.websocket.alert_broadcaster import (
+    AlertBroadcaster,
+    LocalAlertBroadcaster,
+    DaprAlertBroadcaster,
+    InMemoryAlertBus,
+    create_alert_broadcaster,
+)
 
-__all__ = ["ConnectionManager"]
+__all__ = [
+    "ConnectionManager",
+    "AlertBroadcaster",
+    "LocalAlertBroadcaster",
+    "DaprAlertBroadcaster",
+    "InMemoryAlertBus",
+    "create_alert_broadcaster",
+]
@@ -0,0 +1,126 @@
+# Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from logging import getLogger
+import json
+
+from app.websocket.connection_manager import ConnectionManager
+
+logger = getLogger(__name__)
+
+
+class AlertFanoutMode:
+    """How alerts reach the WebSocket clients of every replica"""
+
+    LOCAL = "local"  # deliver to this process only
+    DAPR = "dapr"  # publish to a Dapr topic that every replica subscribes to
+
+
+class AlertBroadcaster(ABC):
+    """
+    Base class for alert fan-out
+
+    publish_async sends an alert towards every replica; each replica then calls
+    deliver_local_async to hand it to its own ConnectionManager.
+    """
+
+    def __init__(self, connection_manager: ConnectionManager):
+        self.connection_manager = connection_manager
+
+    @abstractmethod
+    async def publish_async(self, alert_data: Dict[str, Any]) -> None:
+        """Publish an alert to every replica"""
+        pass
+
+    async def deliver_local_async(self, alert_data: Dict[str, Any]) -> int:
+        """
+        Deliver an alert to the WebSocket clients connected to this replica
+
+        Returns:
+            Number of connections the alert was queued for
+        """
+        tenant_id = alert_data.get("tenant_id")
+        store_code = alert_data.get("store_code")
+        if not tenant_id or not store_code:
+            logger.warning("Alert missing tenant_id or store_code")
+            return 0
+
+        return await self.connection_manager.send_to_store(tenant_id, store_code, json.dumps(alert_data))
+
+    async def close(self) -> None:
+        """Release resources held by the broadcaster"""
+        pass
+
+
+class InMemoryAlertBus:
+    """In-memory stand-in for the Dapr alert topic; every subscribed broadcaster receives every alert"""
+
+    def __init__(self):
+        self._subscribers: List[AlertBroadcaster] = []
+
+    def subscribe(self, broadcaster: AlertBroadcaster) -> None:
+        self._subscribers.append(broadcaster)
+
+    async def publish_async(self, alert_data: Dict[str, Any]) -> None:
+        for broadcaster in self._subscribers:
+            await broadcaster.deliver_local_async(alert_data)
+
+
+class LocalAlertBroadcaster(AlertBroadcaster):
+    """
+    Broadcaster backed by an in-memory bus
+
+    With its own bus this delivers to the current process only (single replica,
+    tests). Several broadcasters sharing one bus behave like replicas subscribed
+    to the same topic.
+    """
+
+    def __init__(self, connection_manager: ConnectionManager, bus: Optional[InMemoryAlertBus] = None):
+        super().__init__(connection_manager)
+        self.bus = bus or InMemoryAlertBus()
+        self.bus.subscribe(self)
+
+    async def publish_async(self, alert_data: Dict[str, Any]) -> None:
+        await self.bus.publish_async(alert_data)
+
+
+class DaprAlertBroadcaster(AlertBroadcaster):
+    """
+    Broadcaster that publishes alerts through Dapr pub/sub
+
+    Every replica subscribes to the alert topic (see /dapr/subscribe) and delivers
+    received alerts to its own connections. The pub/sub component must give each
+    replica its own consumer group (e.g. redis consumerID "{uuid}"), otherwise
+    only one replica receives each alert. When publishing fails the alert is
+    still delivered to the connections of this replica.
+    """
+
+    def __init__(self, connection_manager: ConnectionManager, pubsub_name: str, topic_name: str):
+        super().__init__(connection_manager)
+        from kugel_common.utils.dapr_client_helper import DaprClientHelper
+
+        self.pubsub_name = pubsub_name
+        self.topic_name = topic_name
+        self._dapr_client = DaprClientHelper(circuit_breaker_threshold=3, circuit_breaker_timeout=60)
+
+    async def publish_async(self, alert_data: Dict[str, Any]) -> None:
+        success = await self._dapr_client.publish_event(
+            pubsub_name=self.pubsub_name, topic_name=self.topic_name, event_data=alert_data
+        )
+        if not success:
+            logger.warning(
+                f"Failed to publish alert to {self.pubsub_name}/{self.topic_name}, delivering to local connections only"
+            )
+            await self.deliver_local_async(alert_data)
+
+    async def close(self) -> None:
+        await self._dapr_client.close()
+
+
+def create_alert_broadcaster(connection_manager: ConnectionManager) -> AlertBroadcaster:
+    """Create the alert broadcaster configured by ALERT_FANOUT_MODE"""
+    from app.config.settings import settings
+
+    if settings.ALERT_FANOUT_MODE == AlertFanoutMode.DAPR:
+        return DaprAlertBroadcaster(connection_manager, settings.ALERT_PUBSUB_NAME, settings.ALERT_PUBSUB_TOPIC)
+    return LocalAlertBroadcaster(connection_manager)
@@ -1,90 +1,217 @@
 # Copyright 2025 masa@kugel  # # Licensed under the Apache License, Version 2.0 (the "License");  # you may not use this file except in compliance with the License.  # You may obtain a copy of the License at  # #     http://www.apache.org/licenses/LICENSE-2.0  # # Unless required by applicable law or agreed to in writing, software  # distributed under the License is distributed on an "AS IS" BASIS,  # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  # See the License for the specific language governing permissions and  # limitations under the License.
-from typing import Dict, Set
+from typing import Dict, Optional
 from fastapi import WebSocket
 from logging import getLogger
 import asyncio
 
 logger = getLogger(__name__)
 
+# Close code sent to slow consumers (RFC 6455 "Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class SlowConsumerPolicy:
+    """What to do when a connection's send queue is full"""
+
+    DROP = "drop"  # drop the new message and keep the connection
+    DISCONNECT = "disconnect"  # close the connection so the client reconnects and resyncs
+
+
+class ClientConnection:
+    """A registered WebSocket with its own bounded send queue and sender task"""
+
+    def __init__(self, websocket: WebSocket, tenant_id: str, store_code: str, queue_size: int):
+        self.websocket = websocket
+        self.tenant_id = tenant_id
+        self.store_code = store_code
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped_messages = 0
+        self.closing = False
+        self.sender_task: Optional[asyncio.Task] = None
+
 
 class ConnectionManager:
-    """Manage WebSocket connections for stock alerts"""
+    """
+    Manage WebSocket connections for stock alerts
+
+    Each connection owns a bounded send queue drained by its own sender task, so
+    send_to_store only enqueues and one slow client cannot delay the others.
+    When a queue is full the message is dropped or the connection is closed,
+    depending on the slow consumer policy. A send that does not complete within
+    the send timeout always closes the connection.
+    """
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        slow_consumer_policy: Optional[str] = None,
+    ):
+        from app.config.settings import settings
+
+        self.queue_size = queue_size or settings.WEBSOCKET_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WEBSOCKET_SEND_TIMEOUT_SECONDS
+        self.slow_consumer_policy = slow_consumer_policy or settings.WEBSOCKET_SLOW_CONSUMER_POLICY
 
-    def __init__(self):
         # Store connections by tenant_id and store_code
-        # Structure: {tenant_id: {store_code: set(websocket_connections)}}
-        self._connections: Dict[str, Dict[str, Set[WebSocket]]] = {}
+        # Structure: {tenant_id: {store_code: {websocket: ClientConnection}}}
+        self._connections: Dict[str, Dict[str, Dict[WebSocket, ClientConnection]]] = {}
         self._lock = asyncio.Lock()
+        self._close_tasks: set = set()
+
+        # Counters exposed through get_stats
+        self._dropped_messages = 0
+        self._slow_consumer_disconnects = 0
 
     async def connect(self, websocket: WebSocket, tenant_id: str, store_code: str):
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
 
-        async with self._lock:
-            # Initialize tenant dict if not exists
-            if tenant_id not in self._connections:
-                self._connections[tenant_id] = {}
+        client = ClientConnection(websocket, tenant_id, store_code, self.queue_size)
+        client.sender_task = asyncio.create_task(self._sender_loop(client))
 
-            # Initialize store set if not exists
-            if store_code not in self._connections[tenant_id]:
-                self._connections[tenant_id][store_code] = set()
-
-            # Add the connection
-            self._connections[tenant_id][store_code].add(websocket)
+        async with self._lock:
+            self._connections.setdefault(tenant_id, {}).setdefault(store_code, {})[websocket] = client
 
         logger.info(f"WebSocket connected for tenant {tenant_id}, store {store_code}")
 
     async def disconnect(self, websocket: WebSocket, tenant_id: str, store_code: str):
         """Remove a WebSocket connection"""
-        async with self._lock:
-            if tenant_id in self._connections and store_code in self._connections[tenant_id]:
-                self._connections[tenant_id][store_code].discard(websocket)
+        client = await self._unregister(websocket, tenant_id, store_code)
+        if client:
+            self._stop_sender(client)
 
-                # Clean up empty structures
-                if not self._connections[tenant_id][store_code]:
-                    del self._connections[tenant_id][store_code]
+        logger.info(f"WebSocket disconnected for tenant {tenant_id}, store {store_code}")
 
-                if not self._connections[tenant_id]:
-                    del self._connections[tenant_id]
+    async def _unregister(self, websocket: WebSocket, tenant_id: str, store_code: str) -> Optional[ClientConnection]:
+        """Remove a connection from the registry and return it"""
+        async with self._lock:
+            stores = self._connections.get(tenant_id)
+            if not stores or store_code not in stores:
+                return None
 
-        logger.info(f"WebSocket disconnected for tenant {tenant_id}, store {store_code}")
+            client = stores[store_code].pop(websocket, None)
 
-    async def send_to_store(self, tenant_id: str, store_code: str, message: str):
-        """Send a message to all connections for a specific store"""
-        disconnected = []
+            # Clean up empty structures
+            if not stores[store_code]:
+                del stores[store_code]
 
-        async with self._lock:
-            if tenant_id not in self._connections or store_code not in self._connections[tenant_id]:
-                return
+            if not stores:
+                del self._connections[tenant_id]
+
+            return client
 
-            connections = list(self._connections[tenant_id][store_code])
+    def _stop_sender(self, client: ClientConnection) -> None:
+        """Cancel the sender task of a connection unless called from that task"""
+        task = client.sender_task
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
 
-        # Send to all connections
-        for websocket in connections:
+    async def _sender_loop(self, client: ClientConnection) -> None:
+        """Drain the send queue of one connection"""
+        while True:
+            message = await client.queue.get()
             try:
-                await websocket.send_text(message)
+                await asyncio.wait_for(client.websocket.send_text(message), timeout=self.send_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"WebSocket send timed out after {self.send_timeout}s for tenant {client.tenant_id}, "
+                    f"store {client.store_code}; disconnecting"
+                )
+                self._slow_consumer_disconnects += 1
+                await self._close_client(client, SLOW_CONSUMER_CLOSE_CODE, "Send timeout")
+                return
             except Exception as e:
                 logger.error(f"Error sending to websocket: {e}")
-                disconnected.append(websocket)
+                await self._close_client(client)
+                return
+
+    async def _close_client(self, client: ClientConnection, code: int = None, reason: str = "") -> None:
+        """Unregister a connection, stop its sender and close the socket"""
+        await self._unregister(client.websocket, client.tenant_id, client.store_code)
+        self._stop_sender(client)
+        if code is None:
+            return
+        try:
+            await client.websocket.close(code=code, reason=reason)
+        except Exception as e:
+            logger.debug(f"Error closing websocket: {e}")
+
+    def _enqueue(self, client: ClientConnection, message: str) -> bool:
+        """Put a message on a connection's send queue without waiting"""
+        if client.closing:
+            return False
+        try:
+            client.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        self._dropped_messages += 1
+        client.dropped_messages += 1
+        if self.slow_consumer_policy == SlowConsumerPolicy.DISCONNECT:
+            logger.warning(
+                f"WebSocket send queue full for tenant {client.tenant_id}, store {client.store_code}; disconnecting"
+            )
+            self._slow_consumer_disconnects += 1
+            client.closing = True
+            task = asyncio.create_task(self._close_client(client, SLOW_CONSUMER_CLOSE_CODE, "Slow consumer"))
+            self._close_tasks.add(task)
+            task.add_done_callback(self._close_tasks.discard)
+        else:
+            logger.warning(
+                f"WebSocket send queue full for tenant {client.tenant_id}, store {client.store_code}; "
+                f"dropped {client.dropped_messages} messages"
+            )
+        return False
+
+    async def send_to_connection(self, websocket: WebSocket, tenant_id: str, store_code: str, message: str) -> bool:
+        """Send a message to a single registered connection"""
+        async with self._lock:
+            client = self._connections.get(tenant_id, {}).get(store_code, {}).get(websocket)
+
+        if client is None:
+            return False
+        return self._enqueue(client, message)
+
+    async def send_to_store(self, tenant_id: str, store_code: str, message: str) -> int:
+        """
+        Send a message to all connections for a specific store
 
-        # Clean up disconnected sockets
-        if disconnected:
-            async with self._lock:
-                if tenant_id in self._connections and store_code in self._connections[tenant_id]:
-                    for ws in disconnected:
-                        self._connections[tenant_id][store_code].discard(ws)
+        Returns:
+            Number of connections the message was queued for
+        """
+        async with self._lock:
+            if tenant_id not in self._connections or store_code not in self._connections[tenant_id]:
+                return 0
+
+            clients = list(self._connections[tenant_id][store_code].values())
 
-    async def broadcast_to_tenant(self, tenant_id: str, message: str):
+        return sum(1 for client in clients if self._enqueue(client, message))
+
+    async def broadcast_to_tenant(self, tenant_id: str, message: str) -> int:
         """Send a message to all stores of a tenant"""
         async with self._lock:
             if tenant_id not in self._connections:
-                return
+                return 0
 
-            stores = list(self._connections[tenant_id].keys())
+            clients = [client for store in self._connections[tenant_id].values() for client in store.values()]
 
-        # Send to all stores
-        for store_code in stores:
-            await self.send_to_store(tenant_id, store_code, message)
+        return sum(1 for client in clients if self._enqueue(client, message))
+
+    async def close(self) -> None:
+        """Stop all sender tasks (application shutdown)"""
+        async with self._lock:
+            clients = [
+                client
+                for stores in self._connections.values()
+                for store in stores.values()
+                for client in store.values()
+            ]
+            self._connections.clear()
+
+        for client in clients:
+            self._stop_sender(client)
 
     def get_connection_count(self, tenant_id: str = None, store_code: str = None) -> int:
         """Get the number of active connections"""
@@ -103,3 +230,13 @@ class ConnectionManager:
                     count += len(store)
 
         return count
+
+    def get_stats(self) -> dict:
+        """Get connection and slow consumer statistics"""
+        return {
+            "connections": self.get_connection_count(),
+            "queue_size": self.queue_size,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "dropped_messages": self._dropped_messages,
+            "slow_consumer_disconnects": self._slow_consumer_disconnects,
+        }
@@ -46,9 +46,16 @@ test_files=(
     "tests/test_clean_data.py"
     "tests/test_setup_data.py"
     "tests/test_stock.py"
+    "tests/test_transaction_bulk_update.py"
+    "tests/test_stock_alert_flags.py"
+    "tests/test_stock_history.py"
     "tests/test_snapshot_date_range.py"
+    "tests/test_snapshot_chunks.py"
     "tests/test_snapshot_schedule_api.py"
     "tests/test_snapshot_scheduler.py"
+    "tests/test_snapshot_executor.py"
+    "tests/test_alert_fanout.py"
+    "tests/test_alert_coalescing.py"
     "tests/test_reorder_alerts.py"
     "tests/test_websocket_alerts.py"
     "tests/test_websocket_reorder_new.py"
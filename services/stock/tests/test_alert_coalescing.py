@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+
+from app.config.settings import settings
+from app.models.documents.stock_document import StockDocument
+from app.services.alert_service import AlertService
+from app.utils.cooldown_cache import CooldownCache
+from app.websocket.alert_broadcaster import AlertBroadcaster
+from app.websocket.connection_manager import ConnectionManager
+
+
+class RecordingBroadcaster(AlertBroadcaster):
+    """Broadcaster that records published frames."""
+
+    def __init__(self):
+        super().__init__(ConnectionManager(queue_size=10, send_timeout=1.0))
+        self.published = []
+
+    async def publish_async(self, alert_data):
+        self.published.append(alert_data)
+
+
+def _stock(item_code: str, current_quantity: float, store_code: str = "S001") -> StockDocument:
+    return StockDocument(
+        tenant_id="T0001",
+        store_code=store_code,
+        item_code=item_code,
+        current_quantity=current_quantity,
+        minimum_quantity=0.0,
+        reorder_point=10.0,
+        reorder_quantity=20.0,
+    )
+
+
+def _make_service(monkeypatch, window: float) -> AlertService:
+    monkeypatch.setattr(settings, "ALERT_COALESCE_WINDOW_SECONDS", window)
+    monkeypatch.setattr(settings, "ALERT_COOLDOWN_SECONDS", 60)
+    return AlertService(None, RecordingBroadcaster())
+
+
+def test_cooldown_cache_expires_and_is_bounded():
+    cache = CooldownCache(ttl_seconds=10, max_size=2)
+    assert cache.try_acquire("a", now=0) is True
+    assert cache.try_acquire("a", now=5) is False
+    assert cache.try_acquire("a", now=10) is True
+
+    assert cache.try_acquire("b", now=11) is True
+    assert cache.try_acquire("c", now=12) is True
+    # "a" was the oldest entry and has been evicted by the size bound
+    assert len(cache) == 2
+    assert "a" not in cache
+
+
+@pytest.mark.asyncio
+async def test_updates_of_hot_item_are_coalesced(monkeypatch):
+    service = _make_service(monkeypatch, 0.05)
+    service.start()
+
+    for quantity in range(9, 0, -1):
+        await service.check_and_send_alerts(_stock("ITEM001", quantity))
+    await asyncio.sleep(0.15)
+
+    published = service.broadcaster.published
+    assert len(published) == 1
+    # evaluated once, with the latest state
+    assert published[0]["alert_type"] == "reorder_point"
+    assert published[0]["current_quantity"] == 1
+
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_alerts_batched_per_store(monkeypatch):
+    service = _make_service(monkeypatch, 0.05)
+    service.start()
+
+    await service.check_and_send_alerts_many([_stock("ITEM001", 1), _stock("ITEM002", 2), _stock("ITEM003", 3, "S002")])
+    await asyncio.sleep(0.15)
+
+    frames = {frame["store_code"]: frame for frame in service.broadcaster.published}
+    assert frames["S001"]["type"] == "stock_alert_batch"
+    assert [alert["item_code"] for alert in frames["S001"]["alerts"]] == ["ITEM001", "ITEM002"]
+    # a single alert keeps the plain alert message
+    assert frames["S002"]["type"] == "stock_alert"
+
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_pending_alerts_sent_on_stop_and_immediate_when_not_started(monkeypatch):
+    service = _make_service(monkeypatch, 10.0)
+    service.start()
+    await service.check_and_send_alerts(_stock("ITEM001", 1))
+    assert service.broadcaster.published == []
+
+    await service.stop()
+    assert len(service.broadcaster.published) == 1
+
+    # not started: evaluated immediately, cooldown still applies
+    await service.check_and_send_alerts(_stock("ITEM002", 1))
+    await service.check_and_send_alerts(_stock("ITEM002", 1))
+    assert [frame["item_code"] for frame in service.broadcaster.published] == ["ITEM001", "ITEM002"]
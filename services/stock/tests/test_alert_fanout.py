@@ -0,0 +1,164 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.alert_service import AlertService
+from app.websocket.alert_broadcaster import DaprAlertBroadcaster, InMemoryAlertBus, LocalAlertBroadcaster
+from app.websocket.connection_manager import SLOW_CONSUMER_CLOSE_CODE, ConnectionManager, SlowConsumerPolicy
+
+
+class FakeWebSocket:
+    """WebSocket that records sent messages; a blocked socket never completes a send."""
+
+    def __init__(self, blocked: bool = False):
+        self.sent = []
+        self.closed_code = None
+        self._unblock = asyncio.Event()
+        if not blocked:
+            self._unblock.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        await self._unblock.wait()
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_code = code
+
+
+def _alert(item_code: str) -> dict:
+    return {
+        "type": "stock_alert",
+        "alert_type": "reorder_point",
+        "tenant_id": "T0001",
+        "store_code": "S001",
+        "item_code": item_code,
+    }
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_alert_reaches_clients_on_every_replica():
+    bus = InMemoryAlertBus()
+    replicas = [ConnectionManager(queue_size=10, send_timeout=1.0) for _ in range(2)]
+    services = [AlertService(manager, LocalAlertBroadcaster(manager, bus)) for manager in replicas]
+    sockets = [FakeWebSocket() for _ in replicas]
+    for manager, websocket in zip(replicas, sockets):
+        await manager.connect(websocket, "T0001", "S001")
+
+    # published on replica 0 only
+    await services[0].send_alert(_alert("ITEM001"))
+    await _drain()
+
+    for websocket in sockets:
+        assert [json.loads(m)["item_code"] for m in websocket.sent] == ["ITEM001"]
+
+    for manager in replicas:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_current_alerts_sent_to_new_connection_only():
+    bus = InMemoryAlertBus()
+    replicas = [ConnectionManager(queue_size=10, send_timeout=1.0) for _ in range(2)]
+    services = [AlertService(manager, LocalAlertBroadcaster(manager, bus)) for manager in replicas]
+    existing = [FakeWebSocket() for _ in replicas]
+    for manager, websocket in zip(replicas, existing):
+        await manager.connect(websocket, "T0001", "S001")
+    new_socket = FakeWebSocket()
+    await replicas[0].connect(new_socket, "T0001", "S001")
+
+    await services[0].send_alerts_to_connection(new_socket, "T0001", "S001", [_alert("ITEM001"), _alert("ITEM002")])
+    await _drain()
+
+    frames = [json.loads(m) for m in new_socket.sent]
+    assert [frame["type"] for frame in frames] == ["stock_alert_batch"]
+    assert [alert["item_code"] for alert in frames[0]["alerts"]] == ["ITEM001", "ITEM002"]
+    for websocket in existing:
+        assert websocket.sent == []
+    # the cooldown is left untouched for the regular alerts
+    assert len(services[0].recent_alerts) == 0
+
+    for manager in replicas:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_drops_without_blocking_others():
+    manager = ConnectionManager(queue_size=2, send_timeout=10.0, slow_consumer_policy=SlowConsumerPolicy.DROP)
+    fast = FakeWebSocket()
+    slow = FakeWebSocket(blocked=True)
+    await manager.connect(fast, "T0001", "S001")
+    await manager.connect(slow, "T0001", "S001")
+
+    for i in range(5):
+        await manager.send_to_store("T0001", "S001", f"message-{i}")
+        await _drain()
+
+    assert fast.sent == [f"message-{i}" for i in range(5)]
+    # one message is in flight, two are queued, the rest were dropped
+    assert manager.get_stats()["dropped_messages"] == 2
+    assert manager.get_connection_count("T0001", "S001") == 2
+
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_disconnected_when_queue_full():
+    manager = ConnectionManager(queue_size=1, send_timeout=10.0, slow_consumer_policy=SlowConsumerPolicy.DISCONNECT)
+    slow = FakeWebSocket(blocked=True)
+    await manager.connect(slow, "T0001", "S001")
+
+    for i in range(3):
+        await manager.send_to_store("T0001", "S001", f"message-{i}")
+        await _drain()
+
+    assert slow.closed_code == SLOW_CONSUMER_CLOSE_CODE
+    assert manager.get_connection_count() == 0
+    assert manager.get_stats()["slow_consumer_disconnects"] == 1
+
+
+@pytest.mark.asyncio
+async def test_send_timeout_disconnects():
+    manager = ConnectionManager(queue_size=10, send_timeout=0.05)
+    slow = FakeWebSocket(blocked=True)
+    await manager.connect(slow, "T0001", "S001")
+
+    await manager.send_to_store("T0001", "S001", "message")
+    await asyncio.sleep(0.2)
+
+    assert slow.closed_code == SLOW_CONSUMER_CLOSE_CODE
+    assert manager.get_connection_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_dapr_broadcaster_publishes_and_falls_back_to_local():
+    manager = ConnectionManager(queue_size=10, send_timeout=1.0)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "T0001", "S001")
+
+    with patch("kugel_common.utils.dapr_client_helper.DaprClientHelper") as mock_client_class:
+        mock_client = mock_client_class.return_value
+        mock_client.publish_event = AsyncMock(return_value=True)
+        broadcaster = DaprAlertBroadcaster(manager, "pubsub-stock-alert", "topic-stock-alert")
+
+        # published: delivered when the subscription handler receives it, not directly
+        await broadcaster.publish_async(_alert("ITEM001"))
+        await _drain()
+        mock_client.publish_event.assert_awaited_once()
+        assert websocket.sent == []
+
+        # publish failed: delivered to this replica only
+        mock_client.publish_event = AsyncMock(return_value=False)
+        await broadcaster.publish_async(_alert("ITEM002"))
+        await _drain()
+        assert [json.loads(m)["item_code"] for m in websocket.sent] == ["ITEM002"]
+
+    await manager.close()
@@ -0,0 +1,76 @@
+# Copyright 2025 masa@kugel
+# Chunked stock snapshot tests
+#
+# These tests verify that SnapshotService:
+# 1. Stores snapshot items as pages in the chunk collection with a header document
+# 2. Returns the generated snapshot ID without re-reading the header
+# 3. Pages through the chunks when retrieving a snapshot by ID
+# 4. Lists snapshots with their first page of items
+# 5. Gets its snapshot indexes on tenants created before chunked snapshots existed
+
+import os
+import pytest
+
+from app.config.settings import settings
+from app.database import database_setup
+from app.models.repositories import StockRepository
+from app.services.snapshot_service import SnapshotService
+
+test_store_code = "SNAPCHUNK01"
+
+
+@pytest.mark.asyncio
+async def test_create_and_page_chunked_snapshot(setup_db, monkeypatch):
+    db = setup_db
+    tenant_id = os.environ.get("TENANT_ID")
+    monkeypatch.setattr(settings, "SNAPSHOT_CHUNK_SIZE", 10)
+    monkeypatch.setattr(settings, "SNAPSHOT_CHUNKS_PER_INSERT", 2)
+
+    stock_repository = StockRepository(db)
+    await stock_repository.update_quantities_atomic_async(
+        tenant_id, test_store_code, {f"ITEM{i:03d}": float(i) for i in range(25)}
+    )
+
+    snapshot_service = SnapshotService(db)
+    snapshot = await snapshot_service.create_snapshot_async(tenant_id, test_store_code, "test_user")
+
+    assert snapshot.snapshot_id is not None
+    assert snapshot.total_items == 25
+    assert snapshot.total_quantity == float(sum(range(25)))
+    assert snapshot.chunk_count == 3
+    assert len(snapshot.stocks) == 10
+
+    item_codes = []
+    for page in range(1, snapshot.chunk_count + 1):
+        retrieved = await snapshot_service.get_snapshot_by_id_async(
+            tenant_id, test_store_code, snapshot.snapshot_id, page
+        )
+        item_codes.extend(item.item_code for item in retrieved.stocks)
+    assert item_codes == [f"ITEM{i:03d}" for i in range(25)]
+
+    # other stores cannot read the snapshot
+    assert await snapshot_service.get_snapshot_by_id_async(tenant_id, "OTHER", snapshot.snapshot_id) is None
+
+    snapshots, _ = await snapshot_service.get_snapshots_async(tenant_id, test_store_code)
+    listed = next(s for s in snapshots if s.snapshot_id == snapshot.snapshot_id)
+    assert [item.item_code for item in listed.stocks] == [f"ITEM{i:03d}" for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_upgrade_creates_snapshot_indexes(setup_db):
+    db = setup_db
+    tenant_id = os.environ.get("TENANT_ID")
+    snapshot_index = f"{settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT}_index_snapshot_id"
+    chunk_index = f"{settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT_CHUNK}_index_snapshot_id_chunk_no"
+
+    # tenant set up before the indexes existed
+    await db[settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT].drop_index(snapshot_index)
+    await db[settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT_CHUNK].drop_index(chunk_index)
+
+    # idempotent: the second run finds the indexes in place
+    for _ in range(2):
+        await database_setup.upgrade_collections(tenant_id)
+
+    assert snapshot_index in await db[settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT].index_information()
+    chunk_indexes = await db[settings.DB_COLLECTION_NAME_STOCK_SNAPSHOT_CHUNK].index_information()
+    assert chunk_indexes[chunk_index]["unique"] is True
@@ -0,0 +1,189 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models.documents.snapshot_run_document import SnapshotRunDocument, SnapshotRunStatus
+from app.services.snapshot_executor import SnapshotExecutor
+
+
+class FakeSnapshotService:
+    """Snapshot service that records the number of concurrent snapshots."""
+
+    running = 0
+    max_running = 0
+    failing_stores: set = set()
+
+    def __init__(self, db):
+        pass
+
+    async def create_snapshot_async(self, tenant_id, store_code, created_by):
+        FakeSnapshotService.running += 1
+        FakeSnapshotService.max_running = max(FakeSnapshotService.max_running, FakeSnapshotService.running)
+        try:
+            await asyncio.sleep(0.01)
+            if store_code in FakeSnapshotService.failing_stores:
+                raise RuntimeError(f"snapshot failed for {store_code}")
+        finally:
+            FakeSnapshotService.running -= 1
+
+
+@pytest.fixture
+def fake_snapshot_service():
+    FakeSnapshotService.running = 0
+    FakeSnapshotService.max_running = 0
+    FakeSnapshotService.failing_stores = set()
+    with patch("app.services.snapshot_executor.SnapshotService", FakeSnapshotService):
+        yield FakeSnapshotService
+
+
+def _mock_run_repository(latest_run=None):
+    repo = MagicMock()
+    repo.create_async = AsyncMock()
+    repo.get_latest_run = AsyncMock(return_value=latest_run)
+    repo.mark_store_completed = AsyncMock()
+    repo.mark_store_failed = AsyncMock()
+    repo.claim_for_resume = AsyncMock(return_value=True)
+    repo.heartbeat = AsyncMock()
+
+    async def mark_finished(run_id):
+        failed = {call.args[1]: call.args[2] for call in repo.mark_store_failed.call_args_list}
+        completed = [call.args[1] for call in repo.mark_store_completed.call_args_list]
+        return SnapshotRunDocument(
+            tenant_id="tenant1",
+            run_id=run_id,
+            status=SnapshotRunStatus.PARTIAL if failed else SnapshotRunStatus.COMPLETED,
+            completed_stores=completed,
+            failed_stores=failed,
+        )
+
+    repo.mark_finished = AsyncMock(side_effect=mark_finished)
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_execute_respects_tenant_concurrency(fake_snapshot_service):
+    """Store snapshots of one tenant never exceed the per-tenant limit."""
+    executor = SnapshotExecutor(max_concurrency_per_tenant=3, max_concurrency_global=10)
+    repo = _mock_run_repository()
+
+    with patch("app.services.snapshot_executor.SnapshotRunRepository", return_value=repo):
+        run = await executor.execute_async("tenant1", MagicMock(), [f"store{i}" for i in range(10)])
+
+    assert run.status == SnapshotRunStatus.COMPLETED
+    assert len(run.completed_stores) == 10
+    assert fake_snapshot_service.max_running == 3
+
+    status = executor.get_status()["tenants"]["tenant1"]
+    assert status["completed"] == 10
+    assert status["in_progress"] == 0
+    assert len(status["store_durations"]) == 10
+
+
+@pytest.mark.asyncio
+async def test_execute_respects_global_concurrency(fake_snapshot_service):
+    """Store snapshots of all tenants share the global limit."""
+    executor = SnapshotExecutor(max_concurrency_per_tenant=4, max_concurrency_global=5)
+
+    with patch(
+        "app.services.snapshot_executor.SnapshotRunRepository", side_effect=lambda db: _mock_run_repository()
+    ):
+        await asyncio.gather(
+            executor.execute_async("tenant1", MagicMock(), [f"store{i}" for i in range(8)]),
+            executor.execute_async("tenant2", MagicMock(), [f"store{i}" for i in range(8)]),
+        )
+
+    assert fake_snapshot_service.max_running == 5
+
+
+@pytest.mark.asyncio
+async def test_execute_records_failures_and_resume_retries_pending(fake_snapshot_service):
+    """Failed stores are recorded and only the pending stores are retried on resume."""
+    executor = SnapshotExecutor(max_concurrency_per_tenant=2, max_concurrency_global=2)
+    fake_snapshot_service.failing_stores = {"store2"}
+    repo = _mock_run_repository()
+
+    with patch("app.services.snapshot_executor.SnapshotRunRepository", return_value=repo):
+        run = await executor.execute_async("tenant1", MagicMock(), ["store1", "store2", "store3"])
+
+    assert run.status == SnapshotRunStatus.PARTIAL
+    assert list(run.failed_stores) == ["store2"]
+
+    previous_run = SnapshotRunDocument(
+        tenant_id="tenant1",
+        run_id=run.run_id,
+        status=SnapshotRunStatus.PARTIAL,
+        target_stores=["store1", "store2", "store3"],
+        completed_stores=["store1", "store3"],
+        failed_stores={"store2": "snapshot failed"},
+    )
+    fake_snapshot_service.failing_stores = set()
+    resume_repo = _mock_run_repository(latest_run=previous_run)
+
+    with patch("app.services.snapshot_executor.SnapshotRunRepository", return_value=resume_repo):
+        resumed = await executor.resume_async("tenant1", MagicMock())
+
+    assert resume_repo.claim_for_resume.await_args.args[:2] == (run.run_id, executor.owner_id)
+    assert [call.args[1] for call in resume_repo.mark_store_completed.call_args_list] == ["store2"]
+    assert resumed.status == SnapshotRunStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_resume_without_incomplete_run(fake_snapshot_service):
+    """Nothing is resumed when the latest run completed."""
+    executor = SnapshotExecutor()
+    completed_run = SnapshotRunDocument(tenant_id="tenant1", run_id="run1", status=SnapshotRunStatus.COMPLETED)
+
+    with patch(
+        "app.services.snapshot_executor.SnapshotRunRepository",
+        return_value=_mock_run_repository(latest_run=completed_run),
+    ):
+        assert await executor.resume_async("tenant1", MagicMock()) is None
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_run_claimed_by_another_owner(fake_snapshot_service):
+    """A running run is not resumed while its owner keeps the heartbeat fresh."""
+    executor = SnapshotExecutor()
+    running_run = SnapshotRunDocument(
+        tenant_id="tenant1", run_id="run1", status=SnapshotRunStatus.RUNNING, target_stores=["store1"]
+    )
+    repo = _mock_run_repository(latest_run=running_run)
+    repo.claim_for_resume = AsyncMock(return_value=False)
+
+    with patch("app.services.snapshot_executor.SnapshotRunRepository", return_value=repo):
+        assert await executor.resume_async("tenant1", MagicMock()) is None
+
+    repo.mark_store_completed.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_run_records_duration(fake_snapshot_service):
+    """Cancelling a run propagates CancelledError and still records the store duration."""
+    executor = SnapshotExecutor(max_concurrency_per_tenant=1, max_concurrency_global=1)
+    repo = _mock_run_repository()
+
+    with patch("app.services.snapshot_executor.SnapshotRunRepository", return_value=repo):
+        task = asyncio.create_task(executor.execute_async("tenant1", MagicMock(), ["store1"]))
+        await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert "store1" in executor.get_status()["tenants"]["tenant1"]["store_durations"]
+
+
+@pytest.mark.asyncio
+async def test_run_repository_ensures_indexes():
+    from app.repositories.snapshot_run_repository import SnapshotRunRepository
+
+    repo = SnapshotRunRepository(MagicMock())
+    repo.dbcollection = MagicMock()
+    repo.dbcollection.create_index = AsyncMock()
+
+    await repo.ensure_indexes_async()
+
+    calls = {call.kwargs["name"]: call for call in repo.dbcollection.create_index.await_args_list}
+    # same names as database_setup gives the indexes of new tenants
+    assert calls["snapshot_runs_index_run_id"].args[0] == [("run_id", 1)]
+    assert calls["snapshot_runs_index_run_id"].kwargs["unique"] is True
+    assert calls["snapshot_runs_index_tenant_id_started_at"].args[0] == [("tenant_id", 1), ("started_at", -1)]
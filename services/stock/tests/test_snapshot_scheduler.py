@@ -193,6 +193,25 @@ async def test_get_target_stores_specific(scheduler):
     assert "store2" in stores
 
 
+@pytest.mark.asyncio
+async def test_is_tenant_running_matches_tenant_exactly(scheduler):
+    """A running tenant must not mark tenants whose id starts with it as running."""
+    scheduler.get_db_func = AsyncMock(return_value=MagicMock())
+    observed = {}
+
+    async def resume_async(tenant_id, db):
+        observed["A1"] = scheduler.is_tenant_running("A1")
+        observed["A1_x"] = scheduler.is_tenant_running("A1_x")
+        return None
+
+    scheduler.executor.resume_async = resume_async
+
+    await scheduler.resume_tenant_snapshot("A1")
+
+    assert observed == {"A1": True, "A1_x": False}
+    assert scheduler.is_tenant_running("A1") is False
+
+
 def test_get_status(scheduler):
     """Test getting scheduler status."""
     scheduler.scheduler = MagicMock()
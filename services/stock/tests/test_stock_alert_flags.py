@@ -0,0 +1,62 @@
+# Copyright 2025 masa@kugel
+# Low-stock / reorder flag tests
+#
+# These tests verify that:
+# 1. The alert flags follow the low-stock (current < minimum) and reorder
+#    (reorder_point > 0 and current <= reorder_point) rules
+# 2. Quantity updates, bulk updates and parameter setters keep the flags in sync,
+#    and the low-stock / reorder queries return exactly the flagged stocks
+
+import os
+import pytest
+
+from app.enums.update_type import UpdateType
+from app.models.repositories.stock_repository import StockRepository, compute_alert_flags
+from app.services.stock_service import StockService
+
+test_store_code = "5678"
+
+
+def test_compute_alert_flags():
+    assert compute_alert_flags(5, 10, 0) == {"is_below_minimum": True, "is_below_reorder": False}
+    assert compute_alert_flags(10, 10, 10) == {"is_below_minimum": False, "is_below_reorder": True}
+    assert compute_alert_flags(11, 10, 10) == {"is_below_minimum": False, "is_below_reorder": False}
+    # no reorder point set: never a reorder alert
+    assert compute_alert_flags(-1, 0, 0) == {"is_below_minimum": True, "is_below_reorder": False}
+
+
+@pytest.mark.asyncio
+async def test_flags_maintained_on_updates(setup_db):
+    db = setup_db
+    tenant_id = os.environ.get("TENANT_ID")
+    stock_service = StockService(db)
+    repository = StockRepository(db)
+    await repository.ensure_alert_flags_async()
+
+    # new stock created by the setter
+    await stock_service.set_minimum_quantity_async(tenant_id, test_store_code, "ITEM_FLAG_A", 10.0)
+    stock = await repository.find_by_item_async(tenant_id, test_store_code, "ITEM_FLAG_A")
+    assert stock.is_below_minimum is True
+
+    # atomic update above the minimum clears the flag
+    await stock_service.update_stock_async(
+        tenant_id, test_store_code, "ITEM_FLAG_A", 20.0, update_type=UpdateType.ADJUSTMENT
+    )
+    stock = await repository.find_by_item_async(tenant_id, test_store_code, "ITEM_FLAG_A")
+    assert stock.is_below_minimum is False
+
+    # reorder parameters on an existing stock
+    await stock_service.set_reorder_parameters_async(tenant_id, test_store_code, "ITEM_FLAG_A", 25.0, 50.0)
+    stock = await repository.find_by_item_async(tenant_id, test_store_code, "ITEM_FLAG_A")
+    assert stock.is_below_reorder is True
+
+    # bulk update (transaction path) upserts a new item and lowers the existing one
+    await repository.update_quantities_atomic_async(
+        tenant_id, test_store_code, {"ITEM_FLAG_A": -15.0, "ITEM_FLAG_B": -1.0}
+    )
+
+    low_stock_codes = {s.item_code for s in await repository.find_low_stock_async(tenant_id, test_store_code)}
+    reorder_codes = {s.item_code for s in await repository.find_reorder_alerts_async(tenant_id, test_store_code)}
+    assert {"ITEM_FLAG_A", "ITEM_FLAG_B"} <= low_stock_codes
+    assert "ITEM_FLAG_A" in reorder_codes
+    assert "ITEM_FLAG_B" not in reorder_codes
@@ -0,0 +1,179 @@
+# Copyright 2025 masa@kugel
+# Stock update history tests (write-behind writer, keyset pagination, compaction)
+#
+# These tests verify that:
+# 1. StockHistoryWriter writes sync records immediately, buffers batched records
+#    until the flush task runs and drops disabled records
+# 2. History cursors round-trip and invalid cursors are rejected
+# 3. History pages follow each other without gaps or duplicates
+# 4. Compaction rolls old sale history into daily aggregates and deletes it
+# 5. Compaction is skipped while another replica holds the lease, and an
+#    interrupted run is finished without counting its updates twice
+
+import os
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+
+from app.enums.update_type import UpdateType
+from app.models.documents import StockUpdateDocument
+from app.models.repositories import StockUpdateRepository, StockUpdateDailyRepository
+from app.models.repositories.stock_update_repository import HISTORY_SORT
+from app.services.stock_history_writer import StockHistoryWriter
+from app.services.stock_history_compaction_service import StockHistoryCompactionService, COMPACTABLE_UPDATE_TYPES
+from kugel_common.exceptions import InvalidRequestDataException
+from kugel_common.models.repositories.keyset_pagination import encode_cursor, decode_cursor
+from kugel_common.utils.mongo_lease import MongoLease
+
+test_store_code = "5678"
+
+
+class _Database:
+    name = "db_stock_history_test"
+
+    def __getitem__(self, collection_name):
+        return None
+
+
+def _make_update(item_code: str, update_type: UpdateType, timestamp: datetime = None) -> StockUpdateDocument:
+    return StockUpdateDocument(
+        tenant_id=os.environ.get("TENANT_ID", "T0000"),
+        store_code=test_store_code,
+        item_code=item_code,
+        update_type=update_type,
+        quantity_change=-1.0,
+        before_quantity=10.0,
+        after_quantity=9.0,
+        reference_id="1",
+        timestamp=timestamp or datetime.now(timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_history_writer_durability(monkeypatch):
+    written = []
+
+    async def create_many_async(self, updates):
+        written.extend(updates)
+
+    monkeypatch.setattr(StockUpdateRepository, "create_many_async", create_many_async)
+
+    writer = StockHistoryWriter(
+        default_durability="sync",
+        durability_by_type={"sale": "batched", "void": "disabled"},
+        batch_size=100,
+        flush_interval=0.05,
+    )
+    writer.start()
+    try:
+        await writer.write_async(
+            _Database(),
+            [
+                _make_update("ITEM_A", UpdateType.SALE),
+                _make_update("ITEM_B", UpdateType.ADJUSTMENT),
+                _make_update("ITEM_C", UpdateType.VOID),
+            ],
+        )
+        # the adjustment is written synchronously, the sale waits for the flush task
+        assert [u.item_code for u in written] == ["ITEM_B"]
+        assert writer.get_status()["buffered"] == 1
+
+        await asyncio.sleep(0.2)
+        assert [u.item_code for u in written] == ["ITEM_B", "ITEM_A"]
+    finally:
+        await writer.stop()
+    assert writer.get_status()["written"] == 2
+
+
+def test_history_cursor_round_trip():
+    timestamp = datetime(2025, 1, 2, 3, 4, 5, 678000)
+    object_id = ObjectId()
+    cursor = encode_cursor({"timestamp": timestamp, "_id": object_id}, HISTORY_SORT, 2)
+    assert decode_cursor(cursor, HISTORY_SORT) == ([timestamp, object_id], 2)
+
+    with pytest.raises(InvalidRequestDataException):
+        decode_cursor("not-a-cursor", HISTORY_SORT)
+
+
+@pytest.mark.asyncio
+async def test_history_keyset_pages_and_compaction(setup_db):
+    db = setup_db
+    repository = StockUpdateRepository(db)
+    item_code = "ITEM_HISTORY_001"
+    old = datetime.now(timezone.utc) - timedelta(days=100)
+
+    # 5 recent updates sharing one timestamp (ties are broken by _id) and 3 old sales
+    now = datetime.now(timezone.utc)
+    await repository.create_many_async([_make_update(item_code, UpdateType.SALE, now) for _ in range(5)])
+    await repository.create_many_async(
+        [_make_update(item_code, UpdateType.SALE, old + timedelta(minutes=i)) for i in range(3)]
+    )
+
+    tenant_id = os.environ.get("TENANT_ID")
+    seen = []
+    cursor = None
+    while True:
+        updates, cursor = await repository.find_by_item_async(tenant_id, test_store_code, item_code, 3, cursor)
+        seen.extend(updates)
+        if cursor is None:
+            break
+    assert len(seen) == 8
+    assert [u.timestamp for u in seen] == sorted([u.timestamp for u in seen], reverse=True)
+
+    # offset paging still walks the same order, and the total is counted
+    page_2, next_cursor = await repository.find_by_item_async(tenant_id, test_store_code, item_code, 3, skip=3)
+    assert [u.timestamp for u in page_2] == [u.timestamp for u in seen[3:6]]
+    assert next_cursor is not None
+    assert await repository.count_by_item_async(tenant_id, test_store_code, item_code) == (8, False)
+    assert await repository.count_by_item_async(tenant_id, test_store_code, item_code, "estimate") == (8, False)
+    assert await repository.count_by_item_async(tenant_id, test_store_code, item_code, "none") == (None, None)
+
+    compacted = await StockHistoryCompactionService(db).compact_async(older_than_days=90)
+    assert compacted == 3
+
+    updates, _ = await repository.find_by_item_async(tenant_id, test_store_code, item_code, 100)
+    assert len(updates) == 5
+
+    aggregates, _ = await StockUpdateDailyRepository(db).find_by_item_async(tenant_id, test_store_code, item_code)
+    assert sum(a.update_count for a in aggregates) == 3
+    assert sum(a.quantity_change for a in aggregates) == -3.0
+
+
+@pytest.mark.asyncio
+async def test_compaction_skipped_without_lease(monkeypatch):
+    async def acquire_async(self, fields=None):
+        return False
+
+    async def claim_for_compaction_async(self, cutoff, update_types, compaction_id):
+        raise AssertionError("claimed without the lease")
+
+    monkeypatch.setattr(MongoLease, "acquire_async", acquire_async)
+    monkeypatch.setattr(StockUpdateRepository, "claim_for_compaction_async", claim_for_compaction_async)
+
+    assert await StockHistoryCompactionService(_Database()).compact_async(older_than_days=90) == 0
+
+
+@pytest.mark.asyncio
+async def test_compaction_resumes_interrupted_run(setup_db):
+    db = setup_db
+    repository = StockUpdateRepository(db)
+    daily_repository = StockUpdateDailyRepository(db)
+    item_code = "ITEM_HISTORY_002"
+    old = datetime.now(timezone.utc) - timedelta(days=100)
+    await repository.create_many_async(
+        [_make_update(item_code, UpdateType.SALE, old + timedelta(minutes=i)) for i in range(4)]
+    )
+
+    # a run that merged its updates but stopped before deleting them
+    cutoff = datetime.now(timezone.utc) - timedelta(days=90)
+    assert await repository.claim_for_compaction_async(cutoff, COMPACTABLE_UPDATE_TYPES, "interrupted") == 4
+    await repository.merge_compaction_async("interrupted", daily_repository.collection_name)
+
+    assert await StockHistoryCompactionService(db).compact_async(older_than_days=90) == 4
+    assert await repository.find_pending_compaction_ids_async() == []
+
+    tenant_id = os.environ.get("TENANT_ID")
+    aggregates, _ = await daily_repository.find_by_item_async(tenant_id, test_store_code, item_code)
+    assert sum(a.update_count for a in aggregates) == 4
+    assert sum(a.quantity_change for a in aggregates) == -4.0
@@ -0,0 +1,100 @@
+# Copyright 2025 masa@kugel
+# Transaction-level bulk stock update tests
+#
+# These tests verify that:
+# 1. Line items of the same item are merged, cancelled and non-positive lines are skipped
+# 2. process_transaction_async updates every item once (exact post-images) and records
+#    one history entry per item with consistent before/after quantities
+# 3. before/after quantities come from each update's own post-image, so a concurrent
+#    writer changing the same item right after the update does not skew them
+
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from kugel_common.enums import TransactionType
+from app.enums.update_type import UpdateType
+from app.services.stock_service import StockService
+from app.models.repositories import StockUpdateRepository
+
+test_store_code = "5678"
+
+
+def test_merge_line_item_quantities():
+    line_items = [
+        {"item_code": "ITEM_A", "quantity": 2},
+        {"item_code": "ITEM_B", "quantity": 1},
+        {"item_code": "ITEM_A", "quantity": 3},
+        {"item_code": "ITEM_B", "quantity": 5, "is_cancelled": True},
+        {"item_code": "ITEM_C", "quantity": 0},
+    ]
+
+    assert StockService.merge_line_item_quantities(line_items, -1) == {"ITEM_A": -5, "ITEM_B": -1}
+    assert StockService.merge_line_item_quantities(line_items, 1) == {"ITEM_A": 5, "ITEM_B": 1}
+
+
+@pytest.mark.asyncio
+async def test_quantities_come_from_own_post_images():
+    quantities = {"ITEM_A": 10.0, "ITEM_B": 3.0}
+
+    async def find_one_and_update(filter, update, upsert, return_document):
+        item_code = filter["item_code"]
+        change = {"ITEM_A": -2.0, "ITEM_B": -1.0}[item_code]
+        quantities[item_code] += change
+        post_image = {**filter, "current_quantity": quantities[item_code]}
+        # another terminal sells the same item right after this update
+        quantities[item_code] -= 100.0
+        return post_image
+
+    stock_service = StockService(MagicMock())
+    stock_service._stock_repository.dbcollection = MagicMock()
+    stock_service._stock_repository.dbcollection.find_one_and_update = find_one_and_update
+    stock_service._stock_update_repository.create_many_async = AsyncMock()
+
+    records = await stock_service.apply_quantity_changes_async(
+        "T0001", test_store_code, {"ITEM_A": -2.0, "ITEM_B": -1.0}, UpdateType.SALE, reference_id="1"
+    )
+
+    by_item = {record.item_code: record for record in records}
+    assert (by_item["ITEM_A"].before_quantity, by_item["ITEM_A"].after_quantity) == (10.0, 8.0)
+    assert (by_item["ITEM_B"].before_quantity, by_item["ITEM_B"].after_quantity) == (3.0, 2.0)
+    stock_service._stock_update_repository.create_many_async.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_process_transaction_bulk_update(setup_db):
+    db = setup_db
+    tenant_id = os.environ.get("TENANT_ID")
+    stock_service = StockService(db)
+
+    await stock_service.update_stock_async(
+        tenant_id, test_store_code, "ITEM_BULK_A", 10.0, update_type=UpdateType.ADJUSTMENT
+    )
+
+    transaction = {
+        "tenant_id": tenant_id,
+        "store_code": test_store_code,
+        "terminal_no": 1,
+        "transaction_no": 9001,
+        "transaction_type": TransactionType.NormalSales.value,
+        "sales": {"is_cancelled": False},
+        "line_items": [
+            {"item_code": "ITEM_BULK_A", "quantity": 2},
+            {"item_code": "ITEM_BULK_B", "quantity": 1},
+            {"item_code": "ITEM_BULK_A", "quantity": 3},
+        ],
+    }
+    await stock_service.process_transaction_async(transaction)
+
+    stock_a = await stock_service.get_stock_async(tenant_id, test_store_code, "ITEM_BULK_A")
+    stock_b = await stock_service.get_stock_async(tenant_id, test_store_code, "ITEM_BULK_B")
+    assert stock_a.current_quantity == 5.0
+    assert stock_b.current_quantity == -1.0
+
+    update_repository = StockUpdateRepository(db)
+    updates = await update_repository.get_list_async({"tenant_id": tenant_id, "reference_id": "9001"})
+    assert len(updates) == 2
+    update_a = next(u for u in updates if u.item_code == "ITEM_BULK_A")
+    assert update_a.quantity_change == -5.0
+    assert update_a.before_quantity == 10.0
+    assert update_a.after_quantity == 5.0